@@ -0,0 +1,71 @@
+""" Measures utils.list_file_paths on deep and wide directory trees, compared with the previous recursive implementation.
+
+Usage:
+    python -m benchmarks.directory_walk [--depth 500] [--width 2000] [--files 10] [--max-workers 8]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from glasswall import utils
+
+
+def legacy_iterate_directory_entries(directory: str, file_type: str = "all", absolute: bool = True, recursive: bool = True, followlinks: bool = True, start_directory: str = None):
+    """ The previous recursive implementation of utils.iterate_directory_entries, kept for comparison. """
+    directory = os.path.abspath(directory)
+    start_directory = start_directory or directory
+    for entry in os.scandir(directory):
+        if entry.is_dir(follow_symlinks=followlinks):
+            if recursive:
+                yield from legacy_iterate_directory_entries(entry.path, file_type, absolute, recursive, followlinks, start_directory)
+            if file_type != "files":
+                yield entry.path if absolute else os.path.relpath(entry.path, start=start_directory)
+        elif entry.is_file(follow_symlinks=followlinks):
+            if file_type != "directories":
+                yield entry.path if absolute else os.path.relpath(entry.path, start=start_directory)
+
+
+def legacy_list_file_paths(directory: str, absolute: bool = True) -> list:
+    return sorted(set(legacy_iterate_directory_entries(directory, "files", absolute)))
+
+
+def create_tree(root: str, depth: int, width: int, files: int):
+    """ Creates `width` subdirectories `depth` levels deep, each containing `files` files. """
+    for branch in range(width):
+        directory = os.path.join(root, str(branch), *(["d"] * (depth - 1)))
+        os.makedirs(directory)
+        for level in range(depth):
+            for index in range(files):
+                open(os.path.join(directory, f"{index}.txt"), "wb").close()
+            directory = os.path.dirname(directory)
+
+
+def measure(name: str, func):
+    start_time = time.perf_counter()
+    count = len(func())
+    print(f"    {name:<36} {time.perf_counter() - start_time:8.3f} s {count:>10} files")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--depth", type=int, default=500)
+    parser.add_argument("--width", type=int, default=2000)
+    parser.add_argument("--files", type=int, default=10)
+    parser.add_argument("--max-workers", type=int, default=8)
+    args = parser.parse_args()
+
+    for name, depth, width in [("deep", args.depth, 1), ("wide", 1, args.width)]:
+        with tempfile.TemporaryDirectory() as root:
+            create_tree(root, depth, width, args.files)
+            print(f"{name}: depth {depth}, width {width}, {args.files} files per directory")
+            for absolute in (True, False):
+                measure(f"legacy (absolute={absolute})", lambda: legacy_list_file_paths(root, absolute=absolute))
+                measure(f"list_file_paths (absolute={absolute})", lambda: utils.list_file_paths(root, absolute=absolute))
+            measure("list_file_paths(sort=False)", lambda: utils.list_file_paths(root, sort=False))
+            measure("list_file_paths(deduplicate=True)", lambda: utils.list_file_paths(root, deduplicate=True))
+            measure(f"list_file_paths(max_workers={args.max_workers})", lambda: utils.list_file_paths(root, max_workers=args.max_workers))
+
+
+if __name__ == "__main__":
+    main()
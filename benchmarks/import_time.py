@@ -0,0 +1,44 @@
+""" Measures the time to `import glasswall` in a fresh interpreter, and the time to first use of a library class and content management policies.
+
+Exits with status 1 if the median time of `import glasswall` exceeds the threshold, for use as a regression check.
+
+Usage:
+    python -m benchmarks.import_time [--repeat 20] [--threshold-ms 50]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+STATEMENTS = {
+    "import glasswall": "import glasswall",
+    "glasswall.Editor": "import glasswall; glasswall.Editor",
+    "glasswall.content_management": "import glasswall; glasswall.content_management.policies.Rebuild",
+}
+
+
+def measure(statement: str) -> float:
+    """ Returns the seconds taken to run statement in a fresh interpreter, excluding interpreter startup. """
+    code = f"import time; start_time = time.perf_counter(); {statement}; print(time.perf_counter() - start_time)"
+    return float(subprocess.check_output([sys.executable, "-c", code]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--threshold-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    medians = {}
+    for name, statement in STATEMENTS.items():
+        times = [measure(statement) for _ in range(args.repeat)]
+        medians[name] = statistics.median(times) * 1000
+        print(f"    {name:<32} median {medians[name]:8.2f} ms    min {min(times) * 1000:8.2f} ms")
+
+    if medians["import glasswall"] > args.threshold_ms:
+        print(f"import glasswall median {medians['import glasswall']:.2f} ms exceeds threshold {args.threshold_ms:.2f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
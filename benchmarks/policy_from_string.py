@@ -0,0 +1,86 @@
+""" Measures Policy.from_string for WordSearch policies of 1k, 10k and 100k terms, compared with the previous implementation that validated and parsed the xml twice and sorted switches on every insert.
+
+Usage:
+    python -m benchmarks.policy_from_string [--terms 1000 10000 100000] [--repeat 3]
+"""
+import argparse
+import time
+import tracemalloc
+
+import glasswall
+from glasswall.content_management.policies.policy import Policy
+from lxml import etree
+
+
+def word_search_policy_text(terms: int) -> str:
+    text_items = "".join(
+        f'<textItem><text>term{i}</text><textSetting replacementChar="*">redact</textSetting></textItem>'
+        for i in range(terms)
+    )
+    return f'<config><textSearchConfig libVersion="core2"><textList>{text_items}</textList></textSearchConfig></config>'
+
+
+def legacy_from_string(string: str) -> Policy:
+    """ The previous implementation of Policy.from_string, kept for comparison. """
+    new_policy = glasswall.content_management.policies.Policy()
+    root = etree.fromstring(glasswall.utils.validate_xml(string).encode("utf-8"))
+    for config_element in root:
+        if hasattr(glasswall.content_management.config_elements, config_element.tag):
+            new_config_element = getattr(glasswall.content_management.config_elements, config_element.tag)(attributes=config_element.attrib)
+        else:
+            new_config_element = glasswall.content_management.config_elements.ConfigElement(name=config_element.tag, attributes=config_element.attrib)
+        for item in config_element:
+            if len(item):
+                textList = glasswall.content_management.config_elements.ConfigElement(name=item.tag, attributes=item.attrib)
+                for textItem in item:
+                    new_textItem = glasswall.content_management.config_elements.ConfigElement(name=textItem.tag, attributes=textItem.attrib)
+                    for switch in textItem:
+                        new_textItem.add_switch(glasswall.content_management.switches.Switch(name=switch.tag, value=switch.text, attributes=switch.attrib))
+                    textList.subelements.append(new_textItem)
+                new_config_element.subelements.append(textList)
+                continue
+            if hasattr(new_config_element.switches_module, item.tag):
+                new_switch = getattr(new_config_element.switches_module, item.tag)(value=item.text)
+            else:
+                new_switch = glasswall.content_management.switches.Switch(name=item.tag, value=item.text, attributes=item.attrib)
+            new_config_element.add_switch(new_switch)
+        new_policy.add_config_element(new_config_element)
+    return new_policy
+
+
+def measure(func, repeat: int):
+    """ Returns the best elapsed time in seconds and the peak traced memory in MiB of func(). """
+    best = float("inf")
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start_time)
+
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--terms", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for terms in args.terms:
+        text = word_search_policy_text(terms)
+        print(f"policy: {terms} terms, {len(text)} characters")
+        for name, func in [
+            ("legacy", lambda: legacy_from_string(text)),
+            ("from_string", lambda: Policy.from_string(text)),
+            ("from_string(iterparse=True)", lambda: Policy.from_string(text, iterparse=True)),
+        ]:
+            elapsed, peak = measure(func, args.repeat)
+            print(f"    {name:<28} {elapsed * 1e3:10.1f} ms {peak:10.1f} MiB peak")
+
+
+if __name__ == "__main__":
+    main()
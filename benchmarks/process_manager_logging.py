@@ -0,0 +1,88 @@
+""" Measures the throughput of GlasswallProcessManager workers redacting files with WordSearch, with logging disabled, with DEBUG records written by each worker, written through a QueueListener, and sampled.
+
+The native WordSearch library is replaced with a fake that returns the input file, so only the Python wrapper and logging overhead is measured.
+
+Usage:
+    python -m benchmarks.process_manager_logging [--tasks 16] [--files 200] [--workers 4] [--sampling-rate 0.01]
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from glasswall.config import logging as glasswall_logging
+from glasswall.config.logging import log
+from glasswall.multiprocessing.manager import GlasswallProcessManager
+from glasswall.multiprocessing.tasks import Task
+
+from benchmarks.word_search_logging import fake_word_search, word_search_policy
+
+
+def redact_files(library_path: str, files: int, terms: int) -> int:
+    """ Task run in each worker, returns the number of files redacted. """
+    session = fake_word_search(library_path).session(content_management_policy=word_search_policy(terms))
+    input_file = b"lorem ipsum dolor sit amet " * 40
+    for _ in range(files):
+        session.redact_file(input_file=input_file)
+        # Wrapper methods log a few multiline DEBUG records per file
+        log.debug("\n\tinput_file: %s\n\tfiles: %s", input_file[:20], files)
+    return files
+
+
+def files_per_second(library_path: str, tasks: int, files: int, terms: int, workers: int) -> float:
+    start_time = time.perf_counter()
+    redacted = 0
+    with GlasswallProcessManager(max_workers=workers) as process_manager:
+        for _ in range(tasks):
+            process_manager.queue_task(Task(redact_files, args=(library_path, files, terms)))
+    for task_result in process_manager.task_results:
+        if not task_result.success:
+            raise task_result.exception
+        redacted += task_result.result
+    return redacted / (time.perf_counter() - start_time)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=16)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--terms", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--sampling-rate", type=float, default=0.01)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_directory:
+        library_path = os.path.join(temp_directory, "libglasswall.word.search.so")
+        log_level = log.level
+        # Log records are written to a temporary file rather than the glasswall log file
+        handlers = log.handlers
+        log.handlers = [logging.FileHandler(os.path.join(temp_directory, "benchmark.log"), delay=True)]
+        try:
+            configurations = [
+                ("disabled", logging.WARNING, False, None),
+                ("DEBUG", logging.DEBUG, False, None),
+                ("DEBUG queue", logging.DEBUG, True, None),
+                (f"DEBUG queue sampled {args.sampling_rate}", logging.DEBUG, True, args.sampling_rate),
+            ]
+            for name, level, queue, sampling_rate in configurations:
+                log.setLevel(level)
+                if sampling_rate is not None:
+                    glasswall_logging.set_debug_sampling_rates({"*": sampling_rate})
+                if queue:
+                    glasswall_logging.start_queue_listener()
+                try:
+                    throughput = files_per_second(library_path, args.tasks, args.files, args.terms, args.workers)
+                finally:
+                    glasswall_logging.stop_queue_listener()
+                    glasswall_logging.set_debug_sampling_rates()
+                print(f"{name:<28} {throughput:10.1f} files/s")
+        finally:
+            for handler in log.handlers:
+                handler.close()
+            log.handlers = handlers
+            log.setLevel(log_level)
+
+
+if __name__ == "__main__":
+    main()
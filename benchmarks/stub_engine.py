@@ -0,0 +1,414 @@
+""" A stub Glasswall engine for benchmarks and tests that run without the native libraries or a licence.
+
+StubEngine implements the GW2* (Editor), GW* (Rebuild), Gw*Archive* and GwFileToFile* (ArchiveManager), GwWordSearch and GWSecuTag_* (SecurityTagging) entry points used by the wrappers, accepting the same ctypes arguments and writing output buffers through the same pointers as the native libraries. Each processing call sleeps for a configurable latency, returns output of a configurable size, and fails at a configurable rate.
+
+install registers a StubEngine as the loaded library of a placeholder library file, so that library classes are constructed normally:
+
+    editor = stub_engine.install(glasswall.Editor, directory, latency=0.001)
+    editor.protect_file(b"%PDF-1.7 ...")
+"""
+import ctypes as ct
+import os
+import random
+import tempfile
+import time
+import unittest
+import zipfile
+from typing import Callable, Dict, Optional
+
+from glasswall.determine_file_type import signatures
+from glasswall.determine_file_type.helpers import str_int_map
+from glasswall.libraries import library
+from glasswall.libraries.archive_manager.archive_manager import ArchiveManager
+from glasswall.libraries.editor.editor import Editor
+from glasswall.libraries.rebuild.rebuild import Rebuild
+from glasswall.libraries.security_tagging.security_tagging import SecurityTagging
+from glasswall.libraries.word_search.word_search import WordSearch
+
+REPORT = b"<?xml version=\"1.0\" encoding=\"utf-8\"?><gw:GWallInfo xmlns:gw=\"http://glasswall.com/namespace\"/>"
+TAGS = b"<tags><classification>official</classification></tags>"
+SUPPORTED_ARCHIVES = b"7z,bz2,gz,rar,tar,xz,zip,"
+
+# Status codes returned by each library
+SUCCESS = {"Editor": 1, "Rebuild": 1, "ArchiveManager": 1, "WordSearch": 1, "SecurityTagging": 1}
+FAILURE = {"Editor": -1, "Rebuild": 0, "ArchiveManager": 0, "WordSearch": 0, "SecurityTagging": 0}
+
+# Library file names, only used to create placeholder files
+LIBRARY_FILE_NAMES = {
+    "Editor": "libglasswall_core2.so",
+    "Rebuild": "libglasswall.classic.so",
+    "ArchiveManager": "libglasswall.archive.manager.so",
+    "WordSearch": "libglasswall.word.search.so",
+    "SecurityTagging": "libglasswall.security.tagging.so",
+}
+
+
+def _address(argument) -> Optional[int]:
+    """ Returns the address of the memory referenced by a ctypes argument. """
+    if isinstance(argument, (ct.c_char_p, ct.c_void_p)):
+        return ct.cast(argument, ct.c_void_p).value
+    if type(argument).__name__ == "CArgObject":
+        # ct.byref(obj)
+        return _address(argument._obj) if isinstance(argument._obj, (ct.c_char_p, ct.c_void_p)) else ct.addressof(argument._obj)
+    return ct.addressof(argument)
+
+
+def _read(buffer, buffer_length) -> bytes:
+    if isinstance(buffer, bytes):
+        return buffer
+    address = _address(buffer)
+    length = buffer_length.value if hasattr(buffer_length, "value") else buffer_length
+    return ct.string_at(address, length) if address and length else b""
+
+
+def _read_path(path) -> bytes:
+    path = path.value
+    with open(path.decode() if isinstance(path, bytes) else path, "rb") as f:
+        return f.read()
+
+
+class StubFunction:
+    """ An entry point of StubEngine. Like a ctypes function pointer, argtypes and restype can be set, and are ignored. """
+
+    def __init__(self, name: str, function: Callable):
+        self.__name__ = name
+        self.function = function
+        self.argtypes = None
+        self.restype = None
+        self.call_count = 0
+
+    def __call__(self, *args):
+        self.call_count += 1
+        return self.function(*args)
+
+
+class StubEngine:
+    """ A stub of a Glasswall library.
+
+    Args:
+        library_name (str): The library class name: "Editor", "Rebuild", "ArchiveManager", "WordSearch", or "SecurityTagging".
+        latency (float, optional): Default 0. Seconds each processing call sleeps for.
+        output_size (Optional[int], optional): Default None. The size of output files in bytes. If None, output files are a copy of the input file.
+        failure_rate (float, optional): Default 0. The fraction of processing calls that return the library's failure status.
+        file_type (str, optional): Default "pdf". The file type returned for input files that signatures do not identify.
+        seed (int, optional): Default 0. Seed of the failure sampling, so that runs are reproducible.
+        tags (bytes, optional): Default TAGS. The xml written by GWSecuTag_RetrieveTagFile.
+    """
+
+    def __init__(self, library_name: str, latency: float = 0.0, output_size: Optional[int] = None, failure_rate: float = 0.0, file_type: str = "pdf", seed: int = 0, tags: bytes = TAGS):
+        if library_name not in SUCCESS:
+            raise ValueError(library_name)
+        self.library_name = library_name
+        self.latency = latency
+        self.output_size = output_size
+        self.failure_rate = failure_rate
+        self.file_type = file_type
+        self.random = random.Random(seed)
+        self.tags = tags
+        self.process_count = 0
+        self.failure_count = 0
+
+        # Editor sessions, keyed by session id
+        self.sessions: Dict[int, dict] = {}
+        self._next_session = 0
+        # Output buffers are kept alive until the next call that returns a buffer, as the native libraries do
+        self._buffers = []
+
+        self.functions: Dict[str, StubFunction] = {
+            name: StubFunction(name, getattr(self, name))
+            for name in dir(type(self))
+            if name.startswith(("GW", "Gw"))
+        }
+
+    def __getattribute__(self, name: str):
+        # Return entry points as StubFunction instances so that argtypes and restype can be set on them
+        if name.startswith(("GW", "Gw")):
+            functions = object.__getattribute__(self, "__dict__").get("functions")
+            if functions is not None:
+                try:
+                    return functions[name]
+                except KeyError:
+                    raise AttributeError(f"StubEngine does not implement {name}") from None
+        return object.__getattribute__(self, name)
+
+    # Helpers
+
+    def _process(self, input_bytes: bytes) -> Optional[bytes]:
+        """ Sleeps for the latency, returns the output bytes, or None if this call fails. """
+        self.process_count += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.failure_rate and self.random.random() < self.failure_rate:
+            self.failure_count += 1
+            return None
+        if self.output_size is None:
+            return input_bytes
+        if not input_bytes:
+            return b"\x00" * self.output_size
+        return (input_bytes * (self.output_size // len(input_bytes) + 1))[:self.output_size]
+
+    def _status(self, success: bool) -> int:
+        return SUCCESS[self.library_name] if success else FAILURE[self.library_name]
+
+    def _write_buffer(self, data: bytes, buffer, buffer_length):
+        string_buffer = ct.create_string_buffer(data, len(data))
+        self._buffers.append(string_buffer)
+        buffer._obj.value = ct.addressof(string_buffer)
+        buffer_length._obj.value = len(data)
+
+    def _file_type(self, input_bytes: bytes) -> int:
+        return str_int_map[signatures.file_type_from_bytes(input_bytes) or self.file_type]
+
+    # Editor
+
+    def GW2LibVersion(self):
+        return b"stub"
+
+    def GW2OpenSession(self):
+        self._next_session += 1
+        self.sessions[self._next_session] = {"input": b"", "outputs": []}
+        return self._next_session
+
+    def GW2CloseSession(self, session):
+        self.sessions.pop(session.value, None)
+        self._buffers = []
+        return 0
+
+    def GW2LicenceDetails(self, session):
+        return b"Stub licence"
+
+    def GW2RegisterPoliciesMemory(self, session, buffer, buffer_length, policy_format):
+        return 0
+
+    def GW2RegisterPoliciesFile(self, session, input_file, policy_format):
+        return 0
+
+    def GW2RegisterInputMemory(self, session, buffer, buffer_length):
+        self.sessions[session.value]["input"] = _read(buffer, buffer_length)
+        return 0
+
+    def GW2RegisterInputFile(self, session, input_file):
+        self.sessions[session.value]["input"] = _read_path(input_file)
+        return 0
+
+    GW2RegisterImportMemory = GW2RegisterInputMemory
+    GW2RegisterImportFile = GW2RegisterInputFile
+
+    def _register_output(self, session, kind: str, output):
+        # output is a file path, or the (buffer, buffer_length) pointers to write to
+        self.sessions[session.value]["outputs"].append((kind, output))
+        return 0
+
+    def GW2RegisterOutputMemory(self, session, buffer, buffer_length):
+        return self._register_output(session, "file", (buffer, buffer_length))
+
+    def GW2RegisterExportMemory(self, session, buffer, buffer_length):
+        return self._register_output(session, "file", (buffer, buffer_length))
+
+    def GW2RegisterAnalysisMemory(self, session, buffer, buffer_length, analysis_format=0):
+        return self._register_output(session, "report", (buffer, buffer_length))
+
+    def GW2RegisterOutFile(self, session, output_file):
+        return self._register_output(session, "file", output_file.value.decode())
+
+    def GW2RegisterExportFile(self, session, output_file):
+        return self._register_output(session, "file", output_file.value.decode())
+
+    def GW2RegisterAnalysisFile(self, session, output_file, analysis_format=0):
+        return self._register_output(session, "report", output_file.value.decode())
+
+    def GW2RunSession(self, session):
+        state = self.sessions[session.value]
+        output_bytes = self._process(state["input"])
+        if output_bytes is None:
+            return self._status(False)
+        for kind, output in state["outputs"]:
+            data = output_bytes if kind == "file" else REPORT
+            if isinstance(output, str):
+                with open(output, "wb") as f:
+                    f.write(data)
+            else:
+                self._write_buffer(data, *output)
+        return self._status(True)
+
+    def GW2FileErrorMsg(self, session, buffer, buffer_length):
+        self._write_buffer(b"Stub failure", buffer, buffer_length)
+        return 0
+
+    def GW2DetermineFileTypeFromMemory(self, buffer, buffer_length):
+        return self._file_type(_read(buffer, buffer_length))
+
+    def GW2DetermineFileTypeFromFile(self, input_file):
+        return self._file_type(_read_path(input_file))
+
+    # Rebuild
+
+    def GWFileVersion(self):
+        return "stub"
+
+    def GWFileErrorMsg(self):
+        return "Stub failure"
+
+    def GWFileConfigXML(self, xml_string):
+        return 1
+
+    def GWDetermineFileTypeFromFileInMem(self, buffer, buffer_length):
+        return self._file_type(_read(buffer, buffer_length))
+
+    def GWDetermineFileTypeFromFile(self, input_file):
+        return self._file_type(_read_path(input_file))
+
+    def _memory_to_memory(self, buffer, buffer_length, output_buffer, output_buffer_length, report: bool) -> int:
+        output_bytes = self._process(_read(buffer, buffer_length))
+        if output_bytes is None:
+            return self._status(False)
+        self._buffers = []
+        self._write_buffer(REPORT if report else output_bytes, output_buffer, output_buffer_length)
+        return self._status(True)
+
+    def GWMemoryToMemoryProtect(self, buffer, buffer_length, file_type, output_buffer, output_buffer_length):
+        return self._memory_to_memory(buffer, buffer_length, output_buffer, output_buffer_length, report=False)
+
+    def GWMemoryToMemoryAnalysisAudit(self, buffer, buffer_length, file_type, output_buffer, output_buffer_length):
+        return self._memory_to_memory(buffer, buffer_length, output_buffer, output_buffer_length, report=True)
+
+    def _file_to_file(self, input_file, output_file, report: bool) -> int:
+        output_bytes = self._process(_read_path(input_file))
+        if output_bytes is None:
+            return self._status(False)
+        with open(output_file.value, "wb") as f:
+            f.write(REPORT if report else output_bytes)
+        return self._status(True)
+
+    def GWFileToFileProtect(self, input_file, file_type, output_file):
+        return self._file_to_file(input_file, output_file, report=False)
+
+    def GWFileToFileAnalysisAudit(self, input_file, file_type, output_file):
+        return self._file_to_file(input_file, output_file, report=True)
+
+    def GWFileProtect(self, input_file, file_type, output_buffer, output_buffer_length):
+        input_bytes = _read_path(input_file)
+        return self._memory_to_memory(input_bytes, len(input_bytes), output_buffer, output_buffer_length, report=False)
+
+    def GWFileAnalysisAudit(self, input_file, file_type, output_buffer, output_buffer_length):
+        input_bytes = _read_path(input_file)
+        return self._memory_to_memory(input_bytes, len(input_bytes), output_buffer, output_buffer_length, report=True)
+
+    # ArchiveManager
+
+    def GwArchiveVersion(self):
+        return b"stub"
+
+    def GwSupportedFiletypes(self):
+        return SUPPORTED_ARCHIVES
+
+    def GwIsSupportedArchiveType(self, archive_type):
+        return archive_type.value in SUPPORTED_ARCHIVES.split(b",")[:-1]
+
+    def GwArchiveDone(self):
+        self._buffers = []
+        return 1
+
+    def _archive(self, buffer, buffer_length, output_buffer, output_buffer_length, output_report_buffer, output_report_buffer_length) -> int:
+        output_bytes = self._process(_read(buffer, buffer_length))
+        if output_bytes is None:
+            return self._status(False)
+        self._write_buffer(output_bytes, output_buffer, output_buffer_length)
+        self._write_buffer(REPORT, output_report_buffer, output_report_buffer_length)
+        return self._status(True)
+
+    def GwFileProtectAndReportArchive(self, buffer, buffer_length, output_buffer, output_buffer_length, output_report_buffer, output_report_buffer_length, xml_config):
+        return self._archive(buffer, buffer_length, output_buffer, output_buffer_length, output_report_buffer, output_report_buffer_length)
+
+    def GwFileAnalysisArchive(self, buffer, buffer_length, output_buffer, output_buffer_length, output_report_buffer, output_report_buffer_length, xml_config):
+        return self._archive(buffer, buffer_length, output_buffer, output_buffer_length, output_report_buffer, output_report_buffer_length)
+
+    def GwFileToFileUnpack(self, input_file, output_directory):
+        # Stub archives are zip files
+        try:
+            with zipfile.ZipFile(input_file.value.decode()) as zip_file:
+                zip_file.extractall(output_directory.value.decode())
+        except zipfile.BadZipFile:
+            return self._status(False)
+        return self._status(True)
+
+    def GwFileToFilePack(self, input_directory, output_directory, file_type, add_extension):
+        if file_type.value != b"zip":
+            return self._status(False)
+        input_directory = input_directory.value.decode()
+        output_file = os.path.join(output_directory.value.decode(), os.path.basename(input_directory)) + (".zip" if add_extension.value else "")
+        with zipfile.ZipFile(output_file, "w") as zip_file:
+            for directory, _, file_names in os.walk(input_directory):
+                for file_name in file_names:
+                    file_path = os.path.join(directory, file_name)
+                    zip_file.write(file_path, os.path.relpath(file_path, input_directory))
+        return self._status(True)
+
+    # WordSearch
+
+    def GwWordSearchVersion(self):
+        return b"stub"
+
+    def GwWordSearch(self, buffer, buffer_length, output_buffer, output_buffer_length, output_report_buffer, output_report_buffer_length, homoglyphs, content_management_policy):
+        self._buffers = []
+        return self._archive(buffer, buffer_length, output_buffer, output_buffer_length, output_report_buffer, output_report_buffer_length)
+
+    # SecurityTagging
+
+    def GWSecuTag_TagFile(self, input_file, tags_path, output_file):
+        output_bytes = self._process(_read_path(input_file))
+        if output_bytes is None:
+            return self._status(False)
+        with open(output_file.value, "wb") as f:
+            f.write(output_bytes)
+        return self._status(True)
+
+    def GWSecuTag_RetrieveTagFile(self, input_file, output_file):
+        with open(output_file.value, "wb") as f:
+            f.write(self.tags)
+        return self._status(True)
+
+
+LIBRARY_CLASSES = {
+    "Editor": Editor,
+    "Rebuild": Rebuild,
+    "ArchiveManager": ArchiveManager,
+    "WordSearch": WordSearch,
+    "SecurityTagging": SecurityTagging,
+}
+
+
+def install(library_class: type, directory: str, library_kwargs: Optional[dict] = None, **engine_kwargs):
+    """ Returns an instance of library_class, e.g. glasswall.Editor, backed by a StubEngine. A placeholder library file is created in directory and registered as loaded, so library_class.__init__ runs as it does with the native library.
+
+    Args:
+        library_class (type): Editor, Rebuild, ArchiveManager, WordSearch, or SecurityTagging.
+        directory (str): The directory of the placeholder library file.
+        library_kwargs (Optional[dict], optional): Default None. Passed to library_class, e.g. verification for SecurityTagging.
+        **engine_kwargs: Passed to StubEngine, e.g. latency, output_size, failure_rate.
+    """
+    library_name = library_class.__name__
+    library_path = os.path.join(directory, LIBRARY_FILE_NAMES[library_name])
+    os.makedirs(directory, exist_ok=True)
+    if not os.path.isfile(library_path):
+        open(library_path, "wb").close()
+
+    with library._loaded_libraries_lock:
+        library._loaded_libraries[(library_name, os.path.realpath(library_path))] = {
+            "library": StubEngine(library_name, **engine_kwargs),
+            "licence_validated_time": None,
+        }
+
+    return library_class(library_path, **(library_kwargs or {}))
+
+
+class StubEngineTestCase(unittest.TestCase):
+    """ A TestCase with a temporary directory, self.temp_directory, to install stub engines in. Libraries loaded by a test are unloaded and the directory is deleted after the test. """
+
+    def setUp(self):
+        super().setUp()
+        temp_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_directory.cleanup)
+        self.temp_directory = temp_directory.name
+        # Cleanups run last in first out, libraries are unloaded before their directory is deleted
+        self.addCleanup(library.clear_loaded_libraries)
@@ -0,0 +1,249 @@
+""" Measures the per-call overhead of the wrappers of Editor, Rebuild, ArchiveManager and WordSearch, utils, and GlasswallProcessManager, using the stub engine in benchmarks.stub_engine. No native libraries or licence are needed.
+
+Times are normalised by a fixed pure Python calibration workload so that results saved on one machine can be compared on another. With --compare, exits with status 1 if any benchmark is slower than the baseline by more than --max-regression, for use as a regression check. Benchmarks in `ungated` are reported but never fail the check. The baseline was recorded on Linux with the fork start method, so compare on Linux only.
+
+Usage:
+    python -m benchmarks.suite [--filter editor] [--repeat 5] [--latency 0] [--output-size 4096] [--failure-rate 0]
+    python -m benchmarks.suite --save benchmarks/baseline.json
+    python -m benchmarks.suite --compare benchmarks/baseline.json [--max-regression 2.0]
+"""
+import argparse
+import ctypes as ct
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, Set, Tuple
+
+import glasswall
+from glasswall import utils
+from glasswall.multiprocessing.manager import GlasswallProcessManager
+from glasswall.multiprocessing.tasks import Task
+
+from benchmarks import stub_engine
+
+INPUT_FILE = b"%PDF-1.7\n" + b"lorem ipsum dolor sit amet " * 150
+ARCHIVE_FILE = b"PK\x03\x04" + b"\x00" * 4096
+
+# Benchmarks, keyed by name, with values: (setup function, calls per timing). Setup functions take the stub directory and StubEngine arguments and return the function to time.
+benchmarks: Dict[str, Tuple[Callable, int]] = {}
+# Benchmarks that are reported but do not fail --compare, because they depend on the platform more than on the wrappers
+ungated: Set[str] = set()
+
+
+def benchmark(name: str, number: int = 200, gated: bool = True):
+    def decorator(setup: Callable):
+        benchmarks[name] = (setup, number)
+        if not gated:
+            ungated.add(name)
+        return setup
+    return decorator
+
+
+@benchmark("editor.protect_file")
+def editor_protect_file(directory: str, **engine_kwargs):
+    editor = stub_engine.install(glasswall.Editor, directory, **engine_kwargs)
+    return lambda: editor.protect_file(INPUT_FILE, raise_unsupported=False)
+
+
+@benchmark("editor.analyse_file")
+def editor_analyse_file(directory: str, **engine_kwargs):
+    editor = stub_engine.install(glasswall.Editor, directory, **engine_kwargs)
+    return lambda: editor.analyse_file(INPUT_FILE, raise_unsupported=False)
+
+
+@benchmark("editor.determine_file_type", number=2000)
+def editor_determine_file_type(directory: str, **engine_kwargs):
+    editor = stub_engine.install(glasswall.Editor, directory, **engine_kwargs)
+    return lambda: editor.determine_file_type(INPUT_FILE)
+
+
+@benchmark("rebuild.protect_file")
+def rebuild_protect_file(directory: str, **engine_kwargs):
+    rebuild = stub_engine.install(glasswall.Rebuild, directory, **engine_kwargs)
+    return lambda: rebuild.protect_file(INPUT_FILE, raise_unsupported=False)
+
+
+@benchmark("rebuild.analyse_file")
+def rebuild_analyse_file(directory: str, **engine_kwargs):
+    rebuild = stub_engine.install(glasswall.Rebuild, directory, **engine_kwargs)
+    return lambda: rebuild.analyse_file(INPUT_FILE, raise_unsupported=False)
+
+
+@benchmark("archive_manager.protect_archive")
+def archive_manager_protect_archive(directory: str, **engine_kwargs):
+    archive_manager = stub_engine.install(glasswall.ArchiveManager, directory, **engine_kwargs)
+    return lambda: archive_manager.protect_archive(ARCHIVE_FILE, raise_unsupported=False)
+
+
+@benchmark("archive_manager.analyse_archive")
+def archive_manager_analyse_archive(directory: str, **engine_kwargs):
+    archive_manager = stub_engine.install(glasswall.ArchiveManager, directory, **engine_kwargs)
+    return lambda: archive_manager.analyse_archive(ARCHIVE_FILE, raise_unsupported=False)
+
+
+@benchmark("word_search.redact_file")
+def word_search_redact_file(directory: str, **engine_kwargs):
+    word_search = stub_engine.install(glasswall.WordSearch, directory, **engine_kwargs)
+    policy = glasswall.content_management.policies.WordSearch(config={
+        "textSearchConfig": {
+            "@libVersion": "core2",
+            "textList": [
+                {"name": "textItem", "switches": [
+                    {"name": "text", "value": f"term{i}"},
+                    {"name": "textSetting", "@replacementChar": "*", "value": "redact"},
+                ]}
+                for i in range(10)
+            ]
+        }
+    })
+    session = word_search.session(content_management_policy=policy)
+    return lambda: session.redact_file(INPUT_FILE, raise_unsupported=False)
+
+
+@benchmark("utils.buffer_to_bytes", number=5000)
+def utils_buffer_to_bytes(directory: str, **engine_kwargs):
+    string_buffer = ct.create_string_buffer(INPUT_FILE, len(INPUT_FILE))
+    buffer = ct.c_void_p(ct.addressof(string_buffer))
+    buffer_length = ct.c_size_t(len(INPUT_FILE))
+    return lambda: (string_buffer, utils.buffer_to_bytes(buffer, buffer_length))
+
+
+@benchmark("utils.validate_xml", number=500)
+def utils_validate_xml(directory: str, **engine_kwargs):
+    policy = glasswall.content_management.policies.Editor(default="sanitise")
+    return lambda: utils.validate_xml(policy)
+
+
+_worker_editors = {}
+
+
+def protect_file_in_worker(directory: str, engine_kwargs: dict) -> bytes:
+    """ Task run by GlasswallProcessManager workers. Installs the stub Editor once per worker process. """
+    key = (directory, tuple(sorted(engine_kwargs.items())))
+    if key not in _worker_editors:
+        _worker_editors[key] = stub_engine.install(glasswall.Editor, directory, **engine_kwargs)
+    return _worker_editors[key].protect_file(INPUT_FILE, raise_unsupported=False)
+
+
+# Process start up dominates, and under spawn (macOS and Windows) it is over 40x slower than the fork baseline
+@benchmark("process_manager.task", number=1, gated=False)
+def process_manager_task(directory: str, **engine_kwargs):
+    tasks = 16
+
+    def run():
+        with GlasswallProcessManager(max_workers=4) as process_manager:
+            for _ in range(tasks):
+                process_manager.queue_task(Task(protect_file_in_worker, args=(directory, engine_kwargs)))
+        if len(process_manager.task_results) != tasks:
+            raise RuntimeError(f"Expected {tasks} task results, got {len(process_manager.task_results)}")
+
+    # Report the time per task
+    run.calls_per_run = tasks
+    return run
+
+
+def calibrate(repeat: int) -> float:
+    """ Returns the minimum seconds taken by a fixed pure Python workload. """
+    def workload():
+        mapping = {}
+        for i in range(20000):
+            mapping[i % 97] = mapping.get(i % 97, 0) + len(str(i))
+        return mapping
+
+    return min(time_calls(workload, 5) for _ in range(repeat)) / 5
+
+
+def time_calls(function: Callable, number: int) -> float:
+    start_time = time.perf_counter()
+    for _ in range(number):
+        function()
+    return time.perf_counter() - start_time
+
+
+def run(names=None, repeat: int = 5, number_scale: float = 1.0, **engine_kwargs) -> Dict[str, float]:
+    """ Runs the benchmarks, returning the minimum seconds per call of each, keyed by name.
+
+    Args:
+        names (Optional[Iterable[str]]): The benchmarks to run. If None, all benchmarks are run.
+        repeat (int): The number of timings of each benchmark, the minimum is reported.
+        number_scale (float): Scales the number of calls per timing, e.g. 0.01 for a quick check.
+        **engine_kwargs: Passed to StubEngine, e.g. latency, output_size, failure_rate.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as temp_directory:
+        for name, (setup, number) in benchmarks.items():
+            if names is not None and name not in names:
+                continue
+            function = setup(os.path.join(temp_directory, name), **engine_kwargs)
+            number = max(1, int(number * number_scale))
+            # Warm up
+            function()
+            seconds = min(time_calls(function, number) for _ in range(repeat))
+            results[name] = seconds / number / getattr(function, "calls_per_run", 1)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filter", default="", help="Run benchmarks whose name contains this string.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number-scale", type=float, default=1.0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--output-size", type=int, default=None)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--save", help="Write the results to this JSON file.")
+    parser.add_argument("--compare", help="Compare the results to this JSON file.")
+    parser.add_argument("--max-regression", type=float, default=2.0, help="Maximum ratio of normalised time to the baseline.")
+    parser.add_argument("--log-level", default="WARNING", help="Level of the glasswall logger. Defaults to WARNING to measure the wrappers rather than log file writes, see benchmarks.process_manager_logging.")
+    args = parser.parse_args()
+
+    glasswall.config.logging.log.setLevel(args.log_level)
+    # Keep log records of stub engine failures out of the console
+    glasswall.config.logging.console.setLevel("CRITICAL")
+
+    calibration = calibrate(args.repeat)
+    names = [name for name in benchmarks if args.filter in name]
+    results = run(names, args.repeat, args.number_scale, latency=args.latency, output_size=args.output_size, failure_rate=args.failure_rate)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    regressions = []
+    print(f"    {'calibration':<36} {calibration * 1e6:10.1f} us")
+    for name, seconds in results.items():
+        normalised = seconds / calibration
+        line = f"    {name:<36} {seconds * 1e6:10.1f} us/call    normalised {normalised:8.4f}"
+        if baseline is not None and name in baseline["benchmarks"]:
+            ratio = normalised / baseline["benchmarks"][name]["normalised"]
+            line += f"    {ratio:5.2f}x baseline"
+            if name in ungated:
+                line += " (not gated)"
+            elif ratio > args.max_regression:
+                regressions.append(name)
+        print(line)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "calibration_seconds": calibration,
+                "benchmarks": {
+                    name: {"seconds": seconds, "normalised": seconds / calibration}
+                    for name, seconds in results.items()
+                },
+            }, f, indent=4)
+            f.write("\n")
+
+    if regressions:
+        print(f"Slower than {args.max_regression}x baseline: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
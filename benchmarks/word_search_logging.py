@@ -0,0 +1,108 @@
+""" Measures the per-file overhead of WordSearch.redact_file with a 5k term policy, with DEBUG logging enabled and disabled.
+
+The native WordSearch library is replaced with a fake that returns the input file, so only the Python wrapper overhead is measured.
+
+Usage:
+    python -m benchmarks.word_search_logging [--terms 5000] [--files 200]
+"""
+import argparse
+import ctypes as ct
+import logging
+import os
+import tempfile
+import time
+
+import glasswall
+from glasswall.config.logging import log
+from glasswall.libraries.word_search.word_search import WordSearch
+
+
+class FakeWordSearchLibrary:
+    """ Returns the input file as the output file and a fixed report. """
+
+    def __init__(self):
+        self.buffers = []
+
+    def GwWordSearch(self, input_buffer, input_buffer_length, output_buffer, output_buffer_length, output_report_buffer, output_report_buffer_length, homoglyphs, content_management_policy):
+        # Keep only the most recent output buffers alive
+        self.buffers = []
+        for data, buffer, buffer_length in [
+            (ct.string_at(input_buffer, input_buffer_length.value), output_buffer, output_buffer_length),
+            (b"<gw:WordSearchStatistics/>", output_report_buffer, output_report_buffer_length),
+        ]:
+            string_buffer = ct.create_string_buffer(data, len(data))
+            self.buffers.append(string_buffer)
+            buffer._obj.value = ct.addressof(string_buffer)
+            buffer_length._obj.value = len(data)
+        return 1
+
+
+def fake_word_search(library_path: str) -> WordSearch:
+    word_search = WordSearch.__new__(WordSearch)
+    word_search.library_path = library_path
+    word_search.library = FakeWordSearchLibrary()
+    return word_search
+
+
+def word_search_policy(terms: int) -> glasswall.content_management.policies.WordSearch:
+    return glasswall.content_management.policies.WordSearch(config={
+        "textSearchConfig": {
+            "@libVersion": "core2",
+            "textList": [
+                {"name": "textItem", "switches": [
+                    {"name": "text", "value": f"term{i}"},
+                    {"name": "textSetting", "@replacementChar": "*", "value": "redact"},
+                ]}
+                for i in range(terms)
+            ]
+        }
+    })
+
+
+def time_per_file(session, files: int, input_file: bytes) -> float:
+    start_time = time.perf_counter()
+    for _ in range(files):
+        session.redact_file(input_file=input_file)
+    return (time.perf_counter() - start_time) / files
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--terms", type=int, default=5000)
+    parser.add_argument("--files", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_directory:
+        word_search = fake_word_search(os.path.join(temp_directory, "libglasswall.word.search.so"))
+        policy = word_search_policy(args.terms)
+        session = word_search.session(content_management_policy=policy)
+        input_file = b"lorem ipsum dolor sit amet " * 40
+
+        print(f"policy: {args.terms} terms, {len(session.content_management_policy)} characters")
+        print(f"files: {args.files}, {len(input_file)} bytes each")
+
+        log_level = log.level
+        # Log records are written to a temporary file rather than the glasswall log file
+        handlers = log.handlers
+        log.handlers = [logging.FileHandler(os.path.join(temp_directory, "benchmark.log"), delay=True)]
+        try:
+            for level in (logging.DEBUG, logging.INFO):
+                log.setLevel(level)
+                per_file = time_per_file(session, args.files, input_file)
+                print(f"{logging.getLevelName(level):<8} session.redact_file: {per_file * 1e6:10.1f} us/file")
+
+            log.setLevel(logging.INFO)
+            start_time = time.perf_counter()
+            for _ in range(max(1, args.files // 10)):
+                word_search.redact_file(input_file=input_file, content_management_policy=policy)
+            per_file = (time.perf_counter() - start_time) / max(1, args.files // 10)
+            print(f"{'INFO':<8} redact_file:         {per_file * 1e6:10.1f} us/file (loads homoglyphs and validates policy per call)")
+        finally:
+            for handler in log.handlers:
+                handler.close()
+            log.handlers = handlers
+            log.setLevel(log_level)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,72 @@
-
-
+import importlib
 import os
-import pathlib
-import platform
-import tempfile
+import sys
 
 __version__ = "5.2.0"
 
-_OPERATING_SYSTEM = platform.system()
-_PYTHON_VERSION = platform.python_version()
 _ROOT = os.path.dirname(__file__)
-_TEMPDIR = str(pathlib.Path(os.environ.get("AGENT_TEMPDIRECTORY", tempfile.gettempdir())).joinpath("glasswall").resolve())
-
-from glasswall import config, content_management, determine_file_type, utils
-from glasswall.libraries.archive_manager.archive_manager import ArchiveManager
-from glasswall.libraries.editor.editor import Editor
-from glasswall.libraries.rebuild.rebuild import Rebuild
-from glasswall.libraries.security_tagging.security_tagging import SecurityTagging
-from glasswall.libraries.word_search.word_search import WordSearch
+
+
+def _operating_system() -> str:
+    import platform
+    return platform.system()
+
+
+def _python_version() -> str:
+    import platform
+    return platform.python_version()
+
+
+def _tempdir() -> str:
+    import tempfile
+    return os.path.realpath(os.path.join(os.environ.get("AGENT_TEMPDIRECTORY", tempfile.gettempdir()), "glasswall"))
+
+
+# Constants, submodules and library classes are created on first attribute access, so that `import glasswall` does not import platform, tempfile, lxml, psutil and every content management module
+_constants = {
+    "_OPERATING_SYSTEM": _operating_system,
+    "_PYTHON_VERSION": _python_version,
+    "_TEMPDIR": _tempdir,
+}
+_submodules = frozenset({"change_index", "config", "content_management", "determine_file_type", "instrumentation", "libraries", "multiprocessing", "profiling", "result_cache", "utils"})
+_library_classes = {
+    "ArchiveManager": "glasswall.libraries.archive_manager.archive_manager",
+    "Editor": "glasswall.libraries.editor.editor",
+    "Rebuild": "glasswall.libraries.rebuild.rebuild",
+    "SecurityTagging": "glasswall.libraries.security_tagging.security_tagging",
+    "WordSearch": "glasswall.libraries.word_search.word_search",
+}
+
+
+def __getattr__(name: str):
+    if name in _constants:
+        value = _constants[name]()
+    elif name in _submodules:
+        return importlib.import_module(f"{__name__}.{name}")
+    elif name in _library_classes:
+        value = getattr(importlib.import_module(_library_classes[name]), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted({*globals(), *_constants, *_submodules, *_library_classes})
+
+
+if sys.version_info < (3, 7):
+    # Module __getattr__ requires Python 3.7
+    _OPERATING_SYSTEM = _operating_system()
+    _PYTHON_VERSION = _python_version()
+    _TEMPDIR = _tempdir()
+    from glasswall import config, content_management, determine_file_type, utils
+    from glasswall.libraries.archive_manager.archive_manager import ArchiveManager
+    from glasswall.libraries.editor.editor import Editor
+    from glasswall.libraries.rebuild.rebuild import Rebuild
+    from glasswall.libraries.security_tagging.security_tagging import SecurityTagging
+    from glasswall.libraries.word_search.word_search import WordSearch
 
 
 class GwReturnObj:
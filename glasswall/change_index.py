@@ -0,0 +1,208 @@
+
+
+import hashlib
+import io
+import os
+import sqlite3
+import time
+from typing import Optional, Union
+
+import glasswall
+from glasswall import utils
+from glasswall.config.logging import log
+
+
+class ChangeIndex:
+    """ A persistent index of files processed by a *_directory or *_directory_as_completed method, stored as a SQLite database, so that reruns only process new or changed files.
+
+    Each row records an input file's relative path, size, modification time, content hash, the digest of the policy it was processed with, its output files, and whether processing succeeded. A file is unchanged if its size and modification time match, or if its size matches and its content hash matches after its modification time changed, e.g. after being copied. A file is reprocessed if it failed, if the policy changed, or if an output file is missing.
+
+    A ChangeIndex with database_path None is disabled: no files are unchanged and nothing is recorded.
+
+    Args:
+        database_path (Optional[str]): The SQLite database path, or None to disable the index.
+        operation (str): The operation the index is for, e.g. "Editor.protect_file". Operations are indexed separately, so several operations can share an output directory. A *_directory method and its *_directory_as_completed counterpart share an operation.
+        policy_digest (str, optional): Default "". The digest of the policy and settings files are processed with, see ChangeIndex.digest.
+        commit_interval (int, optional): Default 1000. The number of records written between commits.
+
+    Example:
+        with ChangeIndex.for_directory(output_directory, operation="Editor.protect_file", settings=(policy,)) as change_index:
+            for input_file in utils.list_file_paths(input_directory):
+                relative_path = os.path.relpath(input_file, input_directory)
+                output_file = os.path.join(output_directory, relative_path)
+                if change_index.is_unchanged(relative_path, input_file, output_file):
+                    continue
+                file_bytes = editor.protect_file(input_file, output_file, policy)
+                change_index.record(relative_path, input_file, output_file, success=file_bytes is not None)
+    """
+    def __init__(self, database_path: Optional[str], operation: str, policy_digest: str = "", commit_interval: int = 1000):
+        self.database_path = None if database_path is None else os.path.abspath(database_path)
+        self.operation = operation
+        self.policy_digest = policy_digest
+        self.commit_interval = commit_interval
+        self.skipped_count = 0
+        self._uncommitted_count = 0
+        self._connection = None
+
+        if self.database_path is not None:
+            os.makedirs(os.path.dirname(self.database_path), exist_ok=True)
+            self._connection = sqlite3.connect(self.database_path)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS files (
+                    operation TEXT NOT NULL,
+                    relative_path TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    policy_digest TEXT NOT NULL,
+                    output_files TEXT NOT NULL,
+                    success INTEGER NOT NULL,
+                    status TEXT,
+                    updated_time REAL NOT NULL,
+                    PRIMARY KEY (operation, relative_path)
+                )
+            """)
+            self._connection.commit()
+
+    @classmethod
+    def for_directory(cls, *output_directories: Optional[str], operation: str, settings: tuple = (), enabled: Union[bool, str] = True, commit_interval: int = 1000):
+        """ Returns a ChangeIndex of the first output directory that is not None with a policy digest of settings, or a disabled ChangeIndex if enabled is False.
+
+        If enabled is True the index is stored at ChangeIndex.default_path of the output directory, which persists with the output files. If enabled is a str, it is the index file path.
+
+        Raises:
+            ValueError: enabled is True and all output directories are None.
+        """
+        if not enabled:
+            return cls(None, operation=operation)
+
+        if isinstance(enabled, str):
+            database_path = enabled
+        else:
+            output_directory = next((directory for directory in output_directories if directory is not None), None)
+            if output_directory is None:
+                raise ValueError("An output directory or an index file path is required to store the change index.")
+            database_path = cls.default_path(output_directory)
+
+        return cls(database_path, operation=operation, policy_digest=cls.digest(*settings), commit_interval=commit_interval)
+
+    @staticmethod
+    def default_path(output_directory: str) -> str:
+        """ Returns the index file path of output_directory, in its utils.GLASSWALL_DIRECTORY_NAME subdirectory. The index persists as long as the output directory, and is not processed as an input when the output directory is listed for another run because utils.list_file_paths skips that subdirectory. """
+        return os.path.join(output_directory, utils.GLASSWALL_DIRECTORY_NAME, "change_index.sqlite3")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.commit()
+            self._connection.close()
+            self._connection = None
+            if self.skipped_count:
+                log.info("Skipped %s unchanged files\n\tchange index: %s", self.skipped_count, self.database_path)
+
+    @staticmethod
+    def digest(*values) -> str:
+        """ Returns a hex digest of policies and settings. Policy instances use Policy.digest, str values that are file paths are hashed by content, and other values by their bytes or str representation. """
+        hash_ = hashlib.blake2b(digest_size=16)
+        for value in values:
+            if isinstance(value, glasswall.content_management.policies.policy.Policy):
+                value = value.digest.encode()
+            elif isinstance(value, str) and os.path.isfile(value):
+                value = ChangeIndex.file_hash(value).encode()
+            elif isinstance(value, io.BytesIO):
+                value = value.getvalue()
+            elif isinstance(value, (bytes, bytearray)):
+                value = bytes(value)
+            else:
+                value = str(value).encode("utf-8")
+            hash_.update(len(value).to_bytes(8, "little"))
+            hash_.update(value)
+
+        return hash_.hexdigest()
+
+    @staticmethod
+    def file_hash(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+        """ Returns the BLAKE2b hex digest of a file's content, read in chunks. """
+        hash_ = hashlib.blake2b()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                hash_.update(chunk)
+
+        return hash_.hexdigest()
+
+    def is_unchanged(self, relative_path: str, input_file: str, *output_files: Optional[str]) -> bool:
+        """ Returns True if input_file was processed successfully with the same policy digest, its content is unchanged, and all output files that are not None exist. """
+        if self._connection is None:
+            return False
+
+        row = self._connection.execute(
+            "SELECT size, mtime_ns, content_hash, policy_digest, output_files, success FROM files WHERE operation = ? AND relative_path = ?",
+            (self.operation, relative_path),
+        ).fetchone()
+        if row is None:
+            return False
+
+        size, mtime_ns, content_hash, policy_digest, recorded_output_files, success = row
+        if not success or policy_digest != self.policy_digest:
+            return False
+
+        if recorded_output_files != self._join(output_files) or not all(os.path.isfile(output_file) for output_file in output_files if output_file is not None):
+            return False
+
+        stat_result = os.stat(input_file)
+        if stat_result.st_size != size:
+            return False
+
+        if stat_result.st_mtime_ns != mtime_ns:
+            # Same size and a different modification time, compare content
+            if self.file_hash(input_file) != content_hash:
+                return False
+
+            # Update the modification time so the content is not hashed again on the next run
+            self._connection.execute(
+                "UPDATE files SET mtime_ns = ? WHERE operation = ? AND relative_path = ?",
+                (stat_result.st_mtime_ns, self.operation, relative_path),
+            )
+            self._maybe_commit()
+
+        self.skipped_count += 1
+        return True
+
+    def record(self, relative_path: str, input_file: str, *output_files: Optional[str], success: bool, status=None):
+        """ Records the result of processing input_file. """
+        if self._connection is None:
+            return
+
+        stat_result = os.stat(input_file)
+        self._connection.execute(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                self.operation,
+                relative_path,
+                stat_result.st_size,
+                stat_result.st_mtime_ns,
+                self.file_hash(input_file) if success else "",
+                self.policy_digest,
+                self._join(output_files),
+                int(bool(success)),
+                None if status is None else str(status),
+                time.time(),
+            ),
+        )
+        self._maybe_commit()
+
+    @staticmethod
+    def _join(output_files) -> str:
+        return "\n".join("" if output_file is None else os.path.abspath(output_file) for output_file in output_files)
+
+    def _maybe_commit(self):
+        self._uncommitted_count += 1
+        if self._uncommitted_count >= self.commit_interval:
+            self._connection.commit()
+            self._uncommitted_count = 0
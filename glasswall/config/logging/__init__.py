@@ -1,8 +1,13 @@
 
 
 import logging
+import logging.handlers
+import math
+import multiprocessing
 import os
+import threading
 from datetime import datetime
+from typing import Dict, Optional
 
 import glasswall
 
@@ -18,12 +23,21 @@ log_formatter = logging.Formatter(fmt, datefmt)
 # %temp%/glasswall/logs/2020-06-25 150459.txt
 log_file_path = os.path.join(glasswall._TEMPDIR, "logs", f'{datetime.now().strftime("%Y-%m-%d %H%M%S")}.txt')
 
-# Ensure log directory exists
-os.makedirs(os.path.dirname(log_file_path), exist_ok=True)
+
+class DeferredFileHandler(logging.FileHandler):
+    """ A FileHandler that creates the log directory and file when the first record is emitted, rather than at import. """
+
+    def __init__(self, filename: str, mode: str = "a", encoding=None):
+        super().__init__(filename, mode=mode, encoding=encoding, delay=True)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
 
 # Logging to file
 log = logging.getLogger(__name__)
-log_handler = logging.FileHandler(log_file_path, mode="w", delay=True, encoding="utf-8")
+log_handler = DeferredFileHandler(log_file_path, mode="w", encoding="utf-8")
 log_handler.setFormatter(log_formatter)
 log.addHandler(log_handler)
 log_level = os.environ.get("glasswall_log_level", logging.DEBUG)
@@ -37,7 +51,142 @@ console.setLevel(console_level)
 log.addHandler(console)
 
 
+class DebugSamplingFilter(logging.Filter):
+    """ Passes a fraction of the DEBUG records of each operation, the name of the function that logged the record. Records above DEBUG always pass.
+
+    Sampling is deterministic: with a rate of 0.25 the 1st, 5th, 9th... DEBUG records of each operation pass.
+
+    Args:
+        rates (Dict[str, float]): Sampling rates between 0 and 1 keyed by operation, e.g. {"run_session": 0.01}. The key "*" is the default rate of other operations, 1 if not set.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = dict(rates)
+        self.default_rate = self.rates.pop("*", 1.0)
+        self.counts: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG:
+            return True
+        rate = self.rates.get(record.funcName, self.default_rate)
+        if rate >= 1:
+            return True
+        if rate <= 0:
+            return False
+        with self.lock:
+            count = self.counts.get(record.funcName, 0)
+            self.counts[record.funcName] = count + 1
+        # Pass when count * rate reaches the next integer
+        return math.floor(count * rate) > math.floor((count - 1) * rate)
+
+    @staticmethod
+    def parse(value: str) -> Dict[str, float]:
+        """ Parses rates from a string such as "0.1" or "run_session=0.01,protect_file=0.5,*=0.1". """
+        rates = {}
+        for item in filter(None, (item.strip() for item in value.split(","))):
+            operation, _, rate = item.rpartition("=")
+            rates[operation or "*"] = float(rate)
+        return rates
+
+
+debug_sampling_filter: Optional[DebugSamplingFilter] = None
+
+
+def set_debug_sampling_rates(rates: Optional[Dict[str, float]] = None, **operation_rates: float):
+    """ Samples the DEBUG records of each operation in this process and in worker processes started after this call. Records above DEBUG are not sampled. Pass no rates to disable sampling.
+
+    Example:
+        # Keep 1% of the DEBUG records logged by run_session and 10% of all other DEBUG records
+        set_debug_sampling_rates({"*": 0.1}, run_session=0.01)
+    """
+    global debug_sampling_filter
+    rates = dict(rates or {}, **operation_rates)
+    if debug_sampling_filter is not None:
+        log.removeFilter(debug_sampling_filter)
+        debug_sampling_filter = None
+    if rates:
+        debug_sampling_filter = DebugSamplingFilter(rates)
+        log.addFilter(debug_sampling_filter)
+        os.environ["glasswall_log_debug_sampling"] = ",".join(f"{operation}={rate}" for operation, rate in rates.items())
+    else:
+        os.environ.pop("glasswall_log_debug_sampling", None)
+
+
+if os.environ.get("glasswall_log_debug_sampling"):
+    set_debug_sampling_rates(DebugSamplingFilter.parse(os.environ["glasswall_log_debug_sampling"]))
+
+
+# Queue based logging, see start_queue_listener
+log_queue: "Optional[multiprocessing.Queue]" = None
+log_queue_listener: Optional[logging.handlers.QueueListener] = None
+_log_queue_handlers = []
+
+
+def start_queue_listener() -> logging.handlers.QueueListener:
+    """ Moves the handlers of the glasswall logger behind a QueueListener, so that log records are written by a single thread of this process. GlasswallProcessManager worker processes started after this call send their log records to the same queue, rather than each writing to the log file and console.
+
+    Returns the running listener. Call stop_queue_listener to restore the handlers.
+    """
+    global log_queue, log_queue_listener, _log_queue_handlers
+    if log_queue_listener is not None:
+        return log_queue_listener
+
+    log_queue = multiprocessing.Queue()
+    _log_queue_handlers = list(log.handlers)
+    log_queue_listener = logging.handlers.QueueListener(log_queue, *_log_queue_handlers, respect_handler_level=True)
+    for handler in _log_queue_handlers:
+        log.removeHandler(handler)
+    log.addHandler(logging.handlers.QueueHandler(log_queue))
+    log_queue_listener.start()
+
+    return log_queue_listener
+
+
+def stop_queue_listener():
+    """ Writes the queued log records and restores the handlers moved by start_queue_listener. """
+    global log_queue, log_queue_listener, _log_queue_handlers
+    if log_queue_listener is None:
+        return
+
+    log_queue_listener.stop()
+    for handler in list(log.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            log.removeHandler(handler)
+    for handler in _log_queue_handlers:
+        log.addHandler(handler)
+
+    log_queue.close()
+    log_queue = log_queue_listener = None
+    _log_queue_handlers = []
+
+
+def use_queue_handler(queue: "multiprocessing.Queue"):
+    """ Replaces the handlers of the glasswall logger with a QueueHandler sending records to queue. Called in worker processes, see start_queue_listener. """
+    for handler in list(log.handlers):
+        log.removeHandler(handler)
+    log.addHandler(logging.handlers.QueueHandler(queue))
+
+
 def format_object(obj):
     if not hasattr(obj, "__dict__"):
         return ""
     return "\n\t" + "\n\t".join(f"{k}: {v}" for k, v in obj.__dict__.items())
+
+
+class LazyFormat:
+    """ Defers calling func(*args, **kwargs) until a log record is formatted, so that expensive log messages are only built when the log level is enabled.
+
+    Example:
+        log.debug("%s", LazyFormat(format_object, result))
+    """
+    __slots__ = ("func", "args", "kwargs")
+
+    def __init__(self, func, *args, **kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    def __str__(self):
+        return str(self.func(*self.args, **self.kwargs))
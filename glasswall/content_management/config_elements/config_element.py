@@ -1,14 +1,20 @@
 
 
+from collections import Counter
 from typing import Optional, Union
 
 import glasswall
 from glasswall.content_management.errors.switches import SwitchNotFound
 from glasswall.content_management.switches import Switch
+from glasswall.content_management.tracking import Tracked, digest_of, sorted_attribute_parts, tracked_attribute
 
 
-class ConfigElement:
+class ConfigElement(Tracked):
     """ A Content Management Policy configuration element which has a name, and can have attributes, switches, and subelements. """
+    name = tracked_attribute("name")
+    attributes = tracked_attribute("attributes", container=dict)
+    switches = tracked_attribute("switches", container=list)
+    subelements = tracked_attribute("subelements", container=list)
 
     def __init__(self,
                  name: str,
@@ -78,23 +84,114 @@ class ConfigElement:
 
     @property
     def text(self):
-        """ String representation of XML. """
-        indent = " " * 4 * self._indent
+        """ String representation of XML. The string is cached until an attribute, switch, or subelement changes. """
+        return self._render(self.__dict__.get("_indent", 0))
 
-        string = f"{indent}<{self.name}"
+    def _render(self, indent: int):
+        cache = self.__dict__.get("_text_cache")
+        if cache is not None and cache[0] == indent:
+            return cache[1]
+
+        lines = [self._start_tag(indent)]
+        lines.extend(subelement._render(indent + 1) for subelement in self.subelements)
+        lines.extend(switch._render(indent + 1) for switch in self.switches)
+        lines.append(f"{' ' * 4 * indent}</{self.name}>")
+        string = "\n".join(lines)
+        self.__dict__["_text_cache"] = (indent, string)
+
+        return string
+
+    def _start_tag(self, indent: int):
         # Sort attributes by lowercase key, lowercase value
-        for k, v in sorted(self.attributes.items(), key=lambda kv: (str(kv[0]).lower(), str(kv[1]).lower())):
-            string += f' {k}="{v}"'
-        string += ">"
+        attributes = "".join(
+            f' {k}="{v}"'
+            for k, v in sorted(self.attributes.items(), key=lambda kv: (str(kv[0]).lower(), str(kv[1]).lower()))
+        )
+        return f"{' ' * 4 * indent}<{self.name}{attributes}>"
+
+    def _compute_digest(self):
+        return digest_of(
+            "ConfigElement",
+            self.name,
+            str(len(self.attributes)),
+            *sorted_attribute_parts(self.attributes),
+            str(len(self.subelements)),
+            *(subelement._digest() for subelement in self.subelements),
+            str(len(self.switches)),
+            *(switch._digest() for switch in self.switches),
+        )
+
+    def _iter_lines(self, indent: int):
+        """ Yields the XML line by line without caching it, so that large elements can be written without building the full string. """
+        cache = self.__dict__.get("_text_cache")
+        if cache is not None and cache[0] == indent:
+            yield cache[1]
+            return
+
+        yield self._start_tag(indent)
         for subelement in self.subelements:
-            subelement._indent = self._indent + 1
-            string += f"\n{subelement.text}"
+            yield from subelement._iter_lines(indent + 1)
         for switch in self.switches:
-            switch._indent = self._indent + 1
-            string += f"\n{switch.text}"
-        string += f"\n{indent}</{self.name}>"
+            yield from switch._iter_lines(indent + 1)
+        yield f"{' ' * 4 * indent}</{self.name}>"
 
-        return string
+    def diff(self, other: "ConfigElement"):
+        """ Returns the structural differences from this config element to arg "other". Elements with equal digests are not compared further.
+
+        Switches are matched by .name, using the first Switch with each name. Subelements are matched by digest, ignoring order.
+
+        Args:
+            other (ConfigElement): The ConfigElement to compare with.
+
+        Returns:
+            diff (dict): A dictionary with keys:
+                "attributes" (dict): {name: (old value, new value)} for attributes that were added (old value None), removed (new value None), or changed.
+                "switches_added" (list): Switch instances in "other" with a name that is not in self.
+                "switches_removed" (list): Switch instances in self with a name that is not in "other".
+                "switches_changed" (list): (Switch, Switch) tuples with the same name and a different value or attributes.
+                "subelements_added" (list): ConfigElement instances in "other" without an equal subelement in self.
+                "subelements_removed" (list): ConfigElement instances in self without an equal subelement in "other".
+        """
+        if not isinstance(other, ConfigElement):
+            raise TypeError(other)
+
+        diff = dict(
+            attributes={},
+            switches_added=[],
+            switches_removed=[],
+            switches_changed=[],
+            subelements_added=[],
+            subelements_removed=[],
+        )
+        if self._digest() == other._digest():
+            return diff
+
+        for name in sorted(set(self.attributes) | set(other.attributes), key=str):
+            old, new = self.attributes.get(name), other.attributes.get(name)
+            if old != new:
+                diff["attributes"][name] = (old, new)
+
+        self_switches, other_switches = {}, {}
+        for switches, switches_by_name in ((self.switches, self_switches), (other.switches, other_switches)):
+            for switch in switches:
+                switches_by_name.setdefault(switch.name, switch)
+        for name, switch in other_switches.items():
+            if name not in self_switches:
+                diff["switches_added"].append(switch)
+            elif self_switches[name]._digest() != switch._digest():
+                diff["switches_changed"].append((self_switches[name], switch))
+        diff["switches_removed"] = [switch for name, switch in self_switches.items() if name not in other_switches]
+
+        for subelements, unmatched_subelements, key in ((other.subelements, self.subelements, "subelements_added"), (self.subelements, other.subelements, "subelements_removed")):
+            unmatched = Counter(subelement._digest() for subelement in unmatched_subelements)
+            for subelement in subelements:
+                digest = subelement._digest()
+                if unmatched[digest]:
+                    unmatched[digest] -= 1
+                else:
+                    diff[key].append(subelement)
+
+        return diff
 
     def get_switch_names(self):
         """ Returns a sorted list of unique Switch.name values from self.switches. """
@@ -3,3 +3,8 @@
 class ContentManagementPolicyError(Exception):
     """ Content Management Policy base error. """
     pass
+
+
+class ImmutablePolicyError(ContentManagementPolicyError):
+    """ The Content Management Policy is compiled and cannot be modified. """
+    pass
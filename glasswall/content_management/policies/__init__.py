@@ -1,6 +1,7 @@
 
 
 from glasswall.content_management.policies.archive_manager import ArchiveManager
+from glasswall.content_management.policies.compiled_policy import CompiledPolicy
 from glasswall.content_management.policies.editor import Editor
 from glasswall.content_management.policies.policy import Policy
 from glasswall.content_management.policies.rebuild import Rebuild
@@ -0,0 +1,183 @@
+import types
+from typing import Optional
+
+from glasswall import utils
+from glasswall.content_management.config_elements.config_element import ConfigElement
+from glasswall.content_management.errors.config_elements import ConfigElementNotFound
+from glasswall.content_management.errors.policies import ImmutablePolicyError
+from glasswall.content_management.errors.switches import SwitchNotFound
+from glasswall.content_management.policies.policy import Policy
+from glasswall.content_management.switches.switch import Switch
+from glasswall.content_management.tracking import Tracked
+
+# Read only subclasses of ConfigElement and Switch classes, keyed by class
+_frozen_classes = {}
+
+
+def _raise_immutable(self, *args, **kwargs):
+    raise ImmutablePolicyError(f"{self!r} is part of a CompiledPolicy and cannot be modified")
+
+
+class _FrozenList(list):
+    """ A list of the switches or subelements of a frozen element, which raises ImmutablePolicyError when modified. """
+    __slots__ = ()
+    append = extend = insert = remove = pop = clear = sort = reverse = _raise_immutable
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _raise_immutable
+
+
+def _frozen_class(cls: type) -> type:
+    frozen_class = _frozen_classes.get(cls)
+    if frozen_class is None:
+        frozen_class = type(cls.__name__, (cls,), {
+            "__module__": cls.__module__,
+            "__setattr__": _raise_immutable,
+            "__delattr__": _raise_immutable,
+            "_invalidate": _raise_immutable,
+        })
+        _frozen_classes[cls] = frozen_class
+    return frozen_class
+
+
+def _freeze(value, memo: dict):
+    """ Returns a read only deep copy of value. ConfigElement and Switch instances are copied to read only subclasses, lists to _FrozenList, and dicts to read only mappings. """
+    if id(value) in memo:
+        return memo[id(value)]
+
+    if isinstance(value, Tracked):
+        frozen = object.__new__(_frozen_class(type(value)))
+        memo[id(value)] = frozen
+        # The copy is not registered as a child of the source policy elements, so that their changes do not reach it
+        frozen.__dict__.update({key: _freeze(item, memo) for key, item in value.__dict__.items() if key != "_parents"})
+        return frozen
+    elif isinstance(value, list):
+        frozen = _FrozenList(_freeze(item, memo) for item in value)
+    elif isinstance(value, tuple):
+        frozen = tuple(_freeze(item, memo) for item in value)
+    elif isinstance(value, dict):
+        frozen = types.MappingProxyType({key: _freeze(item, memo) for key, item in value.items()})
+    else:
+        return value
+
+    memo[id(value)] = frozen
+    return frozen
+
+
+class CompiledPolicy(Policy):
+    """ An immutable snapshot of a Policy with dict-indexed config elements and switches, and XML serialised and validated once.
+
+    A CompiledPolicy can be passed anywhere a Policy is accepted. The library wrappers use the cached XML and UTF-8 bytes instead of serialising and validating the policy for each call. Compile a policy once it is fully built. The config elements and switches are read only copies, so changes made to the source policy afterwards are not reflected, and modifying the copies raises ImmutablePolicyError.
+
+    Args:
+        policy (Optional[glasswall.content_management.policies.Policy], optional): Default None. The policy to compile. If None, a Policy is first built from kwargs and then compiled, so this costs as much as Policy(**kwargs).compile().
+        **kwargs: Keyword arguments for Policy when policy is None, e.g. config.
+
+    Example:
+        policy = glasswall.content_management.policies.Editor(default="sanitise").compile()
+        policy.get_switch("pdfConfig", "javascript")
+    """
+
+    def __init__(self, policy: Optional[Policy] = None, **kwargs):
+        if policy is None:
+            policy = Policy(**kwargs)
+        elif not isinstance(policy, Policy):
+            raise TypeError(policy)
+
+        memo = {}
+        config_elements = tuple(_freeze(config_element, memo) for config_element in policy.config_elements)
+
+        # Index the first ConfigElement with each name, and the first Switch with each name within it, matching Policy.__getattr__ and ConfigElement.__getattr__
+        config_elements_by_name = {}
+        switches_by_name = {}
+        for config_element in config_elements:
+            config_elements_by_name.setdefault(config_element.name, config_element)
+            for switch in config_element.switches:
+                switches_by_name.setdefault((config_element.name, switch.name), switch)
+
+        text = utils.validate_xml(policy)
+
+        self.__dict__.update(
+            _config_elements=config_elements,
+            default=policy.default,
+            default_config_elements=tuple(_freeze(config_element, memo) for config_element in policy.default_config_elements),
+            config=_freeze(dict(policy.config), memo),
+            _config_elements_by_name=config_elements_by_name,
+            _switches_by_name=switches_by_name,
+            _text=text,
+            _bytes=text.encode("utf-8"),
+            _digest_cache=policy._digest(),
+        )
+
+    def __setattr__(self, name, value):
+        raise ImmutablePolicyError(f"Cannot set attribute '{name}' of {self.__class__.__name__}")
+
+    def __getattr__(self, name):
+        # Try to return matching ConfigElement from nonexistant attribute
+        config_element = self.__dict__.get("_config_elements_by_name", {}).get(name)
+
+        if config_element:
+            return config_element
+
+        raise AttributeError(name)
+
+    @property
+    def text(self):
+        """ String representation of XML, validated when the policy was compiled. """
+        return self._text
+
+    @property
+    def bytes(self):
+        """ UTF-8 encoded string representation of XML. """
+        return self._bytes
+
+    def encode(self, *args):
+        """ UTF-8 encoded string representation of XML. The cached bytes are returned for UTF-8. """
+        if not args or args[0].lower().replace("_", "-") in ("utf-8", "utf8"):
+            return self._bytes
+        return self._text.encode(*args)
+
+    def compile(self):
+        """ Returns self, the policy is already compiled. """
+        return self
+
+    def get_config_element_names(self):
+        """ Returns a sorted list of unique ConfigElement.name values from self.config_elements. """
+        return sorted(self._config_elements_by_name)
+
+    def get_config_element(self, name: str) -> ConfigElement:
+        """ Returns the ConfigElement with the given name.
+
+        Raises:
+            glasswall.content_management.errors.config_elements.ConfigElementNotFound: The config_element was not found.
+        """
+        try:
+            return self._config_elements_by_name[name]
+        except KeyError:
+            raise ConfigElementNotFound(f"'{name}' not in {self.get_config_element_names()}")
+
+    def get_switch(self, config_element: str, switch: str, default: Optional[Switch] = None) -> Switch:
+        """ Returns the Switch with the given name from the ConfigElement with the given name.
+
+        Args:
+            config_element (str): The ConfigElement.name to match.
+            switch (str): The Switch.name to match.
+            default (Optional[Switch], optional): Default None. Returned if the switch is not found. If None, SwitchNotFound is raised instead.
+
+        Raises:
+            glasswall.content_management.errors.switches.SwitchNotFound: The switch was not found and default is None.
+        """
+        result = self._switches_by_name.get((config_element, switch), default)
+        if result is None:
+            raise SwitchNotFound(f"'{switch}' not in '{config_element}'")
+        return result
+
+    def remove_switch(self, *args, **kwargs):
+        raise ImmutablePolicyError(self.__class__.__name__)
+
+    def add_switch(self, *args, **kwargs):
+        raise ImmutablePolicyError(self.__class__.__name__)
+
+    def remove_config_element(self, *args, **kwargs):
+        raise ImmutablePolicyError(self.__class__.__name__)
+
+    def add_config_element(self, *args, **kwargs):
+        raise ImmutablePolicyError(self.__class__.__name__)
@@ -1,6 +1,8 @@
 
 
-from typing import Optional, Union
+import io
+import os
+from typing import IO, Optional, Union
 
 import glasswall
 from glasswall import utils
@@ -8,11 +10,13 @@ from glasswall.content_management.config_elements.config_element import ConfigEl
 from glasswall.content_management.errors.config_elements import ConfigElementNotFound
 from glasswall.content_management.errors.switches import SwitchNotFound
 from glasswall.content_management.switches.switch import Switch
+from glasswall.content_management.tracking import Tracked, digest_of, tracked_attribute
 from lxml import etree
 
 
-class Policy:
+class Policy(Tracked):
     """ A Content Management Policy made up of a list of ConfigElement instances. """
+    config_elements = tracked_attribute("config_elements", container=list)
 
     def __init__(self,
                  config_elements: list = [],
@@ -96,20 +100,102 @@ class Policy:
 
     @property
     def text(self):
-        """ String representation of XML. """
-        string = '<?xml version="1.0" encoding="utf-8"?>'
-        string += "\n<config>"
-        for config_element in self.config_elements:
-            config_element._indent = 1
-            string += f"\n{config_element.text}"
-        string += '\n</config>'
+        """ String representation of XML. The string is cached until a config element, switch, or attribute changes. """
+        string = self.__dict__.get("_text_cache")
+        if string is not None:
+            return string
+
+        lines = ['<?xml version="1.0" encoding="utf-8"?>', "<config>"]
+        lines.extend(config_element._render(1) for config_element in self.config_elements)
+        lines.append("</config>")
+        string = "\n".join(lines)
+        self.__dict__["_text_cache"] = string
 
         return string
 
+    def iter_lines(self):
+        """ Yields the lines of the XML representation. Unlike .text, the XML of config elements that are not cached is not built or cached in full. """
+        string = self.__dict__.get("_text_cache")
+        if string is not None:
+            yield string
+            return
+
+        yield '<?xml version="1.0" encoding="utf-8"?>'
+        yield "<config>"
+        for config_element in self.config_elements:
+            yield from config_element._iter_lines(1)
+        yield "</config>"
+
+    def write(self, file: Union[str, IO[str]]):
+        """ Writes the XML representation to a file line by line, without holding the full string in memory.
+
+        Args:
+            file (Union[str, IO[str]]): A file path, or a file object opened in text mode.
+
+        Returns:
+            self
+        """
+        if isinstance(file, str):
+            os.makedirs(os.path.dirname(os.path.abspath(file)), exist_ok=True)
+            with open(file, "w", encoding="utf-8", newline="") as f:
+                return self.write(f)
+
+        for i, line in enumerate(self.iter_lines()):
+            if i:
+                file.write("\n")
+            file.write(line)
+
+        return self
+
     def encode(self, *args):
         """ UTF-8 encoded string representation of XML. """
         return str(self).encode(*args)
 
+    def _compute_digest(self):
+        return digest_of("Policy", str(len(self.config_elements)), *(config_element._digest() for config_element in self.config_elements))
+
+    def diff(self, other: "Policy"):
+        """ Returns the structural differences from this policy to arg "other". Equal policies are detected by comparing digests, and only config elements with different digests are compared further.
+
+        Config elements are matched by .name, using the first ConfigElement with each name.
+
+        Args:
+            other (glasswall.content_management.policies.Policy): The Policy to compare with.
+
+        Returns:
+            diff (dict): A dictionary with keys:
+                "config_elements_added" (list): ConfigElement instances in "other" with a name that is not in self.
+                "config_elements_removed" (list): ConfigElement instances in self with a name that is not in "other".
+                "config_elements_changed" (dict): {name: ConfigElement.diff} for config elements with the same name and different digests.
+        """
+        if not isinstance(other, Policy):
+            raise TypeError(other)
+
+        diff = dict(
+            config_elements_added=[],
+            config_elements_removed=[],
+            config_elements_changed={},
+        )
+        if self._digest() == other._digest():
+            return diff
+
+        self_config_elements, other_config_elements = {}, {}
+        for config_elements, config_elements_by_name in ((self.config_elements, self_config_elements), (other.config_elements, other_config_elements)):
+            for config_element in config_elements:
+                config_elements_by_name.setdefault(config_element.name, config_element)
+        for name, config_element in other_config_elements.items():
+            if name not in self_config_elements:
+                diff["config_elements_added"].append(config_element)
+            elif self_config_elements[name]._digest() != config_element._digest():
+                diff["config_elements_changed"][name] = self_config_elements[name].diff(config_element)
+        diff["config_elements_removed"] = [config_element for name, config_element in self_config_elements.items() if name not in other_config_elements]
+
+        return diff
+
+    def compile(self):
+        """ Returns an immutable CompiledPolicy snapshot of this policy with dict-indexed lookups and cached XML. """
+        return glasswall.content_management.policies.CompiledPolicy(self)
+
     def get_config_element_names(self):
         """ Returns a sorted list of unique ConfigElement.name values from self.config_elements. """
         return sorted(set(config_element.name for config_element in self.config_elements))
@@ -287,56 +373,100 @@ class Policy:
         }
 
     @staticmethod
-    def from_string(string: str):
+    def _config_element_from_element(element: "etree._Element") -> ConfigElement:
+        """ Creates a ConfigElement from an xml element of a policy, e.g. pdfConfig. Switches are collected by name, the last switch with each name is kept, and sorted once. """
+        if hasattr(glasswall.content_management.config_elements, element.tag):
+            # Known config element exists, e.g. pdfConfig
+            config_element = getattr(glasswall.content_management.config_elements, element.tag)(attributes=dict(element.attrib))
+        else:
+            # Create custom config element
+            config_element = glasswall.content_management.config_elements.ConfigElement(name=element.tag, attributes=dict(element.attrib))
+
+        switches = {switch.name: switch for switch in config_element.switches}
+        for item in element:
+            # Add children, e.g. textList has child elements: textItem
+            if len(item):
+                # if item has children then item is a config element, such as textList
+                textList = glasswall.content_management.config_elements.ConfigElement(name=item.tag, attributes=dict(item.attrib))
+                for textItem in item:
+                    textItem_switches = {
+                        switch.tag: Switch(name=switch.tag, value=switch.text, attributes=dict(switch.attrib))
+                        for switch in textItem
+                    }
+                    textList.subelements.append(glasswall.content_management.config_elements.ConfigElement(
+                        name=textItem.tag,
+                        attributes=dict(textItem.attrib),
+                        switches=sorted(textItem_switches.values()),
+                    ))
+                config_element.subelements.append(textList)
+                continue
+
+            # if item has no children then item is a switch
+            if hasattr(config_element.switches_module, item.tag):
+                # Known switch exists, e.g. pdf.internal_hyperlinks
+                switches[item.tag] = getattr(config_element.switches_module, item.tag)(value=item.text)
+            else:
+                switches[item.tag] = Switch(name=item.tag, value=item.text, attributes=dict(item.attrib))
+
+        config_element.switches = sorted(switches.values())
+
+        return config_element
+
+    @staticmethod
+    def from_string(string: Union[str, bytes, bytearray, io.BytesIO], iterparse: bool = False):
         """ Create Policy object from string.
 
+        The xml is parsed once and each ConfigElement and Switch is created without re-sorting per item.
+
         Args:
-            string (str): A string representation of an xml content management policy, or a file path.
+            string (Union[str, bytes, bytearray, io.BytesIO]): A string representation of an xml content management policy, or a file path, or bytes.
+            iterparse (bool, optional): Default False. Parse incrementally with lxml.etree.iterparse, discarding the xml of each config element once it is converted. Reduces peak memory usage for large policy files.
 
         Returns:
             new_policy (glasswall.content_management.policies.Policy): A Policy object.
-        """
-        try:
-            string = glasswall.utils.validate_xml(string)
-        except ValueError:
-            raise glasswall.content_management.errors.policies.ContentManagementPolicyError(string)
 
-        config = etree.fromstring(string.encode("utf-8"))
+        Raises:
+            glasswall.content_management.errors.policies.ContentManagementPolicyError: The string could not be parsed or is not a content management policy.
+        """
+        if isinstance(string, str):
+            try:
+                is_file = os.path.isfile(os.path.abspath(string))
+            except Exception:
+                is_file = False
+            source = string if is_file else io.BytesIO(string.encode("utf-8"))
+        elif isinstance(string, (bytes, bytearray)):
+            source = io.BytesIO(string)
+        elif isinstance(string, io.BytesIO):
+            source = string
+        else:
+            raise TypeError(string)
 
-        if config.tag != "config":
+        config_elements = {}
+        try:
+            if iterparse:
+                root = None
+                for event, element in etree.iterparse(source, events=("start", "end")):
+                    if root is None:
+                        root = element
+                        if root.tag != "config":
+                            raise glasswall.content_management.errors.policies.ContentManagementPolicyError(string)
+                    elif event == "end" and element.getparent() is root:
+                        config_elements[element.tag] = Policy._config_element_from_element(element)
+                        # Discard processed config elements
+                        element.clear()
+                        while element.getprevious() is not None:
+                            del root[0]
+            else:
+                root = etree.parse(source).getroot()
+                if root.tag != "config":
+                    raise glasswall.content_management.errors.policies.ContentManagementPolicyError(string)
+                for element in root:
+                    config_elements[element.tag] = Policy._config_element_from_element(element)
+        except (etree.XMLSyntaxError, ValueError):
             raise glasswall.content_management.errors.policies.ContentManagementPolicyError(string)
 
         new_policy = glasswall.content_management.policies.Policy()
-
-        for config_element in config:
-            if hasattr(glasswall.content_management.config_elements, config_element.tag):
-                # Known config element exists, e.g. pdfConfig
-                new_config_element = getattr(glasswall.content_management.config_elements, config_element.tag)(attributes=config_element.attrib)
-            else:
-                # Create custom config element
-                new_config_element = glasswall.content_management.config_elements.ConfigElement(name=config_element.tag, attributes=config_element.attrib)
-
-            for item in config_element:
-                # Add children, e.g. textList has child elements: textItem
-                if item.getchildren():
-                    # if getchildren() then item is a config element, such as textList
-                    textList = glasswall.content_management.config_elements.ConfigElement(name=item.tag, attributes=item.attrib)
-                    for textItem in item.getchildren():
-                        new_textItem = glasswall.content_management.config_elements.ConfigElement(name=textItem.tag, attributes=textItem.attrib)
-                        for switch in textItem:
-                            new_textItem.add_switch(glasswall.content_management.switches.Switch(name=switch.tag, value=switch.text, attributes=switch.attrib))
-                        textList.subelements.append(new_textItem)
-                    new_config_element.subelements.append(textList)
-                    continue
-
-                # if not getchildren() then item is a switch
-                if hasattr(new_config_element.switches_module, item.tag):
-                    # Known switch exists, e.g. pdf.internal_hyperlinks
-                    new_switch = getattr(new_config_element.switches_module, item.tag)(value=item.text)
-                else:
-                    new_switch = glasswall.content_management.switches.Switch(name=item.tag, value=item.text, attributes=item.attrib)
-                new_config_element.add_switch(new_switch)
-
-            new_policy.add_config_element(new_config_element)
+        # Sort config elements by .name and .switches once
+        new_policy.config_elements = sorted(config_elements.values())
 
         return new_policy
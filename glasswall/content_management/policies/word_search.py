@@ -1,5 +1,7 @@
 
 
+from typing import Iterable
+
 import glasswall
 from glasswall.content_management.config_elements.config_element import ConfigElement
 from glasswall.content_management.policies.policy import Policy
@@ -40,14 +42,14 @@ class WordSearch(Policy):
             config=self.config,
         )
 
-    def add_textItem(self, text: str, replacementChar: str, textSetting: str = "redact", **kwargs):
-        """ Adds a textItem to the textSearchConfig textList subelements. """
+    def _get_textList(self, libVersion: str = "core2"):
+        """ Returns the textList ConfigElement of the textSearchConfig, adding a textSearchConfig if it does not exist. """
         textSearchConfig = next(iter(c for c in self.config_elements if c.name == "textSearchConfig"), None)
         if not textSearchConfig:
             # Add textSearchConfig to ConfigElements
             textSearchConfig = ConfigElement(
                 name="textSearchConfig",
-                attributes={"libVersion": kwargs.get("libVersion", "core2")},
+                attributes={"libVersion": libVersion},
                 subelements=[ConfigElement(name="textList")]
             )
             self.add_config_element(
@@ -55,7 +57,18 @@ class WordSearch(Policy):
             )
 
         # Select the ConfigElement named textList
-        textList = next(iter(s for s in textSearchConfig.subelements if s.name == "textList"))
+        return next(iter(s for s in textSearchConfig.subelements if s.name == "textList"))
+
+    @staticmethod
+    def _textItem_key(textItem: ConfigElement):
+        """ Returns the lowercase value of the "text" switch of a textItem, or None. """
+        for switch in textItem.switches:
+            if switch.name == "text":
+                return switch.value.lower()
+
+    def add_textItem(self, text: str, replacementChar: str, textSetting: str = "redact", **kwargs):
+        """ Adds a textItem to the textSearchConfig textList subelements. """
+        textList = self._get_textList(libVersion=kwargs.get("libVersion", "core2"))
 
         # If textList has a subelement textItem that contains a switch named "text" with the same .value as arg "text", delete it to avoid duplicates.
         #   (cannot redact "generic" with "*" and also redact "generic" with "@")
@@ -79,6 +92,46 @@ class WordSearch(Policy):
 
         # Don't sort textList: this preserves top-down order for redaction settings.
 
+    def add_textItems(self, textItems: Iterable[tuple], **kwargs):
+        """ Adds many textItems to the textSearchConfig textList subelements in O(N). The result is the same as calling add_textItem for each item in order.
+
+        Args:
+            textItems (Iterable[tuple]): Tuples of (text, replacementChar) or (text, replacementChar, textSetting). textSetting defaults to "redact".
+
+        Returns:
+            self
+
+        Example:
+            policy = glasswall.content_management.policies.WordSearch()
+            policy.add_textItems((term, "*") for term in watchlist)
+            policy.write("policy.xml")
+        """
+        textList = self._get_textList(libVersion=kwargs.get("libVersion", "core2"))
+
+        # Index new textItems by lowercase text. A later duplicate replaces an earlier one and moves to the end.
+        #   (cannot redact "generic" with "*" and also redact "GeNeRiC" with "@")
+        new_textItems = {}
+        for text, replacementChar, *textSetting in textItems:
+            key = text.lower()
+            new_textItems.pop(key, None)
+            new_textItems[key] = ConfigElement(
+                name="textItem",
+                switches=[
+                    Switch(name="text", value=text),
+                    Switch(name="textSetting", attributes={"replacementChar": replacementChar}, value=textSetting[0] if textSetting else "redact")
+                ],
+            )
+
+        # Keep existing textItems that are not replaced, then add the new textItems to the end.
+        # Don't sort textList: this preserves top-down order for redaction settings.
+        textList.subelements = [
+            textItem
+            for textItem in textList.subelements
+            if self._textItem_key(textItem) not in new_textItems
+        ] + list(new_textItems.values())
+
+        return self
+
     def remove_textItem(self, text: str):
         """ Removes a textItem from the textSearchConfig textList subelements. """
         textSearchConfig = next(iter(c for c in self.config_elements if c.name == "textSearchConfig"), None)
@@ -3,10 +3,13 @@
 from typing import Optional
 
 from glasswall.content_management.errors.switches import RestrictedValue
+from glasswall.content_management.tracking import Tracked, digest_of, sorted_attribute_parts, tracked_attribute
 
 
-class Switch:
+class Switch(Tracked):
     """ A Content Management Policy switch which has a name and a value, and can have attributes. """
+    name = tracked_attribute("name")
+    attributes = tracked_attribute("attributes", container=dict)
 
     def __init__(self, name: str, value: str, attributes: Optional[dict] = None, restrict_values: Optional[list] = None):
         self._indent = 0
@@ -33,18 +36,40 @@ class Switch:
     @value.setter
     def value(self, value):
         self._value = value
+        self._invalidate()
         if self.restrict_values and value not in self.restrict_values:
             raise RestrictedValue(f"{self.name} has an unexpected value: '{value}'. Its value is restricted to: {self.restrict_values}")
 
     @property
     def text(self):
-        """ String representation of XML. """
-        indent = " " * 4 * self._indent
+        """ String representation of XML. The string is cached until the switch changes. """
+        return self._render(self.__dict__.get("_indent", 0))
 
-        string = f"{indent}<{self.name}"
-        # Sort attributes by lowercase key, lowercase value
-        for k, v in sorted(self.attributes.items(), key=lambda kv: (kv[0].lower(), kv[1].lower())):
-            string += f' {k}="{v}"'
-        string += f">{self.value}</{self.name}>"
+    def _render(self, indent: int):
+        cache = self.__dict__.get("_text_cache")
+        if cache is not None and cache[0] == indent:
+            return cache[1]
+
+        string = self._serialise(indent)
+        self.__dict__["_text_cache"] = (indent, string)
 
         return string
+
+    def _serialise(self, indent: int):
+        # Sort attributes by lowercase key, lowercase value
+        attributes = "".join(
+            f' {k}="{v}"'
+            for k, v in sorted(self.attributes.items(), key=lambda kv: (kv[0].lower(), kv[1].lower()))
+        )
+        return f"{' ' * 4 * indent}<{self.name}{attributes}>{self.value}</{self.name}>"
+
+    def _compute_digest(self):
+        return digest_of("Switch", self.name, str(self.value), str(len(self.attributes)), *sorted_attribute_parts(self.attributes))
+
+    def _iter_lines(self, indent: int):
+        """ Yields the XML without caching it. """
+        cache = self.__dict__.get("_text_cache")
+        if cache is not None and cache[0] == indent:
+            yield cache[1]
+        else:
+            yield self._serialise(indent)
@@ -0,0 +1,216 @@
+
+
+import hashlib
+import operator
+from typing import Union
+
+
+class TrackedList(list):
+    """ A list that invalidates the cached XML of its owner when it is modified, and registers the owner as a parent of added items. """
+    __slots__ = ("_owner",)
+
+    def _changed(self, items=()):
+        for item in items:
+            _add_parent(item, self._owner)
+        self._owner._invalidate()
+
+    def append(self, item):
+        super().append(item)
+        self._changed((item,))
+
+    def extend(self, iterable):
+        items = list(iterable)
+        super().extend(items)
+        self._changed(items)
+
+    def insert(self, index, item):
+        super().insert(index, item)
+        self._changed((item,))
+
+    def remove(self, item):
+        super().remove(item)
+        self._changed()
+
+    def pop(self, *args):
+        item = super().pop(*args)
+        self._changed()
+        return item
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._changed()
+
+    def reverse(self):
+        super().reverse()
+        self._changed()
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            value = list(value)
+            super().__setitem__(index, value)
+            self._changed(value)
+        else:
+            super().__setitem__(index, value)
+            self._changed((value,))
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._changed()
+
+    def __iadd__(self, iterable):
+        self.extend(iterable)
+        return self
+
+    def __imul__(self, n):
+        super().__imul__(n)
+        self._changed()
+        return self
+
+
+class TrackedDict(dict):
+    """ A dict that invalidates the cached XML of its owner when it is modified. """
+    __slots__ = ("_owner",)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._owner._invalidate()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._owner._invalidate()
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._owner._invalidate()
+
+    def setdefault(self, key, default=None):
+        value = super().setdefault(key, default)
+        self._owner._invalidate()
+        return value
+
+    def pop(self, *args):
+        value = super().pop(*args)
+        self._owner._invalidate()
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        self._owner._invalidate()
+        return item
+
+    def clear(self):
+        super().clear()
+        self._owner._invalidate()
+
+
+def _add_parent(item, parent):
+    """ Registers parent to be invalidated when item changes. """
+    if not isinstance(item, Tracked):
+        return
+    item_dict = item.__dict__
+    parents = item_dict.get("_parents")
+    if parents is None:
+        item_dict["_parents"] = (parent,)
+    elif not any(p is parent for p in parents):
+        item_dict["_parents"] = parents + (parent,)
+
+
+class Tracked:
+    """ Caches the XML and digest of a policy element until one of its tracked attributes, switches or subelements changes.
+
+    Assigning a tracked_attribute, or modifying a tracked list or dict, clears the caches of the element and of every element containing it.
+    """
+
+    @property
+    def digest(self) -> str:
+        """ A canonical hex digest of the element. Elements with equal XML have equal digests. The digest is cached and computed from the digests of switches and subelements, so only changed elements are rehashed. """
+        return self._digest().hex()
+
+    def _digest(self) -> bytes:
+        digest = self.__dict__.get("_digest_cache")
+        if digest is None:
+            digest = self._compute_digest()
+            self.__dict__["_digest_cache"] = digest
+        return digest
+
+    def _compute_digest(self) -> bytes:
+        raise NotImplementedError
+
+    def _invalidate(self):
+        """ Clears the cached XML and digest of this element and its parents. """
+        self_dict = self.__dict__
+        parents = self_dict.get("_parents")
+        if parents is None and self_dict.get("_text_cache") is None and self_dict.get("_digest_cache") is None:
+            return
+        self_dict["_text_cache"] = None
+        self_dict["_digest_cache"] = None
+        if parents:
+            for parent in parents:
+                parent._invalidate()
+
+
+def digest_of(*parts: Union[str, bytes]) -> bytes:
+    """ Returns a 16 byte BLAKE2b digest of parts. Each part is length prefixed so that different sequences of parts cannot collide by concatenation. """
+    hash_ = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        hash_.update(len(part).to_bytes(8, "little"))
+        hash_.update(part)
+    return hash_.digest()
+
+
+def sorted_attribute_parts(attributes: dict) -> list:
+    """ Returns the keys and values of attributes as strings, sorted by lowercase key, lowercase value as in the XML. """
+    return [
+        part
+        for k, v in sorted(((str(k), str(v)) for k, v in attributes.items()), key=lambda kv: (kv[0].lower(), kv[1].lower()))
+        for part in (k, v)
+    ]
+
+
+def tracked_attribute(name: str, container: type = None, doc: str = None) -> property:
+    """ Returns a property stored as `_name` in the instance __dict__ that invalidates the cached XML of a Tracked element when assigned.
+
+    Args:
+        name (str): The attribute name.
+        container (type, optional): Default None. list or dict, to wrap assigned values in a TrackedList or TrackedDict owned by the element.
+        doc (str, optional): Default None. The property docstring.
+    """
+    storage = f"_{name}"
+
+    if container is list:
+        def wrap(self, value):
+            if isinstance(value, TrackedList) and value._owner is self:
+                return value
+            value = TrackedList(value)
+            value._owner = self
+            for item in value:
+                _add_parent(item, self)
+            return value
+    elif container is dict:
+        def wrap(self, value):
+            if isinstance(value, TrackedDict) and value._owner is self:
+                return value
+            value = TrackedDict(value)
+            value._owner = self
+            return value
+    elif container is None:
+        wrap = None
+    else:
+        raise ValueError(container)
+
+    def fset(self, value):
+        if wrap is not None:
+            value = wrap(self, value)
+        self_dict = self.__dict__
+        self_dict[storage] = value
+        if "_text_cache" in self_dict or "_digest_cache" in self_dict or "_parents" in self_dict:
+            self._invalidate()
+
+    # The getter is implemented in C, reads are as fast as a plain attribute
+    return property(operator.attrgetter(storage), fset, doc=doc)
@@ -1,4 +1,5 @@
 
 
-from glasswall.determine_file_type import classes, errors, successes
-from glasswall.determine_file_type.helpers import error_list, file_type_int_to_str, file_type_str_to_int, int_class_map, int_str_map, is_success, str_int_map, success_list
+from glasswall.determine_file_type import classes, errors, signatures, successes
+from glasswall.determine_file_type.batch import determine_file_types
+from glasswall.determine_file_type.helpers import error_list, file_type_int_to_str, file_type_int_to_str_batch, file_type_str_to_int, int_class_map, int_str_map, is_success, is_success_batch, str_int_map, success_integers, success_list, success_strings
@@ -0,0 +1,55 @@
+
+
+import concurrent.futures
+import io
+from typing import Callable, Iterable, List, Optional, Union
+
+from glasswall.config.logging import log
+from glasswall.determine_file_type import signatures
+from glasswall.determine_file_type.helpers import str_int_map
+
+
+def determine_file_types(determine_file_type: Callable, input_files: Iterable[Union[str, bytes, bytearray, io.BytesIO]], as_string: bool = False, raise_unsupported: bool = True, prefilter: bool = True, max_workers: Optional[int] = 1) -> List[Union[int, str]]:
+    """ Determines the file types of many files, returning them in the same order as input_files.
+
+    If prefilter is True, files whose magic bytes unambiguously identify their file type (see glasswall.determine_file_type.signatures) are classified without calling Glasswall. The remaining files are passed to determine_file_type.
+
+    Args:
+        determine_file_type (Callable): The determine_file_type method of a loaded library, e.g. editor.determine_file_type.
+        input_files (Iterable[Union[str, bytes, bytearray, io.BytesIO]]): The input file paths or bytes.
+        as_string (bool, optional): Return file types as strings, eg: "bmp" instead of: 29. Defaults to False.
+        raise_unsupported (bool, optional): Default True. Raise exceptions when Glasswall encounters an error. Fail silently if False.
+        prefilter (bool, optional): Default True. Classify files with unambiguous magic bytes without calling Glasswall.
+        max_workers (Optional[int], optional): Default 1, files are classified in the current thread. If greater than 1, or None for the ThreadPoolExecutor default, files are classified in a thread pool: magic bytes are read and Glasswall is called concurrently. Only use threads with a library that is safe to call from multiple threads.
+
+    Returns:
+        file_types (List[Union[int, str]]): The file type of each input file.
+    """
+    input_files = list(input_files)
+    prefiltered = [False] * len(input_files)
+
+    def classify(index: int):
+        input_file = input_files[index]
+        file_type = signatures.guess_file_type(input_file) if prefilter else None
+        if file_type is None:
+            return determine_file_type(input_file, as_string=as_string, raise_unsupported=raise_unsupported)
+
+        prefiltered[index] = True
+        return file_type if as_string else str_int_map[file_type]
+
+    if max_workers == 1 or len(input_files) <= 1:
+        file_types = [classify(index) for index in range(len(input_files))]
+    else:
+        # Magic bytes are read in the worker threads too, so that Glasswall calls start without waiting for every header to be read
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(classify, index) for index in range(len(input_files))]
+            try:
+                file_types = [future.result() for future in futures]
+            finally:
+                # Do not process the remaining files after an error
+                for future in futures:
+                    future.cancel()
+
+    log.debug("Determined file types\n\tprefiltered: %s\n\tGlasswall: %s", sum(prefiltered), len(input_files) - sum(prefiltered))
+
+    return file_types
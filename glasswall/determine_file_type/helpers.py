@@ -1,9 +1,12 @@
 
 
-from typing import Union
+from typing import TYPE_CHECKING, Iterable, List, Optional, Union
 
 from glasswall.determine_file_type.classes import FileTypeEnum, FileTypeEnumError, FileTypeEnumSuccess
 
+if TYPE_CHECKING:
+    import numpy
+
 error_list = FileTypeEnumError.__subclasses__()
 success_list = FileTypeEnumSuccess.__subclasses__()
 
@@ -25,6 +28,15 @@ int_class_map = {
     if all(key in fte_class.__dict__.keys() for key in ["integer"])
 }
 
+# Precomputed for lookups per file
+success_integers = frozenset(s.integer for s in success_list)
+success_strings = frozenset(s.string for s in success_list)
+
+# Lookup tables indexed by file type enum int, for batch classification
+_table_size = max(int_str_map) + 1
+_success_table = bytes(integer in success_integers for integer in range(_table_size))
+_string_table = [int_str_map.get(integer) for integer in range(_table_size)]
+
 
 def is_success(file_type: Union[int, str, FileTypeEnumError, FileTypeEnumSuccess]):
     """ Checks if a file type corresponds to a success.
@@ -36,9 +48,9 @@ def is_success(file_type: Union[int, str, FileTypeEnumError, FileTypeEnumSuccess
         bool: Returns True if file_type corresponds to a successful file type, else False.
     """
     if isinstance(file_type, int):
-        return file_type in [s.integer for s in success_list]
+        return file_type in success_integers
     elif isinstance(file_type, str):
-        return file_type in [s.string for s in success_list]
+        return file_type in success_strings
     elif issubclass(file_type, FileTypeEnum):
         return issubclass(file_type, FileTypeEnumSuccess)
     else:
@@ -65,3 +77,50 @@ def file_type_str_to_int(string: str):
     Returns:
         Union[type(None), int]: The enum int that Glasswall returns when determining a file type, or None. """
     return str_int_map.get(string, None)
+
+
+def _is_numpy_array(file_types) -> bool:
+    # Avoid importing numpy, it is not a dependency
+    return type(file_types).__module__ == "numpy" and hasattr(file_types, "dtype")
+
+
+def is_success_batch(file_types: Iterable[int]) -> Union[List[bool], "numpy.ndarray"]:
+    """ Checks which file type enum ints correspond to a success.
+
+    Args:
+        file_types (Iterable[int]): Enum ints returned by Glasswall, e.g. a list, array.array or numpy integer array.
+
+    Returns:
+        Union[List[bool], numpy.ndarray]: A numpy bool array if file_types is a numpy array, else a list of bool.
+    """
+    if _is_numpy_array(file_types):
+        import numpy
+
+        table = numpy.frombuffer(_success_table, dtype=bool)
+        in_range = (file_types >= 0) & (file_types < _table_size)
+        result = numpy.zeros(file_types.shape, dtype=bool)
+        result[in_range] = table[file_types[in_range]]
+        return result
+
+    return [file_type in success_integers for file_type in file_types]
+
+
+def file_type_int_to_str_batch(file_types: Iterable[int]) -> Union[List[Optional[str]], "numpy.ndarray"]:
+    """ Converts file type enum ints to strings.
+
+    Args:
+        file_types (Iterable[int]): Enum ints returned by Glasswall, e.g. a list, array.array or numpy integer array.
+
+    Returns:
+        Union[List[Optional[str]], numpy.ndarray]: A numpy object array if file_types is a numpy array, else a list. Unknown enum ints are None.
+    """
+    if _is_numpy_array(file_types):
+        import numpy
+
+        table = numpy.array(_string_table, dtype=object)
+        in_range = (file_types >= 0) & (file_types < _table_size)
+        result = numpy.full(file_types.shape, None, dtype=object)
+        result[in_range] = table[file_types[in_range]]
+        return result
+
+    return [int_str_map.get(file_type) for file_type in file_types]
@@ -0,0 +1,71 @@
+
+
+import io
+from typing import Optional, Union
+
+# Magic bytes of file types as (offset, signature) pairs, keyed by the Glasswall file type string. Also used by glasswall.libraries.archive_manager.signatures.
+signatures = {
+    "7z": ((0, b"7z\xbc\xaf\x27\x1c"),),
+    # "BZh", the block size "1" to "9", and the magic number of the first block, so that text starting with "BZh" is not matched
+    "bz2": tuple((0, b"BZh" + bytes((block_size,)) + b"1AY&SY") for block_size in b"123456789"),
+    "gz": ((0, b"\x1f\x8b\x08"),),
+    "pdf": ((0, b"%PDF-"),),
+    "png": ((0, b"\x89PNG\r\n\x1a\n"),),
+    "rar": ((0, b"Rar!\x1a\x07"),),
+    "tar": ((257, b"ustar"),),
+    "xz": ((0, b"\xfd7zXZ\x00"),),
+    # Also the signature of OOXML, ODF, JAR, etc.
+    "zip": ((0, b"PK\x03\x04"), (0, b"PK\x05\x06"), (0, b"PK\x07\x08")),
+}
+
+# File types that Glasswall identifies unambiguously from their signature, which are classified without calling Glasswall.
+# zip is excluded as its signature is shared with OOXML, ODF, JAR, etc. which Glasswall identifies as other file types.
+unambiguous_file_types = ("7z", "gz", "pdf", "png")
+
+# Number of bytes to read to check the signatures of unambiguous_file_types
+header_size = max(offset + len(signature) for file_type in unambiguous_file_types for offset, signature in signatures[file_type])
+
+
+def file_type_from_bytes(header: bytes) -> Optional[str]:
+    """ Returns the file type string of the first signature of unambiguous_file_types matched by header, or None.
+
+    Args:
+        header (bytes): The leading bytes of a file, at least `header_size` bytes to check all signatures.
+
+    Returns:
+        file_type (Optional[str]): The file type, e.g. "pdf", or None.
+    """
+    for file_type in unambiguous_file_types:
+        for offset, signature in signatures[file_type]:
+            if header[offset:offset + len(signature)] == signature:
+                return file_type
+
+    return None
+
+
+def guess_file_type(input_file: Union[str, bytes, bytearray, io.BytesIO]) -> Optional[str]:
+    """ Returns the file type string of a file from its magic bytes, or None if the file type is not unambiguously recognised and must be determined by Glasswall.
+
+    Only the leading `header_size` bytes of a file path are read.
+
+    Args:
+        input_file (Union[str, bytes, bytearray, io.BytesIO]): The file path or bytes.
+
+    Returns:
+        file_type (Optional[str]): The file type, e.g. "pdf", or None.
+    """
+    if isinstance(input_file, str):
+        try:
+            with open(input_file, "rb") as f:
+                header = f.read(header_size)
+        except OSError:
+            # Let Glasswall report the error
+            return None
+    elif isinstance(input_file, io.BytesIO):
+        header = input_file.getbuffer()[:header_size].tobytes()
+    elif isinstance(input_file, (bytes, bytearray)):
+        header = bytes(input_file[:header_size])
+    else:
+        return None
+
+    return file_type_from_bytes(header)
@@ -0,0 +1,227 @@
+
+
+import contextlib
+import functools
+import inspect
+import io
+import math
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import glasswall
+from glasswall import profiling
+
+_enabled = os.environ.get("glasswall_instrumentation", "").lower() in ("1", "true", "yes")
+_local = threading.local()
+_lock = threading.Lock()
+
+# Histograms of operation and phase timings and byte counts, keyed by name, e.g. "Editor.protect_file.run_session"
+histograms = {}
+
+
+def enable():
+    """ Enables instrumentation in this process and in worker processes started after this call. """
+    global _enabled
+    _enabled = True
+    os.environ["glasswall_instrumentation"] = "1"
+
+
+def disable():
+    """ Disables instrumentation in this process and in worker processes started after this call. """
+    global _enabled
+    _enabled = False
+    os.environ.pop("glasswall_instrumentation", None)
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+class Histogram:
+    """ A histogram of non-negative values in logarithmic buckets, where each bucket counts the values up to a power of 2.
+
+    Args:
+        name (str): The histogram name.
+        unit (str): The unit of the values, "seconds" or "bytes".
+    """
+    __slots__ = ("name", "unit", "count", "total", "minimum", "maximum", "buckets")
+
+    def __init__(self, name: str, unit: str):
+        self.name = name
+        self.unit = unit
+        self.count = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = 0.0
+        # Exponent of the bucket upper bound, 2 ** exponent, and count
+        self.buckets = {}
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+        exponent = math.frexp(value)[1] if value > 0 else -1074
+        self.buckets[exponent] = self.buckets.get(exponent, 0) + 1
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percent: float) -> float:
+        """ Returns the upper bound of the bucket containing the given percentile, at most the maximum value. """
+        if not self.count:
+            return 0.0
+
+        rank = math.ceil(self.count * percent / 100) or 1
+        cumulative_count = 0
+        for exponent in sorted(self.buckets):
+            cumulative_count += self.buckets[exponent]
+            if cumulative_count >= rank:
+                return min(math.ldexp(1, exponent), self.maximum)
+
+        return self.maximum
+
+    def to_dict(self) -> dict:
+        return {
+            "unit": self.unit,
+            "count": self.count,
+            "total": self.total,
+            "mean": self.mean,
+            "min": self.minimum if self.count else 0.0,
+            "max": self.maximum,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "buckets": {math.ldexp(1, exponent): count for exponent, count in sorted(self.buckets.items())},
+        }
+
+
+def get_histograms() -> Dict[str, dict]:
+    """ Returns a snapshot of all histograms as dictionaries, keyed by name. """
+    with _lock:
+        return {name: histogram.to_dict() for name, histogram in sorted(histograms.items())}
+
+
+def reset():
+    """ Deletes all histograms. """
+    with _lock:
+        histograms.clear()
+
+
+def _add(name: str, unit: str, value: float):
+    histogram = histograms.get(name)
+    if histogram is None:
+        histogram = histograms[name] = Histogram(name, unit)
+    histogram.add(value)
+
+
+def record(timings: dict):
+    """ Adds the timings of an operation, as attached to return objects and TaskResults, to the histograms. """
+    operation = timings["operation"]
+    with _lock:
+        _add(operation, "seconds", timings["elapsed_time"])
+        for phase, elapsed_time in timings["phases"].items():
+            _add(f"{operation}.{phase}", "seconds", elapsed_time)
+        for key in ("input_bytes", "output_bytes"):
+            if timings[key] is not None:
+                _add(f"{operation}.{key}", "bytes", timings[key])
+
+
+def last_timings() -> Optional[dict]:
+    """ Returns the timings of the last operation completed in the current thread, or None. """
+    return getattr(_local, "last_timings", None)
+
+
+@contextlib.contextmanager
+def collect():
+    """ Collects the timings of operations completed in the current thread into the yielded list. """
+    previous_collected = getattr(_local, "collected", None)
+    collected = _local.collected = []
+    try:
+        yield collected
+    finally:
+        _local.collected = previous_collected
+
+
+def _size(value) -> Optional[int]:
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, io.BytesIO):
+        return value.getbuffer().nbytes
+    if isinstance(value, str) and os.path.isfile(value):
+        return os.path.getsize(value)
+    if isinstance(value, glasswall.GwReturnObj):
+        return _size(getattr(value, "output_file", None))
+    return None
+
+
+def instrumented(function: Callable) -> Callable:
+    """ Decorator for library methods. When instrumentation is enabled, the outermost instrumented call in a thread is timed as an operation, and the instrumented calls it makes directly are timed as its phases. The remaining time is recorded as the phase "other".
+
+    The timings are added to the histograms, returned by last_timings, and set as the attribute "timings" of GwReturnObj return values. When instrumentation and profiling are disabled the only overhead is checking two flags.
+
+    When profiling is enabled, sampled operations are also profiled, see glasswall.profiling.
+    """
+    operation = function.__qualname__
+    phase = function.__name__
+    parameters = list(inspect.signature(function).parameters)
+    input_file_index = parameters.index("input_file") if "input_file" in parameters else None
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if profiling._enabled:
+            with profiling.profile(operation):
+                return timed(*args, **kwargs)
+        return timed(*args, **kwargs)
+
+    def timed(*args, **kwargs):
+        if not _enabled:
+            return function(*args, **kwargs)
+
+        depth = getattr(_local, "depth", 0)
+        _local.depth = depth + 1
+        start_time = time.perf_counter()
+        try:
+            if depth == 0:
+                _local.phases = {}
+            result = function(*args, **kwargs)
+        finally:
+            elapsed_time = time.perf_counter() - start_time
+            _local.depth = depth
+            if depth == 1:
+                _local.phases[phase] = _local.phases.get(phase, 0.0) + elapsed_time
+
+        if depth == 0:
+            phases = _local.phases
+            other_time = elapsed_time - sum(phases.values())
+            if other_time > 0:
+                phases["other"] = other_time
+
+            if "input_file" in kwargs:
+                input_file = kwargs["input_file"]
+            elif input_file_index is not None and input_file_index < len(args):
+                input_file = args[input_file_index]
+            else:
+                input_file = None
+
+            timings = {
+                "operation": operation,
+                "elapsed_time": elapsed_time,
+                "phases": phases,
+                "input_bytes": _size(input_file),
+                "output_bytes": _size(result),
+            }
+            record(timings)
+            _local.last_timings = timings
+            collected = getattr(_local, "collected", None)
+            if collected is not None:
+                collected.append(timings)
+            if isinstance(result, glasswall.GwReturnObj):
+                result.timings = timings
+
+        return result
+
+    return wrapper
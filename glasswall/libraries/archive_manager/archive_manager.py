@@ -1,17 +1,58 @@
 
 
 import ctypes as ct
-import functools
 import io
 import os
-from typing import Optional, Union
+import shutil
+from typing import Dict, Generator, List, Optional, Union
 
 import glasswall
 from glasswall import determine_file_type as dft
 from glasswall import utils
+from glasswall.change_index import ChangeIndex
 from glasswall.config.logging import log
-from glasswall.libraries.archive_manager import errors, successes
+from glasswall.instrumentation import instrumented
+from glasswall.libraries.archive_manager import errors, signatures, successes
 from glasswall.libraries.library import Library
+from glasswall.multiprocessing import GlasswallProcessManager, Manifest, Task, TaskResult
+
+# Archive capabilities of each loaded library, keyed by library path. Shared by all ArchiveManager instances in the process.
+_supported_archives_cache: Dict[str, List[str]] = {}
+_is_supported_archive_cache: Dict[str, Dict[str, bool]] = {}
+# Editor instances by library path, registered by the parent process while it processes archive members. Forked worker processes inherit them and skip loading Editor and validating its licence.
+_editors: Dict[str, "glasswall.Editor"] = {}
+
+
+def _process_archive_member(editor_library_path: str, function_name: str, **kwargs):
+    """ Calls Editor `function_name` on a single archive member in a worker process, loading Editor if it was not inherited from the parent process.
+
+    Only the size of the output file is returned so that member bytes are not copied back to the parent process.
+    """
+    editor = _editors.get(editor_library_path)
+    if editor is None:
+        editor = glasswall.Editor(editor_library_path)
+        _editors[editor_library_path] = editor
+
+    getattr(editor, function_name)(**kwargs)
+
+    output_file = kwargs.get("output_file")
+    if output_file and os.path.isfile(output_file):
+        return os.path.getsize(output_file)
+
+
+def _process_archive(library_path: str, function_name: str, **kwargs):
+    """ Loads Archive Manager in a worker process and calls `function_name` on a single archive.
+
+    A summary of the result is returned instead of the archive and report bytes so that memory usage in the parent process does not grow with the number of archives.
+    """
+    archive_manager = ArchiveManager(library_path)
+    gw_return_object = getattr(archive_manager, function_name)(**kwargs)
+
+    return dict(
+        status=gw_return_object.status,
+        output_file_size=len(getattr(gw_return_object, "output_file", b"")),
+        output_report_size=len(getattr(gw_return_object, "output_report", b"")),
+    )
 
 
 class ArchiveManager(Library):
@@ -21,7 +62,7 @@ class ArchiveManager(Library):
         super().__init__(library_path)
         self.library = self.load_library(os.path.abspath(library_path))
 
-        log.info(f"Loaded Glasswall {self.__class__.__name__} version {self.version()} from {self.library_path}")
+        log.info("Loaded Glasswall %s version %s from %s", self.__class__.__name__, self.version(), self.library_path)
 
     def version(self):
         """ Returns the Glasswall library version.
@@ -45,9 +86,10 @@ class ArchiveManager(Library):
         self.library.GwArchiveDone()
 
     @property
-    @functools.lru_cache()
     def supported_archives(self):
-        """ Returns a list of supported archive file formats. """
+        """ Returns a list of supported archive file formats. The result is cached per library path. """
+        if self.library_path in _supported_archives_cache:
+            return list(_supported_archives_cache[self.library_path])
 
         # API function declaration
         self.library.GwSupportedFiletypes.restype = ct.c_char_p
@@ -61,11 +103,15 @@ class ArchiveManager(Library):
         # Convert comma separated str to list, remove empty trailing element, sort
         result = sorted(filter(None, result.split(",")))
 
-        return result
+        _supported_archives_cache[self.library_path] = result
+
+        return list(result)
 
-    @functools.lru_cache()
     def is_supported_archive(self, archive_type: str):
-        """ Returns True if the archive type (e.g. `7z`) is supported. """
+        """ Returns True if the archive type (e.g. `7z`) is supported. The result is cached per library path. """
+        library_cache = _is_supported_archive_cache.setdefault(self.library_path, {})
+        if archive_type in library_cache:
+            return library_cache[archive_type]
 
         # API function declaration
         self.library.GwIsSupportedArchiveType.argtypes = [
@@ -77,21 +123,51 @@ class ArchiveManager(Library):
 
         result = self.library.GwIsSupportedArchiveType(ct_archive_type)
 
+        library_cache[archive_type] = result
+
         return result
 
-    def list_archive_paths(self, directory: str, recursive: bool = True, absolute: bool = True, followlinks: bool = True):
-        """ Returns a list of file paths of supported archives in a directory and all of its subdirectories. """
-        return [
-            file_path
-            for file_path in glasswall.utils.list_file_paths(
-                directory=directory,
-                recursive=recursive,
-                absolute=absolute,
-                followlinks=followlinks,
-            )
-            if self.is_supported_archive(self.determine_file_type(file_path, as_string=True, raise_unsupported=False))
-        ]
+    def list_archive_paths(self, directory: str, recursive: bool = True, absolute: bool = True, followlinks: bool = True, prefilter: bool = True):
+        """ Returns a list of file paths of supported archives in a directory and all of its subdirectories.
+
+        Args:
+            directory (str): The directory to search.
+            recursive (bool, optional): Default True. Include subdirectories.
+            absolute (bool, optional): Default True. Return absolute paths.
+            followlinks (bool, optional): Default True. Follow symbolic links to directories.
+            prefilter (bool, optional): Default True. Guess the archive type of each file from its magic bytes and file extension, and only call Glasswall to determine the file type when the guess is ambiguous (e.g. zip, which shares its signature with OOXML) or made from the file extension alone. Files that are not recognised as archives are skipped. If False, Glasswall determines the file type of every file.
 
+        Returns:
+            archive_paths (list): A list of file paths of supported archives.
+        """
+        archive_paths = []
+        for file_path in glasswall.utils.list_file_paths(
+            directory=directory,
+            recursive=recursive,
+            absolute=absolute,
+            followlinks=followlinks,
+        ):
+            # Resolve relative paths for file reads and Glasswall calls, which may change the cwd
+            input_file = file_path if absolute else os.path.join(directory, file_path)
+            if prefilter:
+                archive_type = signatures.guess_archive_type(input_file, extension_fallback=False)
+                confirm = archive_type is None or archive_type in signatures.ambiguous_archive_types
+                if archive_type is None:
+                    # No signature matched, e.g. pre-POSIX tar archives or files with an archive extension that are not archives
+                    archive_type = signatures.archive_type_from_extension(input_file)
+                if archive_type is None or not self.is_supported_archive(archive_type):
+                    continue
+                if not confirm:
+                    archive_paths.append(file_path)
+                    continue
+
+            archive_type = self.determine_file_type(os.path.abspath(input_file), as_string=True, raise_unsupported=False)
+            if archive_type and self.is_supported_archive(archive_type):
+                archive_paths.append(file_path)
+
+        return archive_paths
+
+    @instrumented
     def determine_file_type(self, input_file: str, as_string: bool = False, raise_unsupported: bool = True):
         """ Returns an int representing the file type of an archive.
 
@@ -125,18 +201,19 @@ class ArchiveManager(Library):
 
         if not dft.is_success(file_type):
             if raise_unsupported:
-                log.warning(f"\n\tfile_type: {file_type}\n\tfile_type_as_string: {file_type_as_string}\n\tinput_file: {input_file_repr}")
+                log.warning("\n\tfile_type: %s\n\tfile_type_as_string: %s\n\tinput_file: %s", file_type, file_type_as_string, input_file_repr)
                 raise dft.int_class_map.get(file_type, dft.errors.UnknownErrorCode)(file_type)
             else:
-                log.debug(f"\n\tfile_type: {file_type}\n\tfile_type_as_string: {file_type_as_string}\n\tinput_file: {input_file_repr}")
+                log.debug("\n\tfile_type: %s\n\tfile_type_as_string: %s\n\tinput_file: %s", file_type, file_type_as_string, input_file_repr)
         else:
-            log.debug(f"\n\tfile_type: {file_type}\n\tfile_type_as_string: {file_type_as_string}\n\tinput_file: {input_file_repr}")
+            log.debug("\n\tfile_type: %s\n\tfile_type_as_string: %s\n\tinput_file: %s", file_type, file_type_as_string, input_file_repr)
 
         if as_string:
             return file_type_as_string
 
         return file_type
 
+    @instrumented
     def analyse_archive(self, input_file: Union[str, bytes, bytearray, io.BytesIO], output_file: Optional[str] = None, output_report: Optional[str] = None, content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, glasswall.content_management.policies.ArchiveManager] = None, raise_unsupported: bool = True):
         """ Extracts the input_file archive and processes each file within the archive using the Glasswall engine. Repackages all files regenerated by the Glasswall engine into a new archive, optionally writing the new archive and report to the paths specified by output_file and output_report.
 
@@ -245,17 +322,17 @@ class ArchiveManager(Library):
 
         input_file_repr = f"{type(input_file)} length {len(input_file)}" if isinstance(input_file, (bytes, bytearray,)) else input_file.__sizeof__() if isinstance(input_file, io.BytesIO) else input_file
         if gw_return_object.status not in successes.success_codes:
-            log.error(f"\n\tinput_file: {input_file_repr}\n\toutput_file: {output_file}\n\tstatus: {gw_return_object.status}")
+            log.error("\n\tinput_file: %s\n\toutput_file: %s\n\tstatus: %s", input_file_repr, output_file, gw_return_object.status)
             if raise_unsupported:
                 raise errors.error_codes.get(gw_return_object.status, errors.UnknownErrorCode)(gw_return_object.status)
         else:
-            log.debug(f"\n\tinput_file: {input_file_repr}\n\toutput_file: {output_file}\n\tstatus: {gw_return_object.status}")
+            log.debug("\n\tinput_file: %s\n\toutput_file: %s\n\tstatus: %s", input_file_repr, output_file, gw_return_object.status)
 
         self.release()
 
         return gw_return_object
 
-    def analyse_directory(self, input_directory: str, output_directory: Optional[str] = None, output_report_directory: Optional[str] = None, content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, glasswall.content_management.policies.ArchiveManager] = None, raise_unsupported: bool = True):
+    def analyse_directory(self, input_directory: str, output_directory: Optional[str] = None, output_report_directory: Optional[str] = None, content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, glasswall.content_management.policies.ArchiveManager] = None, raise_unsupported: bool = True, incremental: Union[bool, str] = False):
         """ Calls analyse_archive on each file in input_directory using the given content management configuration. The resulting archives and analysis reports are written to output_directory maintaining the same directory structure as input_directory.
 
         Args:
@@ -264,30 +341,37 @@ class ArchiveManager(Library):
             output_report_directory (Optional[str], optional): Default None. If str, the output directory where xml reports for each archive will be written.
             content_management_policy (Union[None, str, bytes, bytearray, io.BytesIO, glasswall.content_management.policies.ArchiveManager], optional): The content management policy to apply.
             raise_unsupported (bool, optional): Default True. Raise exceptions when Glasswall encounters an error. Fail silently if False.
+            incremental (Union[bool, str], optional): Default False. Skip files that are unchanged since they were last processed successfully with the same policy, using a change index persisted in the output directory, or at this path if str. Skipped files are not included in the returned dictionary.
 
         Returns:
             analysed_archives_dict (dict): A dictionary of file paths relative to input_directory, and glasswall.GwReturnObj with attributes: "status" (int), "output_file" (bytes), "output_report" (bytes)
         """
         analysed_archives_dict = {}
         # Call analyse_archive on each file in input_directory
-        for input_file in utils.list_file_paths(input_directory):
-            relative_path = os.path.relpath(input_file, input_directory)
-            # Construct paths for output file and output report
-            output_file = None if output_directory is None else os.path.join(os.path.abspath(output_directory), relative_path)
-            output_report = None if output_report_directory is None else os.path.join(os.path.abspath(output_report_directory), relative_path + ".xml")
-
-            result = self.analyse_archive(
-                input_file=input_file,
-                output_file=output_file,
-                output_report=output_report,
-                content_management_policy=content_management_policy,
-                raise_unsupported=raise_unsupported,
-            )
+        with ChangeIndex.for_directory(output_directory, output_report_directory, operation="ArchiveManager.analyse_archive", settings=(content_management_policy,), enabled=incremental) as change_index:
+            for input_file in utils.list_file_paths(input_directory):
+                relative_path = os.path.relpath(input_file, input_directory)
+                # Construct paths for output file and output report
+                output_file = None if output_directory is None else os.path.join(os.path.abspath(output_directory), relative_path)
+                output_report = None if output_report_directory is None else os.path.join(os.path.abspath(output_report_directory), relative_path + ".xml")
+
+                if change_index.is_unchanged(relative_path, input_file, output_file, output_report):
+                    continue
+
+                result = self.analyse_archive(
+                    input_file=input_file,
+                    output_file=output_file,
+                    output_report=output_report,
+                    content_management_policy=content_management_policy,
+                    raise_unsupported=raise_unsupported,
+                )
+                change_index.record(relative_path, input_file, output_file, output_report, success=result.status in successes.success_codes, status=result.status)
 
-            analysed_archives_dict[relative_path] = result
+                analysed_archives_dict[relative_path] = result
 
         return analysed_archives_dict
 
+    @instrumented
     def protect_archive(self, input_file: Union[str, bytes, bytearray, io.BytesIO], output_file: Optional[str] = None, output_report: Optional[str] = None, content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, glasswall.content_management.policies.ArchiveManager] = None, raise_unsupported: bool = True):
         """ Extracts the input_file archive and processes each file within the archive using the Glasswall engine. Repackages all files regenerated by the Glasswall engine into a new archive, optionally writing the new archive and report to the paths specified by output_file and output_report.
 
@@ -395,17 +479,17 @@ class ArchiveManager(Library):
 
         input_file_repr = f"{type(input_file)} length {len(input_file)}" if isinstance(input_file, (bytes, bytearray,)) else input_file.__sizeof__() if isinstance(input_file, io.BytesIO) else input_file
         if gw_return_object.status not in successes.success_codes:
-            log.error(f"\n\tinput_file: {input_file_repr}\n\toutput_file: {output_file}\n\tstatus: {gw_return_object.status}")
+            log.error("\n\tinput_file: %s\n\toutput_file: %s\n\tstatus: %s", input_file_repr, output_file, gw_return_object.status)
             if raise_unsupported:
                 raise errors.error_codes.get(gw_return_object.status, errors.UnknownErrorCode)(gw_return_object.status)
         else:
-            log.debug(f"\n\tinput_file: {input_file_repr}\n\toutput_file: {output_file}\n\tstatus: {gw_return_object.status}")
+            log.debug("\n\tinput_file: %s\n\toutput_file: %s\n\tstatus: %s", input_file_repr, output_file, gw_return_object.status)
 
         self.release()
 
         return gw_return_object
 
-    def protect_directory(self, input_directory: str, output_directory: Optional[str] = None, output_report_directory: Optional[str] = None, content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, glasswall.content_management.policies.ArchiveManager] = None, raise_unsupported: bool = True):
+    def protect_directory(self, input_directory: str, output_directory: Optional[str] = None, output_report_directory: Optional[str] = None, content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, glasswall.content_management.policies.ArchiveManager] = None, raise_unsupported: bool = True, incremental: Union[bool, str] = False):
         """ Calls protect_archive on each file in input_directory using the given content management configuration. The resulting archives are written to output_directory maintaining the same directory structure as input_directory.
 
         Args:
@@ -414,30 +498,168 @@ class ArchiveManager(Library):
             output_report_directory (Optional[str], optional): Default None. If str, the output directory where xml reports for each archive will be written.
             content_management_policy (Union[None, str, bytes, bytearray, io.BytesIO, glasswall.content_management.policies.ArchiveManager], optional): The content management policy to apply.
             raise_unsupported (bool, optional): Default True. Raise exceptions when Glasswall encounters an error. Fail silently if False.
+            incremental (Union[bool, str], optional): Default False. Skip files that are unchanged since they were last processed successfully with the same policy, using a change index persisted in the output directory, or at this path if str. Skipped files are not included in the returned dictionary.
 
         Returns:
             protected_archives_dict (dict): A dictionary of file paths relative to input_directory, and glasswall.GwReturnObj with attributes: "status" (int), "output_file" (bytes), "output_report" (bytes)
         """
         protected_archives_dict = {}
         # Call protect_archive on each file in input_directory to output_directory
-        for input_file in utils.list_file_paths(input_directory):
-            relative_path = os.path.relpath(input_file, input_directory)
-            # Construct paths for output file and output report
-            output_file = None if output_directory is None else os.path.join(os.path.abspath(output_directory), relative_path)
-            output_report = None if output_report_directory is None else os.path.join(os.path.abspath(output_report_directory), relative_path + ".xml")
-
-            result = self.protect_archive(
-                input_file=input_file,
-                output_file=output_file,
-                output_report=output_report,
-                content_management_policy=content_management_policy,
-                raise_unsupported=raise_unsupported,
-            )
+        with ChangeIndex.for_directory(output_directory, output_report_directory, operation="ArchiveManager.protect_archive", settings=(content_management_policy,), enabled=incremental) as change_index:
+            for input_file in utils.list_file_paths(input_directory):
+                relative_path = os.path.relpath(input_file, input_directory)
+                # Construct paths for output file and output report
+                output_file = None if output_directory is None else os.path.join(os.path.abspath(output_directory), relative_path)
+                output_report = None if output_report_directory is None else os.path.join(os.path.abspath(output_report_directory), relative_path + ".xml")
+
+                if change_index.is_unchanged(relative_path, input_file, output_file, output_report):
+                    continue
+
+                result = self.protect_archive(
+                    input_file=input_file,
+                    output_file=output_file,
+                    output_report=output_report,
+                    content_management_policy=content_management_policy,
+                    raise_unsupported=raise_unsupported,
+                )
+                change_index.record(relative_path, input_file, output_file, output_report, success=result.status in successes.success_codes, status=result.status)
 
-            protected_archives_dict[relative_path] = result
+                protected_archives_dict[relative_path] = result
 
         return protected_archives_dict
 
+    def _process_archive_as_completed(self, function_name: str, output_extension: str, input_file: str, output_file: Optional[str] = None, content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, "glasswall.content_management.policies.policy.Policy"] = None, editor_library_path: Optional[str] = None, file_type: Optional[str] = None, max_workers: Optional[int] = None, worker_timeout_seconds: Optional[float] = None, memory_limit_in_gib: Optional[float] = None, raise_unsupported: bool = True) -> Generator[TaskResult, None, None]:
+        """ Unpacks input_file, calls Editor `function_name` on each member in parallel yielding a TaskResult per member as it completes, and packs the processed members to output_file once all members are completed. """
+        # Validate arg types
+        if not isinstance(input_file, str):
+            raise TypeError(input_file)
+        elif not os.path.isfile(input_file):
+            raise FileNotFoundError(input_file)
+        if not isinstance(output_file, (type(None), str)):
+            raise TypeError(output_file)
+
+        # Convert string path arguments to absolute paths
+        input_file = os.path.abspath(input_file)
+        if isinstance(output_file, str):
+            output_file = os.path.abspath(output_file)
+
+        # Editor is expected to be found alongside Archive Manager
+        editor_library_path = os.path.abspath(editor_library_path or os.path.dirname(self.library_path))
+        file_type = file_type or self.determine_file_type(input_file, as_string=True)
+        archive_name = os.path.splitext(os.path.basename(input_file))[0]
+
+        with utils.TempDirectoryPath() as temp_directory:
+            unpacked_directory = os.path.join(temp_directory, "unpacked", archive_name)
+            # Named after the archive, file_to_file_pack names the packed archive after its input directory
+            processed_directory = os.path.join(temp_directory, "processed", archive_name)
+            packed_directory = os.path.join(temp_directory, "packed")
+
+            self.file_to_file_unpack(input_file=input_file, output_directory=unpacked_directory, raise_unsupported=raise_unsupported)
+
+            process_manager = GlasswallProcessManager(
+                max_workers=max_workers,
+                worker_timeout_seconds=worker_timeout_seconds,
+                memory_limit_in_gib=memory_limit_in_gib,
+            )
+            if os.path.isdir(unpacked_directory):
+                for relative_path in utils.list_file_paths(unpacked_directory, absolute=False):
+                    process_manager.queue_task(Task(
+                        func=_process_archive_member,
+                        kwargs=dict(
+                            editor_library_path=editor_library_path,
+                            function_name=function_name,
+                            input_file=os.path.join(unpacked_directory, relative_path),
+                            output_file=os.path.join(processed_directory, relative_path) + output_extension,
+                            content_management_policy=content_management_policy,
+                            raise_unsupported=raise_unsupported,
+                        ),
+                    ))
+
+            # Load Editor and validate its licence once in this process rather than in each worker
+            _editors[editor_library_path] = glasswall.Editor(editor_library_path)
+            try:
+                for task_result in process_manager.as_completed():
+                    task_result.relative_path = os.path.relpath(task_result.task.kwargs["input_file"], unpacked_directory)
+                    task_result.output_file = task_result.task.kwargs["output_file"]
+                    yield task_result
+            finally:
+                _editors.pop(editor_library_path, None)
+
+            if isinstance(output_file, str) and os.path.isdir(processed_directory):
+                self.file_to_file_pack(input_directory=processed_directory, output_directory=packed_directory, file_type=file_type, add_extension=True, raise_unsupported=raise_unsupported)
+                packed_file = next(iter(utils.list_file_paths(packed_directory)), None) if os.path.isdir(packed_directory) else None
+                if packed_file:
+                    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+                    shutil.move(packed_file, output_file)
+                else:
+                    log.error("\n\tinput_file: %s\n\toutput_file: %s\n\tpacked archive was not created", input_file, output_file)
+
+    def protect_archive_as_completed(self, input_file: str, output_file: Optional[str] = None, content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, "glasswall.content_management.policies.policy.Policy"] = None, editor_library_path: Optional[str] = None, file_type: Optional[str] = None, max_workers: Optional[int] = None, worker_timeout_seconds: Optional[float] = None, memory_limit_in_gib: Optional[float] = None, raise_unsupported: bool = True) -> Generator[TaskResult, None, None]:
+        """ Unpacks the input_file archive and protects each member with Editor in parallel, yielding a TaskResult per member as soon as it is processed. Once all members are processed, the protected members are packed into a new archive written to output_file.
+
+        Members are processed file to file in worker processes, so memory usage is bounded by max_workers rather than by the size of the archive. Editor is loaded and its licence validated once in this process, forked worker processes inherit it. The protected member at `task_result.output_file` exists until the generator is exhausted or closed. Members that fail to be protected are not included in the new archive.
+
+        Args:
+            input_file (str): The archive file path.
+            output_file (Optional[str], optional): Default None. If str, pack the protected members into an archive at the output_file path.
+            content_management_policy (Union[None, str, bytes, bytearray, io.BytesIO, glasswall.content_management.policies.policy.Policy], optional): Default None (sanitise). The Editor content management policy to apply to each member.
+            editor_library_path (Optional[str], optional): Default None. The Editor library path or directory. If None, Editor is searched for in the directory of the Archive Manager library.
+            file_type (Optional[str], optional): Default None. The archive format of output_file, e.g. "zip". If None, the archive format of input_file is used.
+            max_workers (Optional[int], optional): Default None. The maximum number of worker processes. If None, the number of logical CPUs is used.
+            worker_timeout_seconds (Optional[float], optional): Default None. The time limit for processing each member.
+            memory_limit_in_gib (Optional[float], optional): Default None. The memory limit for processing each member.
+            raise_unsupported (bool, optional): Default True. Raise exceptions when Glasswall encounters an error. Fail silently if False.
+
+        Yields:
+            task_result (glasswall.multiprocessing.TaskResult): A TaskResult for each member, with additional attributes "relative_path" (str) and "output_file" (str). "result" is the size of the protected member in bytes, or None.
+        """
+        yield from self._process_archive_as_completed(
+            function_name="protect_file",
+            output_extension="",
+            input_file=input_file,
+            output_file=output_file,
+            content_management_policy=content_management_policy,
+            editor_library_path=editor_library_path,
+            file_type=file_type,
+            max_workers=max_workers,
+            worker_timeout_seconds=worker_timeout_seconds,
+            memory_limit_in_gib=memory_limit_in_gib,
+            raise_unsupported=raise_unsupported,
+        )
+
+    def analyse_archive_as_completed(self, input_file: str, output_file: Optional[str] = None, content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, "glasswall.content_management.policies.policy.Policy"] = None, editor_library_path: Optional[str] = None, file_type: Optional[str] = None, max_workers: Optional[int] = None, worker_timeout_seconds: Optional[float] = None, memory_limit_in_gib: Optional[float] = None, raise_unsupported: bool = True) -> Generator[TaskResult, None, None]:
+        """ Unpacks the input_file archive and analyses each member with Editor in parallel, yielding a TaskResult per member as soon as it is processed. Once all members are processed, the analysis reports are packed into a new archive written to output_file.
+
+        Members are processed file to file in worker processes, so memory usage is bounded by max_workers rather than by the size of the archive. Editor is loaded and its licence validated once in this process, forked worker processes inherit it. The analysis report at `task_result.output_file` exists until the generator is exhausted or closed.
+
+        Args:
+            input_file (str): The archive file path.
+            output_file (Optional[str], optional): Default None. If str, pack the analysis reports into an archive at the output_file path.
+            content_management_policy (Union[None, str, bytes, bytearray, io.BytesIO, glasswall.content_management.policies.policy.Policy], optional): Default None (sanitise). The Editor content management policy to apply to each member.
+            editor_library_path (Optional[str], optional): Default None. The Editor library path or directory. If None, Editor is searched for in the directory of the Archive Manager library.
+            file_type (Optional[str], optional): Default None. The archive format of output_file, e.g. "zip". If None, the archive format of input_file is used.
+            max_workers (Optional[int], optional): Default None. The maximum number of worker processes. If None, the number of logical CPUs is used.
+            worker_timeout_seconds (Optional[float], optional): Default None. The time limit for processing each member.
+            memory_limit_in_gib (Optional[float], optional): Default None. The memory limit for processing each member.
+            raise_unsupported (bool, optional): Default True. Raise exceptions when Glasswall encounters an error. Fail silently if False.
+
+        Yields:
+            task_result (glasswall.multiprocessing.TaskResult): A TaskResult for each member, with additional attributes "relative_path" (str) and "output_file" (str). "result" is the size of the analysis report in bytes, or None.
+        """
+        yield from self._process_archive_as_completed(
+            function_name="analyse_file",
+            output_extension=".xml",
+            input_file=input_file,
+            output_file=output_file,
+            content_management_policy=content_management_policy,
+            editor_library_path=editor_library_path,
+            file_type=file_type,
+            max_workers=max_workers,
+            worker_timeout_seconds=worker_timeout_seconds,
+            memory_limit_in_gib=memory_limit_in_gib,
+            raise_unsupported=raise_unsupported,
+        )
+
     def file_to_file_unpack(self, input_file: str, output_directory: str, raise_unsupported: bool = True):
         # Validate arg types
         if not isinstance(input_file, str):
@@ -466,11 +688,11 @@ class ArchiveManager(Library):
             )
 
         if gw_return_object.status not in successes.success_codes:
-            log.error(f"\n\tinput_file: {input_file}\n\tstatus: {gw_return_object.status}")
+            log.error("\n\tinput_file: %s\n\tstatus: %s", input_file, gw_return_object.status)
             if raise_unsupported:
                 raise errors.error_codes.get(gw_return_object.status, errors.UnknownErrorCode)(gw_return_object.status)
         else:
-            log.debug(f"\n\tinput_file: {input_file}\n\tstatus: {gw_return_object.status}")
+            log.debug("\n\tinput_file: %s\n\tstatus: %s", input_file, gw_return_object.status)
 
         self.release()
 
@@ -515,11 +737,11 @@ class ArchiveManager(Library):
             )
 
         if gw_return_object.status not in successes.success_codes:
-            log.error(f"\n\tinput_directory: {input_directory}\n\tstatus: {gw_return_object.status}")
+            log.error("\n\tinput_directory: %s\n\tstatus: %s", input_directory, gw_return_object.status)
             if raise_unsupported:
                 raise errors.error_codes.get(gw_return_object.status, errors.UnknownErrorCode)(gw_return_object.status)
         else:
-            log.debug(f"\n\tinput_directory: {input_directory}\n\tstatus: {gw_return_object.status}")
+            log.debug("\n\tinput_directory: %s\n\tstatus: %s", input_directory, gw_return_object.status)
 
         self.release()
 
@@ -547,7 +769,7 @@ class ArchiveManager(Library):
         archive_output_directory = os.path.join(output_directory, archive_name)
 
         # Unpack
-        log.debug(f"Unpacking\n\tsrc: {input_file}\n\tdst: {archive_output_directory}")
+        log.debug("Unpacking\n\tsrc: %s\n\tdst: %s", input_file, archive_output_directory)
         result = self.file_to_file_unpack(input_file=input_file, output_directory=archive_output_directory, raise_unsupported=raise_unsupported)
         if result:
             status = result.status
@@ -555,11 +777,11 @@ class ArchiveManager(Library):
             status = None
 
         if status not in successes.success_codes:
-            log.error(f"\n\tinput_file: {input_file}\n\tstatus: {status}")
+            log.error("\n\tinput_file: %s\n\tstatus: %s", input_file, status)
             if raise_unsupported:
                 raise errors.error_codes.get(status, errors.UnknownErrorCode)(status)
         else:
-            log.debug(f"\n\tinput_file: {input_file}\n\tstatus: {status}")
+            log.debug("\n\tinput_file: %s\n\tstatus: %s", input_file, status)
 
         if delete_origin:
             os.remove(input_file)
@@ -620,21 +842,22 @@ class ArchiveManager(Library):
         output_directory = os.path.abspath(output_directory)
 
         # Pack
-        log.debug(f"Packing\n\tsrc: {input_directory}\n\tdst: {output_directory}")
+        log.debug("Packing\n\tsrc: %s\n\tdst: %s", input_directory, output_directory)
         status = self.file_to_file_pack(input_directory=input_directory, output_directory=output_directory, file_type=file_type, add_extension=add_extension, raise_unsupported=raise_unsupported).status
 
         if status not in successes.success_codes:
-            log.error(f"\n\tinput_directory: {input_directory}\n\tstatus: {status}")
+            log.error("\n\tinput_directory: %s\n\tstatus: %s", input_directory, status)
             if raise_unsupported:
                 raise errors.error_codes.get(status, errors.UnknownErrorCode)(status)
         else:
-            log.debug(f"\n\tinput_directory: {input_directory}\n\tstatus: {status}")
+            log.debug("\n\tinput_directory: %s\n\tstatus: %s", input_directory, status)
 
         if delete_origin:
             utils.delete_directory(input_directory)
 
         return status
 
+    @instrumented
     def export_archive(self, input_file: Union[str, bytes, bytearray, io.BytesIO], output_file: Optional[str] = None, output_report: Optional[str] = None, content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, glasswall.content_management.policies.ArchiveManager] = None, raise_unsupported: bool = True):
         """ Exports an archive using the Glasswall engine.
 
@@ -743,17 +966,17 @@ class ArchiveManager(Library):
 
         input_file_repr = f"{type(input_file)} length {len(input_file)}" if isinstance(input_file, (bytes, bytearray,)) else input_file.__sizeof__() if isinstance(input_file, io.BytesIO) else input_file
         if gw_return_object.status not in successes.success_codes:
-            log.error(f"\n\tinput_file: {input_file_repr}\n\toutput_file: {output_file}\n\tstatus: {gw_return_object.status}")
+            log.error("\n\tinput_file: %s\n\toutput_file: %s\n\tstatus: %s", input_file_repr, output_file, gw_return_object.status)
             if raise_unsupported:
                 raise errors.error_codes.get(gw_return_object.status, errors.UnknownErrorCode)(gw_return_object.status)
         else:
-            log.debug(f"\n\tinput_file: {input_file_repr}\n\toutput_file: {output_file}\n\tstatus: {gw_return_object.status}")
+            log.debug("\n\tinput_file: %s\n\toutput_file: %s\n\tstatus: %s", input_file_repr, output_file, gw_return_object.status)
 
         self.release()
 
         return gw_return_object
 
-    def export_directory(self, input_directory: str, output_directory: Optional[str], output_report_directory: Optional[str] = None, content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, glasswall.content_management.policies.ArchiveManager] = None, raise_unsupported: bool = True):
+    def export_directory(self, input_directory: str, output_directory: Optional[str], output_report_directory: Optional[str] = None, content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, glasswall.content_management.policies.ArchiveManager] = None, raise_unsupported: bool = True, incremental: Union[bool, str] = False):
         """ Calls export_archive on each file in input_directory. The exported archives are written to output_directory maintaining the same directory structure as input_directory.
 
         Args:
@@ -762,30 +985,37 @@ class ArchiveManager(Library):
             output_report_directory (Optional[str], optional): Default None. If str, the output directory where xml reports for each archive will be written.
             content_management_policy (Union[None, str, bytes, bytearray, io.BytesIO, glasswall.content_management.policies.ArchiveManager], optional): The content management policy to apply.
             raise_unsupported (bool, optional): Default True. Raise exceptions when Glasswall encounters an error. Fail silently if False.
+            incremental (Union[bool, str], optional): Default False. Skip files that are unchanged since they were last processed successfully with the same policy, using a change index persisted in the output directory, or at this path if str. Skipped files are not included in the returned dictionary.
 
         Returns:
             exported_archives_dict (dict): A dictionary of file paths relative to input_directory, and glasswall.GwReturnObj with attributes: "status" (int), "output_file" (bytes), "output_report" (bytes)
         """
         exported_archives_dict = {}
         # Call export_archive on each file in input_directory to output_directory
-        for input_file in utils.list_file_paths(input_directory):
-            relative_path = os.path.relpath(input_file, input_directory)
-            # Construct paths for output file and output report
-            output_file = None if output_directory is None else os.path.join(os.path.abspath(output_directory), relative_path)
-            output_report = None if output_report_directory is None else os.path.join(os.path.abspath(output_report_directory), relative_path + ".xml")
-
-            result = self.export_archive(
-                input_file=input_file,
-                output_file=output_file,
-                output_report=output_report,
-                content_management_policy=content_management_policy,
-                raise_unsupported=raise_unsupported,
-            )
+        with ChangeIndex.for_directory(output_directory, output_report_directory, operation="ArchiveManager.export_archive", settings=(content_management_policy,), enabled=incremental) as change_index:
+            for input_file in utils.list_file_paths(input_directory):
+                relative_path = os.path.relpath(input_file, input_directory)
+                # Construct paths for output file and output report
+                output_file = None if output_directory is None else os.path.join(os.path.abspath(output_directory), relative_path)
+                output_report = None if output_report_directory is None else os.path.join(os.path.abspath(output_report_directory), relative_path + ".xml")
+
+                if change_index.is_unchanged(relative_path, input_file, output_file, output_report):
+                    continue
+
+                result = self.export_archive(
+                    input_file=input_file,
+                    output_file=output_file,
+                    output_report=output_report,
+                    content_management_policy=content_management_policy,
+                    raise_unsupported=raise_unsupported,
+                )
+                change_index.record(relative_path, input_file, output_file, output_report, success=result.status in successes.success_codes, status=result.status)
 
-            exported_archives_dict[relative_path] = result
+                exported_archives_dict[relative_path] = result
 
         return exported_archives_dict
 
+    @instrumented
     def import_archive(self, input_file: Union[str, bytes, bytearray, io.BytesIO], output_file: Optional[str] = None, output_report: Optional[str] = None, content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, glasswall.content_management.policies.ArchiveManager] = None, include_analysis_report: Optional[bool] = False, raise_unsupported: Optional[bool] = True):
         """ Imports an archive using the Glasswall engine.
 
@@ -899,17 +1129,17 @@ class ArchiveManager(Library):
 
         input_file_repr = f"{type(input_file)} length {len(input_file)}" if isinstance(input_file, (bytes, bytearray,)) else input_file.__sizeof__() if isinstance(input_file, io.BytesIO) else input_file
         if gw_return_object.status not in successes.success_codes:
-            log.error(f"\n\tinput_file: {input_file_repr}\n\toutput_file: {output_file}\n\tstatus: {gw_return_object.status}")
+            log.error("\n\tinput_file: %s\n\toutput_file: %s\n\tstatus: %s", input_file_repr, output_file, gw_return_object.status)
             if raise_unsupported:
                 raise errors.error_codes.get(gw_return_object.status, errors.UnknownErrorCode)(gw_return_object.status)
         else:
-            log.debug(f"\n\tinput_file: {input_file_repr}\n\toutput_file: {output_file}\n\tstatus: {gw_return_object.status}")
+            log.debug("\n\tinput_file: %s\n\toutput_file: %s\n\tstatus: %s", input_file_repr, output_file, gw_return_object.status)
 
         self.release()
 
         return gw_return_object
 
-    def import_directory(self, input_directory: str, output_directory: Optional[str], output_report_directory: Optional[str] = None, content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, glasswall.content_management.policies.ArchiveManager] = None, include_analysis_report: Optional[bool] = False, raise_unsupported: bool = True):
+    def import_directory(self, input_directory: str, output_directory: Optional[str], output_report_directory: Optional[str] = None, content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, glasswall.content_management.policies.ArchiveManager] = None, include_analysis_report: Optional[bool] = False, raise_unsupported: bool = True, incremental: Union[bool, str] = False):
         """ Calls import_archive on each file in input_directory. The imported archives are written to output_directory maintaining the same directory structure as input_directory.
 
         Args:
@@ -919,27 +1149,114 @@ class ArchiveManager(Library):
             content_management_policy (Union[None, str, bytes, bytearray, io.BytesIO, glasswall.content_management.policies.ArchiveManager], optional): The content management policy to apply.
             include_analysis_report (Optional[bool], optional): Default False. If True, write the analysis report into the imported archive.
             raise_unsupported (bool, optional): Default True. Raise exceptions when Glasswall encounters an error. Fail silently if False.
+            incremental (Union[bool, str], optional): Default False. Skip files that are unchanged since they were last processed successfully with the same policy, using a change index persisted in the output directory, or at this path if str. Skipped files are not included in the returned dictionary.
 
         Returns:
             imported_archives_dict (dict): A dictionary of file paths relative to input_directory, and glasswall.GwReturnObj with attributes: "status" (int), "output_file" (bytes), "output_report" (bytes)
         """
         imported_archives_dict = {}
         # Call import_archive on each file in input_directory to output_directory
-        for input_file in utils.list_file_paths(input_directory):
-            relative_path = os.path.relpath(input_file, input_directory)
-            # Construct paths for output file and output report
-            output_file = None if output_directory is None else os.path.join(os.path.abspath(output_directory), relative_path)
-            output_report = None if output_report_directory is None else os.path.join(os.path.abspath(output_report_directory), relative_path + ".xml")
-
-            result = self.import_archive(
-                input_file=input_file,
-                output_file=output_file,
-                output_report=output_report,
-                content_management_policy=content_management_policy,
-                include_analysis_report=include_analysis_report,
-                raise_unsupported=raise_unsupported,
-            )
+        with ChangeIndex.for_directory(output_directory, output_report_directory, operation="ArchiveManager.import_archive", settings=(content_management_policy, include_analysis_report), enabled=incremental) as change_index:
+            for input_file in utils.list_file_paths(input_directory):
+                relative_path = os.path.relpath(input_file, input_directory)
+                # Construct paths for output file and output report
+                output_file = None if output_directory is None else os.path.join(os.path.abspath(output_directory), relative_path)
+                output_report = None if output_report_directory is None else os.path.join(os.path.abspath(output_report_directory), relative_path + ".xml")
+
+                if change_index.is_unchanged(relative_path, input_file, output_file, output_report):
+                    continue
+
+                result = self.import_archive(
+                    input_file=input_file,
+                    output_file=output_file,
+                    output_report=output_report,
+                    content_management_policy=content_management_policy,
+                    include_analysis_report=include_analysis_report,
+                    raise_unsupported=raise_unsupported,
+                )
+                change_index.record(relative_path, input_file, output_file, output_report, success=result.status in successes.success_codes, status=result.status)
 
-            imported_archives_dict[relative_path] = result
+                imported_archives_dict[relative_path] = result
 
         return imported_archives_dict
+
+    def process_directory_as_completed(self, function_name: str, input_directory: str, output_directory: Optional[str] = None, output_report_directory: Optional[str] = None, manifest_file: Optional[str] = None, content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, glasswall.content_management.policies.ArchiveManager] = None, max_workers: Optional[int] = None, worker_timeout_seconds: Optional[float] = None, memory_limit_in_gib: Optional[float] = None, raise_unsupported: bool = True, incremental: Union[bool, str] = False, **kwargs) -> Generator[dict, None, None]:
+        """ Calls `function_name` on each file in input_directory in parallel worker processes, yielding a manifest entry per archive as soon as it is processed. The resulting archives and reports are written to output_directory and output_report_directory maintaining the same directory structure as input_directory.
+
+        Unlike the *_directory methods, archive and report bytes are not returned, so memory usage does not grow with the number of archives. Archives that exceed worker_timeout_seconds or memory_limit_in_gib are terminated and recorded as unsuccessful without stopping the remaining archives.
+
+        Args:
+            function_name (str): The method to call on each archive, one of "analyse_archive", "protect_archive", "export_archive", "import_archive".
+            input_directory (str): The input directory containing archives to process.
+            output_directory (Optional[str], optional): Default None. If str, the output directory where the archives will be written.
+            output_report_directory (Optional[str], optional): Default None. If str, the output directory where xml reports for each archive will be written.
+            manifest_file (Optional[str], optional): Default None. If str, each manifest entry is appended to the manifest_file path in JSON Lines format as soon as it is available.
+            content_management_policy (Union[None, str, bytes, bytearray, io.BytesIO, glasswall.content_management.policies.ArchiveManager], optional): The content management policy to apply.
+            max_workers (Optional[int], optional): Default None. The maximum number of worker processes. If None, the number of logical CPUs is used.
+            worker_timeout_seconds (Optional[float], optional): Default None. The time limit for processing each archive.
+            memory_limit_in_gib (Optional[float], optional): Default None. The memory limit for processing each archive.
+            raise_unsupported (bool, optional): Default True. Raise exceptions when Glasswall encounters an error. Exceptions are raised in the worker process and recorded in the manifest entry.
+            incremental (Union[bool, str], optional): Default False. Skip archives that are unchanged since they were last processed successfully with the same policy, by this method or the matching *_directory method, using a change index persisted in the output directory, or at this path if str. Each archive is recorded as soon as it is processed, so re-running after an interruption resumes where the previous run stopped. Skipped archives are not yielded.
+            **kwargs: Additional keyword arguments passed to `function_name`, e.g. include_analysis_report for import_archive.
+
+        Yields:
+            entry (dict): A manifest entry for each archive with keys: "relative_path", "input_file", "input_file_size", "output_file", "output_report", "status", "output_file_size", "output_report_size", "success", "exception", "exit_code", "timed_out", "out_of_memory", "max_memory_used_in_gib", "start_time", "end_time", "elapsed_time".
+        """
+        if function_name not in ("analyse_archive", "protect_archive", "export_archive", "import_archive"):
+            raise ValueError(function_name)
+
+        input_directory = os.path.abspath(input_directory)
+        # Commit each record, processing an archive in a worker process costs far more than a commit
+        with ChangeIndex.for_directory(output_directory, output_report_directory, operation=f"ArchiveManager.{function_name}", settings=(content_management_policy, *(kwargs[key] for key in sorted(kwargs))), enabled=incremental, commit_interval=1) as change_index:
+            process_manager = GlasswallProcessManager(
+                max_workers=max_workers,
+                worker_timeout_seconds=worker_timeout_seconds,
+                memory_limit_in_gib=memory_limit_in_gib,
+            )
+            for input_file in utils.list_file_paths(input_directory):
+                relative_path = os.path.relpath(input_file, input_directory)
+                # Construct paths for output file and output report
+                output_file = None if output_directory is None else os.path.join(os.path.abspath(output_directory), relative_path)
+                output_report = None if output_report_directory is None else os.path.join(os.path.abspath(output_report_directory), relative_path + ".xml")
+
+                if change_index.is_unchanged(relative_path, input_file, output_file, output_report):
+                    continue
+
+                process_manager.queue_task(Task(
+                    func=_process_archive,
+                    kwargs=dict(
+                        library_path=self.library_path,
+                        function_name=function_name,
+                        input_file=input_file,
+                        output_file=output_file,
+                        output_report=output_report,
+                        content_management_policy=content_management_policy,
+                        raise_unsupported=raise_unsupported,
+                        **kwargs,
+                    ),
+                ))
+
+            manifest = None if manifest_file is None else Manifest(manifest_file)
+            try:
+                for task_result in process_manager.as_completed():
+                    task_kwargs = task_result.task.kwargs
+                    result = task_result.result if isinstance(task_result.result, dict) else {}
+                    entry = Manifest.entry_from_task_result(
+                        task_result,
+                        relative_path=os.path.relpath(task_kwargs["input_file"], input_directory),
+                        input_file=task_kwargs["input_file"],
+                        input_file_size=os.path.getsize(task_kwargs["input_file"]),
+                        output_file=task_kwargs["output_file"],
+                        output_report=task_kwargs["output_report"],
+                        status=result.get("status"),
+                        output_file_size=result.get("output_file_size"),
+                        output_report_size=result.get("output_report_size"),
+                    )
+                    if manifest is not None:
+                        manifest.write(entry)
+                    change_index.record(entry["relative_path"], entry["input_file"], entry["output_file"], entry["output_report"], success=entry["success"] and entry["status"] in successes.success_codes, status=entry["status"])
+
+                    yield entry
+            finally:
+                if manifest is not None:
+                    manifest.close()
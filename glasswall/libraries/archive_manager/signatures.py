@@ -0,0 +1,77 @@
+
+
+import os
+from typing import Optional
+
+from glasswall.determine_file_type import signatures as file_type_signatures
+
+# Magic bytes of archive formats as (offset, signature) pairs, keyed by the Glasswall archive type string, from the file type signatures.
+signatures = {
+    archive_type: file_type_signatures.signatures[archive_type]
+    for archive_type in ("7z", "bz2", "gz", "rar", "tar", "xz", "zip")
+}
+
+# Archive types whose signature is shared with non-archive file formats, the file type must be confirmed by Glasswall
+ambiguous_archive_types = frozenset({"zip"})
+
+# Archive types by file extension, used when a file does not match any signature, e.g. pre-POSIX tar archives have no magic bytes. The file type of a guess from the extension alone must be confirmed by Glasswall.
+extensions = {
+    ".7z": "7z",
+    ".bz2": "bz2",
+    ".gz": "gz",
+    ".rar": "rar",
+    ".tar": "tar",
+    ".tgz": "gz",
+    ".xz": "xz",
+    ".zip": "zip",
+}
+
+# Number of bytes to read to check all signatures
+header_size = max(offset + len(signature) for signature_list in signatures.values() for offset, signature in signature_list)
+
+
+def archive_type_from_bytes(header: bytes) -> Optional[str]:
+    """ Returns the archive type string of the first signature matched by header, or None.
+
+    Args:
+        header (bytes): The leading bytes of a file, at least `header_size` bytes to check all signatures.
+
+    Returns:
+        archive_type (Optional[str]): The archive type, e.g. "7z", or None.
+    """
+    for archive_type, signature_list in signatures.items():
+        for offset, signature in signature_list:
+            if header[offset:offset + len(signature)] == signature:
+                return archive_type
+
+    return None
+
+
+def archive_type_from_extension(file_path: str) -> Optional[str]:
+    """ Returns the archive type string of a file from its file extension, or None. """
+    return extensions.get(os.path.splitext(file_path)[1].lower())
+
+
+def guess_archive_type(file_path: str, extension_fallback: bool = True) -> Optional[str]:
+    """ Returns the archive type string of a file from its magic bytes, falling back to its file extension, or None if the file is not recognised as an archive.
+
+    Only the leading `header_size` bytes of the file are read. The result is a guess and is not a substitute for Glasswall file type detection.
+
+    Args:
+        file_path (str): The file path.
+        extension_fallback (bool, optional): Default True. Guess from the file extension if the magic bytes do not match any signature.
+
+    Returns:
+        archive_type (Optional[str]): The archive type, e.g. "7z", or None.
+    """
+    try:
+        with open(file_path, "rb") as f:
+            header = f.read(header_size)
+    except OSError:
+        return None
+
+    archive_type = archive_type_from_bytes(header)
+    if archive_type is None and extension_fallback:
+        archive_type = archive_type_from_extension(file_path)
+
+    return archive_type
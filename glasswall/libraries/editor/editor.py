@@ -5,27 +5,32 @@ import functools
 import io
 import os
 from contextlib import contextmanager
-from typing import Union, Optional
+from typing import Iterable, List, Optional, Union
 
 import glasswall
 from glasswall import determine_file_type as dft
 from glasswall import utils
-from glasswall.config.logging import log, format_object
+from glasswall.change_index import ChangeIndex
+from glasswall.config.logging import LazyFormat, format_object, log
+from glasswall.instrumentation import instrumented
 from glasswall.libraries.editor import errors, successes
 from glasswall.libraries.library import Library
+from glasswall.result_cache import ResultCache, cached_result
 
 
 class Editor(Library):
     """ A high level Python wrapper for Glasswall Editor / Core2. """
 
-    def __init__(self, library_path: str):
+    def __init__(self, library_path: str, result_cache: Optional[ResultCache] = None):
         super().__init__(library_path)
         self.library = self.load_library(os.path.abspath(library_path))
 
-        # Validate killswitch has not activated
-        self.validate_licence()
+        # Validate killswitch has not activated, once per process
+        self.validate_licence_once()
 
-        log.info(f"Loaded Glasswall {self.__class__.__name__} version {self.version()} from {self.library_path}")
+        self.result_cache = result_cache
+
+        log.info("Loaded Glasswall %s version %s from %s", self.__class__.__name__, self.version(), self.library_path)
 
     def validate_licence(self):
         """ Validates the licence of the library by checking the licence details.
@@ -43,10 +48,10 @@ class Editor(Library):
 
         if any(bad_detail.lower() in licence_details.lower() for bad_detail in bad_details):
             # bad_details found in licence_details
-            log.error(f"{self.__class__.__name__} licence validation failed. Licence details:\n{licence_details}")
+            log.error("%s licence validation failed. Licence details:\n%s", self.__class__.__name__, licence_details)
             raise errors.LicenceExpired(licence_details)
         else:
-            log.debug(f"{self.__class__.__name__} licence validated successfully. Licence details:\n{licence_details}")
+            log.debug("%s licence validated successfully. Licence details:\n%s", self.__class__.__name__, licence_details)
 
     def version(self):
         """ Returns the Glasswall library version.
@@ -65,6 +70,7 @@ class Editor(Library):
 
         return version
 
+    @instrumented
     def open_session(self):
         """ Open a new Glasswall session.
 
@@ -74,10 +80,11 @@ class Editor(Library):
         # API call
         session = self.library.GW2OpenSession()
 
-        log.debug(f"\n\tsession: {session}")
+        log.debug("\n\tsession: %s", session)
 
         return session
 
+    @instrumented
     def close_session(self, session: int) -> int:
         """ Close the Glasswall session. All resources allocated by the session will be destroyed.
 
@@ -100,9 +107,9 @@ class Editor(Library):
         status = self.library.GW2CloseSession(ct_session)
 
         if status not in successes.success_codes:
-            log.error(f"\n\tsession: {session}\n\tstatus: {status}")
+            log.error("\n\tsession: %s\n\tstatus: %s", session, status)
         else:
-            log.debug(f"\n\tsession: {session}\n\tstatus: {status}")
+            log.debug("\n\tsession: %s\n\tstatus: %s", session, status)
 
         return status
 
@@ -115,6 +122,7 @@ class Editor(Library):
         finally:
             self.close_session(session)
 
+    @instrumented
     def run_session(self, session):
         """ Runs the Glasswall session and begins processing of a file.
 
@@ -134,12 +142,13 @@ class Editor(Library):
         status = self.library.GW2RunSession(ct_session)
 
         if status not in successes.success_codes:
-            log.error(f"\n\tsession: {session}\n\tstatus: {status}\n\tGW2FileErrorMsg: {self.file_error_message(session)}")
+            log.error("\n\tsession: %s\n\tstatus: %s\n\tGW2FileErrorMsg: %s", session, status, LazyFormat(self.file_error_message, session))
         else:
-            log.debug(f"\n\tsession: {session}\n\tstatus: {status}\n\tGW2FileErrorMsg: {self.file_error_message(session)}")
+            log.debug("\n\tsession: %s\n\tstatus: %s\n\tGW2FileErrorMsg: %s", session, status, LazyFormat(self.file_error_message, session))
 
         return status
 
+    @instrumented
     def determine_file_type(self, input_file: Union[str, bytes, bytearray, io.BytesIO], as_string: bool = False, raise_unsupported: bool = True) -> Union[int, str]:
         """ Determine the file type of a given input file, either as an integer identifier or a string.
 
@@ -182,17 +191,39 @@ class Editor(Library):
         input_file_repr = f"{type(input_file)} length {len(input_file)}" if isinstance(input_file, (bytes, bytearray,)) else input_file.__sizeof__() if isinstance(input_file, io.BytesIO) else input_file
 
         if not dft.is_success(file_type):
-            log.warning(f"\n\tfile_type: {file_type}\n\tfile_type_as_string: {file_type_as_string}\n\tinput_file: {input_file_repr}")
+            log.warning("\n\tfile_type: %s\n\tfile_type_as_string: %s\n\tinput_file: %s", file_type, file_type_as_string, input_file_repr)
             if raise_unsupported:
                 raise dft.int_class_map.get(file_type, dft.errors.UnknownErrorCode)(file_type)
         else:
-            log.debug(f"\n\tfile_type: {file_type}\n\tfile_type_as_string: {file_type_as_string}\n\tinput_file: {input_file_repr}")
+            log.debug("\n\tfile_type: %s\n\tfile_type_as_string: %s\n\tinput_file: %s", file_type, file_type_as_string, input_file_repr)
 
         if as_string:
             return file_type_as_string
 
         return file_type
 
+    def determine_file_types(self, input_files: Iterable[Union[str, bytes, bytearray, io.BytesIO]], as_string: bool = False, raise_unsupported: bool = True, prefilter: bool = True, max_workers: Optional[int] = 1) -> List[Union[int, str]]:
+        """ Returns the file types of many files in the same order as input_files. Files whose magic bytes unambiguously identify their file type are classified without calling Glasswall, and the remaining files are passed to determine_file_type.
+
+        Args:
+            input_files (Iterable[Union[str, bytes, bytearray, io.BytesIO]]): The input file paths or bytes.
+            as_string (bool, optional): Return file types as strings, eg: "bmp" instead of: 29. Defaults to False.
+            raise_unsupported (bool, optional): Default True. Raise exceptions when Glasswall encounters an error. Fail silently if False.
+            prefilter (bool, optional): Default True. Classify files with unambiguous magic bytes (7z, gz, pdf, png) without calling Glasswall.
+            max_workers (Optional[int], optional): Default 1, files are classified in the current thread. If greater than 1, or None for the ThreadPoolExecutor default, files are classified in a thread pool. Only use threads if this library is safe to call from multiple threads.
+
+        Returns:
+            file_types (List[Union[int, str]]): The file type of each input file.
+        """
+        return dft.determine_file_types(
+            self.determine_file_type,
+            input_files,
+            as_string=as_string,
+            raise_unsupported=raise_unsupported,
+            prefilter=prefilter,
+            max_workers=max_workers,
+        )
+
     def _GW2GetPolicySettings(self, session: int, policy_format: int = 0):
         """ Get current policy settings for the given session.
 
@@ -350,6 +381,7 @@ class Editor(Library):
 
         return gw_return_object
 
+    @instrumented
     def set_content_management_policy(self, session: int, input_file: Union[None, str, bytes, bytearray, io.BytesIO, "glasswall.content_management.policies.policy.Policy"] = None, policy_format=0):
         """ Sets the content management policy configuration. If input_file is None then default settings (sanitise) are applied.
 
@@ -399,10 +431,10 @@ class Editor(Library):
             result = self._GW2RegisterPoliciesMemory(session, input_file)
 
         if result.status not in successes.success_codes:
-            log.error(format_object(result))
+            log.error("%s", LazyFormat(format_object, result))
             raise errors.error_codes.get(result.status, errors.UnknownErrorCode)(result.status)
         else:
-            log.debug(format_object(result))
+            log.debug("%s", LazyFormat(format_object, result))
 
         return result
 
@@ -468,6 +500,7 @@ class Editor(Library):
 
         return gw_return_object
 
+    @instrumented
     def register_input(self, session: int, input_file: Union[str, bytes, bytearray, io.BytesIO]):
         """ Register an input file or bytes for the given session.
 
@@ -501,10 +534,10 @@ class Editor(Library):
             result = self._GW2RegisterInputMemory(session, input_file)
 
         if result.status not in successes.success_codes:
-            log.error(format_object(result))
+            log.error("%s", LazyFormat(format_object, result))
             raise errors.error_codes.get(result.status, errors.UnknownErrorCode)(result.status)
         else:
-            log.debug(format_object(result))
+            log.debug("%s", LazyFormat(format_object, result))
 
         return result
 
@@ -568,6 +601,7 @@ class Editor(Library):
 
         return gw_return_object
 
+    @instrumented
     def register_output(self, session, output_file: Optional[str] = None):
         """ Register an output file for the given session. If output_file is None the file will be returned as 'buffer' and 'buffer_length' attributes.
 
@@ -590,10 +624,10 @@ class Editor(Library):
             result = self._GW2RegisterOutputMemory(session)
 
         if result.status not in successes.success_codes:
-            log.error(format_object(result))
+            log.error("%s", LazyFormat(format_object, result))
             raise errors.error_codes.get(result.status, errors.UnknownErrorCode)(result.status)
         else:
-            log.debug(format_object(result))
+            log.debug("%s", LazyFormat(format_object, result))
 
         return result
 
@@ -665,6 +699,7 @@ class Editor(Library):
 
         return gw_return_object
 
+    @instrumented
     def register_analysis(self, session: int, output_file: Optional[str] = None):
         """ Registers an analysis file for the given session. The analysis file will be created during the session's run_session call.
 
@@ -687,13 +722,15 @@ class Editor(Library):
             result = self._GW2RegisterAnalysisMemory(session)
 
         if result.status not in successes.success_codes:
-            log.error(format_object(result))
+            log.error("%s", LazyFormat(format_object, result))
             raise errors.error_codes.get(result.status, errors.UnknownErrorCode)(result.status)
         else:
-            log.debug(format_object(result))
+            log.debug("%s", LazyFormat(format_object, result))
 
         return result
 
+    @instrumented
+    @cached_result
     def protect_file(self, input_file: Union[str, bytes, bytearray, io.BytesIO], output_file: Optional[str] = None, content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, "glasswall.content_management.policies.policy.Policy"] = None, raise_unsupported: bool = True):
         """ Protects a file using the current content management configuration, returning the file bytes. The protected file is written to output_file if it is provided.
 
@@ -741,18 +778,18 @@ class Editor(Library):
 
                 input_file_repr = f"{type(input_file)} length {len(input_file)}" if isinstance(input_file, (bytes, bytearray,)) else input_file.__sizeof__() if isinstance(input_file, io.BytesIO) else input_file
                 if status not in successes.success_codes:
-                    log.error(f"\n\tinput_file: {input_file_repr}\n\toutput_file: {output_file}\n\tsession: {session}\n\tstatus: {status}")
+                    log.error("\n\tinput_file: %s\n\toutput_file: %s\n\tsession: %s\n\tstatus: %s", input_file_repr, output_file, session, status)
                     if raise_unsupported:
                         raise errors.error_codes.get(status, errors.UnknownErrorCode)(status)
                     else:
                         file_bytes = None
                 else:
-                    log.debug(f"\n\tinput_file: {input_file_repr}\n\toutput_file: {output_file}\n\tsession: {session}\n\tstatus: {status}")
+                    log.debug("\n\tinput_file: %s\n\toutput_file: %s\n\tsession: %s\n\tstatus: %s", input_file_repr, output_file, session, status)
                     # Get file bytes
                     if isinstance(output_file, str):
                         # File to file and memory to file, Editor wrote to a file, read it to get the file bytes
                         if not os.path.isfile(output_file):
-                            log.error(f"Editor returned success code: {status} but no output file was found: {output_file}")
+                            log.error("Editor returned success code: %s but no output file was found: %s", status, output_file)
                             file_bytes = None
                         else:
                             with open(output_file, "rb") as f:
@@ -769,7 +806,7 @@ class Editor(Library):
 
                 return file_bytes
 
-    def protect_directory(self, input_directory: str, output_directory: Optional[str], content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, "glasswall.content_management.policies.policy.Policy"] = None, raise_unsupported: bool = True):
+    def protect_directory(self, input_directory: str, output_directory: Optional[str], content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, "glasswall.content_management.policies.policy.Policy"] = None, raise_unsupported: bool = True, incremental: Union[bool, str] = False):
         """ Recursively processes all files in a directory in protect mode using the given content management policy.
         The protected files are written to output_directory maintaining the same directory structure as input_directory.
 
@@ -778,27 +815,35 @@ class Editor(Library):
             output_directory (Optional[str]): The output directory where the protected file will be written, or None to not write files.
             content_management_policy (Union[None, str, bytes, bytearray, io.BytesIO, glasswall.content_management.policies.policy.Policy], optional): Default None (sanitise). The content management policy to apply.
             raise_unsupported (bool, optional): Default True. Raise exceptions when Glasswall encounters an error. Fail silently if False.
+            incremental (Union[bool, str], optional): Default False. Skip files that are unchanged since they were last processed successfully with the same policy, using a change index persisted in the output directory, or at this path if str. Skipped files are not included in the returned dictionary.
 
         Returns:
             protected_files_dict (dict): A dictionary of file paths relative to input_directory, and file bytes.
         """
         protected_files_dict = {}
         # Call protect_file on each file in input_directory to output_directory
-        for input_file in utils.list_file_paths(input_directory):
-            relative_path = os.path.relpath(input_file, input_directory)
-            output_file = None if output_directory is None else os.path.join(os.path.abspath(output_directory), relative_path)
-
-            protected_bytes = self.protect_file(
-                input_file=input_file,
-                output_file=output_file,
-                raise_unsupported=raise_unsupported,
-                content_management_policy=content_management_policy,
-            )
+        with ChangeIndex.for_directory(output_directory, operation="Editor.protect_file", settings=(content_management_policy,), enabled=incremental) as change_index:
+            for input_file in utils.list_file_paths(input_directory):
+                relative_path = os.path.relpath(input_file, input_directory)
+                output_file = None if output_directory is None else os.path.join(os.path.abspath(output_directory), relative_path)
 
-            protected_files_dict[relative_path] = protected_bytes
+                if change_index.is_unchanged(relative_path, input_file, output_file):
+                    continue
+
+                protected_bytes = self.protect_file(
+                    input_file=input_file,
+                    output_file=output_file,
+                    raise_unsupported=raise_unsupported,
+                    content_management_policy=content_management_policy,
+                )
+                change_index.record(relative_path, input_file, output_file, success=protected_bytes is not None)
+
+                protected_files_dict[relative_path] = protected_bytes
 
         return protected_files_dict
 
+    @instrumented
+    @cached_result
     def analyse_file(self, input_file: Union[str, bytes, bytearray, io.BytesIO], output_file: Optional[str] = None, content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, "glasswall.content_management.policies.policy.Policy"] = None, raise_unsupported: bool = True):
         """ Analyses a file, returning the analysis bytes. The analysis is written to output_file if it is provided.
 
@@ -860,18 +905,18 @@ class Editor(Library):
 
                 input_file_repr = f"{type(input_file)} length {len(input_file)}" if isinstance(input_file, (bytes, bytearray,)) else input_file.__sizeof__() if isinstance(input_file, io.BytesIO) else input_file
                 if status not in successes.success_codes:
-                    log.error(f"\n\tinput_file: {input_file_repr}\n\toutput_file: {output_file}\n\tsession: {session}\n\tstatus: {status}")
+                    log.error("\n\tinput_file: %s\n\toutput_file: %s\n\tsession: %s\n\tstatus: %s", input_file_repr, output_file, session, status)
                     if raise_unsupported:
                         raise errors.error_codes.get(status, errors.UnknownErrorCode)(status)
                 else:
-                    log.debug(f"\n\tinput_file: {input_file_repr}\n\toutput_file: {output_file}\n\tsession: {session}\n\tstatus: {status}")
+                    log.debug("\n\tinput_file: %s\n\toutput_file: %s\n\tsession: %s\n\tstatus: %s", input_file_repr, output_file, session, status)
 
                 # Ensure memory allocated is not garbage collected
                 content_management_policy, register_input, register_analysis
 
                 return file_bytes
 
-    def analyse_directory(self, input_directory: str, output_directory: Optional[str], content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, "glasswall.content_management.policies.policy.Policy"] = None, raise_unsupported: bool = True):
+    def analyse_directory(self, input_directory: str, output_directory: Optional[str], content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, "glasswall.content_management.policies.policy.Policy"] = None, raise_unsupported: bool = True, incremental: Union[bool, str] = False):
         """ Analyses all files in a directory and its subdirectories. The analysis files are written to output_directory maintaining the same directory structure as input_directory.
 
         Args:
@@ -879,24 +924,30 @@ class Editor(Library):
             output_directory (Optional[str]): The output directory where the analysis files will be written, or None to not write files.
             content_management_policy (Union[None, str, bytes, bytearray, io.BytesIO, glasswall.content_management.policies.policy.Policy], optional): Default None (sanitise). The content management policy to apply.
             raise_unsupported (bool, optional): Default True. Raise exceptions when Glasswall encounters an error. Fail silently if False.
+            incremental (Union[bool, str], optional): Default False. Skip files that are unchanged since they were last processed successfully with the same policy, using a change index persisted in the output directory, or at this path if str. Skipped files are not included in the returned dictionary.
 
         Returns:
             analysis_files_dict (dict): A dictionary of file paths relative to input_directory, and file bytes.
         """
         analysis_files_dict = {}
         # Call analyse_file on each file in input_directory to output_directory
-        for input_file in utils.list_file_paths(input_directory):
-            relative_path = os.path.relpath(input_file, input_directory) + ".xml"
-            output_file = None if output_directory is None else os.path.join(os.path.abspath(output_directory), relative_path)
-
-            analysis_bytes = self.analyse_file(
-                input_file=input_file,
-                output_file=output_file,
-                raise_unsupported=raise_unsupported,
-                content_management_policy=content_management_policy,
-            )
+        with ChangeIndex.for_directory(output_directory, operation="Editor.analyse_file", settings=(content_management_policy,), enabled=incremental) as change_index:
+            for input_file in utils.list_file_paths(input_directory):
+                relative_path = os.path.relpath(input_file, input_directory) + ".xml"
+                output_file = None if output_directory is None else os.path.join(os.path.abspath(output_directory), relative_path)
+
+                if change_index.is_unchanged(relative_path, input_file, output_file):
+                    continue
+
+                analysis_bytes = self.analyse_file(
+                    input_file=input_file,
+                    output_file=output_file,
+                    raise_unsupported=raise_unsupported,
+                    content_management_policy=content_management_policy,
+                )
+                change_index.record(relative_path, input_file, output_file, success=analysis_bytes is not None)
 
-            analysis_files_dict[relative_path] = analysis_bytes
+                analysis_files_dict[relative_path] = analysis_bytes
 
         return analysis_files_dict
 
@@ -960,6 +1011,7 @@ class Editor(Library):
 
         return gw_return_object
 
+    @instrumented
     def register_export(self, session: int, output_file: Optional[str] = None):
         """ Registers a file to be exported for the given session. The export file will be created during the session's run_session call.
 
@@ -982,13 +1034,15 @@ class Editor(Library):
             result = self._GW2RegisterExportMemory(session)
 
         if result.status not in successes.success_codes:
-            log.error(format_object(result))
+            log.error("%s", LazyFormat(format_object, result))
             raise errors.error_codes.get(result.status, errors.UnknownErrorCode)(result.status)
         else:
-            log.debug(format_object(result))
+            log.debug("%s", LazyFormat(format_object, result))
 
         return result
 
+    @instrumented
+    @cached_result
     def export_file(self, input_file: Union[str, bytes, bytearray, io.BytesIO], output_file: Optional[str] = None, content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, "glasswall.content_management.policies.policy.Policy"] = None, raise_unsupported: bool = True):
         """ Export a file, returning the .zip file bytes. The .zip file is written to output_file if it is provided.
 
@@ -1036,18 +1090,18 @@ class Editor(Library):
 
                 input_file_repr = f"{type(input_file)} length {len(input_file)}" if isinstance(input_file, (bytes, bytearray,)) else input_file.__sizeof__() if isinstance(input_file, io.BytesIO) else input_file
                 if status not in successes.success_codes:
-                    log.error(f"\n\tinput_file: {input_file_repr}\n\toutput_file: {output_file}\n\tsession: {session}\n\tstatus: {status}")
+                    log.error("\n\tinput_file: %s\n\toutput_file: %s\n\tsession: %s\n\tstatus: %s", input_file_repr, output_file, session, status)
                     if raise_unsupported:
                         raise errors.error_codes.get(status, errors.UnknownErrorCode)(status)
                     else:
                         file_bytes = None
                 else:
-                    log.debug(f"\n\tinput_file: {input_file_repr}\n\toutput_file: {output_file}\n\tsession: {session}\n\tstatus: {status}")
+                    log.debug("\n\tinput_file: %s\n\toutput_file: %s\n\tsession: %s\n\tstatus: %s", input_file_repr, output_file, session, status)
                     # Get file bytes
                     if isinstance(output_file, str):
                         # File to file and memory to file, Editor wrote to a file, read it to get the file bytes
                         if not os.path.isfile(output_file):
-                            log.error(f"Editor returned success code: {status} but no output file was found: {output_file}")
+                            log.error("Editor returned success code: %s but no output file was found: %s", status, output_file)
                             file_bytes = None
                         else:
                             with open(output_file, "rb") as f:
@@ -1064,7 +1118,7 @@ class Editor(Library):
 
                 return file_bytes
 
-    def export_directory(self, input_directory: str, output_directory: Optional[str], content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, "glasswall.content_management.policies.policy.Policy"] = None, raise_unsupported: bool = True):
+    def export_directory(self, input_directory: str, output_directory: Optional[str], content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, "glasswall.content_management.policies.policy.Policy"] = None, raise_unsupported: bool = True, incremental: Union[bool, str] = False):
         """ Exports all files in a directory and its subdirectories. The export files are written to output_directory maintaining the same directory structure as input_directory.
 
         Args:
@@ -1072,24 +1126,30 @@ class Editor(Library):
             output_directory (Optional[str]): The output directory where the export files will be written, or None to not write files.
             content_management_policy (Union[None, str, bytes, bytearray, io.BytesIO, glasswall.content_management.policies.policy.Policy], optional): Default None (sanitise). The content management policy to apply.
             raise_unsupported (bool, optional): Default True. Raise exceptions when Glasswall encounters an error. Fail silently if False.
+            incremental (Union[bool, str], optional): Default False. Skip files that are unchanged since they were last processed successfully with the same policy, using a change index persisted in the output directory, or at this path if str. Skipped files are not included in the returned dictionary.
 
         Returns:
             export_files_dict (dict): A dictionary of file paths relative to input_directory, and file bytes.
         """
         export_files_dict = {}
         # Call export_file on each file in input_directory to output_directory
-        for input_file in utils.list_file_paths(input_directory):
-            relative_path = os.path.relpath(input_file, input_directory) + ".zip"
-            output_file = None if output_directory is None else os.path.join(os.path.abspath(output_directory), relative_path)
-
-            export_bytes = self.export_file(
-                input_file=input_file,
-                output_file=output_file,
-                raise_unsupported=raise_unsupported,
-                content_management_policy=content_management_policy,
-            )
+        with ChangeIndex.for_directory(output_directory, operation="Editor.export_file", settings=(content_management_policy,), enabled=incremental) as change_index:
+            for input_file in utils.list_file_paths(input_directory):
+                relative_path = os.path.relpath(input_file, input_directory) + ".zip"
+                output_file = None if output_directory is None else os.path.join(os.path.abspath(output_directory), relative_path)
+
+                if change_index.is_unchanged(relative_path, input_file, output_file):
+                    continue
+
+                export_bytes = self.export_file(
+                    input_file=input_file,
+                    output_file=output_file,
+                    raise_unsupported=raise_unsupported,
+                    content_management_policy=content_management_policy,
+                )
+                change_index.record(relative_path, input_file, output_file, success=export_bytes is not None)
 
-            export_files_dict[relative_path] = export_bytes
+                export_files_dict[relative_path] = export_bytes
 
         return export_files_dict
 
@@ -1154,6 +1214,7 @@ class Editor(Library):
 
         return gw_return_object
 
+    @instrumented
     def register_import(self, session: int, input_file: Union[str, bytes, bytearray, io.BytesIO]):
         """ Registers a .zip file to be imported for the given session. The constructed file will be created during the session's run_session call.
 
@@ -1182,13 +1243,15 @@ class Editor(Library):
             result = self._GW2RegisterImportMemory(session, input_file)
 
         if result.status not in successes.success_codes:
-            log.error(format_object(result))
+            log.error("%s", LazyFormat(format_object, result))
             raise errors.error_codes.get(result.status, errors.UnknownErrorCode)(result.status)
         else:
-            log.debug(format_object(result))
+            log.debug("%s", LazyFormat(format_object, result))
 
         return result
 
+    @instrumented
+    @cached_result
     def import_file(self, input_file: Union[str, bytes, bytearray, io.BytesIO], output_file: Optional[str] = None, content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, "glasswall.content_management.policies.policy.Policy"] = None, raise_unsupported: bool = True):
         """ Import a .zip file, constructs a file from the .zip file and returns the file bytes. The file is written to output_file if it is provided.
 
@@ -1236,18 +1299,18 @@ class Editor(Library):
 
                 input_file_repr = f"{type(input_file)} length {len(input_file)}" if isinstance(input_file, (bytes, bytearray,)) else input_file.__sizeof__() if isinstance(input_file, io.BytesIO) else input_file
                 if status not in successes.success_codes:
-                    log.error(f"\n\tinput_file: {input_file_repr}\n\toutput_file: {output_file}\n\tsession: {session}\n\tstatus: {status}")
+                    log.error("\n\tinput_file: %s\n\toutput_file: %s\n\tsession: %s\n\tstatus: %s", input_file_repr, output_file, session, status)
                     if raise_unsupported:
                         raise errors.error_codes.get(status, errors.UnknownErrorCode)(status)
                     else:
                         file_bytes = None
                 else:
-                    log.debug(f"\n\tinput_file: {input_file_repr}\n\toutput_file: {output_file}\n\tsession: {session}\n\tstatus: {status}")
+                    log.debug("\n\tinput_file: %s\n\toutput_file: %s\n\tsession: %s\n\tstatus: %s", input_file_repr, output_file, session, status)
                     # Get file bytes
                     if isinstance(output_file, str):
                         # File to file and memory to file, Editor wrote to a file, read it to get the file bytes
                         if not os.path.isfile(output_file):
-                            log.error(f"Editor returned success code: {status} but no output file was found: {output_file}")
+                            log.error("Editor returned success code: %s but no output file was found: %s", status, output_file)
                             file_bytes = None
                         else:
                             with open(output_file, "rb") as f:
@@ -1264,7 +1327,7 @@ class Editor(Library):
 
                 return file_bytes
 
-    def import_directory(self, input_directory: str, output_directory: Optional[str], content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, "glasswall.content_management.policies.policy.Policy"] = None, raise_unsupported: bool = True):
+    def import_directory(self, input_directory: str, output_directory: Optional[str], content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, "glasswall.content_management.policies.policy.Policy"] = None, raise_unsupported: bool = True, incremental: Union[bool, str] = False):
         """ Imports all files in a directory and its subdirectories. Files are expected as .zip but this is not forced.
         The constructed files are written to output_directory maintaining the same directory structure as input_directory.
 
@@ -1273,26 +1336,32 @@ class Editor(Library):
             output_directory (Optional[str]): The output directory where the constructed files will be written, or None to not write files.
             content_management_policy (Union[None, str, bytes, bytearray, io.BytesIO, glasswall.content_management.policies.policy.Policy], optional): Default None (sanitise). The content management policy to apply.
             raise_unsupported (bool, optional): Default True. Raise exceptions when Glasswall encounters an error. Fail silently if False.
+            incremental (Union[bool, str], optional): Default False. Skip files that are unchanged since they were last processed successfully with the same policy, using a change index persisted in the output directory, or at this path if str. Skipped files are not included in the returned dictionary.
 
         Returns:
             import_files_dict (dict): A dictionary of file paths relative to input_directory, and file bytes.
         """
         import_files_dict = {}
         # Call import_file on each file in input_directory to output_directory
-        for input_file in utils.list_file_paths(input_directory):
-            relative_path = os.path.relpath(input_file, input_directory)
-            # Remove .zip extension from relative_path
-            relative_path = os.path.splitext(relative_path)[0]
-            output_file = None if output_directory is None else os.path.join(os.path.abspath(output_directory), relative_path)
-
-            import_bytes = self.import_file(
-                input_file=input_file,
-                output_file=output_file,
-                raise_unsupported=raise_unsupported,
-                content_management_policy=content_management_policy,
-            )
-
-            import_files_dict[relative_path] = import_bytes
+        with ChangeIndex.for_directory(output_directory, operation="Editor.import_file", settings=(content_management_policy,), enabled=incremental) as change_index:
+            for input_file in utils.list_file_paths(input_directory):
+                relative_path = os.path.relpath(input_file, input_directory)
+                # Remove .zip extension from relative_path
+                relative_path = os.path.splitext(relative_path)[0]
+                output_file = None if output_directory is None else os.path.join(os.path.abspath(output_directory), relative_path)
+
+                if change_index.is_unchanged(relative_path, input_file, output_file):
+                    continue
+
+                import_bytes = self.import_file(
+                    input_file=input_file,
+                    output_file=output_file,
+                    raise_unsupported=raise_unsupported,
+                    content_management_policy=content_management_policy,
+                )
+                change_index.record(relative_path, input_file, output_file, success=import_bytes is not None)
+
+                import_files_dict[relative_path] = import_bytes
 
         return import_files_dict
 
@@ -1352,10 +1421,10 @@ class Editor(Library):
         result = self._GW2FileErrorMsg(session)
 
         if result.status not in successes.success_codes:
-            log.error(format_object(result))
+            log.error("%s", LazyFormat(format_object, result))
             raise errors.error_codes.get(result.status, errors.UnknownErrorCode)(result.status)
         else:
-            log.debug(format_object(result))
+            log.debug("%s", LazyFormat(format_object, result))
 
         return result.error_message
 
@@ -1396,10 +1465,10 @@ class Editor(Library):
         )
 
         if status not in successes.success_codes:
-            log.error(f"\n\tsession: {session}\n\tstatus: {status}")
+            log.error("\n\tsession: %s\n\tstatus: %s", session, status)
             raise errors.error_codes.get(status, errors.UnknownErrorCode)(status)
         else:
-            log.debug(f"\n\tsession: {session}\n\tstatus: {status}")
+            log.debug("\n\tsession: %s\n\tstatus: %s", session, status)
 
         # Editor wrote to a buffer, convert it to bytes
         file_type_bytes = utils.buffer_to_bytes(
@@ -1448,10 +1517,10 @@ class Editor(Library):
         )
 
         if status not in successes.success_codes:
-            log.error(f"\n\tsession: {session}\n\tstatus: {status}")
+            log.error("\n\tsession: %s\n\tstatus: %s", session, status)
             raise errors.error_codes.get(status, errors.UnknownErrorCode)(status)
         else:
-            log.debug(f"\n\tsession: {session}\n\tstatus: {status}")
+            log.debug("\n\tsession: %s\n\tstatus: %s", session, status)
 
         # Editor wrote to a buffer, convert it to bytes
         file_type_bytes = utils.buffer_to_bytes(
@@ -1547,10 +1616,10 @@ class Editor(Library):
         result = self._GW2RegisterReportFile(session, output_file)
 
         if result.status not in successes.success_codes:
-            log.error(format_object(result))
+            log.error("%s", LazyFormat(format_object, result))
             raise errors.error_codes.get(result.status, errors.UnknownErrorCode)(result.status)
         else:
-            log.debug(format_object(result))
+            log.debug("%s", LazyFormat(format_object, result))
 
         return result
 
@@ -1617,11 +1686,11 @@ class Editor(Library):
                 result = self._GW2GetIdInfo(session, issue_id)
 
                 if result.status not in successes.success_codes:
-                    log.error(format_object(result))
+                    log.error("%s", LazyFormat(format_object, result))
                     if raise_unsupported:
                         raise errors.error_codes.get(result.status, errors.UnknownErrorCode)(result.status)
                 else:
-                    log.debug(format_object(result))
+                    log.debug("%s", LazyFormat(format_object, result))
 
                 return result.id_info
 
@@ -1684,11 +1753,11 @@ class Editor(Library):
                 result = self._GW2GetAllIdInfo(session)
 
                 if result.status not in successes.success_codes:
-                    log.error(format_object(result))
+                    log.error("%s", LazyFormat(format_object, result))
                     if raise_unsupported:
                         raise errors.error_codes.get(result.status, errors.UnknownErrorCode)(result.status)
                 else:
-                    log.debug(format_object(result))
+                    log.debug("%s", LazyFormat(format_object, result))
 
                 if isinstance(output_file, str):
                     # GW2GetAllIdInfo is memory only, write to file
@@ -1761,11 +1830,11 @@ class Editor(Library):
         result = self._GW2FileSessionStatus(session)
 
         if result.status not in successes.success_codes:
-            log.error(format_object(result))
+            log.error("%s", LazyFormat(format_object, result))
             if raise_unsupported:
                 raise errors.error_codes.get(result.status, errors.UnknownErrorCode)(result.status)
         else:
-            log.debug(format_object(result))
+            log.debug("%s", LazyFormat(format_object, result))
 
         return result.message
 
@@ -1802,7 +1871,7 @@ class Editor(Library):
         with self.new_session() as session:
             result = self._GW2LicenceDetails(session)
 
-            log.debug(f"\n\tsession: {session}\n\tGW2LicenceDetails: {result}")
+            log.debug("\n\tsession: %s\n\tGW2LicenceDetails: %s", session, result)
 
         return result
 
@@ -1,10 +1,23 @@
-
-
 import ctypes as ct
 import os
+import threading
+import time
 
 import glasswall
 from glasswall import utils
+from glasswall.config.logging import log
+
+# Libraries loaded in this process, keyed by (class name, resolved library path), with values: {"library": ctypes.CDLL, "licence_validated_time": Optional[float]}
+_loaded_libraries = {}
+_loaded_libraries_lock = threading.RLock()
+# Seconds after a successful licence validation before validate_licence_once validates again, so that a revoked licence is noticed by long running processes. 0 validates on every call.
+licence_revalidation_seconds = float(os.environ.get("glasswall_licence_revalidation_seconds", 3600))
+
+
+def clear_loaded_libraries():
+    """ Clears the registry of libraries loaded in this process, so that the next instance of each library reloads it and validates its licence. Library handles are not unloaded. """
+    with _loaded_libraries_lock:
+        _loaded_libraries.clear()
 
 
 class Library:
@@ -14,6 +27,7 @@ class Library:
         self.library_path = library_path
 
     def load_library(self, library_path: str):
+        """ Returns the ctypes library handle of library_path, a library file or a directory to search. Libraries are loaded once per process, later calls with the same resolved path return the same handle. """
         if not os.path.isfile(library_path):
             if os.path.isdir(library_path):
                 library_path = utils.get_library(self.__class__.__name__, library_path)
@@ -21,7 +35,20 @@ class Library:
                 raise FileNotFoundError(library_path)
 
         self.library_path = library_path
+        registry_key = (self.__class__.__name__, os.path.realpath(library_path))
+
+        with _loaded_libraries_lock:
+            loaded_library = _loaded_libraries.get(registry_key)
+            if loaded_library is not None:
+                log.debug("Reusing loaded %s library: %s", self.__class__.__name__, self.library_path)
+                return loaded_library["library"]
 
+            library = self._load_library()
+            _loaded_libraries[registry_key] = {"library": library, "licence_validated_time": None}
+
+            return library
+
+    def _load_library(self):
         # Preload dependencies to avoid "OSError: ...: cannot open shared object file: No such file or directory"
         dependencies = [
             os.path.join(os.path.dirname(self.library_path), dependency)
@@ -38,3 +65,17 @@ class Library:
                 if missing_dependencies:
                     raise FileNotFoundError(f"Unable to load {self.__class__.__name__}. Below dependencies are missing in directory: {os.path.dirname(self.library_path)}\n{', '.join(missing_dependencies)}") from e
                 raise
+
+    def validate_licence_once(self):
+        """ Calls validate_licence if the licence of this library has not been validated successfully in this process in the last `licence_revalidation_seconds`. """
+        registry_key = (self.__class__.__name__, os.path.realpath(self.library_path))
+        with _loaded_libraries_lock:
+            loaded_library = _loaded_libraries.get(registry_key)
+            validated_time = None if loaded_library is None else loaded_library["licence_validated_time"]
+            if validated_time is not None and time.monotonic() - validated_time < licence_revalidation_seconds:
+                return
+
+            self.validate_licence()
+
+            if loaded_library is not None:
+                loaded_library["licence_validated_time"] = time.monotonic()
@@ -3,30 +3,35 @@
 import ctypes as ct
 import io
 import os
-from typing import Union
+from typing import Iterable, List, Optional, Union
 
 import glasswall
 from glasswall import determine_file_type as dft
 from glasswall import utils
-from glasswall.config.logging import log
+from glasswall.change_index import ChangeIndex
+from glasswall.config.logging import LazyFormat, log
+from glasswall.instrumentation import instrumented
 from glasswall.libraries.library import Library
 from glasswall.libraries.rebuild import errors, successes
+from glasswall.result_cache import ResultCache, cached_result
 
 
 class Rebuild(Library):
     """ A high level Python wrapper for Glasswall Rebuild / Classic. """
 
-    def __init__(self, library_path: str):
+    def __init__(self, library_path: str, result_cache: Optional[ResultCache] = None):
         super().__init__(library_path=library_path)
         self.library = self.load_library(os.path.abspath(library_path))
 
         # Set content management configuration to default
         self.set_content_management_policy(input_file=None)
 
-        # Validate killswitch has not activated
-        self.validate_licence()
+        # Validate killswitch has not activated, once per process
+        self.validate_licence_once()
 
-        log.info(f"Loaded Glasswall {self.__class__.__name__} version {self.version()} from {self.library_path}")
+        self.result_cache = result_cache
+
+        log.info("Loaded Glasswall %s version %s from %s", self.__class__.__name__, self.version(), self.library_path)
 
     def validate_licence(self):
         """ Validates the licence of the library by attempting to call protect_file on a known supported file.
@@ -40,9 +45,9 @@ class Rebuild(Library):
                 input_file=b"BM:\x00\x00\x00\x00\x00\x00\x006\x00\x00\x00(\x00\x00\x00\x01\x00\x00\x00\x01\x00\x00\x00\x01\x00\x18\x00\x00\x00\x00\x00\x04\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\xff\xff\xff\x00",
                 raise_unsupported=True
             )
-            log.debug(f"{self.__class__.__name__} licence validated successfully.")
+            log.debug("%s licence validated successfully.", self.__class__.__name__)
         except errors.RebuildError:
-            log.error(f"{self.__class__.__name__} licence validation failed.")
+            log.error("%s licence validation failed.", self.__class__.__name__)
             raise
 
     def version(self):
@@ -60,6 +65,7 @@ class Rebuild(Library):
 
         return version
 
+    @instrumented
     def determine_file_type(self, input_file: Union[str, bytes, bytearray, io.BytesIO], as_string: bool = False, raise_unsupported: bool = True):
         """ Returns an int representing the file type / file format of a file.
 
@@ -107,18 +113,40 @@ class Rebuild(Library):
 
         if not dft.is_success(file_type):
             if raise_unsupported:
-                log.warning(f"\n\tfile_type: {file_type}\n\tfile_type_as_string: {file_type_as_string}\n\tinput_file: {input_file_repr}")
+                log.warning("\n\tfile_type: %s\n\tfile_type_as_string: %s\n\tinput_file: %s", file_type, file_type_as_string, input_file_repr)
                 raise dft.int_class_map.get(file_type, dft.errors.UnknownErrorCode)(file_type)
             else:
-                log.debug(f"\n\tfile_type: {file_type}\n\tfile_type_as_string: {file_type_as_string}\n\tinput_file: {input_file_repr}")
+                log.debug("\n\tfile_type: %s\n\tfile_type_as_string: %s\n\tinput_file: %s", file_type, file_type_as_string, input_file_repr)
         else:
-            log.debug(f"\n\tfile_type: {file_type}\n\tfile_type_as_string: {file_type_as_string}\n\tinput_file: {input_file_repr}")
+            log.debug("\n\tfile_type: %s\n\tfile_type_as_string: %s\n\tinput_file: %s", file_type, file_type_as_string, input_file_repr)
 
         if as_string:
             return file_type_as_string
 
         return file_type
 
+    def determine_file_types(self, input_files: Iterable[Union[str, bytes, bytearray, io.BytesIO]], as_string: bool = False, raise_unsupported: bool = True, prefilter: bool = True, max_workers: Optional[int] = 1) -> List[Union[int, str]]:
+        """ Returns the file types of many files in the same order as input_files. Files whose magic bytes unambiguously identify their file type are classified without calling Glasswall, and the remaining files are passed to determine_file_type.
+
+        Args:
+            input_files (Iterable[Union[str, bytes, bytearray, io.BytesIO]]): The input file paths or bytes.
+            as_string (bool, optional): Return file types as strings, eg: "bmp" instead of: 29. Defaults to False.
+            raise_unsupported (bool, optional): Default True. Raise exceptions when Glasswall encounters an error. Fail silently if False.
+            prefilter (bool, optional): Default True. Classify files with unambiguous magic bytes (7z, gz, pdf, png) without calling Glasswall.
+            max_workers (Optional[int], optional): Default 1, files are classified in the current thread. If greater than 1, or None for the ThreadPoolExecutor default, files are classified in a thread pool. Only use threads if this library is safe to call from multiple threads.
+
+        Returns:
+            file_types (List[Union[int, str]]): The file type of each input file.
+        """
+        return dft.determine_file_types(
+            self.determine_file_type,
+            input_files,
+            as_string=as_string,
+            raise_unsupported=raise_unsupported,
+            prefilter=prefilter,
+            max_workers=max_workers,
+        )
+
     def get_content_management_policy(self):
         """ Gets the current content management configuration.
 
@@ -143,16 +171,17 @@ class Rebuild(Library):
         )
 
         if status not in successes.success_codes:
-            log.error(f"\n\tstatus: {status}\n\tGWFileErrorMsg: {self.GWFileErrorMsg()}")
+            log.error("\n\tstatus: %s\n\tGWFileErrorMsg: %s", status, LazyFormat(self.GWFileErrorMsg))
             raise errors.error_codes.get(status, errors.UnknownErrorCode)(status)
         else:
-            log.debug(f"\n\tstatus: {status}")
+            log.debug("\n\tstatus: %s", status)
 
         # As string
         xml_string = utils.validate_xml(ct.wstring_at(ct_input_buffer))
 
         return xml_string
 
+    @instrumented
     def set_content_management_policy(self, input_file: Union[None, str, bytes, bytearray, io.BytesIO, "glasswall.content_management.policies.policy.Policy"] = None):
         """ Sets the content management policy configuration. If input_file is None then default settings (sanitise) are applied.
 
@@ -183,13 +212,15 @@ class Rebuild(Library):
         )
 
         if status not in successes.success_codes:
-            log.error(f"\n\tstatus: {status}\n\tGWFileErrorMsg: {self.GWFileErrorMsg()}")
+            log.error("\n\tstatus: %s\n\tGWFileErrorMsg: %s", status, LazyFormat(self.GWFileErrorMsg))
             raise errors.error_codes.get(status, errors.UnknownErrorCode)(status)
         else:
-            log.debug(f"\n\tstatus: {status}")
+            log.debug("\n\tstatus: %s", status)
 
         return status
 
+    @instrumented
+    @cached_result
     def protect_file(self, input_file: Union[str, bytes, bytearray, io.BytesIO], output_file: Union[None, str] = None, content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, "glasswall.content_management.policies.policy.Policy"] = None, raise_unsupported: bool = True):
         """ Protects a file using the current content management configuration, returning the file bytes. The protected file is written to output_file if it is provided.
 
@@ -315,17 +346,17 @@ class Rebuild(Library):
 
             input_file_repr = f"{type(input_file)} length {len(input_file)}" if isinstance(input_file, (bytes, bytearray,)) else input_file.__sizeof__() if isinstance(input_file, io.BytesIO) else input_file
             if status not in successes.success_codes:
-                log.error(f"\n\tinput_file: {input_file_repr}\n\toutput_file: {output_file}\n\tstatus: {status}\n\tGWFileErrorMsg: {self.GWFileErrorMsg()}")
+                log.error("\n\tinput_file: %s\n\toutput_file: %s\n\tstatus: %s\n\tGWFileErrorMsg: %s", input_file_repr, output_file, status, LazyFormat(self.GWFileErrorMsg))
                 if raise_unsupported:
                     raise errors.error_codes.get(status, errors.UnknownErrorCode)(status)
                 else:
                     file_bytes = None
             else:
-                log.debug(f"\n\tinput_file: {input_file_repr}\n\toutput_file: {output_file}\n\tstatus: {status}")
+                log.debug("\n\tinput_file: %s\n\toutput_file: %s\n\tstatus: %s", input_file_repr, output_file, status)
                 if isinstance(input_file, str) and isinstance(output_file, str):
                     # file to file, read the bytes of the file that Rebuild has already written
                     if not os.path.isfile(output_file):
-                        log.error(f"Rebuild returned success code: {status} but no output file was found: {output_file}")
+                        log.error("Rebuild returned success code: %s but no output file was found: %s", status, output_file)
                         file_bytes = None
                     else:
                         with open(output_file, "rb") as f:
@@ -344,7 +375,7 @@ class Rebuild(Library):
 
             return file_bytes
 
-    def protect_directory(self, input_directory: str, output_directory: Union[None, str], content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, "glasswall.content_management.policies.policy.Policy"] = None, raise_unsupported: bool = True):
+    def protect_directory(self, input_directory: str, output_directory: Union[None, str], content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, "glasswall.content_management.policies.policy.Policy"] = None, raise_unsupported: bool = True, incremental: Union[bool, str] = False):
         """ Recursively processes all files in a directory in protect mode using the given content management policy.
         The protected files are written to output_directory maintaining the same directory structure as input_directory.
 
@@ -353,27 +384,35 @@ class Rebuild(Library):
             output_directory (Union[None, str]): The output directory where the protected file will be written, or None to not write files.
             content_management_policy (Union[None, str, bytes, bytearray, io.BytesIO, glasswall.content_management.policies.policy.Policy], optional): Default None (sanitise). The content management policy to apply.
             raise_unsupported (bool, optional): Default True. Raise exceptions when Glasswall encounters an error. Fail silently if False.
+            incremental (Union[bool, str], optional): Default False. Skip files that are unchanged since they were last processed successfully with the same policy, using a change index persisted in the output directory, or at this path if str. Skipped files are not included in the returned dictionary.
 
         Returns:
             protected_files_dict (dict): A dictionary of file paths relative to input_directory, and file bytes.
         """
         protected_files_dict = {}
         # Call protect_file on each file in input_directory to output_directory
-        for input_file in utils.list_file_paths(input_directory):
-            relative_path = os.path.relpath(input_file, input_directory)
-            output_file = None if output_directory is None else os.path.join(os.path.abspath(output_directory), relative_path)
-
-            protected_bytes = self.protect_file(
-                input_file=input_file,
-                output_file=output_file,
-                raise_unsupported=raise_unsupported,
-                content_management_policy=content_management_policy,
-            )
+        with ChangeIndex.for_directory(output_directory, operation="Rebuild.protect_file", settings=(content_management_policy,), enabled=incremental) as change_index:
+            for input_file in utils.list_file_paths(input_directory):
+                relative_path = os.path.relpath(input_file, input_directory)
+                output_file = None if output_directory is None else os.path.join(os.path.abspath(output_directory), relative_path)
+
+                if change_index.is_unchanged(relative_path, input_file, output_file):
+                    continue
+
+                protected_bytes = self.protect_file(
+                    input_file=input_file,
+                    output_file=output_file,
+                    raise_unsupported=raise_unsupported,
+                    content_management_policy=content_management_policy,
+                )
+                change_index.record(relative_path, input_file, output_file, success=protected_bytes is not None)
 
-            protected_files_dict[relative_path] = protected_bytes
+                protected_files_dict[relative_path] = protected_bytes
 
         return protected_files_dict
 
+    @instrumented
+    @cached_result
     def analyse_file(self, input_file: Union[str, bytes, bytearray, io.BytesIO], output_file: Union[None, str] = None, content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, "glasswall.content_management.policies.policy.Policy"] = None, raise_unsupported: bool = True):
         """ Analyses a file, returning the analysis bytes. The analysis is written to output_file if it is provided.
 
@@ -518,15 +557,15 @@ class Rebuild(Library):
 
             input_file_repr = f"{type(input_file)} length {len(input_file)}" if isinstance(input_file, (bytes, bytearray,)) else input_file.__sizeof__() if isinstance(input_file, io.BytesIO) else input_file
             if status not in successes.success_codes:
-                log.error(f"\n\tinput_file: {input_file_repr}\n\toutput_file: {output_file}\n\tstatus: {status}\n\tGWFileErrorMsg: {self.GWFileErrorMsg()}")
+                log.error("\n\tinput_file: %s\n\toutput_file: %s\n\tstatus: %s\n\tGWFileErrorMsg: %s", input_file_repr, output_file, status, LazyFormat(self.GWFileErrorMsg))
                 if raise_unsupported:
                     raise errors.error_codes.get(status, errors.UnknownErrorCode)(status)
             else:
-                log.debug(f"\n\tinput_file: {input_file_repr}\n\toutput_file: {output_file}\n\tstatus: {status}")
+                log.debug("\n\tinput_file: %s\n\toutput_file: %s\n\tstatus: %s", input_file_repr, output_file, status)
 
             return file_bytes
 
-    def analyse_directory(self, input_directory: str, output_directory: Union[None, str], content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, "glasswall.content_management.policies.policy.Policy"] = None, raise_unsupported: bool = True):
+    def analyse_directory(self, input_directory: str, output_directory: Union[None, str], content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, "glasswall.content_management.policies.policy.Policy"] = None, raise_unsupported: bool = True, incremental: Union[bool, str] = False):
         """ Analyses all files in a directory and its subdirectories. The analysis files are written to output_directory maintaining the same directory structure as input_directory.
 
         Args:
@@ -534,27 +573,35 @@ class Rebuild(Library):
             output_directory (Union[None, str]): The output directory where the analysis files will be written, or None to not write files.
             content_management_policy (Union[None, str, bytes, bytearray, io.BytesIO, glasswall.content_management.policies.policy.Policy], optional): Default None (sanitise). The content management policy to apply.
             raise_unsupported (bool, optional): Default True. Raise exceptions when Glasswall encounters an error. Fail silently if False.
+            incremental (Union[bool, str], optional): Default False. Skip files that are unchanged since they were last processed successfully with the same policy, using a change index persisted in the output directory, or at this path if str. Skipped files are not included in the returned dictionary.
 
         Returns:
             analysis_files_dict (dict): A dictionary of file paths relative to input_directory, and file bytes.
         """
         analysis_files_dict = {}
         # Call analyse_file on each file in input_directory to output_directory
-        for input_file in utils.list_file_paths(input_directory):
-            relative_path = os.path.relpath(input_file, input_directory) + ".xml"
-            output_file = None if output_directory is None else os.path.join(os.path.abspath(output_directory), relative_path)
-
-            analysis_bytes = self.analyse_file(
-                input_file=input_file,
-                output_file=output_file,
-                raise_unsupported=raise_unsupported,
-                content_management_policy=content_management_policy,
-            )
+        with ChangeIndex.for_directory(output_directory, operation="Rebuild.analyse_file", settings=(content_management_policy,), enabled=incremental) as change_index:
+            for input_file in utils.list_file_paths(input_directory):
+                relative_path = os.path.relpath(input_file, input_directory) + ".xml"
+                output_file = None if output_directory is None else os.path.join(os.path.abspath(output_directory), relative_path)
+
+                if change_index.is_unchanged(relative_path, input_file, output_file):
+                    continue
+
+                analysis_bytes = self.analyse_file(
+                    input_file=input_file,
+                    output_file=output_file,
+                    raise_unsupported=raise_unsupported,
+                    content_management_policy=content_management_policy,
+                )
+                change_index.record(relative_path, input_file, output_file, success=analysis_bytes is not None)
 
-            analysis_files_dict[relative_path] = analysis_bytes
+                analysis_files_dict[relative_path] = analysis_bytes
 
         return analysis_files_dict
 
+    @instrumented
+    @cached_result
     def export_file(self, input_file: Union[str, bytes, bytearray, io.BytesIO], output_file: Union[None, str] = None, content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, "glasswall.content_management.policies.policy.Policy"] = None, raise_unsupported: bool = True):
         """ Export a file, returning the .zip file bytes. The .zip file is written to output_file.
 
@@ -671,17 +718,17 @@ class Rebuild(Library):
 
             input_file_repr = f"{type(input_file)} length {len(input_file)}" if isinstance(input_file, (bytes, bytearray,)) else input_file.__sizeof__() if isinstance(input_file, io.BytesIO) else input_file
             if status not in successes.success_codes:
-                log.error(f"\n\tinput_file: {input_file_repr}\n\toutput_file: {output_file}\n\tstatus: {status}\n\tGWFileErrorMsg: {self.GWFileErrorMsg()}")
+                log.error("\n\tinput_file: %s\n\toutput_file: %s\n\tstatus: %s\n\tGWFileErrorMsg: %s", input_file_repr, output_file, status, LazyFormat(self.GWFileErrorMsg))
                 if raise_unsupported:
                     raise errors.error_codes.get(status, errors.UnknownErrorCode)(status)
                 else:
                     file_bytes = None
             else:
-                log.debug(f"\n\tinput_file: {input_file_repr}\n\toutput_file: {output_file}\n\tstatus: {status}")
+                log.debug("\n\tinput_file: %s\n\toutput_file: %s\n\tstatus: %s", input_file_repr, output_file, status)
                 if isinstance(input_file, str) and isinstance(output_file, str):
                     # file to file, read the bytes of the file that Rebuild has already written
                     if not os.path.isfile(output_file):
-                        log.error(f"Rebuild returned success code: {status} but no output file was found: {output_file}")
+                        log.error("Rebuild returned success code: %s but no output file was found: %s", status, output_file)
                         file_bytes = None
                     else:
                         with open(output_file, "rb") as f:
@@ -700,7 +747,7 @@ class Rebuild(Library):
 
             return file_bytes
 
-    def export_directory(self, input_directory: str, output_directory: Union[None, str], content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, "glasswall.content_management.policies.policy.Policy"] = None, raise_unsupported: bool = True):
+    def export_directory(self, input_directory: str, output_directory: Union[None, str], content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, "glasswall.content_management.policies.policy.Policy"] = None, raise_unsupported: bool = True, incremental: Union[bool, str] = False):
         """ Exports all files in a directory and its subdirectories. The export files are written to output_directory maintaining the same directory structure as input_directory.
 
         Args:
@@ -708,27 +755,35 @@ class Rebuild(Library):
             output_directory (Union[None, str]): The output directory where the export files will be written, or None to not write files.
             content_management_policy (Union[None, str, bytes, bytearray, io.BytesIO, glasswall.content_management.policies.policy.Policy], optional): Default None (sanitise). The content management policy to apply.
             raise_unsupported (bool, optional): Default True. Raise exceptions when Glasswall encounters an error. Fail silently if False.
+            incremental (Union[bool, str], optional): Default False. Skip files that are unchanged since they were last processed successfully with the same policy, using a change index persisted in the output directory, or at this path if str. Skipped files are not included in the returned dictionary.
 
         Returns:
             export_files_dict (dict): A dictionary of file paths relative to input_directory, and file bytes.
         """
         export_files_dict = {}
         # Call export_file on each file in input_directory to output_directory
-        for input_file in utils.list_file_paths(input_directory):
-            relative_path = os.path.relpath(input_file, input_directory) + ".zip"
-            output_file = None if output_directory is None else os.path.join(os.path.abspath(output_directory), relative_path)
-
-            export_bytes = self.export_file(
-                input_file=input_file,
-                output_file=output_file,
-                raise_unsupported=raise_unsupported,
-                content_management_policy=content_management_policy,
-            )
+        with ChangeIndex.for_directory(output_directory, operation="Rebuild.export_file", settings=(content_management_policy,), enabled=incremental) as change_index:
+            for input_file in utils.list_file_paths(input_directory):
+                relative_path = os.path.relpath(input_file, input_directory) + ".zip"
+                output_file = None if output_directory is None else os.path.join(os.path.abspath(output_directory), relative_path)
+
+                if change_index.is_unchanged(relative_path, input_file, output_file):
+                    continue
+
+                export_bytes = self.export_file(
+                    input_file=input_file,
+                    output_file=output_file,
+                    raise_unsupported=raise_unsupported,
+                    content_management_policy=content_management_policy,
+                )
+                change_index.record(relative_path, input_file, output_file, success=export_bytes is not None)
 
-            export_files_dict[relative_path] = export_bytes
+                export_files_dict[relative_path] = export_bytes
 
         return export_files_dict
 
+    @instrumented
+    @cached_result
     def import_file(self, input_file: Union[str, bytes, bytearray, io.BytesIO], output_file: Union[None, str] = None, content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, "glasswall.content_management.policies.policy.Policy"] = None, raise_unsupported: bool = True):
         """ Import a .zip file, constructs a file from the .zip file and returns the file bytes. The file is written to output_file if it is provided.
 
@@ -845,17 +900,17 @@ class Rebuild(Library):
 
             input_file_repr = f"{type(input_file)} length {len(input_file)}" if isinstance(input_file, (bytes, bytearray,)) else input_file.__sizeof__() if isinstance(input_file, io.BytesIO) else input_file
             if status not in successes.success_codes:
-                log.error(f"\n\tinput_file: {input_file_repr}\n\toutput_file: {output_file}\n\tstatus: {status}\n\tGWFileErrorMsg: {self.GWFileErrorMsg()}")
+                log.error("\n\tinput_file: %s\n\toutput_file: %s\n\tstatus: %s\n\tGWFileErrorMsg: %s", input_file_repr, output_file, status, LazyFormat(self.GWFileErrorMsg))
                 if raise_unsupported:
                     raise errors.error_codes.get(status, errors.UnknownErrorCode)(status)
                 else:
                     file_bytes = None
             else:
-                log.debug(f"\n\tinput_file: {input_file_repr}\n\toutput_file: {output_file}\n\tstatus: {status}")
+                log.debug("\n\tinput_file: %s\n\toutput_file: %s\n\tstatus: %s", input_file_repr, output_file, status)
                 if isinstance(input_file, str) and isinstance(output_file, str):
                     # file to file, read the bytes of the file that Rebuild has already written
                     if not os.path.isfile(output_file):
-                        log.error(f"Rebuild returned success code: {status} but no output file was found: {output_file}")
+                        log.error("Rebuild returned success code: %s but no output file was found: %s", status, output_file)
                         file_bytes = None
                     else:
                         with open(output_file, "rb") as f:
@@ -874,7 +929,7 @@ class Rebuild(Library):
 
             return file_bytes
 
-    def import_directory(self, input_directory: str, output_directory: Union[None, str], content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, "glasswall.content_management.policies.policy.Policy"] = None, raise_unsupported: bool = True):
+    def import_directory(self, input_directory: str, output_directory: Union[None, str], content_management_policy: Union[None, str, bytes, bytearray, io.BytesIO, "glasswall.content_management.policies.policy.Policy"] = None, raise_unsupported: bool = True, incremental: Union[bool, str] = False):
         """ Imports all files in a directory and its subdirectories. Files are expected as .zip but this is not forced.
         The constructed files are written to output_directory maintaining the same directory structure as input_directory.
 
@@ -883,26 +938,32 @@ class Rebuild(Library):
             output_directory (Union[None, str]): The output directory where the constructed files will be written, or None to not write files.
             content_management_policy (Union[None, str, bytes, bytearray, io.BytesIO, glasswall.content_management.policies.policy.Policy], optional): Default None (sanitise). The content management policy to apply.
             raise_unsupported (bool, optional): Default True. Raise exceptions when Glasswall encounters an error. Fail silently if False.
+            incremental (Union[bool, str], optional): Default False. Skip files that are unchanged since they were last processed successfully with the same policy, using a change index persisted in the output directory, or at this path if str. Skipped files are not included in the returned dictionary.
 
         Returns:
             import_files_dict (dict): A dictionary of file paths relative to input_directory, and file bytes.
         """
         import_files_dict = {}
         # Call import_file on each file in input_directory to output_directory
-        for input_file in utils.list_file_paths(input_directory):
-            relative_path = os.path.relpath(input_file, input_directory)
-            # Remove .zip extension from relative_path
-            relative_path = os.path.splitext(relative_path)[0]
-            output_file = None if output_directory is None else os.path.join(os.path.abspath(output_directory), relative_path)
-
-            import_bytes = self.import_file(
-                input_file=input_file,
-                output_file=output_file,
-                raise_unsupported=raise_unsupported,
-                content_management_policy=content_management_policy,
-            )
+        with ChangeIndex.for_directory(output_directory, operation="Rebuild.import_file", settings=(content_management_policy,), enabled=incremental) as change_index:
+            for input_file in utils.list_file_paths(input_directory):
+                relative_path = os.path.relpath(input_file, input_directory)
+                # Remove .zip extension from relative_path
+                relative_path = os.path.splitext(relative_path)[0]
+                output_file = None if output_directory is None else os.path.join(os.path.abspath(output_directory), relative_path)
+
+                if change_index.is_unchanged(relative_path, input_file, output_file):
+                    continue
+
+                import_bytes = self.import_file(
+                    input_file=input_file,
+                    output_file=output_file,
+                    raise_unsupported=raise_unsupported,
+                    content_management_policy=content_management_policy,
+                )
+                change_index.record(relative_path, input_file, output_file, success=import_bytes is not None)
 
-            import_files_dict[relative_path] = import_bytes
+                import_files_dict[relative_path] = import_bytes
 
         return import_files_dict
 
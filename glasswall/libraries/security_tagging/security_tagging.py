@@ -1,23 +1,91 @@
 
 
 import ctypes as ct
+import io
 import os
 import sys
+from typing import Dict, Generator, Optional, Union
 
+from lxml import etree
+
+import glasswall
 from glasswall import utils
+from glasswall.change_index import ChangeIndex
 from glasswall.config.logging import log
+from glasswall.instrumentation import instrumented
 from glasswall.libraries.library import Library
 from glasswall.libraries.security_tagging import errors, successes
+from glasswall.multiprocessing import GlasswallProcessManager, Manifest, Task
+
+# Loaded libraries by library path. Forked worker processes inherit the instances of the parent process and skip loading the library.
+_instances: Dict[str, "SecurityTagging"] = {}
+
+
+def tags_retrieved(xml: bytes) -> bool:
+    """ Returns True if xml is a parsable tags document containing at least one tag.
+
+    Args:
+        xml (bytes): The xml bytes written by GWSecuTag_RetrieveTagFile.
+
+    Returns:
+        bool: True if xml contains at least one tag, else False.
+    """
+    if not xml:
+        return False
+
+    try:
+        root = etree.fromstring(xml)
+    except (etree.XMLSyntaxError, ValueError):
+        return False
+
+    return len(root) > 0
+
+
+def _process_file(library_path: str, function_name: str, **kwargs):
+    """ Calls SecurityTagging `function_name` on a single file in a worker process, returning the status. """
+    security_tagging = _instances.get(library_path)
+    if security_tagging is None:
+        security_tagging = SecurityTagging(library_path)
+        _instances[library_path] = security_tagging
+
+    try:
+        return getattr(security_tagging, function_name)(**kwargs)
+    finally:
+        # Worker processes exit without running finalizers, delete the temporary paths created by this process
+        temp_path_pool = security_tagging._temp_path_pools.pop(os.getpid(), None)
+        if temp_path_pool is not None:
+            temp_path_pool.close()
 
 
 class SecurityTagging(Library):
-    """ A high level Python wrapper for Glasswall Security Tagging. """
+    """ A high level Python wrapper for Glasswall Security Tagging.
+
+    Args:
+        library_path (str): The Security Tagging library path or directory.
+        verification (str, optional): Default "sampled". How tag_file checks that tags are retrievable from each output file, deleting output files without retrievable tags. Each verified file costs a second engine pass, GWSecuTag_RetrieveTagFile:
+            - "off": Do not verify.
+            - "sampled": Verify the first file and then one file in every 1 / verification_sample_rate files, in the same way as "retrieve_fast".
+            - "retrieve_fast": Verify every file, retrieving tags to a RAM-backed temporary file and checking the xml in memory.
+            - "retrieve": Verify every file, retrieving tags to a temporary file and parsing the xml with utils.xml_as_dict.
+        verification_sample_rate (float, optional): Default 0.01. The proportion of files to verify when verification is "sampled".
+    """
+    verification_modes = ("off", "sampled", "retrieve_fast", "retrieve")
+
+    def __init__(self, library_path: str, verification: str = "sampled", verification_sample_rate: float = 0.01):
+        if verification not in self.verification_modes:
+            raise ValueError(verification)
+        if not 0 <= verification_sample_rate <= 1:
+            raise ValueError(verification_sample_rate)
 
-    def __init__(self, library_path: str):
         super().__init__(library_path=library_path)
+        self.verification = verification
+        self.verification_sample_rate = verification_sample_rate
+        self._verification_count = 0
+        # Pools of temporary paths by process id, forked worker processes must not stage files at the paths of the parent process
+        self._temp_path_pools: Dict[int, utils.TempPathPool] = {}
         self.library = self.load_library(os.path.abspath(library_path))
 
-        log.info(f"Loaded Glasswall {self.__class__.__name__} version {self.version()} from {self.library_path}")
+        log.info("Loaded Glasswall %s version %s from %s", self.__class__.__name__, self.version(), self.library_path)
 
     def version(self):
         """ Returns the Glasswall library version.
@@ -28,7 +96,52 @@ class SecurityTagging(Library):
         # TODO security tagging currently has no version function
         return "NOT_IMPLEMENTED"
 
-    def tag_file(self, tags_path: str, input_file: str, output_file: str, raise_unsupported: bool = True):
+    def _sample(self) -> bool:
+        """ Returns True if the next file should be verified when verification is "sampled". """
+        self._verification_count += 1
+        if not self.verification_sample_rate:
+            return False
+        interval = max(1, round(1 / self.verification_sample_rate))
+        return (self._verification_count - 1) % interval == 0
+
+    @instrumented
+    def _verify_tags(self, output_file: str, verification: str, temp_file: Optional[str] = None) -> bool:
+        """ Returns True if tags are retrievable from output_file, or if output_file is not verified with the given verification mode. Tags are retrieved to temp_file, or to a path acquired from temp_path_pool if None. """
+        if verification == "off":
+            return True
+
+        if verification == "sampled" and not self._sample():
+            return True
+
+        if temp_file is None:
+            with self.temp_path_pool.paths(1) as (temp_file,):
+                return self._tags_retrievable(output_file, verification, temp_file)
+
+        return self._tags_retrievable(output_file, verification, temp_file)
+
+    def _tags_retrievable(self, output_file: str, verification: str, temp_file: str) -> bool:
+        """ Retrieves the tags of output_file to temp_file, returning True if the xml contains tags. """
+        self.retrieve_tags(
+            input_file=output_file,
+            output_file=temp_file,
+            raise_unsupported=False
+        )
+
+        if verification == "retrieve":
+            try:
+                dict_ = utils.xml_as_dict(temp_file)
+            except ValueError:
+                dict_ = {}
+            return bool(dict_)
+
+        # "sampled" and "retrieve_fast"
+        if not os.path.isfile(temp_file):
+            return False
+        with open(temp_file, "rb") as f:
+            return tags_retrieved(f.read())
+
+    @instrumented
+    def tag_file(self, tags_path: str, input_file: str, output_file: str, raise_unsupported: bool = True, verification: Optional[str] = None):
         """ Tags the input_file with xml loaded from tags_path, writing to output_file.
 
         Args:
@@ -36,6 +149,7 @@ class SecurityTagging(Library):
             input_file (str): The path to the input file.
             output_file (str): The path to the output file where the tagged input_file will be written to.
             raise_unsupported (bool, optional): Default True. Raise exceptions when Glasswall encounters an error. Fail silently if False.
+            verification (Optional[str], optional): Default None. Overrides the verification mode of the instance, one of "off", "sampled", "retrieve_fast", "retrieve". Output files that fail verification are deleted.
 
         Returns:
             status (int): An integer indicating the file process status.
@@ -61,6 +175,10 @@ class SecurityTagging(Library):
         if not isinstance(raise_unsupported, bool):
             raise TypeError(raise_unsupported)
 
+        verification = verification or self.verification
+        if verification not in self.verification_modes:
+            raise ValueError(verification)
+
         # Convert paths to absolute paths
         tags_path = os.path.abspath(tags_path)
         input_file = os.path.abspath(input_file)
@@ -86,36 +204,25 @@ class SecurityTagging(Library):
             )
 
             if status not in successes.success_codes:
-                log.error(f"\n\tinput_file: {input_file}\n\toutput_file: {output_file}\n\tstatus: {status}\n\ttags_path: {tags_path}")
+                log.error("\n\tinput_file: %s\n\toutput_file: %s\n\tstatus: %s\n\ttags_path: %s", input_file, output_file, status, tags_path)
                 if raise_unsupported:
                     raise errors.error_codes.get(status, errors.UnknownErrorCode)(status)
             else:
-                log.debug(f"\n\tinput_file: {input_file}\n\toutput_file: {output_file}\n\tstatus: {status}\n\ttags_path: {tags_path}")
+                log.debug("\n\tinput_file: %s\n\toutput_file: %s\n\tstatus: %s\n\ttags_path: %s", input_file, output_file, status, tags_path)
 
             # TODO remove, temp fix - check if tags are retrievable, if not delete the file just created by glasswall
             # if status not in successes.success_codes: # status is currently incorrect in the library
             if not os.path.isfile(output_file):
-                log.error(f"\n\toutput file does not exist: {output_file}")
+                log.error("\n\toutput file does not exist: %s", output_file)
                 status = "OUTPUT_NOT_CREATED"
-            elif os.path.isfile(output_file):
-                with utils.TempFilePath() as temp_file:
-                    self.retrieve_tags(
-                        input_file=output_file,
-                        output_file=temp_file,
-                        raise_unsupported=False
-                    )
-                    try:
-                        dict_ = utils.xml_as_dict(temp_file)
-                    except ValueError:
-                        dict_ = {}
-                    if not dict_:
-                        os.remove(output_file)
-                        log.debug(f"\n\tunable to retrieve tags, deleted output file\n\toutput_file: {output_file}\n\t")
-                        status = "OUTPUT_NOT_RETRIEVABLE"
+            elif not self._verify_tags(output_file, verification):
+                os.remove(output_file)
+                log.debug("\n\tunable to retrieve tags, deleted output file\n\toutput_file: %s\n\t", output_file)
+                status = "OUTPUT_NOT_RETRIEVABLE"
 
             return status
 
-    def tag_directory(self, tags_path: str, input_directory: str, output_directory: str, raise_unsupported: bool = True):
+    def tag_directory(self, tags_path: str, input_directory: str, output_directory: str, raise_unsupported: bool = True, verification: Optional[str] = None, incremental: Union[bool, str] = False):
         """ Tags all files in input_directory with the xml loaded from tags_path, writing to output_directory and maintaining the same directory structure.
 
         Args:
@@ -123,6 +230,8 @@ class SecurityTagging(Library):
             input_directory (str): The path to the input directory.
             output_directory (str): The path to the output directory where the tagged files will be written to.
             raise_unsupported (bool, optional): Default True. Raise exceptions when Glasswall encounters an error. Fail silently if False.
+            verification (Optional[str], optional): Default None. Overrides the verification mode of the instance, one of "off", "sampled", "retrieve_fast", "retrieve".
+            incremental (Union[bool, str], optional): Default False. Skip files that are unchanged since they were last processed successfully with the same tags, using a change index persisted in the output directory, or at this path if str.
 
         Returns:
             status (int): An integer indicating the file process status.
@@ -148,21 +257,129 @@ class SecurityTagging(Library):
         if not isinstance(raise_unsupported, bool):
             raise TypeError(raise_unsupported)
 
-        for relative_path in utils.list_file_paths(input_directory, absolute=False):
-            # construct absolute paths
-            input_file = os.path.abspath(os.path.join(input_directory, relative_path))
-            output_file = os.path.abspath(os.path.join(output_directory, relative_path))
+        with ChangeIndex.for_directory(output_directory, operation="SecurityTagging.tag_file", settings=(tags_path,), enabled=incremental) as change_index:
+            for relative_path in utils.list_file_paths(input_directory, absolute=False):
+                # construct absolute paths
+                input_file = os.path.abspath(os.path.join(input_directory, relative_path))
+                output_file = os.path.abspath(os.path.join(output_directory, relative_path))
+
+                if change_index.is_unchanged(relative_path, input_file, output_file):
+                    continue
+
+                # call tag_file on each file in input to output
+                status = self.tag_file(
+                    tags_path=tags_path,
+                    input_file=input_file,
+                    output_file=output_file,
+                    raise_unsupported=raise_unsupported,
+                    verification=verification,
+                )
+                change_index.record(relative_path, input_file, output_file, success=status in successes.success_codes, status=status)
+
+        utils.delete_empty_subdirectories(output_directory)
+
+    @property
+    def temp_path_pool(self) -> utils.TempPathPool:
+        """ The RAM-backed pool of temporary paths used to stage files for tag_bytes and retrieve_tags_bytes and to retrieve tags for verification, created on first use in each process. """
+        pid = os.getpid()
+        if pid not in self._temp_path_pools:
+            self._temp_path_pools[pid] = utils.TempPathPool()
+        return self._temp_path_pools[pid]
+
+    @instrumented
+    def tag_bytes(self, tags: Union[str, bytes, bytearray, io.BytesIO], input_file: Union[bytes, bytearray, io.BytesIO], raise_unsupported: bool = True, verification: Optional[str] = None):
+        """ Tags input_file bytes with the given tags, returning the tagged file bytes.
+
+        Security Tagging only supports file paths, so the input, output and tags retrieved for verification are staged through a pool of reusable RAM-backed temporary paths (see temp_path_pool) rather than new temporary files on disk.
+
+        Args:
+            tags (Union[str, bytes, bytearray, io.BytesIO]): The path to the .xml file containing tags to add, or the xml bytes.
+            input_file (Union[bytes, bytearray, io.BytesIO]): The input file bytes.
+            raise_unsupported (bool, optional): Default True. Raise exceptions when Glasswall encounters an error. Fail silently if False.
+            verification (Optional[str], optional): Default None. Overrides the verification mode of the instance, one of "off", "sampled", "retrieve_fast", "retrieve".
+
+        Returns:
+            gw_return_object (glasswall.GwReturnObj): An instance of class glasswall.GwReturnObj containing attributes: "status" (Union[int, str]), "output_file" (bytes). "output_file" is empty if the file was not tagged.
+        """
+        # Validate arg types
+        if not isinstance(tags, (str, bytes, bytearray, io.BytesIO)):
+            raise TypeError(tags)
+        if not isinstance(input_file, (bytes, bytearray, io.BytesIO)):
+            raise TypeError(input_file)
+
+        verification = verification or self.verification
+        if verification not in self.verification_modes:
+            raise ValueError(verification)
 
-            # call tag_file on each file in input to output
-            self.tag_file(
+        # Acquire all paths at once, the tags are only staged if they are not already a file path
+        with self.temp_path_pool.paths(3 if isinstance(tags, str) else 4) as paths:
+            input_path, output_path, verification_path = paths[:3]
+            if isinstance(tags, str):
+                tags_path = tags
+            else:
+                tags_path = paths[3]
+                with open(tags_path, "wb") as f:
+                    f.write(utils.as_bytes(tags))
+            with open(input_path, "wb") as f:
+                f.write(utils.as_bytes(input_file))
+
+            gw_return_object = glasswall.GwReturnObj()
+            gw_return_object.status = self.tag_file(
                 tags_path=tags_path,
-                input_file=input_file,
-                output_file=output_file,
+                input_file=input_path,
+                output_file=output_path,
                 raise_unsupported=raise_unsupported,
+                verification="off",
             )
+            # Verify here rather than in tag_file to retrieve the tags to a path already acquired from the pool
+            if os.path.isfile(output_path) and not self._verify_tags(output_path, verification, temp_file=verification_path):
+                os.remove(output_path)
+                log.debug("\n\tunable to retrieve tags, deleted output file\n\toutput_file: %s\n\t", output_path)
+                gw_return_object.status = "OUTPUT_NOT_RETRIEVABLE"
 
-        utils.delete_empty_subdirectories(output_directory)
+            gw_return_object.output_file = b""
+            if os.path.isfile(output_path):
+                with open(output_path, "rb") as f:
+                    gw_return_object.output_file = f.read()
+
+        return gw_return_object
+
+    @instrumented
+    def retrieve_tags_bytes(self, input_file: Union[bytes, bytearray, io.BytesIO], raise_unsupported: bool = True):
+        """ Retrieves the xml tags of input_file bytes, returning the xml bytes.
+
+        Security Tagging only supports file paths, so the input and output are staged through a pool of reusable RAM-backed temporary paths (see temp_path_pool) rather than new temporary files on disk.
+
+        Args:
+            input_file (Union[bytes, bytearray, io.BytesIO]): The input file bytes.
+            raise_unsupported (bool, optional): Default True. Raise exceptions when Glasswall encounters an error. Fail silently if False.
+
+        Returns:
+            gw_return_object (glasswall.GwReturnObj): An instance of class glasswall.GwReturnObj containing attributes: "status" (int), "output_file" (bytes) the xml tags.
+        """
+        # Validate arg types
+        if not isinstance(input_file, (bytes, bytearray, io.BytesIO)):
+            raise TypeError(input_file)
 
+        with self.temp_path_pool.paths(2) as (input_path, output_path):
+            with open(input_path, "wb") as f:
+                f.write(utils.as_bytes(input_file))
+
+            gw_return_object = glasswall.GwReturnObj()
+            gw_return_object.status = self.retrieve_tags(
+                input_file=input_path,
+                output_file=output_path,
+                raise_unsupported=raise_unsupported,
+            )
+
+            gw_return_object.output_file = b""
+            if os.path.isfile(output_path):
+                with open(output_path, "rb") as f:
+                    gw_return_object.output_file = f.read()
+
+        return gw_return_object
+
+    @instrumented
     def retrieve_tags(self, input_file: str, output_file: str, raise_unsupported=True):
         """ Retrieves the xml tags of the input_file and writes it to output_file.
 
@@ -193,7 +410,7 @@ class SecurityTagging(Library):
         # Make output directory if it does not exist
         os.makedirs(os.path.dirname(output_file), exist_ok=True)
 
-        log.debug(f"Attempting {sys._getframe().f_code.co_name}:\n\tinput_file: {input_file}\n\toutput_file: {output_file}")
+        log.debug("Attempting %s:\n\tinput_file: %s\n\toutput_file: %s", sys._getframe().f_code.co_name, input_file, output_file)
 
         with utils.CwdHandler(self.library_path):
             # API function declaration
@@ -210,21 +427,22 @@ class SecurityTagging(Library):
             )
 
             if status not in successes.success_codes:
-                log.error(f"\n\tinput_file: {input_file}\n\toutput_file: {output_file}\n\tstatus: {status}")
+                log.error("\n\tinput_file: %s\n\toutput_file: %s\n\tstatus: %s", input_file, output_file, status)
                 if raise_unsupported:
                     raise errors.error_codes.get(status, errors.UnknownErrorCode)(status)
             else:
-                log.debug(f"\n\tinput_file: {input_file}\n\toutput_file: {output_file}\n\tstatus: {status}")
+                log.debug("\n\tinput_file: %s\n\toutput_file: %s\n\tstatus: %s", input_file, output_file, status)
 
             return status
 
-    def retrieve_tags_directory(self, input_directory: str, output_directory: str, raise_unsupported=True):
+    def retrieve_tags_directory(self, input_directory: str, output_directory: str, raise_unsupported=True, incremental: Union[bool, str] = False):
         """ Retrieves all tags from files in input_directory, writing XML to output_directory and maintaining the same directory structure.
 
         Args:
             input_directory (str): The path to the input directory.
             output_directory (str): The path to the output directory where the tagged files will be written to.
             raise_unsupported (bool, optional): Default True. Raise exceptions when Glasswall encounters an error. Fail silently if False.
+            incremental (Union[bool, str], optional): Default False. Skip files that are unchanged since their tags were last retrieved successfully, using a change index persisted in the output directory, or at this path if str.
 
         Returns:
             status (int): The status of the function call.
@@ -245,16 +463,186 @@ class SecurityTagging(Library):
         if not isinstance(raise_unsupported, bool):
             raise TypeError(raise_unsupported)
 
-        for relative_path in utils.list_file_paths(input_directory, absolute=False):
-            # construct absolute paths
-            input_file = os.path.abspath(os.path.join(input_directory, relative_path))
-            output_file = os.path.abspath(os.path.join(output_directory, relative_path + ".xml"))
+        with ChangeIndex.for_directory(output_directory, operation="SecurityTagging.retrieve_tags", enabled=incremental) as change_index:
+            for relative_path in utils.list_file_paths(input_directory, absolute=False):
+                # construct absolute paths
+                input_file = os.path.abspath(os.path.join(input_directory, relative_path))
+                output_file = os.path.abspath(os.path.join(output_directory, relative_path + ".xml"))
 
-            # call retrieve_tags on each file in input to output
-            self.retrieve_tags(
-                input_file=input_file,
-                output_file=output_file,
-                raise_unsupported=raise_unsupported,
-            )
+                if change_index.is_unchanged(relative_path, input_file, output_file):
+                    continue
+
+                # call retrieve_tags on each file in input to output
+                status = self.retrieve_tags(
+                    input_file=input_file,
+                    output_file=output_file,
+                    raise_unsupported=raise_unsupported,
+                )
+                change_index.record(relative_path, input_file, output_file, success=status in successes.success_codes, status=status)
 
         utils.delete_empty_subdirectories(output_directory)
+
+    def _process_directory_as_completed(self, function_name: str, output_extension: str, input_directory: str, output_directory: str, manifest_file: Optional[str] = None, max_workers: Optional[int] = None, worker_timeout_seconds: Optional[float] = None, memory_limit_in_gib: Optional[float] = None, raise_unsupported: bool = True, verification: Optional[str] = None, incremental: Union[bool, str] = False, **kwargs) -> Generator[dict, None, None]:
+        """ Calls `function_name` on each file in input_directory in parallel worker processes, skipping files that are unchanged according to the change index if incremental, and yielding a manifest entry per file as soon as it is processed. """
+        # Validate arg types
+        if not isinstance(input_directory, str):
+            raise TypeError(input_directory)
+        elif not os.path.isdir(input_directory):
+            raise NotADirectoryError(input_directory)
+
+        if not isinstance(output_directory, str):
+            raise TypeError(output_directory)
+
+        if not isinstance(raise_unsupported, bool):
+            raise TypeError(raise_unsupported)
+
+        verification = verification or self.verification
+        if verification not in self.verification_modes:
+            raise ValueError(verification)
+
+        input_directory = os.path.abspath(input_directory)
+        output_directory = os.path.abspath(output_directory)
+        # Files are only skipped if they were processed by the same function with the same tags. Commit each record, processing a file in a worker process costs far more than a commit.
+        settings = () if kwargs.get("tags_path") is None else (kwargs["tags_path"],)
+        with ChangeIndex.for_directory(output_directory, operation=f"SecurityTagging.{function_name}", settings=settings, enabled=incremental, commit_interval=1) as change_index:
+            process_manager = GlasswallProcessManager(
+                max_workers=max_workers,
+                worker_timeout_seconds=worker_timeout_seconds,
+                memory_limit_in_gib=memory_limit_in_gib,
+            )
+            for relative_path in utils.list_file_paths(input_directory, absolute=False):
+                # construct absolute paths
+                input_file = os.path.join(input_directory, relative_path)
+                output_file = os.path.join(output_directory, relative_path + output_extension)
+
+                if change_index.is_unchanged(relative_path, input_file, output_file):
+                    continue
+
+                task_kwargs = dict(
+                    library_path=self.library_path,
+                    function_name=function_name,
+                    input_file=input_file,
+                    output_file=output_file,
+                    raise_unsupported=raise_unsupported,
+                    **kwargs,
+                )
+                if function_name == "tag_file":
+                    # Sample in this process, worker processes do not share a verification count
+                    if verification == "sampled":
+                        task_kwargs["verification"] = "retrieve_fast" if self._sample() else "off"
+                    else:
+                        task_kwargs["verification"] = verification
+
+                process_manager.queue_task(Task(func=_process_file, kwargs=task_kwargs))
+
+            _instances[self.library_path] = self
+            manifest = None if manifest_file is None else Manifest(manifest_file)
+            # Output subdirectories of failed files, removed at the end if empty. Removing them while workers are running races with workers creating them.
+            failed_output_directories = set()
+            try:
+                for task_result in process_manager.as_completed():
+                    input_file = task_result.task.kwargs["input_file"]
+                    output_file = task_result.task.kwargs["output_file"]
+                    output_exists = os.path.isfile(output_file)
+                    if not output_exists:
+                        failed_output_directories.add(os.path.dirname(output_file))
+
+                    entry = Manifest.entry_from_task_result(
+                        task_result,
+                        relative_path=os.path.relpath(input_file, input_directory),
+                        input_file=input_file,
+                        output_file=output_file,
+                        function_name=function_name,
+                        status=task_result.result,
+                        output_exists=output_exists,
+                    )
+                    entry["success"] = entry["success"] and task_result.result in successes.success_codes and output_exists
+                    if manifest is not None:
+                        manifest.write(entry)
+                    change_index.record(entry["relative_path"], input_file, output_file, success=entry["success"], status=entry["status"])
+
+                    yield entry
+            finally:
+                _instances.pop(self.library_path, None)
+                if manifest is not None:
+                    manifest.close()
+
+                # Remove empty output subdirectories of failed files rather than walking output_directory, deepest first
+                for directory in sorted(failed_output_directories, key=len, reverse=True):
+                    while directory != output_directory and directory.startswith(output_directory):
+                        try:
+                            os.rmdir(directory)
+                        except OSError:
+                            break
+                        directory = os.path.dirname(directory)
+
+    def tag_directory_as_completed(self, tags_path: str, input_directory: str, output_directory: str, manifest_file: Optional[str] = None, max_workers: Optional[int] = None, worker_timeout_seconds: Optional[float] = None, memory_limit_in_gib: Optional[float] = None, raise_unsupported: bool = True, verification: Optional[str] = None, incremental: Union[bool, str] = False) -> Generator[dict, None, None]:
+        """ Tags all files in input_directory with the xml loaded from tags_path in parallel worker processes, writing to output_directory and maintaining the same directory structure. Yields a manifest entry per file as soon as it is tagged.
+
+        If manifest_file is given, each entry is appended to it as soon as it is available. If incremental is set, each file is recorded in the change index as soon as it is tagged, and files that were tagged successfully with the same tags by a previous run of this method or tag_directory are skipped if their input is unchanged and their output file still exists. Re-running with incremental after an interruption resumes where the previous run stopped.
+
+        Args:
+            tags_path (str): The path to the .xml file containing tags to add.
+            input_directory (str): The path to the input directory.
+            output_directory (str): The path to the output directory where the tagged files will be written to.
+            manifest_file (Optional[str], optional): Default None. The checkpoint manifest path, written in JSON Lines format.
+            max_workers (Optional[int], optional): Default None. The maximum number of worker processes. If None, the number of logical CPUs is used.
+            worker_timeout_seconds (Optional[float], optional): Default None. The time limit for tagging each file.
+            memory_limit_in_gib (Optional[float], optional): Default None. The memory limit for tagging each file.
+            raise_unsupported (bool, optional): Default True. Raise exceptions when Glasswall encounters an error. Exceptions are raised in the worker process and recorded in the manifest entry.
+            verification (Optional[str], optional): Default None. Overrides the verification mode of the instance, one of "off", "sampled", "retrieve_fast", "retrieve".
+            incremental (Union[bool, str], optional): Default False. Skip files that are unchanged since they were last tagged successfully with the same tags, using a change index persisted in the output directory, or at this path if str. Skipped files are not yielded.
+
+        Yields:
+            entry (dict): A manifest entry for each file with keys: "relative_path", "input_file", "output_file", "function_name", "status", "output_exists", "success", "exception", "exit_code", "timed_out", "out_of_memory", "max_memory_used_in_gib", "start_time", "end_time", "elapsed_time".
+        """
+        if not isinstance(tags_path, str):
+            raise TypeError(tags_path)
+        elif not os.path.isfile(tags_path):
+            raise FileNotFoundError(tags_path)
+
+        yield from self._process_directory_as_completed(
+            function_name="tag_file",
+            output_extension="",
+            input_directory=input_directory,
+            output_directory=output_directory,
+            manifest_file=manifest_file,
+            max_workers=max_workers,
+            worker_timeout_seconds=worker_timeout_seconds,
+            memory_limit_in_gib=memory_limit_in_gib,
+            raise_unsupported=raise_unsupported,
+            verification=verification,
+            incremental=incremental,
+            tags_path=os.path.abspath(tags_path),
+        )
+
+    def retrieve_tags_directory_as_completed(self, input_directory: str, output_directory: str, manifest_file: Optional[str] = None, max_workers: Optional[int] = None, worker_timeout_seconds: Optional[float] = None, memory_limit_in_gib: Optional[float] = None, raise_unsupported: bool = True, incremental: Union[bool, str] = False) -> Generator[dict, None, None]:
+        """ Retrieves all tags from files in input_directory in parallel worker processes, writing XML to output_directory and maintaining the same directory structure. Yields a manifest entry per file as soon as its tags are retrieved.
+
+        If manifest_file is given, each entry is appended to it as soon as it is available. If incremental is set, files whose tags were retrieved successfully by a previous run of this method or retrieve_tags_directory are skipped if their input is unchanged and their output file still exists.
+
+        Args:
+            input_directory (str): The path to the input directory.
+            output_directory (str): The path to the output directory where the xml tags will be written to.
+            manifest_file (Optional[str], optional): Default None. The checkpoint manifest path, written in JSON Lines format.
+            max_workers (Optional[int], optional): Default None. The maximum number of worker processes. If None, the number of logical CPUs is used.
+            worker_timeout_seconds (Optional[float], optional): Default None. The time limit for retrieving the tags of each file.
+            memory_limit_in_gib (Optional[float], optional): Default None. The memory limit for retrieving the tags of each file.
+            raise_unsupported (bool, optional): Default True. Raise exceptions when Glasswall encounters an error. Exceptions are raised in the worker process and recorded in the manifest entry.
+            incremental (Union[bool, str], optional): Default False. Skip files that are unchanged since their tags were last retrieved successfully, using a change index persisted in the output directory, or at this path if str. Skipped files are not yielded.
+
+        Yields:
+            entry (dict): A manifest entry for each file, see tag_directory_as_completed.
+        """
+        yield from self._process_directory_as_completed(
+            function_name="retrieve_tags",
+            output_extension=".xml",
+            input_directory=input_directory,
+            output_directory=output_directory,
+            manifest_file=manifest_file,
+            max_workers=max_workers,
+            worker_timeout_seconds=worker_timeout_seconds,
+            memory_limit_in_gib=memory_limit_in_gib,
+            raise_unsupported=raise_unsupported,
+            incremental=incremental,
+        )
@@ -1,15 +1,49 @@
 
 
 import ctypes as ct
+import functools
 import io
 import os
-from typing import Optional, Union
+import uuid
+from typing import Dict, Generator, Optional, Union
 
 import glasswall
 from glasswall import utils
+from glasswall.change_index import ChangeIndex
 from glasswall.config.logging import log
+from glasswall.instrumentation import instrumented
 from glasswall.libraries.library import Library
 from glasswall.libraries.word_search import errors, successes
+from glasswall.multiprocessing import GlasswallProcessManager, Task, TaskResult
+
+# Sessions by key. Forked worker processes inherit the sessions of the parent process and skip loading WordSearch, the homoglyphs and the policy. Spawned worker processes, one per task, start with no sessions.
+_sessions: Dict[str, "WordSearchSession"] = {}
+
+
+@functools.lru_cache()
+def _load_default_homoglyphs() -> bytes:
+    """ Returns the bytes of the default homoglyphs json file, read from disk once per process. """
+    with open(os.path.join(glasswall._ROOT, "config", "word_search", "homoglyphs.json"), "rb") as f:
+        return f.read()
+
+
+def _redact_file(library_path: str, session_key: str, content_management_policy: str, homoglyphs: bytes, **kwargs):
+    """ Redacts a single file in a worker process using the session registered under session_key, creating the session if it was not inherited from the parent process.
+
+    A summary of the result is returned instead of the redacted file and report bytes so that memory usage in the parent process does not grow with the number of files.
+    """
+    session = _sessions.get(session_key)
+    if session is None:
+        session = WordSearch(library_path).session(content_management_policy=content_management_policy, homoglyphs=homoglyphs)
+        _sessions[session_key] = session
+
+    gw_return_object = session.redact_file(**kwargs)
+
+    return dict(
+        status=gw_return_object.status,
+        output_file_size=len(gw_return_object.output_file),
+        output_report_size=len(gw_return_object.output_report),
+    )
 
 
 class WordSearch(Library):
@@ -19,7 +53,7 @@ class WordSearch(Library):
         super().__init__(library_path=library_path)
         self.library = self.load_library(os.path.abspath(library_path))
 
-        log.info(f"Loaded Glasswall {self.__class__.__name__} version {self.version()} from {self.library_path}")
+        log.info("Loaded Glasswall %s version %s from %s", self.__class__.__name__, self.version(), self.library_path)
 
     def version(self):
         """ Returns the Glasswall library version.
@@ -38,10 +72,25 @@ class WordSearch(Library):
 
         return version
 
+    def session(self, content_management_policy: Union[str, bytes, bytearray, io.BytesIO, "glasswall.content_management.policies.policy.Policy"], homoglyphs: Union[None, str, bytes, bytearray, io.BytesIO] = None):
+        """ Returns a WordSearchSession that loads the homoglyphs and validates the content_management_policy once, to redact many files.
+
+        Args:
+            content_management_policy (Union[str, bytes, bytearray, io.BytesIO, glasswall.content_management.policies.policy.Policy]): The content management policy to apply.
+            homoglyphs (Union[None, str, bytes, bytearray, io.BytesIO)], optional): Default None. The homoglyphs json file path or bytes.
+
+        Returns:
+            session (glasswall.libraries.word_search.word_search.WordSearchSession): The session.
+        """
+        return WordSearchSession(word_search=self, content_management_policy=content_management_policy, homoglyphs=homoglyphs)
+
+    @instrumented
     @glasswall.utils.deprecated_alias(xml_config="content_management_policy")
     def redact_file(self, input_file: Union[str, bytes, bytearray, io.BytesIO], content_management_policy: Union[str, bytes, bytearray, io.BytesIO], output_file: Union[None, str] = None, output_report: Union[None, str] = None, homoglyphs: Union[None, str, bytes, bytearray, io.BytesIO] = None, raise_unsupported: bool = True):
         """ Redacts text from input_file using the given content_management_policy and homoglyphs file, optionally writing the redacted file and report to the paths specified by output_file and output_report.
 
+        To redact many files with the same policy, use `session` to avoid loading the homoglyphs and validating the policy for each file.
+
         Args:
             input_file (Union[str, bytes, bytearray, io.BytesIO]): The input file path or bytes.
             content_management_policy (Union[str, bytes, bytearray, io.BytesIO)]): The content management policy to apply.
@@ -56,15 +105,128 @@ class WordSearch(Library):
         # Validate arg types
         if not isinstance(input_file, (str, bytes, bytearray, io.BytesIO)):
             raise TypeError(input_file)
-        if not isinstance(content_management_policy, (str, bytes, bytearray, io.BytesIO, glasswall.content_management.policies.policy.Policy)):
-            raise TypeError(content_management_policy)
         if not isinstance(output_file, (type(None), str)):
             raise TypeError(output_file)
         if not isinstance(output_report, (type(None), str)):
             raise TypeError(output_report)
+
+        return self.session(content_management_policy=content_management_policy, homoglyphs=homoglyphs).redact_file(
+            input_file=input_file,
+            output_file=output_file,
+            output_report=output_report,
+            raise_unsupported=raise_unsupported,
+        )
+
+    @glasswall.utils.deprecated_alias(xml_config="content_management_policy")
+    def redact_directory(self, input_directory: str, content_management_policy: Union[str, bytes, bytearray, io.BytesIO, glasswall.content_management.policies.policy.Policy], output_directory: Optional[str] = None, output_report_directory: Optional[str] = None, homoglyphs: Union[None, str, bytes, bytearray, io.BytesIO] = None, raise_unsupported: bool = True, incremental: Union[bool, str] = False):
+        """ Redacts all files in a directory and it's subdirectories using the given content_management_policy and homoglyphs file. The redacted files are written to output_directory maintaining the same directory structure as input_directory.
+
+        Args:
+            input_directory (str): The input directory containing files to redact.
+            output_directory (str): The output directory where the redacted files will be written.
+            output_report_directory (Optional[str], optional): Default None. If str, the output directory where analysis reports for each redacted file will be written.
+            content_management_policy (Union[str, bytes, bytearray, io.BytesIO)]): The content management policy to apply.
+            homoglyphs (Union[None, str, bytes, bytearray, io.BytesIO)], optional): Default None. The homoglyphs file path, str, or bytes.
+            raise_unsupported (bool, optional): Default True. Raise exceptions when Glasswall encounters an error. Fail silently if False.
+            incremental (Union[bool, str], optional): Default False. Skip files that are unchanged since they were last processed successfully with the same policy, using a change index persisted in the output directory, or at this path if str. Skipped files are not included in the returned dictionary.
+
+        Returns:
+            redacted_files_dict (dict): A dictionary of file paths relative to input_directory, and glasswall.GwReturnObj with attributes: "status" (int), "output_file" (bytes), "output_report" (bytes)
+        """
+        return self.session(content_management_policy=content_management_policy, homoglyphs=homoglyphs).redact_directory(
+            input_directory=input_directory,
+            output_directory=output_directory,
+            output_report_directory=output_report_directory,
+            raise_unsupported=raise_unsupported,
+            incremental=incremental,
+        )
+
+    def redact_directory_as_completed(self, input_directory: str, content_management_policy: Union[str, bytes, bytearray, io.BytesIO, "glasswall.content_management.policies.policy.Policy"], output_directory: Optional[str] = None, output_report_directory: Optional[str] = None, homoglyphs: Union[None, str, bytes, bytearray, io.BytesIO] = None, max_workers: Optional[int] = None, worker_timeout_seconds: Optional[float] = None, memory_limit_in_gib: Optional[float] = None, raise_unsupported: bool = True, incremental: Union[bool, str] = False) -> Generator[TaskResult, None, None]:
+        """ Redacts all files in a directory and it's subdirectories in parallel worker processes, yielding a TaskResult per file as soon as it is redacted. See WordSearchSession.redact_directory_as_completed. """
+        yield from self.session(content_management_policy=content_management_policy, homoglyphs=homoglyphs).redact_directory_as_completed(
+            input_directory=input_directory,
+            output_directory=output_directory,
+            output_report_directory=output_report_directory,
+            max_workers=max_workers,
+            worker_timeout_seconds=worker_timeout_seconds,
+            memory_limit_in_gib=memory_limit_in_gib,
+            raise_unsupported=raise_unsupported,
+            incremental=incremental,
+        )
+
+
+class WordSearchSession:
+    """ Redacts many files with WordSearch using the same content management policy and homoglyphs.
+
+    The homoglyphs are loaded and the policy is validated once when the session is created, and their ctypes buffers are kept alive for the lifetime of the session.
+
+    Args:
+        word_search (glasswall.WordSearch): The loaded WordSearch library.
+        content_management_policy (Union[str, bytes, bytearray, io.BytesIO, glasswall.content_management.policies.policy.Policy]): The content management policy to apply.
+        homoglyphs (Union[None, str, bytes, bytearray, io.BytesIO)], optional): Default None. The homoglyphs json file path or bytes. If None, the default homoglyphs are used.
+
+    Example:
+        with word_search.session(content_management_policy=policy) as session:
+            for input_file in input_files:
+                session.redact_file(input_file=input_file)
+    """
+
+    def __init__(self, word_search: WordSearch, content_management_policy: Union[str, bytes, bytearray, io.BytesIO, "glasswall.content_management.policies.policy.Policy"], homoglyphs: Union[None, str, bytes, bytearray, io.BytesIO] = None):
+        # Validate arg types
+        if not isinstance(content_management_policy, (str, bytes, bytearray, io.BytesIO, glasswall.content_management.policies.policy.Policy)):
+            raise TypeError(content_management_policy)
         if not isinstance(homoglyphs, (type(None), str, bytes, bytearray, io.BytesIO)):
             raise TypeError(homoglyphs)
 
+        self.word_search = word_search
+        self.key = uuid.uuid4().hex
+
+        if isinstance(homoglyphs, str):
+            with open(homoglyphs, "rb") as f:
+                self.homoglyphs = f.read()
+        elif isinstance(homoglyphs, (bytes, bytearray, io.BytesIO)):
+            self.homoglyphs = utils.as_bytes(homoglyphs)
+        elif isinstance(homoglyphs, type(None)):
+            # Load default
+            self.homoglyphs = _load_default_homoglyphs()
+        self.homoglyphs_repr = f"{type(self.homoglyphs)} length {len(self.homoglyphs)}" if not isinstance(homoglyphs, str) else homoglyphs
+
+        if isinstance(content_management_policy, str) and os.path.isfile(content_management_policy):
+            with open(content_management_policy, "rb") as f:
+                content_management_policy = f.read()
+        self.content_management_policy = utils.validate_xml(content_management_policy)
+
+        # Keep references to the ctypes buffers for the lifetime of the session
+        self._ct_homoglyphs = ct.c_char_p(self.homoglyphs)
+        self._ct_content_management_policy = ct.c_char_p(self.content_management_policy.encode())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _sessions.pop(self.key, None)
+
+    @instrumented
+    def redact_file(self, input_file: Union[str, bytes, bytearray, io.BytesIO], output_file: Union[None, str] = None, output_report: Union[None, str] = None, raise_unsupported: bool = True):
+        """ Redacts text from input_file using the session's content_management_policy and homoglyphs, optionally writing the redacted file and report to the paths specified by output_file and output_report.
+
+        Args:
+            input_file (Union[str, bytes, bytearray, io.BytesIO]): The input file path or bytes.
+            output_file (Union[None, str], optional): Default None. If str, write output_file to that path.
+            output_report (Union[None, str], optional): Default None. If str, write output_file to that path.
+            raise_unsupported (bool, optional): Default True. Raise exceptions when Glasswall encounters an error. Fail silently if False.
+
+        Returns:
+            gw_return_object (glasswall.GwReturnObj): An instance of class glasswall.GwReturnObj containing attributes: "status" (int), "output_file" (bytes), "output_report" (bytes)
+        """
+        # Validate arg types
+        if not isinstance(input_file, (str, bytes, bytearray, io.BytesIO)):
+            raise TypeError(input_file)
+        if not isinstance(output_file, (type(None), str)):
+            raise TypeError(output_file)
+        if not isinstance(output_report, (type(None), str)):
+            raise TypeError(output_report)
+
         # Convert string path arguments to absolute paths
         if isinstance(output_file, str):
             output_file = os.path.abspath(output_file)
@@ -80,22 +242,7 @@ class WordSearch(Library):
             input_file_bytes = utils.as_bytes(input_file)
         # warn if input_file is 0 bytes
         if not input_file_bytes:
-            log.warning(f"input_file is 0 bytes\n\tinput_file: {input_file}")
-
-        if isinstance(homoglyphs, str):
-            with open(homoglyphs, "rb") as f:
-                homoglyphs_bytes = f.read()
-        elif isinstance(homoglyphs, (bytes, bytearray, io.BytesIO)):
-            homoglyphs_bytes = utils.as_bytes(homoglyphs)
-        elif isinstance(homoglyphs, type(None)):
-            # Load default
-            with open(os.path.join(glasswall._ROOT, "config", "word_search", "homoglyphs.json"), "rb") as f:
-                homoglyphs_bytes = f.read()
-
-        if isinstance(content_management_policy, str) and os.path.isfile(content_management_policy):
-            with open(content_management_policy, "rb") as f:
-                content_management_policy = f.read()
-        content_management_policy = utils.validate_xml(content_management_policy)
+            log.warning("input_file is 0 bytes\n\tinput_file: %s", input_file)
 
         # Variable initialisation
         ct_input_buffer = ct.c_char_p(input_file_bytes)
@@ -104,20 +251,18 @@ class WordSearch(Library):
         ct_output_buffer_length = ct.c_size_t()
         ct_output_report_buffer = ct.c_void_p()
         ct_output_report_buffer_length = ct.c_size_t()
-        ct_homoglyphs = ct.c_char_p(homoglyphs_bytes)
-        ct_content_management_policy = ct.c_char_p(content_management_policy.encode())
         gw_return_object = glasswall.GwReturnObj()
 
-        with utils.CwdHandler(new_cwd=self.library_path):
-            gw_return_object.status = self.library.GwWordSearch(
+        with utils.CwdHandler(new_cwd=self.word_search.library_path):
+            gw_return_object.status = self.word_search.library.GwWordSearch(
                 ct_input_buffer,
                 ct_input_buffer_length,
                 ct.byref(ct_output_buffer),
                 ct.byref(ct_output_buffer_length),
                 ct.byref(ct_output_report_buffer),
                 ct.byref(ct_output_report_buffer_length),
-                ct_homoglyphs,
-                ct_content_management_policy
+                self._ct_homoglyphs,
+                self._ct_content_management_policy
             )
 
         gw_return_object.output_file = utils.buffer_to_bytes(
@@ -132,13 +277,12 @@ class WordSearch(Library):
         input_file_repr = f"{type(input_file_bytes)} length {len(input_file_bytes)}" if not isinstance(input_file, str) else input_file
         output_file_repr = f"{type(gw_return_object.output_file)} length {len(gw_return_object.output_file)}"
         output_report_repr = f"{type(gw_return_object.output_report)} length {len(gw_return_object.output_report)}"
-        homoglyphs_repr = f"{type(homoglyphs_bytes)} length {len(homoglyphs_bytes)}" if not isinstance(homoglyphs, str) else homoglyphs
         if gw_return_object.status not in successes.success_codes:
-            log.error(f"\n\tinput_file: {input_file_repr}\n\toutput_file: {output_file_repr}\n\toutput_report: {output_report_repr}\n\thomoglyphs: {homoglyphs_repr}\n\tstatus: {gw_return_object.status}\n\tcontent_management_policy:\n{content_management_policy}")
+            log.error("\n\tinput_file: %s\n\toutput_file: %s\n\toutput_report: %s\n\thomoglyphs: %s\n\tstatus: %s\n\tcontent_management_policy:\n%s", input_file_repr, output_file_repr, output_report_repr, self.homoglyphs_repr, gw_return_object.status, self.content_management_policy)
             if raise_unsupported:
                 raise errors.error_codes.get(gw_return_object.status, errors.UnknownErrorCode)(gw_return_object.status)
         else:
-            log.debug(f"\n\tinput_file: {input_file_repr}\n\toutput_file: {output_file_repr}\n\toutput_report: {output_report_repr}\n\thomoglyphs: {homoglyphs_repr}\n\tstatus: {gw_return_object.status}\n\tcontent_management_policy:\n{content_management_policy}")
+            log.debug("\n\tinput_file: %s\n\toutput_file: %s\n\toutput_report: %s\n\thomoglyphs: %s\n\tstatus: %s\n\tcontent_management_policy:\n%s", input_file_repr, output_file_repr, output_report_repr, self.homoglyphs_repr, gw_return_object.status, self.content_management_policy)
 
         # Write output file
         if gw_return_object.output_file:
@@ -156,50 +300,113 @@ class WordSearch(Library):
 
         if input_file_bytes and not gw_return_object.output_file:
             # input_file_bytes was not empty but output_file is unexpectedly empty
-            log.error(f"output_file empty\n\tinput_file: {input_file_repr}\n\tct_output_buffer: {ct_output_buffer}\n\tct_output_buffer_length: {ct_output_buffer_length}\n\toutput_file: {gw_return_object.output_file}")
+            log.error("output_file empty\n\tinput_file: %s\n\tct_output_buffer: %s\n\tct_output_buffer_length: %s\n\toutput_file: %s", input_file_repr, ct_output_buffer, ct_output_buffer_length, gw_return_object.output_file)
             if raise_unsupported:
                 raise errors.WordSearchError(f"Unexpected empty output_file after calling GwWordSearch\n\toutput_file: {output_file}")
 
         if input_file_bytes and not gw_return_object.output_report:
             # input_file_bytes was not empty but output_report is unexpectedly empty
-            log.error(f"output_report empty\n\tinput_file: {input_file_repr}\n\tct_output_report_buffer: {ct_output_report_buffer}\n\tct_output_report_buffer_length: {ct_output_report_buffer_length}")
+            log.error("output_report empty\n\tinput_file: %s\n\tct_output_report_buffer: %s\n\tct_output_report_buffer_length: %s", input_file_repr, ct_output_report_buffer, ct_output_report_buffer_length)
             if raise_unsupported:
                 raise errors.WordSearchError(f"Unexpected empty output_report after calling GwWordSearch\n\toutput_report: {output_report}")
 
         return gw_return_object
 
-    @glasswall.utils.deprecated_alias(xml_config="content_management_policy")
-    def redact_directory(self, input_directory: str, content_management_policy: Union[str, bytes, bytearray, io.BytesIO, glasswall.content_management.policies.policy.Policy], output_directory: Optional[str] = None, output_report_directory: Optional[str] = None, homoglyphs: Union[None, str, bytes, bytearray, io.BytesIO] = None, raise_unsupported: bool = True):
-        """ Redacts all files in a directory and it's subdirectories using the given content_management_policy and homoglyphs file. The redacted files are written to output_directory maintaining the same directory structure as input_directory.
+    def redact_directory(self, input_directory: str, output_directory: Optional[str] = None, output_report_directory: Optional[str] = None, raise_unsupported: bool = True, incremental: Union[bool, str] = False):
+        """ Redacts all files in a directory and it's subdirectories using the session's content_management_policy and homoglyphs. The redacted files are written to output_directory maintaining the same directory structure as input_directory.
 
         Args:
             input_directory (str): The input directory containing files to redact.
             output_directory (str): The output directory where the redacted files will be written.
             output_report_directory (Optional[str], optional): Default None. If str, the output directory where analysis reports for each redacted file will be written.
-            content_management_policy (Union[str, bytes, bytearray, io.BytesIO)]): The content management policy to apply.
-            homoglyphs (Union[None, str, bytes, bytearray, io.BytesIO)], optional): Default None. The homoglyphs file path, str, or bytes.
             raise_unsupported (bool, optional): Default True. Raise exceptions when Glasswall encounters an error. Fail silently if False.
+            incremental (Union[bool, str], optional): Default False. Skip files that are unchanged since they were last processed successfully with the same policy, using a change index persisted in the output directory, or at this path if str. Skipped files are not included in the returned dictionary.
 
         Returns:
             redacted_files_dict (dict): A dictionary of file paths relative to input_directory, and glasswall.GwReturnObj with attributes: "status" (int), "output_file" (bytes), "output_report" (bytes)
         """
         redacted_files_dict = {}
         # Call redact_file on each file in input_directory
-        for input_file in utils.list_file_paths(input_directory):
-            relative_path = os.path.relpath(input_file, input_directory)
-            # Construct paths for output file and output report
-            output_file = None if output_directory is None else os.path.join(os.path.abspath(output_directory), relative_path)
-            output_report = None if output_report_directory is None else os.path.join(os.path.abspath(output_report_directory), relative_path + ".xml")
-
-            result = self.redact_file(
-                input_file=input_file,
-                output_file=output_file,
-                output_report=output_report,
-                homoglyphs=homoglyphs,
-                content_management_policy=content_management_policy,
-                raise_unsupported=raise_unsupported,
-            )
-
-            redacted_files_dict[relative_path] = result
+        with ChangeIndex.for_directory(output_directory, output_report_directory, operation="WordSearch.redact_file", settings=(self.content_management_policy, self.homoglyphs), enabled=incremental) as change_index:
+            for input_file in utils.list_file_paths(input_directory):
+                relative_path = os.path.relpath(input_file, input_directory)
+                # Construct paths for output file and output report
+                output_file = None if output_directory is None else os.path.join(os.path.abspath(output_directory), relative_path)
+                output_report = None if output_report_directory is None else os.path.join(os.path.abspath(output_report_directory), relative_path + ".xml")
+
+                if change_index.is_unchanged(relative_path, input_file, output_file, output_report):
+                    continue
+
+                result = self.redact_file(
+                    input_file=input_file,
+                    output_file=output_file,
+                    output_report=output_report,
+                    raise_unsupported=raise_unsupported,
+                )
+                change_index.record(relative_path, input_file, output_file, output_report, success=result.status in successes.success_codes, status=result.status)
+
+                redacted_files_dict[relative_path] = result
 
         return redacted_files_dict
+
+    def redact_directory_as_completed(self, input_directory: str, output_directory: Optional[str] = None, output_report_directory: Optional[str] = None, max_workers: Optional[int] = None, worker_timeout_seconds: Optional[float] = None, memory_limit_in_gib: Optional[float] = None, raise_unsupported: bool = True, incremental: Union[bool, str] = False) -> Generator[TaskResult, None, None]:
+        """ Redacts all files in a directory and it's subdirectories in parallel worker processes, yielding a TaskResult per file as soon as it is redacted. The redacted files are written to output_directory maintaining the same directory structure as input_directory.
+
+        GlasswallProcessManager starts a new worker process per file. Where worker processes are forked, each worker inherits this session and its loaded library, homoglyphs and policy, so there is no setup cost per file. Where they are spawned (the default on Windows and macOS), each worker loads WordSearch and creates the session again from the policy and homoglyphs, once per file.
+
+        Args:
+            input_directory (str): The input directory containing files to redact.
+            output_directory (Optional[str], optional): Default None. If str, the output directory where the redacted files will be written.
+            output_report_directory (Optional[str], optional): Default None. If str, the output directory where analysis reports for each redacted file will be written.
+            max_workers (Optional[int], optional): Default None. The maximum number of worker processes. If None, the number of logical CPUs is used.
+            worker_timeout_seconds (Optional[float], optional): Default None. The time limit for redacting each file.
+            memory_limit_in_gib (Optional[float], optional): Default None. The memory limit for redacting each file.
+            raise_unsupported (bool, optional): Default True. Raise exceptions when Glasswall encounters an error. Exceptions are raised in the worker process and returned as the TaskResult exception.
+            incremental (Union[bool, str], optional): Default False. Skip files that are unchanged since they were last redacted successfully with the same policy and homoglyphs, by this method or redact_directory, using a change index persisted in the output directory, or at this path if str. Each file is recorded as soon as it is redacted, so re-running after an interruption resumes where the previous run stopped. Skipped files are not yielded.
+
+        Yields:
+            task_result (glasswall.multiprocessing.TaskResult): A TaskResult for each file, with additional attributes "relative_path" (str), "output_file" (Optional[str]) and "output_report" (Optional[str]). "result" is a dict with keys: "status" (int), "output_file_size" (int), "output_report_size" (int).
+        """
+        input_directory = os.path.abspath(input_directory)
+        _sessions[self.key] = self
+        # Commit each record, redacting a file in a worker process costs far more than a commit
+        change_index = ChangeIndex.for_directory(output_directory, output_report_directory, operation="WordSearch.redact_file", settings=(self.content_management_policy, self.homoglyphs), enabled=incremental, commit_interval=1)
+        try:
+            process_manager = GlasswallProcessManager(
+                max_workers=max_workers,
+                worker_timeout_seconds=worker_timeout_seconds,
+                memory_limit_in_gib=memory_limit_in_gib,
+            )
+            for input_file in utils.list_file_paths(input_directory):
+                relative_path = os.path.relpath(input_file, input_directory)
+                # Construct paths for output file and output report
+                output_file = None if output_directory is None else os.path.join(os.path.abspath(output_directory), relative_path)
+                output_report = None if output_report_directory is None else os.path.join(os.path.abspath(output_report_directory), relative_path + ".xml")
+
+                if change_index.is_unchanged(relative_path, input_file, output_file, output_report):
+                    continue
+
+                process_manager.queue_task(Task(
+                    func=_redact_file,
+                    kwargs=dict(
+                        library_path=self.word_search.library_path,
+                        session_key=self.key,
+                        content_management_policy=self.content_management_policy,
+                        homoglyphs=self.homoglyphs,
+                        input_file=input_file,
+                        output_file=output_file,
+                        output_report=output_report,
+                        raise_unsupported=raise_unsupported,
+                    ),
+                ))
+
+            for task_result in process_manager.as_completed():
+                task_result.relative_path = os.path.relpath(task_result.task.kwargs["input_file"], input_directory)
+                task_result.output_file = task_result.task.kwargs["output_file"]
+                task_result.output_report = task_result.task.kwargs["output_report"]
+                status = task_result.result["status"] if task_result.success else None
+                change_index.record(task_result.relative_path, task_result.task.kwargs["input_file"], task_result.output_file, task_result.output_report, success=status in successes.success_codes, status=status)
+                yield task_result
+        finally:
+            change_index.close()
+            _sessions.pop(self.key, None)
@@ -1,5 +1,7 @@
 
 
 from glasswall.multiprocessing.manager import GlasswallProcessManager
+from glasswall.multiprocessing.manifest import Manifest
+from glasswall.multiprocessing.metrics import MetricsRegistry
 from glasswall.multiprocessing.task_watcher import TaskWatcher
 from glasswall.multiprocessing.tasks import Task, TaskResult
@@ -1,11 +1,16 @@
 
 
 import os
+import queue
 import time
 from collections import deque
 from multiprocessing import Process, Queue
 from typing import List, Generator, Optional
 
+from glasswall import instrumentation
+from glasswall.config import logging as glasswall_logging
+from glasswall.multiprocessing import metrics as metrics_module
+from glasswall.multiprocessing.memory_usage import get_total_memory_usage_in_gib
 from glasswall.multiprocessing.task_watcher import TaskWatcher
 from glasswall.multiprocessing.tasks import Task, TaskResult
 
@@ -16,6 +21,7 @@ class GlasswallProcessManager:
         max_workers: Optional[int] = None,
         worker_timeout_seconds: Optional[float] = None,
         memory_limit_in_gib: Optional[float] = None,
+        metrics: Optional[metrics_module.MetricsRegistry] = None,
     ):
         self.max_workers = max_workers or os.cpu_count() or 1
         self.worker_timeout_seconds = worker_timeout_seconds
@@ -23,12 +29,20 @@ class GlasswallProcessManager:
         self._sleep_time: float = 0  # Time to sleep for while waiting for processes to complete
         self._task_watcher_sleep_time: float = 0.001  # Time the TaskWatcher sleeps for while waiting for completed processes and monitoring timeout/memory
         self._task_watcher_memory_limit_polling_rate: float = 0.1  # Polling rate for TaskWatcher to check the memory usage of a process
+        self._task_results_queue_timeout: float = 5  # Time to wait for the results of exited processes that are still in transit
 
         self.pending_processes: deque[Process] = deque()
         self.active_processes: list[Process] = []
         self.task_results_queue: "Queue[TaskResult]" = Queue()
         self.task_results: List[TaskResult] = []
 
+        # Metrics are recorded if a registry is passed or glasswall.multiprocessing.metrics.default_registry is set
+        self.metrics = metrics if metrics is not None else metrics_module.default_registry
+        self._metrics_sampling_interval: float = 1  # Minimum time between samples of queue depth, active workers, and worker memory usage
+        self._last_metrics_sample: float = 0
+        if self.metrics is not None:
+            self._register_metrics(self.metrics)
+
     def __enter__(self):
         return self
 
@@ -46,11 +60,53 @@ class GlasswallProcessManager:
                 memory_limit_in_gib=self.memory_limit_in_gib,
                 sleep_time=self._task_watcher_sleep_time,
                 memory_limit_polling_rate=self._task_watcher_memory_limit_polling_rate,
+                track_memory=self.metrics is not None,
+                log_queue=glasswall_logging.log_queue,
             ),
         )
         self.pending_processes.append(process)
+        if self.metrics is not None:
+            self._queue_depth.set(len(self.pending_processes))
+
+    def _register_metrics(self, registry: metrics_module.MetricsRegistry):
+        prefix = "glasswall_process_manager"
+        self._tasks_started = registry.counter(f"{prefix}_tasks_started_total", "Tasks started in a worker process.")
+        self._tasks_completed = registry.counter(f"{prefix}_tasks_completed_total", "Tasks completed, by operation, input file name extension, and status: success, failure, timeout, or out_of_memory.")
+        self._exit_codes = registry.counter(f"{prefix}_exit_codes_total", "Worker process exit codes. Negative values are the signal that terminated the process.")
+        self._queue_depth = registry.gauge(f"{prefix}_queue_depth", "Tasks queued and not yet started.")
+        self._active_workers = registry.gauge(f"{prefix}_active_workers", "Worker processes currently running.")
+        self._worker_rss = registry.gauge(f"{prefix}_worker_rss_bytes", "Resident set size of each running worker process and its children.")
+        self._task_duration = registry.histogram(f"{prefix}_task_duration_seconds", "Task wall time, by operation and input file name extension, or \"bytes\" for in-memory input.", metrics_module.DURATION_BUCKETS)
+        self._task_max_memory = registry.histogram(f"{prefix}_task_max_memory_bytes", "Peak memory usage of each task, by operation and input file name extension, or \"bytes\" for in-memory input.", metrics_module.MEMORY_BUCKETS)
+
+    def _sample_metrics(self):
+        now = time.time()
+        if now - self._last_metrics_sample < self._metrics_sampling_interval:
+            return
+        self._last_metrics_sample = now
+
+        self._queue_depth.set(len(self.pending_processes))
+        self._active_workers.set(len(self.active_processes))
+        for process in self.active_processes:
+            # The active process is the TaskWatcher, the task runs in its child process
+            self._worker_rss.set(get_total_memory_usage_in_gib(process.pid) * 1024 ** 3, pid=process.pid)
+
+    @staticmethod
+    def _task_labels(task: Task) -> dict:
+        input_file = task.kwargs.get("input_file", task.args[0] if task.args else None)
+        if isinstance(input_file, str):
+            extension = os.path.splitext(input_file)[1].lstrip(".").lower() or "none"
+        elif isinstance(input_file, (bytes, bytearray)):
+            extension = "bytes"
+        else:
+            extension = "unknown"
+        # Library directory methods run every file through one dispatch function, e.g. _process_file, that is passed the method to call
+        operation = task.kwargs.get("function_name") or getattr(task.func, "__name__", "unknown")
+        return {"operation": operation, "extension": extension}
 
     def as_completed(self) -> Generator[TaskResult, None, None]:
+        started_count = 0
+        yielded_count = 0
         while self.pending_processes or self.active_processes:
             if self.active_processes:
                 self.wait_for_completed_process()
@@ -59,10 +115,52 @@ class GlasswallProcessManager:
                 process = self.pending_processes.popleft()
                 self.active_processes.append(process)
                 process.start()
-
-            for result in self.task_results:
-                self.task_results.remove(result)
-                yield result
+                started_count += 1
+                if self.metrics is not None:
+                    self._tasks_started.inc()
+
+            while self.task_results:
+                yielded_count += 1
+                yield self._completed(self.task_results.pop(0))
+
+        # A process can exit before its result is readable from the queue
+        while yielded_count < started_count:
+            if not self.task_results:
+                try:
+                    self.task_results.append(self.task_results_queue.get(timeout=self._task_results_queue_timeout))
+                except queue.Empty:
+                    break
+            yielded_count += 1
+            yield self._completed(self.task_results.pop(0))
+
+        if self.metrics is not None:
+            for process in self.active_processes:
+                self._worker_rss.remove(pid=process.pid)
+            self._queue_depth.set(len(self.pending_processes))
+            self._active_workers.set(0)
+
+    def _completed(self, task_result: TaskResult) -> TaskResult:
+        # Add the timings recorded in the worker process to the histograms of this process
+        for timings in getattr(task_result, "timings", None) or ():
+            instrumentation.record(timings)
+
+        if self.metrics is not None:
+            labels = self._task_labels(task_result.task)
+            if getattr(task_result, "timed_out", False):
+                status = "timeout"
+            elif getattr(task_result, "out_of_memory", False):
+                status = "out_of_memory"
+            else:
+                status = "success" if task_result.success else "failure"
+            self._tasks_completed.inc(status=status, **labels)
+            self._exit_codes.inc(exit_code=getattr(task_result, "exit_code", None))
+            if getattr(task_result, "elapsed_time", None) is not None:
+                self._task_duration.observe(task_result.elapsed_time, **labels)
+            if getattr(task_result, "max_memory_used_in_gib", 0):
+                self._task_max_memory.observe(task_result.max_memory_used_in_gib * 1024 ** 3, **labels)
+            self._sample_metrics()
+
+        return task_result
 
     def start_tasks(self):
         self.task_results = list(self.as_completed())
@@ -75,7 +173,17 @@ class GlasswallProcessManager:
             self.remove_completed_active_processes()
 
     def remove_completed_active_processes(self):
-        self.active_processes = [process for process in self.active_processes if process.is_alive()]
+        if self.metrics is None:
+            self.active_processes = [process for process in self.active_processes if process.is_alive()]
+        else:
+            active_processes = []
+            for process in self.active_processes:
+                if process.is_alive():
+                    active_processes.append(process)
+                else:
+                    self._worker_rss.remove(pid=process.pid)
+            self.active_processes = active_processes
+            self._sample_metrics()
         self.clean_task_results_queue()
 
     def clean_task_results_queue(self):
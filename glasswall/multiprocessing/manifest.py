@@ -0,0 +1,90 @@
+
+
+import json
+import os
+from typing import Dict, Generator
+
+from glasswall.multiprocessing.tasks import TaskResult
+
+
+class Manifest:
+    """ A results manifest written incrementally in JSON Lines format, one JSON object per line.
+
+    Each entry is written and flushed as soon as it is available, so results do not need to be held in memory and the manifest remains readable if processing is interrupted.
+
+    Args:
+        file_path (str): The manifest file path.
+        mode (str, optional): Default "a". The file mode, "a" to append to an existing manifest or "w" to overwrite it.
+    """
+
+    def __init__(self, file_path: str, mode: str = "a"):
+        if mode not in ("a", "w"):
+            raise ValueError(mode)
+
+        self.file_path = os.path.abspath(file_path)
+        self.mode = mode
+        self._file = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def open(self):
+        os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+        self._file = open(self.file_path, self.mode, encoding="utf-8")
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def write(self, entry: dict):
+        """ Writes an entry to the manifest and flushes it to disk. """
+        if self._file is None:
+            self.open()
+
+        self._file.write(json.dumps(entry, default=str) + "\n")
+        self._file.flush()
+
+    @staticmethod
+    def read(file_path: str) -> Generator[dict, None, None]:
+        """ Yields each entry of a manifest. Incomplete trailing lines, such as those left by an interrupted run, are skipped. """
+        if not os.path.isfile(file_path):
+            return
+
+        with open(file_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+    @staticmethod
+    def latest_entries(file_path: str, key: str = "relative_path") -> Dict[str, dict]:
+        """ Returns the latest entry of a manifest for each value of `key`, e.g. the final result of files processed again by a later run. Entries without `key` are skipped. """
+        return {
+            entry[key]: entry
+            for entry in Manifest.read(file_path)
+            if key in entry
+        }
+
+    @staticmethod
+    def entry_from_task_result(task_result: TaskResult, **kwargs) -> dict:
+        """ Returns a manifest entry containing the status and timings of a TaskResult, updated with kwargs. """
+        entry = dict(
+            success=task_result.success,
+            exception=None if task_result.exception is None else repr(task_result.exception),
+            exit_code=getattr(task_result, "exit_code", None),
+            timed_out=getattr(task_result, "timed_out", False),
+            out_of_memory=getattr(task_result, "out_of_memory", False),
+            max_memory_used_in_gib=getattr(task_result, "max_memory_used_in_gib", 0.0),
+            start_time=getattr(task_result, "start_time", None),
+            end_time=getattr(task_result, "end_time", None),
+            elapsed_time=getattr(task_result, "elapsed_time", None),
+        )
+        entry.update(kwargs)
+
+        return entry
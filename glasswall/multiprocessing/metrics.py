@@ -0,0 +1,181 @@
+
+
+import http.server
+import math
+import os
+import socketserver
+import threading
+from typing import Dict, Optional, Tuple
+
+# The registry used by GlasswallProcessManager instances created without a metrics argument, including those created by the *_as_completed methods. None disables metrics.
+default_registry: Optional["MetricsRegistry"] = None
+
+# Bucket upper bounds of task duration histograms, in seconds
+DURATION_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# Bucket upper bounds of memory histograms, in bytes
+MEMORY_BUCKETS = tuple(2 ** exponent for exponent in range(24, 36))
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+class Metric:
+    """ A metric family with samples keyed by their sorted label pairs. """
+
+    def __init__(self, registry: "MetricsRegistry", name: str, metric_type: str, help_text: str):
+        self.registry = registry
+        self.name = name
+        self.metric_type = metric_type
+        self.help_text = help_text
+        self.samples: Dict[Tuple[Tuple[str, str], ...], float] = {}
+
+    @staticmethod
+    def _key(labels: dict) -> Tuple[Tuple[str, str], ...]:
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def render_samples(self):
+        for labels, value in sorted(self.samples.items()):
+            yield f"{self.name}{_format_labels(labels)} {_format_value(value)}"
+
+
+class Counter(Metric):
+    def inc(self, value: float = 1, **labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            self.samples[key] = self.samples.get(key, 0) + value
+
+
+class Gauge(Metric):
+    def set(self, value: float, **labels):
+        with self.registry.lock:
+            self.samples[self._key(labels)] = value
+
+    def remove(self, **labels):
+        with self.registry.lock:
+            self.samples.pop(self._key(labels), None)
+
+
+class Histogram(Metric):
+    def __init__(self, registry: "MetricsRegistry", name: str, metric_type: str, help_text: str, buckets: tuple):
+        super().__init__(registry, name, metric_type, help_text)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            sample = self.samples.get(key)
+            if sample is None:
+                # Per bucket counts, sum
+                sample = self.samples[key] = [[0] * len(self.buckets), 0.0]
+            for index, upper_bound in enumerate(self.buckets):
+                if value <= upper_bound:
+                    sample[0][index] += 1
+                    break
+            sample[1] += value
+
+    def render_samples(self):
+        for labels, (bucket_counts, total) in sorted(self.samples.items()):
+            cumulative_count = 0
+            for upper_bound, count in zip(self.buckets, bucket_counts):
+                cumulative_count += count
+                yield f"{self.name}_bucket{_format_labels(labels + (('le', _format_value(upper_bound)),))} {cumulative_count}"
+            yield f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(labels)} {cumulative_count}"
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    # http.server.ThreadingHTTPServer requires Python 3.7
+    daemon_threads = True
+
+
+class MetricsRegistry:
+    """ A thread-safe registry of counters, gauges and histograms, rendered in the Prometheus text exposition format.
+
+    Example:
+        registry = MetricsRegistry()
+        server = registry.serve(port=9100)  # http://127.0.0.1:9100/metrics
+        with GlasswallProcessManager(metrics=registry) as process_manager:
+            ...
+        registry.write("/var/lib/node_exporter/glasswall.prom")
+        server.shutdown()
+    """
+    content_type = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.metrics: Dict[str, Metric] = {}
+
+    def _get_or_create(self, metric_class, name: str, metric_type: str, help_text: str, *args):
+        with self.lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = metric_class(self, name, metric_type, help_text, *args)
+            elif not isinstance(metric, metric_class):
+                raise ValueError(f"Metric {name} is already registered as a {metric.metric_type}")
+            return metric
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self._get_or_create(Counter, name, "counter", help_text)
+
+    def gauge(self, name: str, help_text: str) -> Gauge:
+        return self._get_or_create(Gauge, name, "gauge", help_text)
+
+    def histogram(self, name: str, help_text: str, buckets: tuple = DURATION_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, "histogram", help_text, buckets)
+
+    def render(self) -> str:
+        """ Returns all metrics in the Prometheus text exposition format. """
+        lines = []
+        with self.lock:
+            for name, metric in sorted(self.metrics.items()):
+                lines.append(f"# HELP {name} {_escape(metric.help_text)}")
+                lines.append(f"# TYPE {name} {metric.metric_type}")
+                lines.extend(metric.render_samples())
+        return "\n".join(lines) + "\n"
+
+    def write(self, file_path: str):
+        """ Writes all metrics to file_path, replacing it atomically, e.g. for the node_exporter textfile collector. """
+        os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+        temp_path = f"{file_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8", newline="\n") as f:
+            f.write(self.render())
+        os.replace(temp_path, file_path)
+
+    def serve(self, port: int = 0, host: str = "127.0.0.1") -> http.server.HTTPServer:
+        """ Serves the metrics at http://host:port/metrics from a daemon thread. Returns the server, call server.shutdown() to stop it. server.server_address is the bound address, which is useful when port is 0. """
+        registry = self
+
+        class MetricsHandler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", registry.content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = _ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, name="glasswall-metrics", daemon=True).start()
+        return server
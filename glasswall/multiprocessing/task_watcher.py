@@ -23,6 +23,8 @@ class TaskWatcher:
         sleep_time: float = 0.001,
         memory_limit_polling_rate: float = 0.1,
         auto_start: bool = True,
+        track_memory: bool = False,
+        log_queue: Optional[Queue] = None,
     ):
         self.task = task
         self.task_results_queue = task_results_queue
@@ -31,6 +33,8 @@ class TaskWatcher:
         self.sleep_time = sleep_time
         self.memory_limit_polling_rate = memory_limit_polling_rate
         self.auto_start = auto_start
+        self.track_memory = track_memory  # Sample memory usage to record max_memory_used_in_gib even when there is no memory limit
+        self.log_queue = log_queue  # Queue of the QueueListener writing log records, see glasswall.config.logging.start_queue_listener
 
         self.watcher_queue: "Queue[TaskResult]" = Queue()
         self.watcher_results = []
@@ -48,7 +52,7 @@ class TaskWatcher:
     def start_task(self) -> None:
         self.process = Process(
             target=execute_task_and_put_in_queue,
-            args=(self.task, self.watcher_queue,)
+            args=(self.task, self.watcher_queue, self.log_queue,)
         )
         self.process.start()
         self.start_time = time.time()
@@ -84,13 +88,13 @@ class TaskWatcher:
                     break
 
             # Monitor for memory limit exceeded
-            if self.memory_limit_in_gib:
+            if self.memory_limit_in_gib or self.track_memory:
                 if now - last_memory_limit_check > self.memory_limit_polling_rate:
                     last_memory_limit_check = now
                     memory_usage_in_gib = get_total_memory_usage_in_gib(self.process.pid)
                     if memory_usage_in_gib > self.max_memory_used_in_gib:
                         self.max_memory_used_in_gib = memory_usage_in_gib
-                    if memory_usage_in_gib > self.memory_limit_in_gib:
+                    if self.memory_limit_in_gib and memory_usage_in_gib > self.memory_limit_in_gib:
                         self.terminate_task_with_out_of_memory()
                         break
 
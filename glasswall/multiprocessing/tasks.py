@@ -1,9 +1,11 @@
 
 
 from multiprocessing import Queue
-from typing import Any, Callable, Optional, Union
+from typing import Any, Callable, List, Optional, Union
 
 import glasswall
+from glasswall import instrumentation, profiling
+from glasswall.config.logging import use_queue_handler
 
 
 class Task:
@@ -56,6 +58,8 @@ class TaskResult:
     timed_out: bool
     max_memory_used_in_gib: float
     exit_code: Union[int, None]
+    # Timings of the instrumented operations the task called, see glasswall.instrumentation. None if instrumentation is disabled.
+    timings: Optional[List[dict]]
 
     def __init__(
         self,
@@ -68,6 +72,7 @@ class TaskResult:
         self.success = success
         self.result = result
         self.exception = exception
+        self.timings = None
 
     def __eq__(self, other):
         if isinstance(other, TaskResult):
@@ -84,11 +89,20 @@ class TaskResult:
         return f"{self.__class__.__name__}({attributes_str})"
 
 
-def execute_task_and_put_in_queue(task: Task, queue: "Queue[TaskResult]") -> None:
-    try:
-        func_result = task.func(*task.args, **task.kwargs)
-        task_result = TaskResult(task=task, success=True, result=func_result)
-    except Exception as e:
-        task_result = TaskResult(task=task, success=False, exception=e)
+def execute_task_and_put_in_queue(task: Task, queue: "Queue[TaskResult]", log_queue: Optional[Queue] = None) -> None:
+    if log_queue is not None:
+        # Send log records to the QueueListener of the parent process, see glasswall.config.logging.start_queue_listener
+        use_queue_handler(log_queue)
+
+    with instrumentation.collect() as timings:
+        try:
+            with profiling.profile(f"Task.{getattr(task.func, '__qualname__', 'unknown')}"):
+                func_result = task.func(*task.args, **task.kwargs)
+            task_result = TaskResult(task=task, success=True, result=func_result)
+        except Exception as e:
+            task_result = TaskResult(task=task, success=False, exception=e)
+
+    if instrumentation.is_enabled():
+        task_result.timings = timings
 
     queue.put(task_result)
@@ -0,0 +1,233 @@
+
+
+import contextlib
+import cProfile
+import json
+import os
+import pstats
+import random
+import threading
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+import glasswall
+from glasswall.config.logging import log
+
+_local = threading.local()
+_lock = threading.Lock()
+_tracemalloc_users = 0
+_profile_count = 0
+
+
+def _parse_environment() -> dict:
+    # glasswall_profiling: "cprofile", "tracemalloc", or "cprofile,tracemalloc". "1" is "cprofile".
+    modes = {mode.strip().lower() for mode in os.environ.get("glasswall_profiling", "").split(",")} - {"", "0", "false", "no"}
+    if modes & {"1", "true", "yes"}:
+        modes = (modes - {"1", "true", "yes"}) | {"cprofile"}
+    return {
+        "cprofile": "cprofile" in modes,
+        "tracemalloc": "tracemalloc" in modes,
+        "sample_rate": float(os.environ.get("glasswall_profiling_sample_rate", 1.0)),
+        "directory": os.environ.get("glasswall_profiling_directory") or None,
+    }
+
+
+_settings = _parse_environment()
+_enabled = _settings["cprofile"] or _settings["tracemalloc"]
+
+
+def enable(cprofile: bool = True, tracemalloc: bool = False, sample_rate: float = 1.0, directory: Optional[str] = None):
+    """ Enables profiling in this process and in worker processes started after this call. Each sampled operation, the outermost instrumented wrapper call in a thread or a GlasswallProcessManager task, writes its own profile files.
+
+    Args:
+        cprofile (bool, optional): Default True. Write a cProfile profile of each sampled operation, "<directory>/<operation>/<id>.prof".
+        tracemalloc (bool, optional): Default False. Write the lines that allocated memory during each sampled operation, "<directory>/<operation>/<id>.tracemalloc.json". Tracing memory allocations slows down all threads while a sampled operation runs.
+        sample_rate (float, optional): Default 1.0. The fraction of operations to profile, e.g. 0.01 in production.
+        directory (Optional[str], optional): Default None, os.path.join(glasswall._TEMPDIR, "profiles"). The directory profiles are written to.
+    """
+    global _enabled
+    _settings.update(cprofile=cprofile, tracemalloc=tracemalloc, sample_rate=sample_rate, directory=directory)
+    _enabled = cprofile or tracemalloc
+    os.environ["glasswall_profiling"] = ",".join(mode for mode, value in (("cprofile", cprofile), ("tracemalloc", tracemalloc)) if value) or "0"
+    os.environ["glasswall_profiling_sample_rate"] = str(sample_rate)
+    if directory:
+        os.environ["glasswall_profiling_directory"] = directory
+    else:
+        os.environ.pop("glasswall_profiling_directory", None)
+
+
+def disable():
+    """ Disables profiling in this process and in worker processes started after this call. """
+    global _enabled
+    _enabled = False
+    _settings.update(cprofile=False, tracemalloc=False)
+    for key in ("glasswall_profiling", "glasswall_profiling_sample_rate", "glasswall_profiling_directory"):
+        os.environ.pop(key, None)
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def get_directory() -> str:
+    return _settings["directory"] or os.path.join(glasswall._TEMPDIR, "profiles")
+
+
+def _start_tracemalloc():
+    global _tracemalloc_users
+    with _lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _tracemalloc_users += 1
+
+
+def _stop_tracemalloc():
+    global _tracemalloc_users
+    with _lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0:
+            tracemalloc.stop()
+
+
+def _write_tracemalloc(path: str, start_snapshot: tracemalloc.Snapshot, end_snapshot: tracemalloc.Snapshot, peak_bytes: int, top: int = 50):
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+    statistics = end_snapshot.filter_traces(filters).compare_to(start_snapshot.filter_traces(filters), "lineno")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "peak_bytes": peak_bytes,
+            "lines": [
+                {"line": str(statistic.traceback), "size_diff": statistic.size_diff, "count_diff": statistic.count_diff}
+                for statistic in statistics[:top]
+                if statistic.size_diff > 0
+            ],
+        }, f)
+
+
+@contextlib.contextmanager
+def profile(operation: str):
+    """ Profiles the enclosed code as operation if profiling is enabled and the operation is sampled. Nested calls in the same thread are not profiled separately. Yields a list of the profile file paths, which is filled in on exit. """
+    paths = []
+    if not _enabled or getattr(_local, "active", False):
+        yield paths
+        return
+
+    if random.random() >= _settings["sample_rate"]:
+        # Not sampled, nested operations are not sampled either
+        _local.active = True
+        try:
+            yield paths
+        finally:
+            _local.active = False
+        return
+
+    global _profile_count
+    with _lock:
+        _profile_count += 1
+        profile_id = f"{int(time.time() * 1e6)}-{os.getpid()}-{_profile_count}"
+
+    profiler = None
+    if _settings["cprofile"]:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+ allows one active profiler per process, another thread is being profiled
+            log.debug("Skipped cProfile of %s, another profiler is active", operation)
+            profiler = None
+
+    tracing = _settings["tracemalloc"]
+    if tracing:
+        _start_tracemalloc()
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        start_snapshot = tracemalloc.take_snapshot()
+
+    _local.active = True
+    try:
+        yield paths
+    finally:
+        _local.active = False
+        if profiler is not None:
+            profiler.disable()
+        if tracing:
+            end_snapshot = tracemalloc.take_snapshot()
+            peak_bytes = tracemalloc.get_traced_memory()[1]
+            _stop_tracemalloc()
+
+        operation_directory = os.path.join(get_directory(), operation)
+        if profiler is not None or tracing:
+            os.makedirs(operation_directory, exist_ok=True)
+        if profiler is not None:
+            paths.append(os.path.join(operation_directory, f"{profile_id}.prof"))
+            profiler.dump_stats(paths[-1])
+        if tracing:
+            paths.append(os.path.join(operation_directory, f"{profile_id}.tracemalloc.json"))
+            _write_tracemalloc(paths[-1], start_snapshot, end_snapshot, peak_bytes)
+
+
+def summary(directory: Optional[str] = None, top: int = 20, sort: str = "tottime") -> Dict[str, dict]:
+    """ Merges the profiles in directory into the top hot spots of each operation.
+
+    Args:
+        directory (Optional[str], optional): Default None, the profiling directory. The directory profiles were written to.
+        top (int, optional): Default 20. The number of functions and allocating lines to return per operation.
+        sort (str, optional): Default "tottime". Sort functions by "tottime", the time spent in the function itself, or "cumtime", including the functions it calls.
+
+    Returns:
+        summary (Dict[str, dict]): Keyed by operation, with values: {"profiles": int, "total_time": float, "functions": List[dict], "memory_profiles": int, "peak_bytes": int, "allocations": List[dict]}
+    """
+    directory = directory or get_directory()
+    operations = {}
+    if not os.path.isdir(directory):
+        return operations
+
+    for operation in sorted(os.listdir(directory)):
+        operation_directory = os.path.join(directory, operation)
+        if not os.path.isdir(operation_directory):
+            continue
+        file_names = sorted(os.listdir(operation_directory))
+        profile_paths = [os.path.join(operation_directory, name) for name in file_names if name.endswith(".prof")]
+        tracemalloc_paths = [os.path.join(operation_directory, name) for name in file_names if name.endswith(".tracemalloc.json")]
+        result = {"profiles": len(profile_paths), "total_time": 0.0, "functions": [], "memory_profiles": len(tracemalloc_paths), "peak_bytes": 0, "allocations": []}
+
+        if profile_paths:
+            stats = pstats.Stats(*profile_paths)
+            result["total_time"] = stats.total_tt
+            sort_index = {"tottime": 2, "cumtime": 3}[sort]
+            for (file_name, line_number, function_name), (_, ncalls, tottime, cumtime, _) in sorted(stats.stats.items(), key=lambda item: item[1][sort_index], reverse=True)[:top]:
+                result["functions"].append({
+                    "function": f"{file_name}:{line_number}({function_name})",
+                    "ncalls": ncalls,
+                    "tottime": tottime,
+                    "cumtime": cumtime,
+                })
+
+        allocations = {}
+        for path in tracemalloc_paths:
+            with open(path, encoding="utf-8") as f:
+                memory_profile = json.load(f)
+            result["peak_bytes"] = max(result["peak_bytes"], memory_profile["peak_bytes"])
+            for line in memory_profile["lines"]:
+                allocation = allocations.setdefault(line["line"], {"line": line["line"], "size_diff": 0, "count_diff": 0})
+                allocation["size_diff"] += line["size_diff"]
+                allocation["count_diff"] += line["count_diff"]
+        result["allocations"] = sorted(allocations.values(), key=lambda allocation: allocation["size_diff"], reverse=True)[:top]
+
+        operations[operation] = result
+
+    return operations
+
+
+def format_summary(operations: Dict[str, dict]) -> str:
+    """ Formats the result of summary as text. """
+    lines: List[str] = []
+    for operation, result in operations.items():
+        lines.append(f"{operation}: {result['profiles']} profiles, {result['total_time']:.3f} s")
+        for function in result["functions"]:
+            lines.append(f"\t{function['tottime']:10.4f} s  {function['cumtime']:10.4f} s cumulative  {function['ncalls']:8}  {function['function']}")
+        if result["memory_profiles"]:
+            lines.append(f"\t{result['memory_profiles']} memory profiles, peak {result['peak_bytes']} bytes")
+            for allocation in result["allocations"]:
+                lines.append(f"\t{allocation['size_diff']:12} bytes  {allocation['count_diff']:8} blocks  {allocation['line']}")
+    return "\n".join(lines)
@@ -0,0 +1,282 @@
+
+
+import collections
+import functools
+import hashlib
+import io
+import os
+import re
+import shutil
+import threading
+from typing import Callable, Optional, Union
+
+from glasswall.change_index import ChangeIndex
+from glasswall.config.logging import log
+
+
+class ResultCache:
+    """ A content-addressed cache of the bytes returned by Editor and Rebuild protect_file, analyse_file, export_file and import_file.
+
+    Entries are keyed by the operation, the library name and version, the content management policy digest, and the input file content hash, so an identical file processed with the same policy and library is only processed once. Entries are held in an in-memory LRU tier and optionally in an on-disk tier, each evicted least recently used first when it exceeds its size limit.
+
+    On-disk entries are stored in a subdirectory per library version. After upgrading a library, call prune with the new version to delete entries created by previous versions.
+
+    Several processes can share the on-disk tier, each reading the entries written by the others. Each process re-scans the directory before evicting and after writing max_disk_bytes / 16 bytes of entries, so the total size of the directory exceeds max_disk_bytes by at most that much per process.
+
+    Args:
+        max_memory_bytes (int, optional): Default 256 MiB. The maximum total size of entries in memory. 0 disables the in-memory tier.
+        directory (Optional[str], optional): Default None. The directory of the on-disk tier, or None to disable the on-disk tier.
+        max_disk_bytes (int, optional): Default 4 GiB. The maximum total size of entries on disk.
+
+    Example:
+        editor = glasswall.Editor(library_path, result_cache=ResultCache(directory="/var/cache/glasswall"))
+        editor.protect_file("logo.png")  # miss, processed by the library
+        editor.protect_file("logo.png")  # hit
+        print(editor.result_cache.metrics())
+    """
+
+    def __init__(self, max_memory_bytes: int = 256 * 1024 ** 2, directory: Optional[str] = None, max_disk_bytes: int = 4 * 1024 ** 3):
+        self.max_memory_bytes = max_memory_bytes
+        self.directory = None if directory is None else os.path.abspath(directory)
+        self.max_disk_bytes = max_disk_bytes
+        self._lock = threading.Lock()
+        # (library_version, key) -> bytes, least recently used first
+        self._memory = collections.OrderedDict()
+        self._memory_bytes = 0
+        # (library_version, key) -> size, least recently used first
+        self._disk = collections.OrderedDict()
+        self._disk_bytes = 0
+        # Bytes written to disk by this process since the directory was last scanned
+        self._unscanned_bytes = 0
+        self._scan_interval_bytes = max(1, max_disk_bytes // 16)
+        self.reset_metrics()
+
+        if self.directory is not None:
+            self._scan_disk()
+
+    def _scan_disk(self):
+        """ Indexes the on-disk entries, least recently used first, including entries written by other processes sharing the directory, and evicts entries if their total size exceeds max_disk_bytes. """
+        entries = []
+        os.makedirs(self.directory, exist_ok=True)
+        for version_entry in os.scandir(self.directory):
+            if not version_entry.is_dir():
+                continue
+            try:
+                version_entries = list(os.scandir(version_entry.path))
+            except FileNotFoundError:
+                # Invalidated by another process
+                continue
+            for entry in version_entries:
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    try:
+                        stat_result = entry.stat()
+                    except FileNotFoundError:
+                        # Evicted by another process
+                        continue
+                    entries.append((stat_result.st_mtime_ns, (version_entry.name, entry.name), stat_result.st_size))
+
+        # Modification times are coarse, order entries with the same time by this process's use, other processes' entries first
+        ranks = {cache_key: rank for rank, cache_key in enumerate(self._disk)}
+        entries.sort(key=lambda entry: (entry[0], ranks.get(entry[1], -1), entry[1]))
+        self._disk.clear()
+        self._disk_bytes = 0
+        for _, cache_key, size in entries:
+            self._disk[cache_key] = size
+            self._disk_bytes += size
+        self._unscanned_bytes = 0
+
+        if self._disk_bytes > self.max_disk_bytes:
+            self._evict_disk()
+
+    def reset_metrics(self):
+        self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.evictions = 0
+
+    def metrics(self) -> dict:
+        """ Returns a dictionary of cache metrics. "bytes_saved" is the total size of the outputs returned from the cache instead of being processed. """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "bytes_saved": self.bytes_saved,
+                "evictions": self.evictions,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+            }
+
+    @staticmethod
+    def key(operation: str, input_bytes: bytes, content_management_policy=None) -> str:
+        """ Returns the hex key of processing input_bytes with content_management_policy in operation, e.g. "Editor.protect_file". """
+        return hashlib.blake2b(
+            b"\0".join((
+                operation.encode("utf-8"),
+                ChangeIndex.digest(content_management_policy).encode(),
+                hashlib.blake2b(input_bytes).hexdigest().encode(),
+            )),
+            digest_size=20,
+        ).hexdigest()
+
+    @staticmethod
+    def _version_directory_name(library_version: str) -> str:
+        return re.sub(r"[^\w.-]", "_", library_version) or "_"
+
+    def _disk_path(self, cache_key: tuple) -> str:
+        return os.path.join(self.directory, *cache_key)
+
+    def get(self, library_version: str, key: str) -> Optional[bytes]:
+        """ Returns the cached bytes for key created by library_version, or None if there is no entry. """
+        cache_key = (self._version_directory_name(library_version), key)
+        with self._lock:
+            value = self._memory.get(cache_key)
+            if value is not None:
+                self._memory.move_to_end(cache_key)
+                self.hits += 1
+                self.memory_hits += 1
+                self.bytes_saved += len(value)
+                return value
+
+            if self.directory is not None:
+                # Entries written by other processes sharing the directory are not indexed until the next scan
+                disk_path = self._disk_path(cache_key)
+                try:
+                    with open(disk_path, "rb") as f:
+                        value = f.read()
+                    os.utime(disk_path)
+                except OSError:
+                    # Not cached, or evicted by another process
+                    if cache_key in self._disk:
+                        self._disk_bytes -= self._disk.pop(cache_key)
+                else:
+                    if cache_key not in self._disk:
+                        self._disk[cache_key] = len(value)
+                        self._disk_bytes += len(value)
+                    self._disk.move_to_end(cache_key)
+                    self._put_memory(cache_key, value)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    self.bytes_saved += len(value)
+                    return value
+
+            self.misses += 1
+            return None
+
+    def put(self, library_version: str, key: str, value: bytes):
+        """ Caches value for key created by library_version. """
+        cache_key = (self._version_directory_name(library_version), key)
+        with self._lock:
+            self._put_memory(cache_key, value)
+
+            if self.directory is not None and cache_key not in self._disk and len(value) <= self.max_disk_bytes:
+                disk_path = self._disk_path(cache_key)
+                os.makedirs(os.path.dirname(disk_path), exist_ok=True)
+                # Write to a temporary file and rename so that other processes never read a partial entry
+                temp_path = f"{disk_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(temp_path, "wb") as f:
+                    f.write(value)
+                os.replace(temp_path, disk_path)
+                self._disk[cache_key] = len(value)
+                self._disk_bytes += len(value)
+                self._unscanned_bytes += len(value)
+                if self._disk_bytes > self.max_disk_bytes or self._unscanned_bytes >= self._scan_interval_bytes:
+                    self._scan_disk()
+
+    def _put_memory(self, cache_key: tuple, value: bytes):
+        if len(value) > self.max_memory_bytes:
+            return
+
+        previous_value = self._memory.pop(cache_key, None)
+        if previous_value is not None:
+            self._memory_bytes -= len(previous_value)
+        self._memory[cache_key] = value
+        self._memory_bytes += len(value)
+
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted_value = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted_value)
+            self.evictions += 1
+
+    def _evict_disk(self):
+        # Evict below the limit so that a full directory is not re-scanned on every put
+        while self._disk and self._disk_bytes > self.max_disk_bytes - self._scan_interval_bytes:
+            cache_key, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(self._disk_path(cache_key))
+            except FileNotFoundError:
+                pass
+
+    def invalidate(self, library_version: Optional[str] = None):
+        """ Deletes the entries created by library_version, or all entries if library_version is None. """
+        version_directory_name = None if library_version is None else self._version_directory_name(library_version)
+        with self._lock:
+            for cache_key in [cache_key for cache_key in self._memory if version_directory_name in (None, cache_key[0])]:
+                self._memory_bytes -= len(self._memory.pop(cache_key))
+            for cache_key in [cache_key for cache_key in self._disk if version_directory_name in (None, cache_key[0])]:
+                self._disk_bytes -= self._disk.pop(cache_key)
+
+            if self.directory is not None:
+                for entry in os.scandir(self.directory):
+                    if entry.is_dir() and version_directory_name in (None, entry.name):
+                        shutil.rmtree(entry.path, ignore_errors=True)
+
+        log.debug("Invalidated result cache entries\n\tlibrary_version: %s", library_version)
+
+    def prune(self, library_version: str):
+        """ Deletes the entries created by library versions other than library_version, e.g. after a library upgrade. """
+        version_directory_name = self._version_directory_name(library_version)
+        with self._lock:
+            versions = {cache_key[0] for cache_key in (*self._memory, *self._disk)}
+            if self.directory is not None:
+                versions.update(entry.name for entry in os.scandir(self.directory) if entry.is_dir())
+
+        for version in versions - {version_directory_name}:
+            self.invalidate(version)
+
+
+def cached_result(function: Callable) -> Callable:
+    """ Decorator for Editor and Rebuild *_file methods that returns the output from the instance's result_cache when the same input content has been processed with the same policy and library version. Outputs that are None are not cached. """
+    operation_name = function.__name__
+
+    @functools.wraps(function)
+    def wrapper(self, input_file: Union[str, bytes, bytearray, io.BytesIO], output_file: Optional[str] = None, content_management_policy=None, raise_unsupported: bool = True):
+        result_cache = getattr(self, "result_cache", None)
+        if result_cache is None or not isinstance(input_file, (str, bytes, bytearray, io.BytesIO)):
+            return function(self, input_file, output_file, content_management_policy, raise_unsupported)
+
+        if isinstance(input_file, str):
+            with open(input_file, "rb") as f:
+                input_bytes = f.read()
+        elif isinstance(input_file, io.BytesIO):
+            input_bytes = input_file.getvalue()
+        else:
+            input_bytes = bytes(input_file)
+
+        library_version = self.version()
+        key = ResultCache.key(f"{self.__class__.__name__}.{operation_name}", input_bytes, content_management_policy)
+        file_bytes = result_cache.get(library_version, key)
+        if file_bytes is not None:
+            if isinstance(output_file, str):
+                output_file = os.path.abspath(output_file)
+                os.makedirs(os.path.dirname(output_file), exist_ok=True)
+                with open(output_file, "wb") as f:
+                    f.write(file_bytes)
+            return file_bytes
+
+        file_bytes = function(self, input_file, output_file, content_management_policy, raise_unsupported)
+        if file_bytes is not None:
+            result_cache.put(library_version, key, file_bytes)
+
+        return file_bytes
+
+    return wrapper
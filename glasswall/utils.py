@@ -1,20 +1,26 @@
 
 
+import concurrent.futures
 import ctypes as ct
 import functools
 import io
 import math
 import os
 import pathlib
+import shutil
 import stat
 import tempfile
+import threading
 import warnings
+import weakref
+from contextlib import contextmanager
 from typing import Any, Callable, Dict, Iterable, List, Optional, Union
 
 from lxml import etree
 
 import glasswall
 from glasswall.config.logging import log
+from glasswall.instrumentation import instrumented
 
 
 def as_bytes(file_: Union[bytes, bytearray, io.BytesIO]):
@@ -78,6 +84,7 @@ def as_title(string):
     )
 
 
+@instrumented
 def buffer_to_bytes(buffer: ct.c_void_p, buffer_length: ct.c_size_t):
     """ Convert ctypes buffer and buffer_length to bytes.
 
@@ -153,7 +160,7 @@ def delete_empty_subdirectories(directory: str):
                 try:
                     os.chmod(absolute_path, stat.S_IWRITE)
                 except Exception:
-                    log.warning(f"PermissionError while attempting to delete {absolute_path}. Attempted chmod but failed.")
+                    log.warning("PermissionError while attempting to delete %s. Attempted chmod but failed.", absolute_path)
                 try:
                     os.rmdir(absolute_path)
                 except OSError:
@@ -205,12 +212,17 @@ def get_libraries(directory: str, library_names: Optional[List[str]] = None, ign
     return libraries
 
 
-def get_library(library: str, directory: str):
+# Library file paths found by get_library, keyed by (library, resolved directory)
+_library_paths = {}
+
+
+def get_library(library: str, directory: str, use_cache: bool = True):
     """ Returns a path to the specified library found from the current directory or any subdirectory. If multiple libraries exist, returns the file with the latest modified time.
 
     Args:
         library (str): The library to search for, ie: "rebuild", "word_search"
         directory (str): The directory to search from.
+        use_cache (bool, optional): Default True. Return the path found by a previous search of the same directory if the file still exists, rather than searching the directory again.
 
     Returns:
         library_file_path (str): The absolute file path to the library.
@@ -223,6 +235,12 @@ def get_library(library: str, directory: str):
         raise NotADirectoryError(directory)
 
     library = as_snake_case(library)
+    cache_key = (library, os.path.realpath(directory))
+    if use_cache:
+        library_path = _library_paths.get(cache_key)
+        if library_path is not None and os.path.isfile(library_path):
+            return library_path
+
     library_file_names = glasswall.libraries.os_info[glasswall._OPERATING_SYSTEM][library]["file_name"]
 
     if isinstance(library_file_names, str):
@@ -239,20 +257,57 @@ def get_library(library: str, directory: str):
         if len(matches) > 1:
             # warn that multiple libraries found, list library paths if there are <= 5
             if len(matches) <= 5:
-                log.warning(f"Found {len(matches)} {library} libraries, but expected only one:\n{chr(10).join(str(item) for item in matches)}\nLatest library: {latest_library}")
+                log.warning("Found %s %s libraries, but expected only one:\n%s\nLatest library: %s", len(matches), library, chr(10).join(str(item) for item in matches), latest_library)
             else:
-                log.warning(f"Found {len(matches)} {library} libraries, but expected only one.\nLatest library: {latest_library}")
+                log.warning("Found %s %s libraries, but expected only one.\nLatest library: %s", len(matches), library, latest_library)
 
         # Return library with latest change time
+        _library_paths[cache_key] = latest_library
         return latest_library
 
     # exhausted, not found
     raise FileNotFoundError(f'Could not find any files: "{library_file_names}" under directory: "{directory}"')
 
 
-def iterate_directory_entries(directory: str, file_type: str = 'all', absolute: bool = True, recursive: bool = True, followlinks: bool = True, start_directory: str = None):
+# The name of directories that glasswall stores its own files in, such as the change index of an output directory. They are skipped when listing directories, so their files are never processed as inputs.
+GLASSWALL_DIRECTORY_NAME = ".glasswall"
+
+
+def _scan_directory(path: str, prefix: str, followlinks: bool, directory_keys: bool, file_keys: bool) -> list:
+    """ Returns a list of (path, relative path, is_dir, key) tuples for the files and directories in a directory. key is (st_dev, st_ino) for directories if directory_keys and for files if file_keys, else None. Other entries such as broken symlinks and GLASSWALL_DIRECTORY_NAME directories are skipped. """
+    entries = []
+    with os.scandir(path) as iterator:
+        for entry in iterator:
+            if entry.is_dir(follow_symlinks=followlinks):
+                if entry.name == GLASSWALL_DIRECTORY_NAME:
+                    continue
+                is_dir = True
+            elif entry.is_file(follow_symlinks=followlinks):
+                is_dir = False
+            else:
+                continue
+
+            key = None
+            if directory_keys if is_dir else file_keys:
+                try:
+                    # On Windows DirEntry.stat() sets st_dev and st_ino to 0, os.stat() returns them
+                    stat_result = os.stat(entry.path, follow_symlinks=followlinks) if os.name == "nt" else entry.stat(follow_symlinks=followlinks)
+                except OSError:
+                    continue
+                key = (stat_result.st_dev, stat_result.st_ino)
+
+            entries.append((entry.path, prefix + entry.name, is_dir, key))
+
+    return entries
+
+
+def iterate_directory_entries(directory: str, file_type: str = 'all', absolute: bool = True, recursive: bool = True, followlinks: bool = True, start_directory: str = None, deduplicate: bool = False, max_workers: Optional[int] = None):
     """ Generate entries (files, directories, or both) in a given directory using os.scandir().
 
+    Directories are walked iteratively, without a generator frame per directory level, and relative paths are built while walking rather than with os.path.relpath per entry. Entries are yielded in directory order, not sorted, and each directory is yielded after the entries in it. Directories named GLASSWALL_DIRECTORY_NAME, where glasswall stores its own files, are skipped.
+
+    When following symbolic links, a symbolic link to a directory that contains it is not followed, so symbolic link loops are walked once. Loops are detected by device and inode number.
+
     Args:
         directory (str): The path to the directory whose entries are to be listed.
         file_type (str, optional): Type of entries to return.
@@ -263,6 +318,8 @@ def iterate_directory_entries(directory: str, file_type: str = 'all', absolute:
         recursive (bool, optional): Whether to recurse into subdirectories (default is True).
         followlinks (bool, optional): Whether to follow symbolic links and yield entries from the target directory (default is True).
         start_directory (str, optional): The starting directory used to calculate relative paths (default is None).
+        deduplicate (bool, optional): Whether to skip files and directories with the same device and inode number as an entry already yielded, such as hard links and symbolic links to the same target (default is False). Requires a stat call per entry.
+        max_workers (Optional[int], optional): The number of threads used to scan directories in parallel (default is None, scan in the calling thread). Useful on network file systems where each directory listing has a high latency. Entries are yielded in the order directories are scanned, so each directory is yielded before the entries in it.
 
     Yields:
         str: The full path of each file or directory found in the specified directory.
@@ -298,35 +355,82 @@ def iterate_directory_entries(directory: str, file_type: str = 'all', absolute:
     # Convert the directory to an absolute path
     directory = os.path.abspath(directory)
 
-    # Set the start_directory to the provided directory if not specified
-    start_directory = start_directory or directory
-
-    # Get the directory entries using os.scandir()
-    for entry in os.scandir(directory):
-        # If the entry is a directory
-        if entry.is_dir(follow_symlinks=followlinks):
-            # If recursive is True, traverse the subdirectory
-            if recursive:
-                yield from iterate_directory_entries(entry.path, file_type, absolute, recursive, followlinks, start_directory)
-
-            # If the file_type is not "files", yield the directory entry
-            if file_type != "files":
-                if absolute:
-                    yield entry.path
-                else:
-                    yield os.path.relpath(entry.path, start=start_directory)
-
-        # If the entry is a file
-        elif entry.is_file(follow_symlinks=followlinks):
-            # If the file_type is not "directories", yield the file entry
-            if file_type != "directories":
-                if absolute:
-                    yield entry.path
-                else:
-                    yield os.path.relpath(entry.path, start=start_directory)
-
-
-def list_file_paths(directory: str, file_type: str = 'files', absolute: bool = True, recursive: bool = True, followlinks: bool = True) -> list:
+    # Relative paths are built by joining the relative path of each directory with entry names
+    prefix = ""
+    if start_directory and os.path.abspath(start_directory) != directory:
+        prefix = os.path.relpath(directory, start=start_directory) + os.sep
+
+    # Device and inode numbers are needed to detect symbolic link loops and duplicates
+    directory_keys = deduplicate or (followlinks and recursive)
+    file_keys = deduplicate
+    root_key = None
+    if directory_keys:
+        stat_result = os.stat(directory)
+        root_key = (stat_result.st_dev, stat_result.st_ino)
+    seen = {root_key} if deduplicate else None
+
+    yield_files = file_type != "directories"
+    yield_directories = file_type != "files"
+
+    def walk_entries(entries, ancestors):
+        """ Yields (path, directory_to_scan) for entries, where directory_to_scan is (path, prefix, ancestors) or None. """
+        for path, relative_path, is_dir, key in entries:
+            if deduplicate:
+                if key in seen:
+                    continue
+                seen.add(key)
+
+            if is_dir:
+                subdirectory = None
+                # Do not follow symbolic links to a directory that contains this directory
+                if recursive and (key is None or key not in ancestors):
+                    subdirectory = (path, relative_path + os.sep, ancestors | {key} if key is not None else ancestors)
+                yield (path if absolute else relative_path) if yield_directories else None, subdirectory
+            elif yield_files:
+                yield path if absolute else relative_path, None
+
+    root_ancestors = frozenset() if root_key is None else frozenset({root_key})
+
+    if not max_workers:
+        # Depth first, using a stack of (entries being walked, path of their directory to yield once they are exhausted)
+        stack = [(walk_entries(_scan_directory(directory, prefix, followlinks, directory_keys, file_keys), root_ancestors), None)]
+        while stack:
+            entries, directory_path = stack[-1]
+            for entry_path, subdirectory in entries:
+                if subdirectory is not None:
+                    # Walk the subdirectory before yielding it
+                    path, subdirectory_prefix, ancestors = subdirectory
+                    stack.append((walk_entries(_scan_directory(path, subdirectory_prefix, followlinks, directory_keys, file_keys), ancestors), entry_path))
+                    break
+                if entry_path is not None:
+                    yield entry_path
+            else:
+                stack.pop()
+                if directory_path is not None:
+                    yield directory_path
+        return
+
+    # Scan directories in parallel threads, yielding entries from the main thread as each directory scan completes
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(_scan_directory, directory, prefix, followlinks, directory_keys, file_keys): root_ancestors}
+        try:
+            while futures:
+                done, _ = concurrent.futures.wait(futures, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    ancestors = futures.pop(future)
+                    for entry_path, subdirectory in walk_entries(future.result(), ancestors):
+                        if entry_path is not None:
+                            yield entry_path
+                        if subdirectory is not None:
+                            path, prefix, subdirectory_ancestors = subdirectory
+                            futures[executor.submit(_scan_directory, path, prefix, followlinks, directory_keys, file_keys)] = subdirectory_ancestors
+        finally:
+            # Stop scanning if the generator is closed early
+            for future in futures:
+                future.cancel()
+
+
+def list_file_paths(directory: str, file_type: str = 'files', absolute: bool = True, recursive: bool = True, followlinks: bool = True, sort: bool = True, deduplicate: bool = False, max_workers: Optional[int] = None) -> list:
     """ List all file paths in a given directory and its subdirectories.
 
     Args:
@@ -338,6 +442,9 @@ def list_file_paths(directory: str, file_type: str = 'files', absolute: bool = T
         absolute (bool, optional): Whether to return absolute paths (default is True).
         recursive (bool, optional): Whether to recurse into subdirectories (default is True).
         followlinks (bool, optional): Whether to follow symbolic links and list file paths from the target directory (default is True).
+        sort (bool, optional): Whether to sort the file paths (default is True). Sorting requires all paths to be listed first, use iterate_directory_entries to stream paths.
+        deduplicate (bool, optional): Whether to skip files and directories with the same device and inode number as one already listed (default is False).
+        max_workers (Optional[int], optional): The number of threads used to scan directories in parallel (default is None).
 
     Returns:
         list: A list of file paths found in the specified directory and its subdirectories.
@@ -347,8 +454,12 @@ def list_file_paths(directory: str, file_type: str = 'files', absolute: bool = T
         file_paths = list_file_paths(directory)
         print(file_paths)
     """
-    # Remove duplicate file paths (symlinks of same files or other symlinks), and sort
-    return sorted(set(iterate_directory_entries(directory, file_type, absolute, recursive, followlinks)))
+    # Each path is only yielded once, sorting is all that is needed
+    file_paths = list(iterate_directory_entries(directory, file_type, absolute, recursive, followlinks, deduplicate=deduplicate, max_workers=max_workers))
+    if sort:
+        file_paths.sort()
+
+    return file_paths
 
 
 def list_subdirectory_paths(directory: str, recursive: bool = False, absolute: bool = True):
@@ -426,6 +537,28 @@ def round_up(number: float, decimals=0) -> float:
     return math.ceil(number * multiplier) / multiplier
 
 
+@functools.lru_cache()
+def get_ram_temp_directory() -> str:
+    """ Returns a temporary directory backed by RAM where available, e.g. /dev/shm/glasswall on Linux, otherwise glasswall._TEMPDIR. The directory is created if it does not exist.
+
+    Returns:
+        directory (str): The temporary directory path.
+    """
+    ram_directory = "/dev/shm"
+    if os.path.isdir(ram_directory) and os.access(ram_directory, os.W_OK):
+        directory = os.path.join(ram_directory, os.path.basename(glasswall._TEMPDIR))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            if os.access(directory, os.W_OK):
+                return directory
+        except OSError:
+            pass
+
+    os.makedirs(glasswall._TEMPDIR, exist_ok=True)
+
+    return glasswall._TEMPDIR
+
+
 class TempDirectoryPath:
     """ Gives a path to a uniquely named temporary directory that does not currently exist on __enter__, deletes the directory if it exists on __exit__.
 
@@ -499,7 +632,68 @@ class TempFilePath:
                 os.remove(self.temp_file)
 
 
+class TempPathPool:
+    """ A pool of reusable temporary file paths in a uniquely named directory, by default RAM-backed (see get_ram_temp_directory). Paths are created once and reused instead of generating a new TempFilePath per call, and any file at a path is deleted when the path is released. The directory is deleted when the pool is closed or garbage collected. Thread safe.
+
+    Args:
+        size (int, optional): Default 8. The number of paths in the pool.
+        directory (Optional[str], optional): Default None. The directory to create the pool directory in. If None, get_ram_temp_directory() is used.
+
+    Example:
+        pool = TempPathPool()
+        with pool.paths(2) as (input_file, output_file):
+            ...
+    """
+
+    def __init__(self, size: int = 8, directory: Optional[str] = None):
+        # Validate args
+        if not isinstance(size, int):
+            raise TypeError(size)
+        if size < 1:
+            raise ValueError(size)
+        if not isinstance(directory, (str, type(None))):
+            raise TypeError(directory)
+
+        self.size = size
+        self.directory = tempfile.mkdtemp(dir=directory or get_ram_temp_directory())
+        self._available = [os.path.join(self.directory, str(index)) for index in range(size)]
+        self._condition = threading.Condition()
+        self._finalizer = weakref.finalize(self, shutil.rmtree, self.directory, ignore_errors=True)
+
+    def close(self):
+        """ Deletes the pool directory and any files in it. """
+        self._finalizer()
+
+    @contextmanager
+    def paths(self, count: int = 1):
+        """ Acquires `count` paths from the pool, waiting until enough paths are available, and releases them on exit.
+
+        Args:
+            count (int, optional): Default 1. The number of paths to acquire, at most the size of the pool.
+
+        Yields:
+            paths (List[str]): The acquired paths. No file exists at each path.
+        """
+        if not 1 <= count <= self.size:
+            raise ValueError(count)
+
+        # Acquire all paths at once so that concurrent callers cannot each hold part of what they need
+        with self._condition:
+            self._condition.wait_for(lambda: len(self._available) >= count)
+            acquired = [self._available.pop() for _ in range(count)]
+        try:
+            yield acquired
+        finally:
+            for path in acquired:
+                if os.path.isfile(path):
+                    os.remove(path)
+            with self._condition:
+                self._available.extend(acquired)
+                self._condition.notify_all()
+
+
 # NOTE typehint as string due to no "from __future__ import annotations" support on python 3.6 on ubuntu-16.04 / centos7
+@instrumented
 def validate_xml(xml: Union[str, bytes, bytearray, io.BytesIO, "glasswall.content_management.policies.policy.Policy"]):
     """ Attempts to parse the xml provided, returning the xml as string. Raises ValueError if the xml cannot be parsed.
 
@@ -513,6 +707,10 @@ def validate_xml(xml: Union[str, bytes, bytearray, io.BytesIO, "glasswall.conten
         ValueError: if the xml cannot be parsed.
         TypeError: if the type of arg "xml" is invalid
     """
+    # CompiledPolicy xml is validated once when compiled
+    if isinstance(xml, glasswall.content_management.policies.CompiledPolicy):
+        return xml.text
+
     try:
         # Get tree from file/str
         if isinstance(xml, str):
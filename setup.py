@@ -17,7 +17,7 @@ setuptools.setup(
     author="AngusWR",
     author_email="aroberts@glasswall.com",
     url="https://github.com/gw-engineering/glasswall-python-wrapper",
-    packages=setuptools.find_packages(),
+    packages=setuptools.find_packages(exclude=["benchmarks", "benchmarks.*"]),
     classifiers=[
         "Programming Language :: Python :: 3.6",
     ],
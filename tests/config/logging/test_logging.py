@@ -1,9 +1,27 @@
 
 
 import logging
+import logging.handlers
+import os
 import unittest
 
-from glasswall.config.logging import format_object, log, log_handler
+from glasswall.config import logging as glasswall_logging
+from glasswall.config.logging import DebugSamplingFilter, LazyFormat, format_object, log, log_handler
+from glasswall.multiprocessing.manager import GlasswallProcessManager
+from glasswall.multiprocessing.tasks import Task
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def logging_task(message):
+    log.info(message)
 
 
 class TestLoggingConfiguration(unittest.TestCase):
@@ -62,6 +80,31 @@ class TestLoggingConfiguration(unittest.TestCase):
         # Assert that the formatted string matches the expected output
         self.assertEqual(formatted, "\n\tattr1: value1\n\tattr2: value2")
 
+    def test_lazy_format(self):
+        """
+        Test that LazyFormat only calls its function when a log record is formatted.
+        This test logs a LazyFormat argument at a disabled log level and checks that the
+        function is not called, then at an enabled log level and checks the formatted message.
+        """
+        calls = []
+
+        def expensive_message(value):
+            calls.append(value)
+            return f"expensive {value}"
+
+        log_level = log.level
+        try:
+            log.setLevel(logging.INFO)
+            log.debug("%s", LazyFormat(expensive_message, "debug"))
+            self.assertEqual(calls, [])
+
+            with self.assertLogs(log, level=logging.INFO) as cm:
+                log.info("%s", LazyFormat(expensive_message, value="info"))
+            self.assertEqual(calls, ["info"])
+            self.assertIn("INFO:glasswall.config.logging:expensive info", cm.output)
+        finally:
+            log.setLevel(log_level)
+
     def test_log_levels(self):
         """
         Test that logging messages are correctly logged at different log levels.
@@ -125,6 +168,60 @@ class TestLoggingConfiguration(unittest.TestCase):
                 # Assert that the expected message is in the log file contents
                 self.assertIn(message, log_contents)
 
+    def test_debug_sampling_filter(self):
+        """
+        Test that DebugSamplingFilter passes every nth DEBUG record per operation and all records above DEBUG.
+        """
+        sampling_filter = DebugSamplingFilter({"run_session": 0.25, "*": 0})
+
+        def record(level, func_name):
+            return logging.LogRecord(log.name, level, __file__, 1, "message", None, None, func=func_name)
+
+        self.assertEqual([sampling_filter.filter(record(logging.DEBUG, "run_session")) for _ in range(8)], [True, False, False, False, True, False, False, False])
+        self.assertFalse(sampling_filter.filter(record(logging.DEBUG, "protect_file")))
+        self.assertTrue(sampling_filter.filter(record(logging.INFO, "protect_file")))
+        self.assertEqual(DebugSamplingFilter.parse("0.1, run_session=0.01"), {"*": 0.1, "run_session": 0.01})
+
+    def test_set_debug_sampling_rates(self):
+        """
+        Test that set_debug_sampling_rates adds a single filter to the logger and exports the rates to worker processes.
+        """
+        try:
+            glasswall_logging.set_debug_sampling_rates({"*": 0.5}, run_session=0.01)
+            glasswall_logging.set_debug_sampling_rates(run_session=0.1)
+            self.assertEqual(sum(isinstance(f, DebugSamplingFilter) for f in log.filters), 1)
+            self.assertEqual(os.environ["glasswall_log_debug_sampling"], "run_session=0.1")
+        finally:
+            glasswall_logging.set_debug_sampling_rates()
+        self.assertFalse(any(isinstance(f, DebugSamplingFilter) for f in log.filters))
+        self.assertNotIn("glasswall_log_debug_sampling", os.environ)
+
+    def test_queue_listener_writes_worker_records(self):
+        """
+        Test that with a QueueListener running, records logged in this process and in GlasswallProcessManager workers
+        are written by the original handlers, and that stop_queue_listener restores them.
+        """
+        handler = ListHandler()
+        log.addHandler(handler)
+        handlers = list(log.handlers)
+        try:
+            listener = glasswall_logging.start_queue_listener()
+            self.assertIs(glasswall_logging.start_queue_listener(), listener)
+            self.assertEqual([type(h) for h in log.handlers], [logging.handlers.QueueHandler])
+
+            log.info("from parent")
+            manager = GlasswallProcessManager(max_workers=2)
+            for index in range(3):
+                manager.queue_task(Task(logging_task, args=(f"from worker {index}",)))
+            task_results = list(manager.as_completed())
+            self.assertTrue(all(task_result.success for task_result in task_results))
+        finally:
+            glasswall_logging.stop_queue_listener()
+            log.removeHandler(handler)
+
+        self.assertEqual(log.handlers, [h for h in handlers if h is not handler])
+        self.assertEqual(sorted(handler.messages), ["from parent", "from worker 0", "from worker 1", "from worker 2"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+
+import glasswall
+from glasswall import utils
+from glasswall.content_management.errors.config_elements import ConfigElementNotFound
+from glasswall.content_management.errors.policies import ImmutablePolicyError
+from glasswall.content_management.errors.switches import SwitchNotFound
+from glasswall.content_management.policies import CompiledPolicy
+from glasswall.content_management.switches.switch import Switch
+
+
+class TestCompiledPolicy(unittest.TestCase):
+    def setUp(self):
+        self.policy = glasswall.content_management.policies.Editor(
+            default="sanitise",
+            config={
+                "pdfConfig": {
+                    "javascript": "disallow",
+                    "custom_switch": "allow",
+                },
+            },
+        )
+        self.compiled_policy = self.policy.compile()
+
+    def test_compile___returns_CompiledPolicy_instance_of_Policy(self):
+        self.assertIsInstance(self.compiled_policy, CompiledPolicy)
+        self.assertIsInstance(self.compiled_policy, glasswall.content_management.policies.Policy)
+        self.assertIs(self.compiled_policy.compile(), self.compiled_policy)
+
+    def test_compile___invalid_type___raises_TypeError(self):
+        with self.assertRaises(TypeError):
+            CompiledPolicy("<config/>")
+
+    def test_text___matches_validated_policy_text(self):
+        self.assertEqual(self.compiled_policy.text, utils.validate_xml(self.policy))
+        self.assertEqual(str(self.compiled_policy), self.compiled_policy.text)
+
+    def test_encode___returns_cached_bytes(self):
+        self.assertEqual(self.compiled_policy.encode(), self.compiled_policy.text.encode("utf-8"))
+        self.assertIs(self.compiled_policy.encode("utf-8"), self.compiled_policy.bytes)
+        self.assertIs(self.compiled_policy.encode(), self.compiled_policy.bytes)
+        self.assertEqual(self.compiled_policy.encode("utf-16"), self.compiled_policy.text.encode("utf-16"))
+
+    def test_validate_xml___returns_cached_text(self):
+        self.assertIs(utils.validate_xml(self.compiled_policy), self.compiled_policy.text)
+
+    def test_getattr___config_elements_and_switches_indexed(self):
+        self.assertIs(self.compiled_policy.get_config_element("pdfConfig"), self.compiled_policy.pdfConfig)
+        self.assertIsInstance(self.compiled_policy.pdfConfig, type(self.policy.pdfConfig))
+        self.assertEqual(self.compiled_policy.pdfConfig.text, self.policy.pdfConfig.text)
+        self.assertIs(self.compiled_policy.pdfConfig.javascript, self.compiled_policy.get_switch("pdfConfig", "javascript"))
+        self.assertEqual(self.compiled_policy.get_switch("pdfConfig", "javascript").value, "disallow")
+        self.assertEqual(self.compiled_policy.get_switch("pdfConfig", "custom_switch").value, "allow")
+        self.assertEqual(self.compiled_policy.get_config_element_names(), self.policy.get_config_element_names())
+
+    def test_getattr___missing___raises_errors(self):
+        with self.assertRaises(AttributeError):
+            self.compiled_policy.missingConfig
+        with self.assertRaises(ConfigElementNotFound):
+            self.compiled_policy.get_config_element("missingConfig")
+        with self.assertRaises(SwitchNotFound):
+            self.compiled_policy.get_switch("pdfConfig", "missing_switch")
+
+        default = Switch(name="missing_switch", value="allow")
+        self.assertIs(self.compiled_policy.get_switch("pdfConfig", "missing_switch", default=default), default)
+
+    def test_modification___raises_ImmutablePolicyError(self):
+        with self.assertRaises(ImmutablePolicyError):
+            self.compiled_policy.default = "allow"
+        with self.assertRaises(ImmutablePolicyError):
+            self.compiled_policy.add_switch("pdfConfig", Switch(name="javascript", value="allow"))
+        with self.assertRaises(ImmutablePolicyError):
+            self.compiled_policy.remove_switch("pdfConfig", "javascript")
+        with self.assertRaises(ImmutablePolicyError):
+            self.compiled_policy.add_config_element(glasswall.content_management.config_elements.gifConfig())
+        with self.assertRaises(ImmutablePolicyError):
+            self.compiled_policy.remove_config_element("pdfConfig")
+        with self.assertRaises(TypeError):
+            self.compiled_policy.config["pdfConfig"] = {}
+
+    def test_config_element_and_switch_modification___raises_ImmutablePolicyError(self):
+        config_element = self.compiled_policy.pdfConfig
+        with self.assertRaises(ImmutablePolicyError):
+            config_element.add_switch(Switch(name="javascript", value="allow"))
+        with self.assertRaises(ImmutablePolicyError):
+            config_element.remove_switch("javascript")
+        with self.assertRaises(ImmutablePolicyError):
+            config_element.switches.append(Switch(name="javascript", value="allow"))
+        with self.assertRaises(ImmutablePolicyError):
+            config_element.javascript.value = "allow"
+        with self.assertRaises(TypeError):
+            config_element.attributes["name"] = "value"
+        with self.assertRaises(TypeError):
+            self.compiled_policy.config["pdfConfig"]["javascript"] = "allow"
+        self.assertEqual(self.compiled_policy.get_switch("pdfConfig", "javascript").value, "disallow")
+
+    def test_source_policy_modified___compiled_policy_unchanged(self):
+        text = self.compiled_policy.text
+        digest = self.compiled_policy.digest
+        self.policy.add_switch("pdfConfig", Switch(name="javascript", value="allow"))
+        self.policy.pdfConfig.custom_switch.value = "disallow"
+
+        self.assertEqual(self.compiled_policy.text, text)
+        self.assertEqual(self.compiled_policy.digest, digest)
+        self.assertEqual(self.compiled_policy.pdfConfig.javascript.value, "disallow")
+        self.assertEqual(self.compiled_policy.pdfConfig.custom_switch.value, "allow")
+        self.assertIn("<javascript>disallow</javascript>", self.compiled_policy.pdfConfig.text)
+
+    def test_compiled_policy_from_kwargs___matches_compiled_policy(self):
+        config = {"customConfig": {"custom_switch": "allow"}}
+        self.assertEqual(CompiledPolicy(config=config).text, glasswall.content_management.policies.Policy(config=config).compile().text)
+
+
+if __name__ == "__main__":
+    unittest.main()
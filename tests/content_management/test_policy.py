@@ -1,6 +1,8 @@
 
 
 import inspect
+import os
+import tempfile
 import unittest
 
 import glasswall
@@ -777,6 +779,93 @@ class TestPolicy(unittest.TestCase):
             # The two policies should be equal
             self.assertTrue(policy.text == policy_from_string.text, msg=f"Policy texts not equal:\n{policy.text}\n{policy_from_string.text}")
 
+    def test_policy_from_string___iterparse___policy_strings_equal(self):
+        policy = glasswall.content_management.policies.WordSearch(
+            default="allow",
+            config={
+                "textSearchConfig": {
+                    "@libVersion": "core2",
+                    "textList": [
+                        {"name": "textItem", "switches": [
+                            {"name": "text", "value": f"term{i}"},
+                            {"name": "textSetting", "@replacementChar": "*", "value": "redact"},
+                        ]}
+                        for i in range(100)
+                    ]
+                }
+            }
+        )
+
+        policy_from_string = glasswall.content_management.policies.Policy.from_string(policy.text, iterparse=True)
+
+        self.assertEqual(policy.text, policy_from_string.text)
+        self.assertEqual(len(policy_from_string.textSearchConfig.textList.subelements), 100)
+
+    def test_policy_from_string___bytes_and_file_path___policy_strings_equal(self):
+        policy = glasswall.content_management.policies.Rebuild(default="sanitise")
+
+        with tempfile.TemporaryDirectory() as temp_directory:
+            file_path = os.path.join(temp_directory, "policy.xml")
+            with open(file_path, "w") as f:
+                f.write(policy.text)
+
+            for iterparse in (False, True):
+                self.assertEqual(policy.text, glasswall.content_management.policies.Policy.from_string(policy.text.encode("utf-8"), iterparse=iterparse).text)
+                self.assertEqual(policy.text, glasswall.content_management.policies.Policy.from_string(file_path, iterparse=iterparse).text)
+
+    def test_policy_from_string___duplicate_switches___last_switch_kept(self):
+        policy_from_string = glasswall.content_management.policies.Policy.from_string(
+            "<config><pdfConfig><acroform>allow</acroform><acroform>disallow</acroform></pdfConfig></config>"
+        )
+
+        self.assertEqual(policy_from_string.pdfConfig.acroform.value, "disallow")
+        self.assertEqual(len([switch for switch in policy_from_string.pdfConfig.switches if switch.name == "acroform"]), 1)
+
+    def test_policy_from_string___invalid_xml___raises_ContentManagementPolicyError(self):
+        for iterparse in (False, True):
+            for string in ("<config><pdfConfig></config>", "<notconfig/>"):
+                with self.assertRaises(glasswall.content_management.errors.policies.ContentManagementPolicyError):
+                    glasswall.content_management.policies.Policy.from_string(string, iterparse=iterparse)
+
+    def test_diff___equal_policies___empty_diff(self):
+        policy = glasswall.content_management.policies.Rebuild(default="sanitise")
+
+        self.assertEqual(
+            policy.diff(glasswall.content_management.policies.Rebuild(default="sanitise")),
+            dict(config_elements_added=[], config_elements_removed=[], config_elements_changed={}),
+        )
+
+    def test_diff___changed_policies___differences_returned(self):
+        policy = glasswall.content_management.policies.WordSearch(default="allow")
+        policy.add_textItems([("password", "*"), ("email", "*")])
+        other = glasswall.content_management.policies.WordSearch(default="allow")
+        other.add_textItems([("email", "*"), ("secret", "#")])
+        other.add_switch("pdfConfig", Switch(name="javascript", value="disallow"))
+        other.add_switch("pdfConfig", Switch(name="custom", value="allow"))
+        other.pdfConfig.attributes["custom"] = "1"
+        other.remove_config_element("xlsConfig")
+        other.add_config_element(ConfigElement(name="customConfig"))
+
+        diff = policy.diff(other)
+
+        self.assertEqual([c.name for c in diff["config_elements_added"]], ["customConfig"])
+        self.assertEqual([c.name for c in diff["config_elements_removed"]], ["xlsConfig"])
+        self.assertEqual(sorted(diff["config_elements_changed"]), ["pdfConfig", "textSearchConfig"])
+
+        pdfConfig_diff = diff["config_elements_changed"]["pdfConfig"]
+        self.assertEqual(pdfConfig_diff["attributes"], {"custom": (None, "1")})
+        self.assertEqual([s.name for s in pdfConfig_diff["switches_added"]], ["custom"])
+        self.assertEqual([(old.value, new.value) for old, new in pdfConfig_diff["switches_changed"]], [("allow", "disallow")])
+        self.assertEqual(pdfConfig_diff["switches_removed"], [])
+
+        textSearchConfig_diff = diff["config_elements_changed"]["textSearchConfig"]
+        self.assertEqual(len(textSearchConfig_diff["subelements_removed"]), 1)
+        self.assertEqual(len(textSearchConfig_diff["subelements_added"]), 1)
+
+        textList_diff = textSearchConfig_diff["subelements_removed"][0].diff(textSearchConfig_diff["subelements_added"][0])
+        self.assertEqual([s.switches[0].value for s in textList_diff["subelements_added"]], ["secret"])
+        self.assertEqual([s.switches[0].value for s in textList_diff["subelements_removed"]], ["password"])
+
 
 if __name__ == "__main__":
     unittest.main()
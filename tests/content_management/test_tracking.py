@@ -0,0 +1,132 @@
+import unittest
+
+import glasswall
+from glasswall.content_management.config_elements.config_element import ConfigElement
+from glasswall.content_management.switches.switch import Switch
+
+
+def clear_text_caches(element):
+    """ Clears the cached XML of element and everything it contains. """
+    element.__dict__["_text_cache"] = None
+    if isinstance(element, glasswall.content_management.policies.Policy):
+        children = element.config_elements
+    elif isinstance(element, ConfigElement):
+        children = [*element.subelements, *element.switches]
+    else:
+        children = []
+    for child in children:
+        clear_text_caches(child)
+
+
+def uncached_text(policy):
+    clear_text_caches(policy)
+    return policy.text
+
+
+class TestTracking(unittest.TestCase):
+    def setUp(self):
+        self.policy = glasswall.content_management.policies.WordSearch(
+            default="allow",
+            config={
+                "textSearchConfig": {
+                    "@libVersion": "core2",
+                    "textList": [
+                        {"name": "textItem", "switches": [
+                            {"name": "text", "value": "password"},
+                            {"name": "textSetting", "@replacementChar": "*", "value": "redact"},
+                        ]},
+                    ]
+                }
+            }
+        )
+        self.text = self.policy.text
+
+    def test_text___unchanged___returns_cached_string(self):
+        self.assertIs(self.policy.text, self.text)
+        self.assertEqual(self.text, uncached_text(self.policy))
+
+    def test_text___switch_value_changed___text_updated(self):
+        self.policy.textSearchConfig.textList.subelements[0].switches[0].value = "email"
+
+        self.assertIn("<text>email</text>", self.policy.text)
+        self.assertEqual(self.policy.text, uncached_text(self.policy))
+
+    def test_text___switch_attribute_changed___text_updated(self):
+        self.policy.textSearchConfig.textList.subelements[0].textSetting.attributes["replacementChar"] = "#"
+
+        self.assertIn('replacementChar="#"', self.policy.text)
+        self.assertEqual(self.policy.text, uncached_text(self.policy))
+
+    def test_text___config_element_attributes_updated___text_updated(self):
+        self.policy.textSearchConfig.attributes.update({"libVersion": "core3"})
+
+        self.assertIn('<textSearchConfig libVersion="core3">', self.policy.text)
+        self.assertEqual(self.policy.text, uncached_text(self.policy))
+
+    def test_text___subelement_appended___text_updated(self):
+        self.policy.textSearchConfig.textList.subelements.append(ConfigElement(
+            name="textItem",
+            switches=[Switch(name="text", value="email"), Switch(name="textSetting", value="redact")],
+        ))
+
+        self.assertIn("<text>email</text>", self.policy.text)
+        self.assertEqual(self.policy.text, uncached_text(self.policy))
+
+    def test_text___switches_reassigned_and_config_element_added___text_updated(self):
+        policy = glasswall.content_management.policies.Rebuild(default="sanitise")
+        text = policy.text
+
+        policy.add_switch("pdfConfig", Switch(name="javascript", value="disallow"))
+        self.assertIn("<javascript>disallow</javascript>", policy.text)
+        self.assertEqual(policy.text, uncached_text(policy))
+
+        policy.remove_config_element("pdfConfig")
+        self.assertNotIn("pdfConfig", policy.text)
+
+        policy.add_config_element(glasswall.content_management.config_elements.pdfConfig(default="sanitise"))
+        self.assertEqual(policy.text, text)
+
+    def test_text___switch_shared_by_two_config_elements___both_updated(self):
+        switch = Switch(name="shared", value="a")
+        policy = glasswall.content_management.policies.Policy(config_elements=[
+            ConfigElement(name="customConfig1", switches=[switch]),
+            ConfigElement(name="customConfig2", switches=[switch]),
+        ])
+        self.assertEqual(policy.text.count("<shared>a</shared>"), 2)
+
+        switch.value = "b"
+
+        self.assertEqual(policy.text.count("<shared>b</shared>"), 2)
+        self.assertEqual(policy.customConfig1.text, "<customConfig1>\n    <shared>b</shared>\n</customConfig1>")
+
+    def test_digest___equal_text___equal_digest(self):
+        policy = glasswall.content_management.policies.Policy.from_string(self.text)
+
+        self.assertIsNot(policy, self.policy)
+        self.assertEqual(policy.digest, self.policy.digest)
+        self.assertEqual(policy.compile().digest, self.policy.digest)
+
+    def test_digest___switch_changed_and_restored___digest_updated(self):
+        digest = self.policy.digest
+        textItem_digest = self.policy.textSearchConfig.textList.subelements[0].digest
+        pdfConfig_digest = self.policy.pdfConfig.digest
+
+        self.policy.textSearchConfig.textList.subelements[0].switches[0].value = "email"
+        self.assertNotEqual(self.policy.digest, digest)
+        self.assertNotEqual(self.policy.textSearchConfig.textList.subelements[0].digest, textItem_digest)
+        self.assertEqual(self.policy.pdfConfig.digest, pdfConfig_digest)
+
+        self.policy.textSearchConfig.textList.subelements[0].switches[0].value = "password"
+        self.assertEqual(self.policy.digest, digest)
+
+    def test_digest___attribute_changed_before_text___digest_updated(self):
+        policy = glasswall.content_management.policies.Policy(config_elements=[ConfigElement(name="customConfig", attributes={"a": "1"})])
+        digest = policy.digest
+
+        policy.customConfig.attributes["a"] = "2"
+
+        self.assertNotEqual(policy.digest, digest)
+
+
+if __name__ == "__main__":
+    unittest.main()
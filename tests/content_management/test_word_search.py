@@ -0,0 +1,65 @@
+import io
+import os
+import tempfile
+import unittest
+
+import glasswall
+
+
+class TestWordSearch(unittest.TestCase):
+    def setUp(self):
+        self.textItems = [
+            ("password", "*"),
+            ("email", "#", "redact"),
+            ("PASSWORD", "@"),
+            ("secret", "*", "noAction"),
+            ("Email", "%"),
+        ]
+
+    def test_add_textItems___same_as_add_textItem_per_item(self):
+        expected = glasswall.content_management.policies.WordSearch()
+        expected.add_textItem("existing", "*")
+        expected.add_textItem("secret", "*")
+        for textItem in self.textItems:
+            expected.add_textItem(*textItem)
+
+        policy = glasswall.content_management.policies.WordSearch()
+        policy.add_textItem("existing", "*")
+        policy.add_textItem("secret", "*")
+        policy.add_textItems(self.textItems)
+
+        self.assertEqual(policy.text, expected.text)
+
+    def test_add_textItems___duplicates___last_case_insensitive_match_kept(self):
+        policy = glasswall.content_management.policies.WordSearch().add_textItems(iter(self.textItems))
+
+        textList = policy.textSearchConfig.subelements[0]
+        self.assertEqual(
+            [(textItem.switches[0].value, textItem.switches[1].attributes["replacementChar"], textItem.switches[1].value) for textItem in textList.subelements],
+            [("PASSWORD", "@", "redact"), ("secret", "*", "noAction"), ("Email", "%", "redact")],
+        )
+
+    def test_write___file_path_and_file_object___same_as_text(self):
+        policy = glasswall.content_management.policies.WordSearch().add_textItems(
+            (f"term{i}", "*") for i in range(100)
+        )
+
+        f = io.StringIO()
+        policy.write(f)
+        self.assertEqual(f.getvalue(), policy.text)
+
+        with tempfile.TemporaryDirectory() as temp_directory:
+            file_path = os.path.join(temp_directory, "nested", "policy.xml")
+            policy.write(file_path)
+
+            with open(file_path, "r", encoding="utf-8") as f:
+                self.assertEqual(f.read(), policy.text)
+
+            # Cached text is written as a single string
+            policy.write(file_path)
+            with open(file_path, "r", encoding="utf-8") as f:
+                self.assertEqual(f.read(), policy.text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import io
+import os
+import tempfile
+import threading
+import unittest
+
+from glasswall import determine_file_type as dft
+
+
+class FakeDetermineFileType:
+    """ Returns "doc" for every file, recording the inputs and threads it was called with. """
+
+    def __init__(self):
+        self.input_files = []
+        self.thread_ids = set()
+        self.lock = threading.Lock()
+
+    def __call__(self, input_file, as_string=False, raise_unsupported=True):
+        with self.lock:
+            self.input_files.append(input_file)
+            self.thread_ids.add(threading.get_ident())
+        if input_file == b"unsupported" and raise_unsupported:
+            raise dft.errors.ft_unknown(0)
+        return "doc" if as_string else dft.file_type_str_to_int("doc")
+
+
+class TestDetermineFileTypes(unittest.TestCase):
+    def setUp(self):
+        self.temp_directory = tempfile.TemporaryDirectory()
+        self.pdf_path = os.path.join(self.temp_directory.name, "file.pdf")
+        with open(self.pdf_path, "wb") as f:
+            f.write(b"%PDF-1.7\n")
+        self.input_files = [
+            self.pdf_path,
+            b"\x89PNG\r\n\x1a\n...",
+            io.BytesIO(b"\x1f\x8b\x08..."),
+            bytearray(b"7z\xbc\xaf\x27\x1c..."),
+            b"PK\x03\x04...",
+            b"\xd0\xcf\x11\xe0...",
+        ]
+
+    def tearDown(self):
+        self.temp_directory.cleanup()
+
+    def test_prefilter___unambiguous_types_classified_without_glasswall(self):
+        determine_file_type = FakeDetermineFileType()
+
+        file_types = dft.determine_file_types(determine_file_type, iter(self.input_files), as_string=True, max_workers=2)
+
+        self.assertEqual(file_types, ["pdf", "png", "gz", "7z", "doc", "doc"])
+        self.assertCountEqual(determine_file_type.input_files, self.input_files[4:])
+        self.assertEqual(
+            dft.determine_file_types(determine_file_type, self.input_files[:1]),
+            [dft.file_type_str_to_int("pdf")],
+        )
+
+    def test_no_prefilter___all_files_passed_to_glasswall_in_current_thread_by_default(self):
+        determine_file_type = FakeDetermineFileType()
+
+        file_types = dft.determine_file_types(determine_file_type, self.input_files, as_string=True, prefilter=False)
+
+        self.assertEqual(file_types, ["doc"] * len(self.input_files))
+        self.assertEqual(determine_file_type.input_files, self.input_files)
+        self.assertEqual(determine_file_type.thread_ids, {threading.get_ident()})
+
+    def test_unsupported___raises(self):
+        with self.assertRaises(dft.errors.ft_unknown):
+            dft.determine_file_types(FakeDetermineFileType(), [b"doc", b"unsupported", b"doc"], max_workers=2)
+
+        self.assertEqual(
+            dft.determine_file_types(FakeDetermineFileType(), [b"doc", b"unsupported"], as_string=True, raise_unsupported=False, max_workers=2),
+            ["doc", "doc"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import array
+import unittest
+
+from glasswall import determine_file_type as dft
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TestHelpers(unittest.TestCase):
+    def setUp(self):
+        self.file_types = [dft.file_type_str_to_int("pdf"), 0, dft.file_type_str_to_int("zip"), -1, 100000, dft.file_type_str_to_int("fileIssues")]
+        self.expected_success = [True, False, True, False, False, False]
+        self.expected_strings = ["pdf", "unknown", "zip", None, None, "fileIssues"]
+
+    def test_is_success___same_as_success_list(self):
+        for fte_class in dft.success_list:
+            self.assertTrue(dft.is_success(fte_class.integer))
+            self.assertTrue(dft.is_success(fte_class.string))
+            self.assertTrue(dft.is_success(fte_class))
+        for fte_class in dft.error_list:
+            if "integer" in fte_class.__dict__:
+                self.assertFalse(dft.is_success(fte_class.integer))
+                self.assertFalse(dft.is_success(fte_class.string))
+            self.assertFalse(dft.is_success(fte_class))
+
+    def test_batch___list_and_array(self):
+        for file_types in (self.file_types, array.array("i", self.file_types)):
+            self.assertEqual(dft.is_success_batch(file_types), self.expected_success)
+            self.assertEqual(dft.file_type_int_to_str_batch(file_types), self.expected_strings)
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_batch___numpy_array(self):
+        file_types = numpy.array(self.file_types, dtype=numpy.int64)
+        self.assertEqual(dft.is_success_batch(file_types).tolist(), self.expected_success)
+        self.assertEqual(dft.file_type_int_to_str_batch(file_types).tolist(), self.expected_strings)
+
+
+if __name__ == "__main__":
+    unittest.main()
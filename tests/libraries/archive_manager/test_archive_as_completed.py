@@ -0,0 +1,83 @@
+import os
+import unittest
+import zipfile
+from unittest import mock
+
+import glasswall
+from glasswall.libraries.archive_manager import archive_manager
+from glasswall.libraries.archive_manager.archive_manager import ArchiveManager
+from glasswall.libraries.editor.editor import Editor
+
+from benchmarks import stub_engine
+from benchmarks.stub_engine import StubEngineTestCase
+
+MEMBERS = {
+    "a.pdf": b"%PDF-1.7 a",
+    "nested/b.pdf": b"%PDF-1.7 b",
+    "nested/c.pdf": b"%PDF-1.7 c",
+}
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "requires fork")
+class TestArchiveAsCompleted(StubEngineTestCase):
+    def setUp(self):
+        super().setUp()
+        self.library_directory = os.path.join(self.temp_directory, "libraries")
+        # Editor is found alongside Archive Manager
+        stub_engine.install(Editor, self.library_directory)
+        self.archive_manager = stub_engine.install(ArchiveManager, self.library_directory)
+        self.input_file = os.path.join(self.temp_directory, "archive.zip")
+        with zipfile.ZipFile(self.input_file, "w") as zip_file:
+            for name, content in MEMBERS.items():
+                zip_file.writestr(name, content)
+
+    def process_archive(self, method, **kwargs):
+        parent_pid = os.getpid()
+
+        def load_editor(library_path):
+            if os.getpid() != parent_pid:
+                raise AssertionError("Editor loaded in a worker process")
+            return Editor(library_path)
+
+        # Workers use the Editor loaded by the parent process
+        with mock.patch.object(glasswall, "Editor", side_effect=load_editor) as editor_class:
+            task_results = list(method(input_file=self.input_file, file_type="zip", max_workers=2, **kwargs))
+
+        self.assertEqual(editor_class.call_count, 1)
+        self.assertEqual(archive_manager._editors, {})
+        for task_result in task_results:
+            self.assertTrue(task_result.success, task_result.exception)
+        return task_results
+
+    def test_protect_archive_as_completed(self):
+        output_file = os.path.join(self.temp_directory, "output", "archive.zip")
+        task_results = self.process_archive(self.archive_manager.protect_archive_as_completed, output_file=output_file)
+
+        self.assertEqual(sorted(task_result.relative_path for task_result in task_results), sorted(os.path.normpath(name) for name in MEMBERS))
+        self.assertEqual({task_result.result for task_result in task_results}, {len(b"%PDF-1.7 a")})
+        with zipfile.ZipFile(output_file) as zip_file:
+            self.assertEqual({name: zip_file.read(name) for name in zip_file.namelist()}, MEMBERS)
+
+    def test_analyse_archive_as_completed(self):
+        output_file = os.path.join(self.temp_directory, "output", "reports.zip")
+        task_results = self.process_archive(self.archive_manager.analyse_archive_as_completed, output_file=output_file)
+
+        self.assertEqual(len(task_results), 3)
+        self.assertTrue(all(task_result.output_file.endswith(".xml") for task_result in task_results))
+        with zipfile.ZipFile(output_file) as zip_file:
+            self.assertEqual(sorted(zip_file.namelist()), sorted(name + ".xml" for name in MEMBERS))
+            self.assertEqual({zip_file.read(name) for name in zip_file.namelist()}, {stub_engine.REPORT})
+
+    def test_failed_members_not_packed(self):
+        stub_engine.install(Editor, self.library_directory, failure_rate=1)
+        output_file = os.path.join(self.temp_directory, "output", "archive.zip")
+
+        task_results = list(self.archive_manager.protect_archive_as_completed(input_file=self.input_file, output_file=output_file, file_type="zip", max_workers=2, raise_unsupported=False))
+
+        self.assertEqual([task_result.result for task_result in task_results], [None] * 3)
+        with zipfile.ZipFile(output_file) as zip_file:
+            self.assertEqual(zip_file.namelist(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import unittest
+
+from glasswall import utils
+from glasswall.libraries.archive_manager.archive_manager import ArchiveManager
+from glasswall.multiprocessing import Manifest
+
+from benchmarks import stub_engine
+from benchmarks.stub_engine import StubEngineTestCase
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "requires fork")
+class TestArchiveManagerDirectoryAsCompleted(StubEngineTestCase):
+    def setUp(self):
+        super().setUp()
+        self.input_directory = os.path.join(self.temp_directory, "input")
+        self.output_directory = os.path.join(self.temp_directory, "output")
+        self.output_report_directory = os.path.join(self.temp_directory, "reports")
+        self.manifest_file = os.path.join(self.temp_directory, "manifest.jsonl")
+        self.index_file = os.path.join(self.temp_directory, "change_index.sqlite3")
+        for index in range(4):
+            os.makedirs(os.path.join(self.input_directory, str(index % 2)), exist_ok=True)
+            with open(os.path.join(self.input_directory, str(index % 2), f"{index}.zip"), "wb") as f:
+                f.write(b"PK\x03\x04archive " + str(index).encode())
+
+    def protect_directory(self, **engine_kwargs):
+        return list(stub_engine.install(ArchiveManager, self.temp_directory, **engine_kwargs).process_directory_as_completed(
+            function_name="protect_archive",
+            input_directory=self.input_directory,
+            output_directory=self.output_directory,
+            output_report_directory=self.output_report_directory,
+            manifest_file=self.manifest_file,
+            max_workers=2,
+            incremental=self.index_file,
+        ))
+
+    def test_protect_directory_resumes_incrementally(self):
+        entries = self.protect_directory()
+        self.assertEqual(len(entries), 4)
+        self.assertTrue(all(entry["success"] and entry["status"] == 1 for entry in entries))
+        self.assertEqual(len(utils.list_file_paths(self.output_directory)), 4)
+        self.assertEqual(len(utils.list_file_paths(self.output_report_directory)), 4)
+
+        # Nothing to do when inputs and outputs are unchanged
+        self.assertEqual(self.protect_directory(), [])
+
+        # Changed inputs and missing reports are processed again
+        with open(os.path.join(self.input_directory, "0", "0.zip"), "ab") as f:
+            f.write(b" changed")
+        os.remove(os.path.join(self.output_report_directory, "1", "1.zip.xml"))
+        entries = self.protect_directory()
+        self.assertEqual(sorted(entry["relative_path"] for entry in entries), [os.path.join("0", "0.zip"), os.path.join("1", "1.zip")])
+        self.assertEqual(len(list(Manifest.read(self.manifest_file))), 6)
+
+    def test_protect_directory_failed_archives_processed_again(self):
+        entries = self.protect_directory(failure_rate=1)
+        self.assertEqual(len(entries), 4)
+        self.assertFalse(any(entry["success"] for entry in entries))
+
+        self.assertEqual(len(self.protect_directory()), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
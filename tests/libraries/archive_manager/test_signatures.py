@@ -0,0 +1,86 @@
+import os
+import unittest
+
+from glasswall.libraries.archive_manager import archive_manager, signatures
+from glasswall.libraries.archive_manager.archive_manager import ArchiveManager
+from glasswall.utils import TempDirectoryPath
+
+from benchmarks import stub_engine
+from benchmarks.stub_engine import StubEngineTestCase
+
+
+class TestSignatures(unittest.TestCase):
+    def test_archive_type_from_bytes(self):
+        self.assertEqual(signatures.archive_type_from_bytes(b"7z\xbc\xaf\x27\x1c\x00\x04"), "7z")
+        self.assertEqual(signatures.archive_type_from_bytes(b"BZh91AY&SY"), "bz2")
+        self.assertEqual(signatures.archive_type_from_bytes(b"\x1f\x8b\x08\x00"), "gz")
+        self.assertEqual(signatures.archive_type_from_bytes(b"Rar!\x1a\x07\x01\x00"), "rar")
+        self.assertEqual(signatures.archive_type_from_bytes(b"\x00" * 257 + b"ustar\x0000"), "tar")
+        self.assertEqual(signatures.archive_type_from_bytes(b"\xfd7zXZ\x00\x00"), "xz")
+        self.assertEqual(signatures.archive_type_from_bytes(b"PK\x03\x04\x14\x00"), "zip")
+        self.assertIsNone(signatures.archive_type_from_bytes(b"BZh text"))
+        self.assertIsNone(signatures.archive_type_from_bytes(b"%PDF-1.7"))
+        self.assertIsNone(signatures.archive_type_from_bytes(b""))
+
+    def test_guess_archive_type(self):
+        with TempDirectoryPath() as temp_directory:
+            gz_file = os.path.join(temp_directory, "no_extension")
+            with open(gz_file, "wb") as f:
+                f.write(b"\x1f\x8b\x08\x00")
+            # Pre-POSIX tar archives have no magic bytes
+            tar_file = os.path.join(temp_directory, "v7.TAR")
+            with open(tar_file, "wb") as f:
+                f.write(b"\x00" * 512)
+            pdf_file = os.path.join(temp_directory, "document.pdf")
+            with open(pdf_file, "wb") as f:
+                f.write(b"%PDF-1.7")
+
+            self.assertEqual(signatures.guess_archive_type(gz_file), "gz")
+            self.assertEqual(signatures.guess_archive_type(tar_file), "tar")
+            self.assertIsNone(signatures.guess_archive_type(tar_file, extension_fallback=False))
+            self.assertIsNone(signatures.guess_archive_type(pdf_file))
+            self.assertIsNone(signatures.guess_archive_type(os.path.join(temp_directory, "missing.zip")))
+
+
+class TestCapabilityCache(StubEngineTestCase):
+    def setUp(self):
+        super().setUp()
+        archive_manager._supported_archives_cache.clear()
+        archive_manager._is_supported_archive_cache.clear()
+
+    def test_cached_per_library_path(self):
+        first = stub_engine.install(ArchiveManager, os.path.join(self.temp_directory, "libraries"))
+        second = stub_engine.install(ArchiveManager, os.path.join(self.temp_directory, "libraries"))
+        other = stub_engine.install(ArchiveManager, os.path.join(self.temp_directory, "other"))
+
+        self.assertEqual(first.supported_archives, ["7z", "bz2", "gz", "rar", "tar", "xz", "zip"])
+        self.assertEqual(second.supported_archives, first.supported_archives)
+        self.assertTrue(first.is_supported_archive("zip"))
+        self.assertTrue(second.is_supported_archive("zip"))
+        self.assertEqual(first.library.GwSupportedFiletypes.call_count + second.library.GwSupportedFiletypes.call_count, 1)
+        self.assertEqual(first.library.GwIsSupportedArchiveType.call_count + second.library.GwIsSupportedArchiveType.call_count, 1)
+
+        other.supported_archives
+        self.assertEqual(other.library.GwSupportedFiletypes.call_count, 1)
+
+    def test_list_archive_paths_prefilter(self):
+        instance = stub_engine.install(ArchiveManager, os.path.join(self.temp_directory, "libraries"))
+        determined = []
+        file_types = {"b.docx": "zip", "d.gz": "Unknown", "e.tar": "tar"}
+        instance.determine_file_type = lambda input_file, **kwargs: determined.append(os.path.basename(input_file)) or file_types[os.path.basename(input_file)]
+
+        input_directory = os.path.join(self.temp_directory, "input")
+        os.makedirs(input_directory)
+        for file_name, content in [("a.gz", b"\x1f\x8b\x08\x00"), ("b.docx", b"PK\x03\x04"), ("c.txt", b"text"), ("d.gz", b"not an archive"), ("e.tar", b"\x00" * 512)]:
+            with open(os.path.join(input_directory, file_name), "wb") as f:
+                f.write(content)
+
+        archive_paths = instance.list_archive_paths(input_directory, absolute=False)
+
+        self.assertEqual(archive_paths, ["a.gz", "b.docx", "e.tar"])
+        # The ambiguous zip signature and guesses from the file extension alone require Glasswall file type detection
+        self.assertEqual(determined, ["b.docx", "d.gz", "e.tar"])
+
+
+if __name__ == "__main__":
+    unittest.main()
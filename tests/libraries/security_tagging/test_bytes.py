@@ -0,0 +1,71 @@
+import io
+import os
+import unittest
+from unittest import mock
+
+from glasswall import utils
+from glasswall.libraries.security_tagging.security_tagging import SecurityTagging
+
+from benchmarks import stub_engine
+from benchmarks.stub_engine import TAGS, StubEngineTestCase
+
+
+class TestSecurityTaggingBytes(StubEngineTestCase):
+    def test_invalid_arg_types(self):
+        instance = stub_engine.install(SecurityTagging, self.temp_directory)
+        with self.assertRaises(TypeError):
+            instance.tag_bytes(tags=None, input_file=b"content")
+        with self.assertRaises(TypeError):
+            instance.tag_bytes(tags=TAGS, input_file="input_file.txt")
+        with self.assertRaises(TypeError):
+            instance.retrieve_tags_bytes(input_file="input_file.txt")
+
+    def test_tag_bytes(self):
+        instance = stub_engine.install(SecurityTagging, self.temp_directory)
+        tags_path = os.path.join(self.temp_directory, "tags.xml")
+        with open(tags_path, "wb") as f:
+            f.write(TAGS)
+
+        for tags in (TAGS, bytearray(TAGS), io.BytesIO(TAGS), tags_path):
+            with self.subTest(tags=type(tags)):
+                result = instance.tag_bytes(tags=tags, input_file=b"content")
+                self.assertEqual(result.status, 1)
+                self.assertEqual(result.output_file, b"content")
+
+        # Staged files are deleted and paths are reused
+        self.assertEqual(os.listdir(instance.temp_path_pool.directory), [])
+
+    def test_tag_bytes___verification_staged_in_pool(self):
+        instance = stub_engine.install(SecurityTagging, self.temp_directory, library_kwargs=dict(verification="retrieve_fast"))
+        tags_path = os.path.join(self.temp_directory, "tags.xml")
+        with open(tags_path, "wb") as f:
+            f.write(TAGS)
+
+        for tags, expected_count in ((TAGS, 4), (tags_path, 3)):
+            for verification in ("retrieve_fast", "retrieve"):
+                with self.subTest(tags=type(tags), verification=verification):
+                    with mock.patch.object(utils, "TempFilePath", side_effect=AssertionError("TempFilePath created")), \
+                            mock.patch.object(instance.temp_path_pool, "paths", wraps=instance.temp_path_pool.paths) as paths:
+                        result = instance.tag_bytes(tags=tags, input_file=b"content", verification=verification)
+
+                    self.assertEqual(result.output_file, b"content")
+                    self.assertEqual(paths.call_args_list, [mock.call(expected_count)])
+
+        self.assertEqual(instance.library.GWSecuTag_RetrieveTagFile.call_count, 4)
+        self.assertEqual(os.listdir(instance.temp_path_pool.directory), [])
+
+    def test_tag_bytes_not_retrievable(self):
+        instance = stub_engine.install(SecurityTagging, self.temp_directory, tags=b"<tags/>")
+        result = instance.tag_bytes(tags=TAGS, input_file=b"content")
+        self.assertEqual(result.status, "OUTPUT_NOT_RETRIEVABLE")
+        self.assertEqual(result.output_file, b"")
+
+    def test_retrieve_tags_bytes(self):
+        instance = stub_engine.install(SecurityTagging, self.temp_directory)
+        result = instance.retrieve_tags_bytes(input_file=io.BytesIO(b"content"))
+        self.assertEqual(result.status, 1)
+        self.assertEqual(result.output_file, TAGS)
+
+
+if __name__ == "__main__":
+    unittest.main()
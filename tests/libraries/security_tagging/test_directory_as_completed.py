@@ -0,0 +1,104 @@
+import os
+import unittest
+
+from glasswall import utils
+from glasswall.libraries.security_tagging.security_tagging import SecurityTagging
+from glasswall.multiprocessing import Manifest
+
+from benchmarks import stub_engine
+from benchmarks.stub_engine import TAGS, StubEngineTestCase
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "requires fork")
+class TestSecurityTaggingDirectoryAsCompleted(StubEngineTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tags_path = os.path.join(self.temp_directory, "tags.xml")
+        with open(self.tags_path, "wb") as f:
+            f.write(TAGS)
+        self.input_directory = os.path.join(self.temp_directory, "input")
+        self.output_directory = os.path.join(self.temp_directory, "output")
+        self.manifest_file = os.path.join(self.temp_directory, "manifest.jsonl")
+        self.index_file = os.path.join(self.temp_directory, "change_index.sqlite3")
+        for index in range(6):
+            os.makedirs(os.path.join(self.input_directory, str(index % 2)), exist_ok=True)
+            with open(os.path.join(self.input_directory, str(index % 2), f"{index}.txt"), "wb") as f:
+                f.write(b"file " + str(index).encode())
+
+    def tag_directory(self, **kwargs):
+        return list(stub_engine.install(SecurityTagging, self.temp_directory, **kwargs).tag_directory_as_completed(
+            tags_path=self.tags_path,
+            input_directory=self.input_directory,
+            output_directory=self.output_directory,
+            manifest_file=self.manifest_file,
+            max_workers=3,
+            incremental=self.index_file,
+        ))
+
+    def test_tag_directory_resumes_incrementally(self):
+        entries = self.tag_directory()
+        self.assertEqual(len(entries), 6)
+        self.assertTrue(all(entry["success"] for entry in entries))
+        self.assertEqual(len(utils.list_file_paths(self.output_directory)), 6)
+        self.assertEqual(len(list(Manifest.read(self.manifest_file))), 6)
+
+        # Nothing to do when inputs and outputs are unchanged
+        self.assertEqual(self.tag_directory(), [])
+
+        # Changed inputs and missing outputs are processed again
+        with open(os.path.join(self.input_directory, "0", "0.txt"), "ab") as f:
+            f.write(b" changed")
+        os.remove(os.path.join(self.output_directory, "1", "1.txt"))
+        entries = self.tag_directory()
+        self.assertEqual(sorted(entry["relative_path"] for entry in entries), [os.path.join("0", "0.txt"), os.path.join("1", "1.txt")])
+        self.assertEqual(len(list(Manifest.read(self.manifest_file))), 8)
+
+        # All files are processed again with different tags
+        with open(self.tags_path, "wb") as f:
+            f.write(TAGS.replace(b"</", b" </", 1))
+        self.assertEqual(len(self.tag_directory()), 6)
+
+    def test_tag_directory_shares_change_index_with_tag_directory(self):
+        instance = stub_engine.install(SecurityTagging, self.temp_directory)
+        instance.tag_directory(self.tags_path, self.input_directory, self.output_directory, incremental=self.index_file)
+
+        self.assertEqual(self.tag_directory(), [])
+        # The manifest is a results log, not read on resume
+        self.assertFalse(os.path.isfile(self.manifest_file))
+
+    def test_tag_directory_failed_verification(self):
+        entries = self.tag_directory(library_kwargs=dict(verification="retrieve_fast"), tags=b"<tags/>")
+        self.assertEqual(len(entries), 6)
+        self.assertFalse(any(entry["success"] for entry in entries))
+        self.assertEqual({entry["status"] for entry in entries}, {"OUTPUT_NOT_RETRIEVABLE"})
+        # Empty output subdirectories are removed
+        self.assertEqual(os.listdir(self.output_directory), [])
+
+        # Failed files are processed again
+        self.assertEqual(len(self.tag_directory()), 6)
+
+    def test_tag_directory___worker_temp_paths_deleted(self):
+        ram_temp_directory = utils.get_ram_temp_directory()
+        before = set(os.listdir(ram_temp_directory))
+
+        entries = self.tag_directory(library_kwargs=dict(verification="retrieve_fast"))
+
+        self.assertTrue(all(entry["success"] for entry in entries))
+        self.assertEqual(set(os.listdir(ram_temp_directory)) - before, set())
+
+    def test_retrieve_tags_directory(self):
+        entries = list(stub_engine.install(SecurityTagging, self.temp_directory).retrieve_tags_directory_as_completed(
+            input_directory=self.input_directory,
+            output_directory=self.output_directory,
+            max_workers=3,
+        ))
+        self.assertEqual(len(entries), 6)
+        self.assertTrue(all(entry["success"] for entry in entries))
+        for entry in entries:
+            self.assertTrue(entry["output_file"].endswith(".xml"))
+            with open(entry["output_file"], "rb") as f:
+                self.assertEqual(f.read(), TAGS)
+
+
+if __name__ == "__main__":
+    unittest.main()
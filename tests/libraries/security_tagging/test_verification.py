@@ -0,0 +1,70 @@
+import os
+import unittest
+
+from glasswall import utils
+from glasswall.libraries.security_tagging.security_tagging import SecurityTagging, tags_retrieved
+
+from benchmarks import stub_engine
+from benchmarks.stub_engine import TAGS, StubEngineTestCase
+
+
+class TestSecurityTaggingVerification(StubEngineTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tags_path = os.path.join(self.temp_directory, "tags.xml")
+        with open(self.tags_path, "wb") as f:
+            f.write(TAGS)
+        self.input_directory = os.path.join(self.temp_directory, "input")
+        os.makedirs(self.input_directory)
+        for index in range(10):
+            with open(os.path.join(self.input_directory, f"{index}.txt"), "wb") as f:
+                f.write(b"file " + str(index).encode())
+
+    def test_tags_retrieved(self):
+        self.assertTrue(tags_retrieved(TAGS))
+        self.assertFalse(tags_retrieved(b""))
+        self.assertFalse(tags_retrieved(b"<tags/>"))
+        self.assertFalse(tags_retrieved(b"<tags><incomplete"))
+
+    def test_invalid_verification(self):
+        instance = stub_engine.install(SecurityTagging, self.temp_directory)
+        with self.assertRaises(ValueError):
+            instance.tag_file(self.tags_path, os.path.join(self.input_directory, "0.txt"), os.path.join(self.temp_directory, "output", "0.txt"), verification="invalid")
+
+    def test_verification_modes(self):
+        # (verification, retrieved_tags, expected retrieve count, expected output files)
+        cases = [
+            ("off", b"", 0, 10),
+            ("retrieve_fast", TAGS, 10, 10),
+            ("retrieve_fast", b"<tags/>", 10, 0),
+            ("retrieve", TAGS, 10, 10),
+            ("retrieve", b"<tags/>", 10, 0),
+            # The first file and every 4th file thereafter are verified
+            ("sampled", TAGS, 3, 10),
+            ("sampled", b"<tags/>", 3, 7),
+        ]
+        for verification, retrieved_tags, expected_retrieve_count, expected_output_files in cases:
+            with self.subTest(verification=verification, retrieved_tags=retrieved_tags):
+                instance = stub_engine.install(SecurityTagging, self.temp_directory, library_kwargs=dict(verification_sample_rate=0.25), tags=retrieved_tags)
+                output_directory = os.path.join(self.temp_directory, "output", verification, str(len(retrieved_tags)))
+
+                instance.tag_directory(self.tags_path, self.input_directory, output_directory, verification=verification)
+
+                self.assertEqual(instance.library.GWSecuTag_RetrieveTagFile.call_count, expected_retrieve_count)
+                output_files = utils.list_file_paths(output_directory) if os.path.isdir(output_directory) else []
+                self.assertEqual(len(output_files), expected_output_files)
+
+    def test_default_verification_sampled(self):
+        instance = stub_engine.install(SecurityTagging, self.temp_directory)
+        output_directory = os.path.join(self.temp_directory, "output")
+
+        instance.tag_directory(self.tags_path, self.input_directory, output_directory)
+
+        # Only the first file is verified at the default sample rate
+        self.assertEqual(instance.verification, "sampled")
+        self.assertEqual(instance.library.GWSecuTag_RetrieveTagFile.call_count, 1)
+        self.assertEqual(len(utils.list_file_paths(output_directory)), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
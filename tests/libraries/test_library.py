@@ -0,0 +1,102 @@
+import os
+import tempfile
+import unittest
+
+import glasswall
+from glasswall import utils
+from glasswall.libraries import library
+
+
+class CountingLibrary(library.Library):
+    """ Counts library loads and licence validations instead of loading a native library. """
+    load_count = 0
+    validate_count = 0
+    licence_valid = True
+
+    def _load_library(self):
+        CountingLibrary.load_count += 1
+        return object()
+
+    def validate_licence(self):
+        CountingLibrary.validate_count += 1
+        if not CountingLibrary.licence_valid:
+            raise RuntimeError("Licence expired")
+
+
+class TestLibrary(unittest.TestCase):
+    def setUp(self):
+        library.clear_loaded_libraries()
+        CountingLibrary.load_count = 0
+        CountingLibrary.validate_count = 0
+        CountingLibrary.licence_valid = True
+        self.temp_directory = tempfile.TemporaryDirectory()
+        self.library_path = os.path.join(self.temp_directory.name, "library.so")
+        open(self.library_path, "wb").close()
+
+    def tearDown(self):
+        library.clear_loaded_libraries()
+        self.temp_directory.cleanup()
+
+    def test_load_library___loaded_and_validated_once_per_resolved_path(self):
+        handles = []
+        for library_path in (self.library_path, os.path.join(self.temp_directory.name, ".", "library.so")):
+            instance = CountingLibrary(library_path)
+            handles.append(instance.load_library(library_path))
+            instance.validate_licence_once()
+
+        self.assertIs(handles[0], handles[1])
+        self.assertEqual((CountingLibrary.load_count, CountingLibrary.validate_count), (1, 1))
+
+        library.clear_loaded_libraries()
+        CountingLibrary(self.library_path).load_library(self.library_path)
+        self.assertEqual(CountingLibrary.load_count, 2)
+
+    def test_validate_licence_once___failed_validation_retried(self):
+        CountingLibrary.licence_valid = False
+        instance = CountingLibrary(self.library_path)
+        instance.load_library(self.library_path)
+        with self.assertRaises(RuntimeError):
+            instance.validate_licence_once()
+
+        CountingLibrary.licence_valid = True
+        instance.validate_licence_once()
+        instance.validate_licence_once()
+        self.assertEqual(CountingLibrary.validate_count, 2)
+
+    def test_validate_licence_once___revalidated_after_interval(self):
+        instance = CountingLibrary(self.library_path)
+        instance.load_library(self.library_path)
+        instance.validate_licence_once()
+        instance.validate_licence_once()
+        self.assertEqual(CountingLibrary.validate_count, 1)
+
+        licence_revalidation_seconds = library.licence_revalidation_seconds
+        library.licence_revalidation_seconds = 0
+        try:
+            CountingLibrary.licence_valid = False
+            with self.assertRaises(RuntimeError):
+                instance.validate_licence_once()
+        finally:
+            library.licence_revalidation_seconds = licence_revalidation_seconds
+        self.assertEqual(CountingLibrary.validate_count, 2)
+
+    def test_get_library___cached_until_file_deleted(self):
+        file_name = glasswall.libraries.os_info[glasswall._OPERATING_SYSTEM]["editor"]["file_name"]
+        first_path = os.path.join(self.temp_directory.name, "a", file_name)
+        second_path = os.path.join(self.temp_directory.name, "b", file_name)
+        os.makedirs(os.path.dirname(first_path))
+        open(first_path, "wb").close()
+
+        self.assertEqual(utils.get_library("editor", self.temp_directory.name), os.path.realpath(first_path))
+
+        os.makedirs(os.path.dirname(second_path))
+        open(second_path, "wb").close()
+        self.assertEqual(utils.get_library("editor", self.temp_directory.name), os.path.realpath(first_path))
+
+        os.remove(first_path)
+        self.assertEqual(utils.get_library("editor", self.temp_directory.name), os.path.realpath(second_path))
+        self.assertEqual(utils.get_library("editor", self.temp_directory.name, use_cache=False), os.path.realpath(second_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
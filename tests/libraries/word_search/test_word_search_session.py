@@ -0,0 +1,86 @@
+import os
+import unittest
+from unittest import mock
+
+from glasswall import utils
+from glasswall.libraries.word_search import word_search
+from glasswall.libraries.word_search.word_search import WordSearch, WordSearchSession
+
+from benchmarks import stub_engine
+from benchmarks.stub_engine import StubEngineTestCase
+
+POLICY = "<config><textSearchConfig><textList><textItem><text>lorem</text></textItem></textList></textSearchConfig></config>"
+
+
+class TestWordSearchSession(StubEngineTestCase):
+    def setUp(self):
+        super().setUp()
+        self.input_directory = os.path.join(self.temp_directory, "input")
+        for relative_path in ["a.txt", os.path.join("nested", "b.txt"), os.path.join("nested", "c.txt")]:
+            os.makedirs(os.path.dirname(os.path.join(self.input_directory, relative_path)), exist_ok=True)
+            with open(os.path.join(self.input_directory, relative_path), "wb") as f:
+                f.write(b"lorem ipsum " + relative_path.encode())
+
+    def test_invalid_arg_types(self):
+        with self.assertRaises(TypeError):
+            WordSearchSession(stub_engine.install(WordSearch, self.temp_directory), content_management_policy=1)
+        with self.assertRaises(TypeError):
+            WordSearchSession(stub_engine.install(WordSearch, self.temp_directory), content_management_policy=POLICY, homoglyphs=1)
+
+    def test_redact_directory_validates_policy_once(self):
+        instance = stub_engine.install(WordSearch, self.temp_directory)
+        redact = instance.library.GwWordSearch
+        with mock.patch.object(word_search.utils, "validate_xml", wraps=utils.validate_xml) as validate_xml, mock.patch.object(redact, "function", wraps=redact.function) as function:
+            redacted_files_dict = instance.redact_directory(
+                input_directory=self.input_directory,
+                content_management_policy=POLICY,
+                homoglyphs=b"{}",
+            )
+
+        self.assertEqual(validate_xml.call_count, 1)
+        self.assertEqual(len(redacted_files_dict), 3)
+        self.assertEqual(redacted_files_dict["a.txt"].output_file, b"lorem ipsum a.txt")
+        self.assertEqual(redacted_files_dict["a.txt"].output_report, stub_engine.REPORT)
+        # The same homoglyphs buffer is reused for every file
+        self.assertEqual(function.call_count, 3)
+        self.assertEqual(len({id(call[0][6]) for call in function.call_args_list}), 1)
+
+    def test_default_homoglyphs(self):
+        session = stub_engine.install(WordSearch, self.temp_directory).session(content_management_policy=POLICY)
+        self.assertTrue(session.homoglyphs)
+        self.assertIs(session.homoglyphs, word_search._load_default_homoglyphs())
+
+    @unittest.skipUnless(hasattr(os, "fork"), "requires fork")
+    def test_redact_directory_as_completed(self):
+        output_directory = os.path.join(self.temp_directory, "output")
+        with stub_engine.install(WordSearch, self.temp_directory).session(content_management_policy=POLICY, homoglyphs=b"{}") as session:
+            task_results = list(session.redact_directory_as_completed(
+                input_directory=self.input_directory,
+                output_directory=output_directory,
+                max_workers=2,
+            ))
+            self.assertNotIn(session.key, word_search._sessions)
+
+        self.assertEqual(sorted(task_result.relative_path for task_result in task_results), ["a.txt", os.path.join("nested", "b.txt"), os.path.join("nested", "c.txt")])
+        for task_result in task_results:
+            self.assertTrue(task_result.success, task_result.exception)
+            self.assertEqual(task_result.result["status"], 1)
+            self.assertEqual(task_result.result["output_file_size"], os.path.getsize(task_result.output_file))
+
+    @unittest.skipUnless(hasattr(os, "fork"), "requires fork")
+    def test_redact_directory_as_completed___incremental(self):
+        output_directory = os.path.join(self.temp_directory, "output")
+        index_file = os.path.join(self.temp_directory, "change_index.sqlite3")
+        with stub_engine.install(WordSearch, self.temp_directory).session(content_management_policy=POLICY, homoglyphs=b"{}") as session:
+            session.redact_directory(input_directory=self.input_directory, output_directory=output_directory, incremental=index_file)
+            # Files redacted by redact_directory are skipped
+            self.assertEqual(list(session.redact_directory_as_completed(input_directory=self.input_directory, output_directory=output_directory, max_workers=2, incremental=index_file)), [])
+
+            os.remove(os.path.join(output_directory, "a.txt"))
+            task_results = list(session.redact_directory_as_completed(input_directory=self.input_directory, output_directory=output_directory, max_workers=2, incremental=index_file))
+            self.assertEqual([task_result.relative_path for task_result in task_results], ["a.txt"])
+            self.assertEqual(session.redact_directory(input_directory=self.input_directory, output_directory=output_directory, incremental=index_file), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -67,6 +67,20 @@ class TestGlasswallProcessManager(unittest.TestCase):
         # Ensure task results are correctly appended to manager's task_results list
         self.assertEqual(len(manager.task_results), 2)
 
+    def test_as_completed_yields_all_results(self):
+        # Test every queued task yields exactly one result, including results still in transit when the last processes exit
+        for max_workers in (1, 2, 8):
+            with self.subTest(max_workers=max_workers):
+                manager = GlasswallProcessManager(max_workers=max_workers)
+                for index in range(8):
+                    manager.queue_task(Task(sample_task, kwargs=dict()) if index % 2 else Task(exception_task))
+
+                task_results = list(manager.as_completed())
+
+                self.assertEqual(len(task_results), 8)
+                self.assertEqual(sum(task_result.success for task_result in task_results), 4)
+                self.assertEqual(len(manager.task_results), 0)
+
 
 if __name__ == "__main__":
     unittest.main()
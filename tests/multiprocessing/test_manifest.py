@@ -0,0 +1,86 @@
+
+
+import json
+import os
+import unittest
+
+from glasswall.multiprocessing.manifest import Manifest
+from glasswall.multiprocessing.tasks import Task, TaskResult
+from glasswall.utils import TempDirectoryPath
+
+
+def sample_task():
+    return "Task completed!"
+
+
+class TestManifest(unittest.TestCase):
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            Manifest("manifest.jsonl", mode="r")
+
+    def test_write_and_read(self):
+        with TempDirectoryPath() as temp_directory:
+            manifest_file = os.path.join(temp_directory, "nested", "manifest.jsonl")
+            with Manifest(manifest_file) as manifest:
+                manifest.write({"relative_path": "a.zip", "status": 1})
+                # Entries are flushed as they are written
+                self.assertEqual(len(list(Manifest.read(manifest_file))), 1)
+                manifest.write({"relative_path": "b.zip", "status": 1})
+
+            entries = list(Manifest.read(manifest_file))
+            self.assertEqual([entry["relative_path"] for entry in entries], ["a.zip", "b.zip"])
+
+    def test_append_and_overwrite(self):
+        with TempDirectoryPath() as temp_directory:
+            manifest_file = os.path.join(temp_directory, "manifest.jsonl")
+            with Manifest(manifest_file) as manifest:
+                manifest.write({"index": 0})
+            with Manifest(manifest_file, mode="a") as manifest:
+                manifest.write({"index": 1})
+            self.assertEqual(len(list(Manifest.read(manifest_file))), 2)
+
+            with Manifest(manifest_file, mode="w") as manifest:
+                manifest.write({"index": 2})
+            self.assertEqual(list(Manifest.read(manifest_file)), [{"index": 2}])
+
+    def test_read_skips_incomplete_lines(self):
+        with TempDirectoryPath() as temp_directory:
+            manifest_file = os.path.join(temp_directory, "manifest.jsonl")
+            with open(manifest_file, "w") as f:
+                f.write(json.dumps({"index": 0}) + "\n")
+                f.write('{"index": 1, "sta')
+
+            self.assertEqual(list(Manifest.read(manifest_file)), [{"index": 0}])
+
+    def test_read_missing_file(self):
+        self.assertEqual(list(Manifest.read("does_not_exist.jsonl")), [])
+
+    def test_latest_entries(self):
+        with TempDirectoryPath() as temp_directory:
+            manifest_file = os.path.join(temp_directory, "manifest.jsonl")
+            with Manifest(manifest_file) as manifest:
+                manifest.write({"relative_path": "a.zip", "success": False})
+                manifest.write({"relative_path": "b.zip", "success": True})
+                manifest.write({"relative_path": "a.zip", "success": True})
+                manifest.write({"success": True})
+
+            entries = Manifest.latest_entries(manifest_file)
+
+        self.assertEqual(entries, {"a.zip": {"relative_path": "a.zip", "success": True}, "b.zip": {"relative_path": "b.zip", "success": True}})
+
+    def test_entry_from_task_result(self):
+        task_result = TaskResult(Task(sample_task), success=False, exception=ValueError("Test exception"))
+        task_result.timed_out = True
+        entry = Manifest.entry_from_task_result(task_result, relative_path="a.zip")
+
+        self.assertFalse(entry["success"])
+        self.assertEqual(entry["exception"], repr(ValueError("Test exception")))
+        self.assertTrue(entry["timed_out"])
+        self.assertFalse(entry["out_of_memory"])
+        self.assertEqual(entry["relative_path"], "a.zip")
+        # Entries are JSON serializable
+        json.dumps(entry)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+
+
+import os
+import tempfile
+import time
+import unittest
+import urllib.error
+import urllib.request
+from unittest import mock
+
+from glasswall.multiprocessing import manager as manager_module
+from glasswall.multiprocessing import metrics
+from glasswall.multiprocessing.manager import GlasswallProcessManager
+from glasswall.multiprocessing.metrics import MetricsRegistry
+from glasswall.multiprocessing.tasks import Task
+
+
+def sample_task(input_file):
+    return input_file
+
+
+def exception_task(input_file):
+    raise ValueError("Test exception")
+
+
+def sleep_task(input_file):
+    time.sleep(10)
+
+
+def dispatch_task(function_name, input_file):
+    return input_file
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def test_render_counter_and_gauge(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("tasks_total", "Tasks.")
+        counter.inc(status="success")
+        counter.inc(2, status="success")
+        counter.inc(status='fa"il\n')
+        gauge = registry.gauge("queue_depth", "Queue depth.")
+        gauge.set(3)
+
+        text = registry.render()
+
+        self.assertIn("# HELP tasks_total Tasks.\n# TYPE tasks_total counter\n", text)
+        self.assertIn('tasks_total{status="success"} 3\n', text)
+        self.assertIn('tasks_total{status="fa\\"il\\n"} 1\n', text)
+        self.assertIn("# TYPE queue_depth gauge\nqueue_depth 3\n", text)
+
+        gauge.remove()
+        self.assertNotIn("queue_depth 3", registry.render())
+
+    def test_render_histogram_buckets_are_cumulative(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram("duration_seconds", "Duration.", buckets=(1, 5))
+        for value in (0.5, 2, 10):
+            histogram.observe(value, file_type="pdf")
+
+        text = registry.render()
+
+        self.assertIn('duration_seconds_bucket{file_type="pdf",le="1"} 1\n', text)
+        self.assertIn('duration_seconds_bucket{file_type="pdf",le="5"} 2\n', text)
+        self.assertIn('duration_seconds_bucket{file_type="pdf",le="+Inf"} 3\n', text)
+        self.assertIn('duration_seconds_sum{file_type="pdf"} 12.5\n', text)
+        self.assertIn('duration_seconds_count{file_type="pdf"} 3\n', text)
+
+    def test_metric_type_conflict_raises(self):
+        registry = MetricsRegistry()
+        self.assertIs(registry.counter("a_total", "A."), registry.counter("a_total", "A."))
+        with self.assertRaises(ValueError):
+            registry.gauge("a_total", "A.")
+
+    def test_write_and_serve(self):
+        registry = MetricsRegistry()
+        registry.counter("a_total", "A.").inc()
+
+        with tempfile.TemporaryDirectory() as temp_directory:
+            file_path = os.path.join(temp_directory, "metrics", "glasswall.prom")
+            registry.write(file_path)
+            with open(file_path) as f:
+                self.assertEqual(f.read(), registry.render())
+            self.assertEqual(os.listdir(os.path.dirname(file_path)), ["glasswall.prom"])
+
+        server = registry.serve()
+        try:
+            host, port = server.server_address[:2]
+            with urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=5) as response:
+                self.assertTrue(response.headers["Content-Type"].startswith("text/plain; version=0.0.4"))
+                self.assertEqual(response.read().decode("utf-8"), registry.render())
+            with self.assertRaises(urllib.error.HTTPError):
+                urllib.request.urlopen(f"http://{host}:{port}/", timeout=5)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+class TestGlasswallProcessManagerMetrics(unittest.TestCase):
+    def test_manager_records_task_metrics(self):
+        registry = MetricsRegistry()
+        manager = GlasswallProcessManager(max_workers=2, worker_timeout_seconds=1, metrics=registry)
+        manager.queue_task(Task(sample_task, kwargs=dict(input_file="a.PDF")))
+        manager.queue_task(Task(exception_task, kwargs=dict(input_file=b"bytes")))
+        manager.queue_task(Task(sleep_task, args=("c.docx",)))
+        manager.queue_task(Task(dispatch_task, kwargs=dict(function_name="protect_file", input_file="d.xlsx")))
+        self.assertEqual(registry.metrics["glasswall_process_manager_queue_depth"].samples[()], 4)
+
+        task_results = list(manager.as_completed())
+
+        self.assertEqual(len(task_results), 4)
+        text = registry.render()
+        self.assertIn("glasswall_process_manager_tasks_started_total 4\n", text)
+        self.assertIn('glasswall_process_manager_tasks_completed_total{extension="pdf",operation="sample_task",status="success"} 1\n', text)
+        self.assertIn('glasswall_process_manager_tasks_completed_total{extension="bytes",operation="exception_task",status="failure"} 1\n', text)
+        self.assertIn('glasswall_process_manager_tasks_completed_total{extension="docx",operation="sleep_task",status="timeout"} 1\n', text)
+        self.assertIn('glasswall_process_manager_tasks_completed_total{extension="xlsx",operation="protect_file",status="success"} 1\n', text)
+        self.assertIn('glasswall_process_manager_exit_codes_total{exit_code="0"} 3\n', text)
+        self.assertIn('glasswall_process_manager_task_duration_seconds_count{extension="pdf",operation="sample_task"} 1\n', text)
+        self.assertIn("glasswall_process_manager_queue_depth 0\n", text)
+        self.assertIn("glasswall_process_manager_active_workers 0\n", text)
+        self.assertNotIn("glasswall_process_manager_worker_rss_bytes{", text)
+
+    def test_worker_memory_sampled_at_interval(self):
+        registry = MetricsRegistry()
+        manager = GlasswallProcessManager(max_workers=2, metrics=registry)
+        manager._metrics_sampling_interval = 60
+        for index in range(8):
+            manager.queue_task(Task(sample_task, kwargs=dict(input_file=f"{index}.pdf")))
+
+        with mock.patch.object(manager_module, "get_total_memory_usage_in_gib", return_value=0) as get_total_memory_usage_in_gib:
+            self.assertEqual(len(list(manager.as_completed())), 8)
+
+        # Only the first sample walks the process trees of the active workers, not every process start
+        self.assertLessEqual(get_total_memory_usage_in_gib.call_count, 2)
+        self.assertIn("glasswall_process_manager_tasks_started_total 8\n", registry.render())
+
+    def test_default_registry(self):
+        registry = MetricsRegistry()
+        metrics.default_registry = registry
+        try:
+            manager = GlasswallProcessManager()
+        finally:
+            metrics.default_registry = None
+        self.assertIs(manager.metrics, registry)
+        self.assertIsNone(GlasswallProcessManager().metrics)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+import glasswall
+from glasswall.libraries.editor import errors as editor_errors
+
+from benchmarks import stub_engine, suite
+from benchmarks.stub_engine import StubEngineTestCase
+
+
+class TestStubEngine(StubEngineTestCase):
+    def test_library_classes_run_on_the_stub_engine(self):
+        input_file = b"%PDF-1.7 content"
+
+        editor = stub_engine.install(glasswall.Editor, self.temp_directory)
+        self.assertEqual(editor.version(), "stub")
+        self.assertEqual(editor.protect_file(input_file), input_file)
+        self.assertEqual(editor.analyse_file(input_file), stub_engine.REPORT)
+        self.assertEqual(editor.determine_file_type(input_file, as_string=True), "pdf")
+
+        rebuild = stub_engine.install(glasswall.Rebuild, self.temp_directory)
+        self.assertEqual(rebuild.protect_file(input_file), input_file)
+
+        archive_manager = stub_engine.install(glasswall.ArchiveManager, self.temp_directory)
+        result = archive_manager.protect_archive(b"PK\x03\x04archive")
+        self.assertEqual((result.status, result.output_file, result.output_report), (1, b"PK\x03\x04archive", stub_engine.REPORT))
+
+        word_search = stub_engine.install(glasswall.WordSearch, self.temp_directory)
+        result = word_search.redact_file(input_file, content_management_policy=glasswall.content_management.policies.WordSearch())
+        self.assertEqual(result.output_file, input_file)
+
+    def test_output_size_and_failure_rate(self):
+        editor = stub_engine.install(glasswall.Editor, self.temp_directory, output_size=5, failure_rate=0.5, seed=1)
+
+        results = [editor.protect_file(b"%PDF-1.7 content", raise_unsupported=False) for _ in range(20)]
+
+        engine = editor.library
+        self.assertEqual(engine.process_count, 20)
+        self.assertEqual(results.count(None), engine.failure_count)
+        self.assertTrue(0 < engine.failure_count < 20)
+        self.assertEqual({result for result in results if result is not None}, {b"%PDF-"})
+        with self.assertRaises(editor_errors.GeneralFail):
+            while True:
+                editor.protect_file(b"%PDF-1.7 content")
+
+    def test_unimplemented_entry_point_raises(self):
+        engine = stub_engine.StubEngine("Editor")
+        with self.assertRaises(AttributeError):
+            engine.GW2NotAnEntryPoint
+
+
+class TestSuite(StubEngineTestCase):
+    def test_run_all_benchmarks(self):
+        results = suite.run(repeat=1, number_scale=0.001)
+
+        self.assertEqual(set(results), set(suite.benchmarks))
+        self.assertTrue(all(seconds > 0 for seconds in results.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+import os
+import tempfile
+import unittest
+
+import glasswall
+from glasswall import utils
+from glasswall.change_index import ChangeIndex
+from glasswall.libraries import library
+from glasswall.libraries.security_tagging.security_tagging import SecurityTagging
+
+from benchmarks import stub_engine
+
+
+class TestChangeIndex(unittest.TestCase):
+    def setUp(self):
+        self.temp_directory = tempfile.TemporaryDirectory()
+        self.directory = self.temp_directory.name
+        self.input_file = os.path.join(self.directory, "input", "file.txt")
+        self.output_file = os.path.join(self.directory, "output", "file.txt")
+        os.makedirs(os.path.dirname(self.input_file))
+        os.makedirs(os.path.dirname(self.output_file))
+        self.write(self.input_file, b"content")
+        self.write(self.output_file, b"output")
+        self.database_path = os.path.join(self.directory, "change_index.sqlite3")
+
+    def tearDown(self):
+        library.clear_loaded_libraries()
+        self.temp_directory.cleanup()
+
+    @staticmethod
+    def write(file_path: str, content: bytes):
+        with open(file_path, "wb") as f:
+            f.write(content)
+
+    def record(self, policy_digest: str = "policy", success: bool = True):
+        with ChangeIndex(self.database_path, operation="operation", policy_digest=policy_digest) as change_index:
+            change_index.record("file.txt", self.input_file, self.output_file, success=success)
+
+    def is_unchanged(self, policy_digest: str = "policy", operation: str = "operation") -> bool:
+        with ChangeIndex(self.database_path, operation=operation, policy_digest=policy_digest) as change_index:
+            return change_index.is_unchanged("file.txt", self.input_file, self.output_file)
+
+    def test_is_unchanged___not_recorded___false(self):
+        self.assertFalse(self.is_unchanged())
+
+    def test_is_unchanged___recorded___true(self):
+        self.record()
+        self.assertTrue(self.is_unchanged())
+        self.assertFalse(self.is_unchanged(operation="other_operation"))
+
+    def test_is_unchanged___content_changed___false(self):
+        self.record()
+        self.write(self.input_file, b"changed content")
+        self.assertFalse(self.is_unchanged())
+
+    def test_is_unchanged___same_size_content_changed___false(self):
+        self.record()
+        stat_result = os.stat(self.input_file)
+        self.write(self.input_file, b"CONTENT")
+        os.utime(self.input_file, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000_000))
+        self.assertFalse(self.is_unchanged())
+
+    def test_is_unchanged___modification_time_changed_content_unchanged___true(self):
+        self.record()
+        stat_result = os.stat(self.input_file)
+        os.utime(self.input_file, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000_000))
+        self.assertTrue(self.is_unchanged())
+        self.assertTrue(self.is_unchanged())
+
+    def test_is_unchanged___policy_changed___false(self):
+        self.record()
+        self.assertFalse(self.is_unchanged(policy_digest="other_policy"))
+
+    def test_is_unchanged___output_file_deleted___false(self):
+        self.record()
+        os.remove(self.output_file)
+        self.assertFalse(self.is_unchanged())
+
+    def test_is_unchanged___failed___false(self):
+        self.record(success=False)
+        self.assertFalse(self.is_unchanged())
+
+    def test_for_directory___disabled___nothing_recorded(self):
+        with ChangeIndex.for_directory(None, operation="operation", enabled=False) as change_index:
+            change_index.record("file.txt", self.input_file, self.output_file, success=True)
+            self.assertFalse(change_index.is_unchanged("file.txt", self.input_file, self.output_file))
+
+        with self.assertRaises(ValueError):
+            ChangeIndex.for_directory(None, None, operation="operation")
+
+    def test_for_directory___index_path(self):
+        output_directory = os.path.dirname(self.output_file)
+        with ChangeIndex.for_directory(None, output_directory, operation="operation") as change_index:
+            change_index.record("file.txt", self.input_file, self.output_file, success=True)
+            # Persisted in the output directory, but not listed as an input of a run reading the output directory
+            self.assertEqual(change_index.database_path, os.path.join(os.path.abspath(output_directory), ".glasswall", "change_index.sqlite3"))
+            self.assertEqual(utils.list_file_paths(output_directory, absolute=False), ["file.txt"])
+
+        with ChangeIndex.for_directory(output_directory, operation="operation", enabled=self.database_path) as change_index:
+            self.assertEqual(change_index.database_path, self.database_path)
+
+    def test_digest___policy___changes_with_policy(self):
+        policy = glasswall.content_management.policies.Rebuild(default="sanitise")
+        digest = ChangeIndex.digest(policy)
+        self.assertEqual(ChangeIndex.digest(glasswall.content_management.policies.Rebuild(default="sanitise")), digest)
+        self.assertNotEqual(ChangeIndex.digest(glasswall.content_management.policies.Rebuild(default="allow")), digest)
+        self.assertNotEqual(ChangeIndex.digest(policy, None), digest)
+
+    def test_tag_directory___incremental___only_new_and_changed_files_tagged(self):
+        input_directory = os.path.dirname(self.input_file)
+        output_directory = os.path.join(self.directory, "tagged")
+        tags_path = os.path.join(self.directory, "tags.xml")
+        self.write(tags_path, stub_engine.TAGS)
+        for index in range(5):
+            self.write(os.path.join(input_directory, f"{index}.txt"), b"file " + str(index).encode())
+
+        instance = stub_engine.install(SecurityTagging, os.path.join(self.directory, "library"))
+        tagged_files = []
+        tag_file = instance.library.GWSecuTag_TagFile.function
+
+        def counting_tag_file(input_file, *args):
+            tagged_files.append(os.path.basename(input_file.value.decode()))
+            return tag_file(input_file, *args)
+
+        instance.library.GWSecuTag_TagFile.function = counting_tag_file
+
+        instance.tag_directory(tags_path, input_directory, output_directory, incremental=True)
+        self.assertEqual(len(tagged_files), 6)
+        self.assertEqual(len(utils.list_file_paths(output_directory)), 6)
+        self.assertTrue(os.path.isfile(ChangeIndex.default_path(output_directory)))
+
+        tagged_files.clear()
+        self.write(os.path.join(input_directory, "0.txt"), b"changed")
+        self.write(os.path.join(input_directory, "new.txt"), b"new")
+        os.remove(os.path.join(output_directory, "1.txt"))
+        instance.tag_directory(tags_path, input_directory, output_directory, incremental=True)
+        self.assertEqual(sorted(tagged_files), ["0.txt", "1.txt", "new.txt"])
+
+        tagged_files.clear()
+        instance.tag_directory(tags_path, input_directory, output_directory)
+        self.assertEqual(len(tagged_files), 7)
+
+        # The change index is not an input when the output directory feeds another run
+        tagged_files.clear()
+        instance.tag_directory(tags_path, output_directory, os.path.join(self.directory, "tagged_again"), incremental=True)
+        self.assertEqual(sorted(tagged_files), sorted(os.listdir(input_directory)))
+
+
+if __name__ == "__main__":
+    unittest.main()
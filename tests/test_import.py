@@ -0,0 +1,49 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import glasswall
+
+
+def run_python(code: str, temp_directory: str) -> dict:
+    """ Runs code in a fresh interpreter with glasswall._TEMPDIR under temp_directory, returning the json it prints. """
+    env = dict(os.environ, AGENT_TEMPDIRECTORY=temp_directory)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.path.dirname(glasswall._ROOT), env.get("PYTHONPATH")]))
+    return json.loads(subprocess.check_output([sys.executable, "-c", code], env=env))
+
+
+class TestImport(unittest.TestCase):
+    @unittest.skipIf(sys.version_info < (3, 7), "Python 3.6 has no module __getattr__, submodules are imported eagerly")
+    def test_import___no_heavy_modules_or_log_directory(self):
+        with tempfile.TemporaryDirectory() as temp_directory:
+            result = run_python(
+                "import json, sys, glasswall; "
+                "print(json.dumps(sorted(m for m in sys.modules if m.startswith(('glasswall.', 'lxml', 'psutil')))))",
+                temp_directory,
+            )
+
+            self.assertEqual(result, [])
+            self.assertEqual(os.listdir(temp_directory), [])
+
+    def test_first_use___imported_and_log_file_created_on_first_record(self):
+        with tempfile.TemporaryDirectory() as temp_directory:
+            result = run_python(
+                "import json, os, glasswall; "
+                "from glasswall.config.logging import log, log_file_path; "
+                "exists_before = os.path.exists(os.path.dirname(log_file_path)); "
+                "log.debug('message'); "
+                "print(json.dumps([exists_before, os.path.isfile(log_file_path), glasswall.Editor.__name__, glasswall.content_management.policies.Rebuild.__name__, 'Editor' in dir(glasswall)]))",
+                temp_directory,
+            )
+
+            self.assertEqual(result, [False, True, "Editor", "Rebuild", True])
+
+        with self.assertRaises(AttributeError):
+            glasswall.not_an_attribute
+
+
+if __name__ == "__main__":
+    unittest.main()
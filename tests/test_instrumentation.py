@@ -0,0 +1,99 @@
+import queue
+import time
+import unittest
+
+import glasswall
+from glasswall import instrumentation
+from glasswall.instrumentation import instrumented
+from glasswall.multiprocessing.tasks import Task, execute_task_and_put_in_queue
+
+
+class FakeLibrary:
+    @instrumented
+    def register_input(self, input_file):
+        time.sleep(0.002)
+
+    @instrumented
+    def run_session(self):
+        time.sleep(0.004)
+
+    @instrumented
+    def protect_file(self, input_file, output_file=None):
+        self.register_input(input_file)
+        self.run_session()
+        self.run_session()
+        return bytes(reversed(input_file))
+
+    @instrumented
+    def protect_archive(self, input_file):
+        return glasswall.GwReturnObj(status=1, output_file=self.protect_file(input_file=input_file))
+
+
+def protect_file(input_file):
+    return FakeLibrary().protect_file(input_file)
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        instrumentation.reset()
+        instrumentation.enable()
+
+    def tearDown(self):
+        instrumentation.disable()
+        instrumentation.reset()
+
+    def test_operation___phases_and_bytes_recorded(self):
+        FakeLibrary().protect_file(b"content")
+        timings = instrumentation.last_timings()
+
+        self.assertEqual(timings["operation"], "FakeLibrary.protect_file")
+        self.assertEqual(set(timings["phases"]), {"register_input", "run_session", "other"})
+        self.assertGreaterEqual(timings["phases"]["run_session"], 0.008)
+        self.assertAlmostEqual(sum(timings["phases"].values()), timings["elapsed_time"])
+        self.assertEqual((timings["input_bytes"], timings["output_bytes"]), (7, 7))
+
+        histograms = instrumentation.get_histograms()
+        self.assertEqual(histograms["FakeLibrary.protect_file"]["count"], 1)
+        self.assertEqual(histograms["FakeLibrary.protect_file.run_session"]["count"], 1)
+        self.assertEqual(histograms["FakeLibrary.protect_file.output_bytes"]["max"], 7)
+        self.assertNotIn("FakeLibrary.run_session", histograms)
+
+    def test_gw_return_obj___timings_attached(self):
+        result = FakeLibrary().protect_archive(b"content")
+
+        self.assertEqual(result.timings["operation"], "FakeLibrary.protect_archive")
+        self.assertEqual(set(result.timings["phases"]), {"protect_file", "other"})
+        self.assertEqual(result.timings["output_bytes"], 7)
+
+    def test_task_result___timings_collected(self):
+        results_queue = queue.Queue()
+        execute_task_and_put_in_queue(Task(protect_file, args=(b"content",)), results_queue)
+
+        task_result = results_queue.get_nowait()
+        self.assertTrue(task_result.success)
+        self.assertEqual([timings["operation"] for timings in task_result.timings], ["FakeLibrary.protect_file"])
+
+    def test_disabled___nothing_recorded(self):
+        instrumentation.disable()
+        result = FakeLibrary().protect_archive(b"content")
+
+        self.assertFalse(hasattr(result, "timings"))
+        self.assertEqual(instrumentation.get_histograms(), {})
+
+        results_queue = queue.Queue()
+        execute_task_and_put_in_queue(Task(protect_file, args=(b"content",)), results_queue)
+        self.assertIsNone(results_queue.get_nowait().timings)
+
+    def test_histogram___percentiles(self):
+        histogram = instrumentation.Histogram("name", "seconds")
+        for value in (0.001, 0.002, 0.003, 0.1):
+            histogram.add(value)
+
+        self.assertEqual(histogram.count, 4)
+        self.assertAlmostEqual(histogram.mean, 0.0265)
+        self.assertEqual(histogram.percentile(50), 2 ** -8)
+        self.assertEqual(histogram.percentile(100), 0.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import queue
+import time
+import unittest
+
+from glasswall import profiling
+from glasswall.instrumentation import instrumented
+from glasswall.multiprocessing.manager import GlasswallProcessManager
+from glasswall.multiprocessing.tasks import Task, execute_task_and_put_in_queue
+
+from benchmarks.stub_engine import StubEngineTestCase
+
+
+def busy_function(seconds):
+    end_time = time.perf_counter() + seconds
+    while time.perf_counter() < end_time:
+        pass
+
+
+class FakeLibrary:
+    @instrumented
+    def run_session(self):
+        busy_function(0.002)
+
+    @instrumented
+    def protect_file(self, input_file):
+        self.run_session()
+        self.buffer = bytearray(1024 * 1024)
+        return input_file
+
+
+def protect_file(input_file):
+    return FakeLibrary().protect_file(input_file)
+
+
+class TestProfiling(StubEngineTestCase):
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(profiling.disable)
+
+    def test_disabled___nothing_written(self):
+        FakeLibrary().protect_file(b"content")
+
+        self.assertFalse(profiling.is_enabled())
+        self.assertEqual(profiling.summary(self.temp_directory), {})
+
+    def test_outermost_operation_profiled(self):
+        profiling.enable(cprofile=True, tracemalloc=True, directory=self.temp_directory)
+        for _ in range(3):
+            FakeLibrary().protect_file(b"content")
+
+        self.assertEqual(os.listdir(self.temp_directory), ["FakeLibrary.protect_file"])
+        operations = profiling.summary(self.temp_directory)
+        result = operations["FakeLibrary.protect_file"]
+        self.assertEqual((result["profiles"], result["memory_profiles"]), (3, 3))
+        self.assertIn("busy_function", " ".join(function["function"] for function in result["functions"][:5]))
+        self.assertGreaterEqual(result["peak_bytes"], 1024 * 1024)
+        self.assertTrue(result["allocations"])
+        self.assertIn("FakeLibrary.protect_file: 3 profiles", profiling.format_summary(operations))
+
+    def test_sample_rate(self):
+        profiling.enable(directory=self.temp_directory, sample_rate=0)
+        FakeLibrary().protect_file(b"content")
+        self.assertEqual(profiling.summary(self.temp_directory), {})
+
+    def test_task_profiled(self):
+        profiling.enable(directory=self.temp_directory)
+        results_queue = queue.Queue()
+        execute_task_and_put_in_queue(Task(protect_file, args=(b"content",)), results_queue)
+
+        self.assertTrue(results_queue.get_nowait().success)
+        self.assertEqual(list(profiling.summary(self.temp_directory)), ["Task.protect_file"])
+
+    def test_worker_processes_profiled(self):
+        profiling.enable(directory=self.temp_directory)
+        manager = GlasswallProcessManager(max_workers=2)
+        for _ in range(2):
+            manager.queue_task(Task(protect_file, args=(b"content",)))
+        task_results = list(manager.as_completed())
+
+        self.assertTrue(all(task_result.success for task_result in task_results))
+        self.assertEqual(profiling.summary(self.temp_directory)["Task.protect_file"]["profiles"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
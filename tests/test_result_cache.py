@@ -0,0 +1,124 @@
+import os
+import tempfile
+import unittest
+
+import glasswall
+from glasswall.result_cache import ResultCache, cached_result
+
+
+class FakeEditor:
+    """ Reverses the input bytes, counting calls. """
+
+    def __init__(self, result_cache: ResultCache, library_version: str = "1.0.0"):
+        self.result_cache = result_cache
+        self.library_version = library_version
+        self.call_count = 0
+
+    def version(self):
+        return self.library_version
+
+    @cached_result
+    def protect_file(self, input_file, output_file=None, content_management_policy=None, raise_unsupported=True):
+        self.call_count += 1
+        if input_file == b"unsupported":
+            return None
+        if isinstance(input_file, str):
+            with open(input_file, "rb") as f:
+                input_file = f.read()
+        file_bytes = bytes(input_file)[::-1]
+        if output_file is not None:
+            with open(output_file, "wb") as f:
+                f.write(file_bytes)
+        return file_bytes
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_directory = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.temp_directory.name, "cache")
+
+    def tearDown(self):
+        self.temp_directory.cleanup()
+
+    def test_memory___least_recently_used_evicted(self):
+        result_cache = ResultCache(max_memory_bytes=10)
+        result_cache.put("1.0.0", "a", b"aaaa")
+        result_cache.put("1.0.0", "b", b"bbbb")
+        self.assertEqual(result_cache.get("1.0.0", "a"), b"aaaa")
+        result_cache.put("1.0.0", "c", b"cccc")
+
+        self.assertIsNone(result_cache.get("1.0.0", "b"))
+        self.assertEqual(result_cache.get("1.0.0", "a"), b"aaaa")
+        self.assertEqual(result_cache.get("1.0.0", "c"), b"cccc")
+        self.assertIsNone(result_cache.get("2.0.0", "c"))
+
+        metrics = result_cache.metrics()
+        self.assertEqual((metrics["hits"], metrics["misses"], metrics["bytes_saved"], metrics["evictions"]), (3, 2, 12, 1))
+
+    def test_disk___persisted_and_evicted_by_size(self):
+        result_cache = ResultCache(max_memory_bytes=0, directory=self.directory, max_disk_bytes=10)
+        result_cache.put("1.0.0", "a", b"aaaa")
+        result_cache.put("1.0.0", "b", b"bbbb")
+
+        result_cache = ResultCache(max_memory_bytes=0, directory=self.directory, max_disk_bytes=10)
+        self.assertEqual(result_cache.get("1.0.0", "a"), b"aaaa")
+        result_cache.put("1.0.0", "c", b"cccc")
+
+        self.assertIsNone(result_cache.get("1.0.0", "b"))
+        self.assertEqual(result_cache.get("1.0.0", "c"), b"cccc")
+        self.assertEqual(result_cache.metrics()["disk_hits"], 2)
+        self.assertEqual(result_cache.metrics()["disk_bytes"], 8)
+
+    def test_disk___shared_directory___evicted_by_total_size(self):
+        # Caches in two processes sharing a directory
+        result_caches = [ResultCache(max_memory_bytes=0, directory=self.directory, max_disk_bytes=16) for _ in range(2)]
+        for index in range(8):
+            result_caches[index % 2].put("1.0.0", str(index), b"%04d" % index)
+
+        disk_bytes = sum(os.path.getsize(os.path.join(self.directory, "1.0.0", name)) for name in os.listdir(os.path.join(self.directory, "1.0.0")))
+        self.assertLessEqual(disk_bytes, 16)
+        self.assertEqual(result_caches[0].get("1.0.0", "7"), b"0007")
+        self.assertIsNone(result_caches[1].get("1.0.0", "0"))
+
+    def test_prune___other_library_versions_deleted(self):
+        result_cache = ResultCache(directory=self.directory)
+        result_cache.put("1.0.0", "a", b"aaaa")
+        result_cache.put("2.0.0", "a", b"AAAA")
+
+        result_cache.prune("2.0.0")
+
+        self.assertIsNone(result_cache.get("1.0.0", "a"))
+        self.assertEqual(result_cache.get("2.0.0", "a"), b"AAAA")
+        self.assertEqual(os.listdir(self.directory), ["2.0.0"])
+
+        result_cache.invalidate()
+        self.assertIsNone(result_cache.get("2.0.0", "a"))
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_cached_result___same_content_and_policy___processed_once(self):
+        editor = FakeEditor(ResultCache(directory=self.directory))
+        input_file = os.path.join(self.temp_directory.name, "input.txt")
+        output_file = os.path.join(self.temp_directory.name, "output", "output.txt")
+        with open(input_file, "wb") as f:
+            f.write(b"content")
+
+        self.assertEqual(editor.protect_file(b"content"), b"tnetnoc")
+        self.assertEqual(editor.protect_file(input_file, output_file), b"tnetnoc")
+        with open(output_file, "rb") as f:
+            self.assertEqual(f.read(), b"tnetnoc")
+        self.assertEqual(editor.call_count, 1)
+
+        # A different policy, operation or library version is processed again
+        editor.protect_file(b"content", content_management_policy=glasswall.content_management.policies.Editor(default="allow"))
+        self.assertEqual(editor.call_count, 2)
+        FakeEditor(editor.result_cache, library_version="2.0.0").protect_file(b"content")
+        self.assertEqual(editor.result_cache.metrics()["misses"], 3)
+
+        # Outputs that are None are not cached
+        editor.protect_file(b"unsupported")
+        editor.protect_file(b"unsupported")
+        self.assertEqual(editor.call_count, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import os
+import tempfile
+import unittest
+
+from glasswall import utils
+
+
+class TestIterateDirectoryEntries(unittest.TestCase):
+    def setUp(self):
+        self.temp_directory = tempfile.TemporaryDirectory()
+        self.directory = self.temp_directory.name
+        self.expected_files = []
+        for subdirectory in ("", "a", os.path.join("a", "b"), os.path.join("a", "b", "c"), "d"):
+            os.makedirs(os.path.join(self.directory, subdirectory), exist_ok=True)
+            for index in range(3):
+                relative_path = os.path.join(subdirectory, f"{index}.txt")
+                with open(os.path.join(self.directory, relative_path), "w") as f:
+                    f.write(relative_path)
+                self.expected_files.append(relative_path)
+        self.expected_files.sort()
+
+    def tearDown(self):
+        self.temp_directory.cleanup()
+
+    def test_unsorted_and_threaded___same_entries_as_sorted(self):
+        for file_type in ("all", "files", "directories"):
+            for absolute in (True, False):
+                expected = utils.list_file_paths(self.directory, file_type=file_type, absolute=absolute)
+                self.assertEqual(sorted(utils.list_file_paths(self.directory, file_type=file_type, absolute=absolute, sort=False)), expected)
+                self.assertEqual(sorted(utils.iterate_directory_entries(self.directory, file_type=file_type, absolute=absolute, max_workers=4)), expected)
+
+        self.assertEqual(utils.list_file_paths(self.directory, absolute=False), self.expected_files)
+        self.assertEqual(
+            utils.list_file_paths(self.directory, file_type="directories", absolute=False),
+            ["a", os.path.join("a", "b"), os.path.join("a", "b", "c"), "d"],
+        )
+
+    def test_order___directories_yielded_after_their_entries(self):
+        def iterate_recursively(directory):
+            for entry in os.scandir(directory):
+                if entry.is_dir():
+                    yield from iterate_recursively(entry.path)
+                    yield entry.path
+                elif entry.is_file():
+                    yield entry.path
+
+        self.assertEqual(list(utils.iterate_directory_entries(self.directory)), list(iterate_recursively(self.directory)))
+
+    def test_start_directory___relative_to_start_directory(self):
+        self.assertEqual(
+            sorted(utils.iterate_directory_entries(os.path.join(self.directory, "a", "b"), file_type="files", absolute=False, start_directory=self.directory)),
+            [path for path in self.expected_files if path.startswith(os.path.join("a", "b") + os.sep)],
+        )
+
+    def test_non_recursive___top_level_files_only(self):
+        self.assertEqual(utils.list_file_paths(self.directory, absolute=False, recursive=False), ["0.txt", "1.txt", "2.txt"])
+
+    def test_glasswall_directory___skipped(self):
+        os.makedirs(os.path.join(self.directory, "a", utils.GLASSWALL_DIRECTORY_NAME))
+        with open(os.path.join(self.directory, "a", utils.GLASSWALL_DIRECTORY_NAME, "change_index.sqlite3"), "w"):
+            pass
+
+        for max_workers in (None, 4):
+            self.assertEqual(sorted(utils.iterate_directory_entries(self.directory, file_type="files", absolute=False, max_workers=max_workers)), self.expected_files)
+
+    @unittest.skipUnless(hasattr(os, "symlink") and os.name == "posix", "requires symlinks")
+    def test_symlink_loop___walked_once(self):
+        os.symlink(self.directory, os.path.join(self.directory, "a", "b", "loop"))
+        os.symlink(os.path.join(self.directory, "a"), os.path.join(self.directory, "d", "a_link"))
+
+        for max_workers in (None, 2):
+            file_paths = utils.list_file_paths(self.directory, absolute=False, max_workers=max_workers)
+            # The loop back to the root is not followed, the symlink to "a" is followed once
+            self.assertEqual(
+                file_paths,
+                sorted(self.expected_files + [
+                    os.path.join("d", "a_link", path[len("a" + os.sep):])
+                    for path in self.expected_files
+                    if path.startswith("a" + os.sep)
+                ])
+            )
+
+            # Deduplicate by inode, files under d/a_link were already listed under a, or vice versa
+            self.assertEqual(len(utils.list_file_paths(self.directory, deduplicate=True, max_workers=max_workers)), len(self.expected_files))
+
+            # Symlinks are not followed
+            self.assertEqual(utils.list_file_paths(self.directory, absolute=False, followlinks=False, max_workers=max_workers), self.expected_files)
+
+    @unittest.skipUnless(hasattr(os, "link"), "requires hard links")
+    def test_deduplicate___hard_links_listed_once(self):
+        os.link(os.path.join(self.directory, "0.txt"), os.path.join(self.directory, "d", "hard_link.txt"))
+
+        self.assertEqual(len(utils.list_file_paths(self.directory)), len(self.expected_files) + 1)
+        self.assertEqual(len(utils.list_file_paths(self.directory, deduplicate=True)), len(self.expected_files))
+
+    def test_threaded___generator_closed_early(self):
+        entries = utils.iterate_directory_entries(self.directory, file_type="files", max_workers=2)
+        self.assertTrue(os.path.isfile(next(entries)))
+        entries.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
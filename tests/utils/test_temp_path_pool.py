@@ -0,0 +1,66 @@
+import os
+import threading
+import unittest
+
+from glasswall import utils
+
+
+class TestTempPathPool(unittest.TestCase):
+    def test_invalid_args(self):
+        with self.assertRaises(TypeError):
+            utils.TempPathPool(size="1")
+        with self.assertRaises(ValueError):
+            utils.TempPathPool(size=0)
+
+        pool = utils.TempPathPool(size=2)
+        with self.assertRaises(ValueError):
+            with pool.paths(3):
+                pass
+        pool.close()
+
+    def test_paths_are_reused_and_cleaned(self):
+        pool = utils.TempPathPool(size=2)
+        self.assertTrue(os.path.isdir(pool.directory))
+        self.assertTrue(pool.directory.startswith(utils.get_ram_temp_directory()))
+
+        with pool.paths(2) as (first, second):
+            self.assertNotEqual(first, second)
+            with open(first, "wb") as f:
+                f.write(b"content")
+        # Files are deleted on release
+        self.assertFalse(os.path.isfile(first))
+
+        with pool.paths(2) as paths:
+            self.assertEqual(sorted(paths), sorted([first, second]))
+
+        pool.close()
+        self.assertFalse(os.path.isdir(pool.directory))
+
+    def test_concurrent_paths(self):
+        pool = utils.TempPathPool(size=3)
+        in_use = set()
+        lock = threading.Lock()
+        errors = []
+
+        def worker():
+            for _ in range(50):
+                with pool.paths(2) as paths:
+                    with lock:
+                        if in_use.intersection(paths):
+                            errors.append(paths)
+                        in_use.update(paths)
+                    with lock:
+                        in_use.difference_update(paths)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        pool.close()
+
+
+if __name__ == "__main__":
+    unittest.main()